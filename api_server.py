@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+"""Read-only REST API over the crawled papers (see tools/rest_api.py).
+
+    python api_server.py --port 8080
+    curl -H 'Accept-Encoding: gzip' http://127.0.0.1:8080/api/categories/cs.AI/latest
+
+For production, point a WSGI server at ``api_server:app``, e.g.
+``gunicorn -w 4 api_server:app``.
+"""
+import os
+import argparse
+import logging
+from tools.logs import configure_logging
+from tools.rest_api import create_app
+
+# 与MCP服务器共用数据目录
+BASE_DIR = os.environ.get("ARXIV_BASE_DIR") or os.path.dirname(os.path.abspath(__file__))
+
+app = create_app(BASE_DIR)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.environ.get("ARXIV_API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("ARXIV_API_PORT", "8080")))
+    args = parser.parse_args()
+
+    configure_logging(os.path.join(BASE_DIR, "arxiv_api.log"))
+    logging.getLogger(__name__).info(f"Serving REST API on http://{args.host}:{args.port}")
+    app.run(host=args.host, port=args.port, threaded=True)
@@ -1,53 +1,214 @@
 #!/usr/bin/env python
 from mcp.server import FastMCP
+from mcp.types import CallToolResult
+import argparse
+import asyncio
+import functools
+import json
 import logging
 import os
-import sys
-from tools.crawler import crawl_latest_papers
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timezone
+from tools.backfill import BACKFILL_CONCURRENCY, backfill
+from tools.browser_pool import BrowserPool
+from tools.cache import cache_stats
+from tools.crawler import crawl_categories, crawl_flights, crawl_latest_papers
+from tools.executor import shutdown as shutdown_executor
+from tools.limits import ClientLimiter
+from tools.logs import configure_logging, stop_logging
+from tools.metrics import MetricsDumper, registry
+from tools.paper_store import close_stores, open_store
 from tools.paper_info import check_latest_paper_info
 from tools.titles import get_latest_titles
+from tools.scheduler import CrawlScheduler
+from tools.dedup import close_dedup_indexes, find_duplicates
+from tools.search import search_titles
+from tools.storage import CATEGORIES, DEFAULT_CATEGORY
+from tools.topics import close_topic_indexes, topics_for_day, trend
+
+# 定义基础目录（ARXIV_BASE_DIR 可指定数据目录）
+BASE_DIR = os.environ.get("ARXIV_BASE_DIR") or os.path.dirname(os.path.abspath(__file__))
+
+# 传输方式：stdio（默认，每个客户端启动一个进程）或 sse / streamable-http（一个进程服务多个客户端）
+TRANSPORT = os.environ.get("ARXIV_TRANSPORT", "stdio")
+HOST = os.environ.get("ARXIV_HOST", "127.0.0.1")
+PORT = int(os.environ.get("ARXIV_PORT", "8000"))
+# 每个客户端会话同时执行的工具调用数，多出的排队等待
+CLIENT_CONCURRENCY = int(os.environ.get("ARXIV_CLIENT_CONCURRENCY", "4"))
+# 停止服务时等待进行中的调用完成的秒数
+SHUTDOWN_TIMEOUT = float(os.environ.get("ARXIV_SHUTDOWN_TIMEOUT", "30"))
+
+# 浏览器池配置（仅 backend="playwright" 时使用）
+BROWSER_POOL_SIZE = int(os.environ.get("ARXIV_BROWSER_POOL_SIZE", "2"))
+BROWSER_IDLE_TIMEOUT = float(os.environ.get("ARXIV_BROWSER_IDLE_TIMEOUT", "300"))
+BROWSER_MAX_NAVIGATIONS = int(os.environ.get("ARXIV_BROWSER_MAX_NAVIGATIONS", "100"))
+
+# 后台定时抓取（默认关闭）：arXiv每次公告后 DELAY 秒（再加随机抖动）抓取配置的分类
+SCHEDULER_ENABLED = os.environ.get("ARXIV_SCHEDULER", "0").lower() in ("1", "true", "yes")
+SCHEDULE_CATEGORIES = [c.strip() for c in os.environ.get("ARXIV_SCHEDULE_CATEGORIES", "cs.AI").split(",") if c.strip()]
+SCHEDULE_DELAY = float(os.environ.get("ARXIV_SCHEDULE_DELAY", "600"))
+SCHEDULE_JITTER = float(os.environ.get("ARXIV_SCHEDULE_JITTER", "300"))
+SCHEDULE_RETRIES = int(os.environ.get("ARXIV_SCHEDULE_RETRIES", "3"))
 
-# 定义基础目录
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-
-# 清除可能存在的处理器
-for handler in logging.root.handlers[:]:
-    logging.root.removeHandler(handler)
-
-# 配置日志
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(BASE_DIR, 'arxiv_server0.log'), mode='w', encoding='utf-8'),  # 使用写入模式，每次启动都是新日志
-        logging.StreamHandler()  # 输出到控制台
-    ]
-)
 logger = logging.getLogger(__name__)
 
 def log_debug(message):
-    """Write debug message to log file and print to console"""
-    logger.debug(message)  # 使用debug级别，确保正确显示
-    # 同时直接打印到控制台，确保可见
-    sys.stdout.write(f"DEBUG: {message}\n")
-    sys.stdout.flush()
-
-# 记录基本环境信息
-log_debug(f"Base directory: {BASE_DIR}")
-log_debug(f"Current working directory: {os.getcwd()}")
-if os.path.exists(BASE_DIR):
-    log_debug(f"Base directory contents: {os.listdir(BASE_DIR)}")
-else:
-    log_debug("Base directory does not exist")
+    """Write debug message to log file and console"""
+    logger.debug(message)
+
+# 下面只创建对象，不启动任何东西；日志配置等有副作用的启动步骤都在 __main__ 里，
+# 被导入时（基准测试、ARXIV_CPU_WORKERS 的 spawn 子进程以 __mp_main__ 导入本文件）不会重复执行
+# 服务器进程持有的浏览器，首次使用时才启动，之后的抓取只需导航
+browser_pool = BrowserPool(
+    user_data_dir=os.path.join(BASE_DIR, "chrome_data"),
+    size=BROWSER_POOL_SIZE,
+    idle_timeout=BROWSER_IDLE_TIMEOUT,
+    max_navigations=BROWSER_MAX_NAVIGATIONS,
+)
+
+async def scheduled_crawl(categories: list) -> dict:
+    # 公告之后一定要重新抓取，增量抓取保证没有变化时也很快
+    return await crawl_categories(BASE_DIR, categories, pool=browser_pool, force=True)
+
+def last_crawled():
+    """When the least recently crawled scheduled category was crawled, or None"""
+    store = open_store(BASE_DIR)
+    days = [store.latest_day(category) for category in SCHEDULE_CATEGORIES]
+    if any(day is None for day in days):
+        return None
+    return datetime.fromtimestamp(min(day["crawled_at"] for day in days), timezone.utc)
+
+scheduler = CrawlScheduler(
+    scheduled_crawl,
+    SCHEDULE_CATEGORIES,
+    delay=SCHEDULE_DELAY,
+    jitter=SCHEDULE_JITTER,
+    retries=SCHEDULE_RETRIES,
+    last_crawled=last_crawled,
+)
+
+client_limiter = ClientLimiter(CLIENT_CONCURRENCY)
+
+def read_cache_totals() -> dict:
+    """Hits and misses of the read caches of every base directory together"""
+    totals = {"hits": 0, "misses": 0}
+    for stats in cache_stats().values():
+        for key in totals:
+            totals[key] += stats[key]
+    lookups = totals["hits"] + totals["misses"]
+    return dict(totals, hit_rate=round(totals["hits"] / lookups, 4) if lookups else None)
+
+# server_stats_tool 和 /metrics 里同时给出这些组件自己的统计
+registry.add_collector("read_cache", read_cache_totals)
+registry.add_collector("browser_pool", browser_pool.get_stats)
+registry.add_collector("client", client_limiter.get_stats)
+registry.add_collector("crawl_flights", crawl_flights.get_stats)
+# ARXIV_METRICS_FILE / ARXIV_TRACE_FILE 设置时定期写出指标和 span
+metrics_dumper = MetricsDumper()
+
+@asynccontextmanager
+async def lifespan(server):
+    # HTTP传输下每个客户端会话都会进入一次，start() 只启动一次
+    if SCHEDULER_ENABLED:
+        log_debug(f"Starting crawl scheduler for {SCHEDULE_CATEGORIES}")
+        scheduler.start()
+    metrics_dumper.start()
+    yield {}
+
+async def shutdown():
+    """Let running tool calls finish, then stop the scheduler and release the shared resources"""
+    await client_limiter.drain(SHUTDOWN_TIMEOUT)
+    await scheduler.stop()
+    await metrics_dumper.stop()
+    await browser_pool.close()
+    shutdown_executor()
+    close_topic_indexes()
+    close_dedup_indexes()
+    close_stores()
+    logger.info("MCP server stopped")
+
+# 失败的结果都很小；更大的文本不再解析，直接算作成功
+ERROR_RESULT_MAX_BYTES = 65536
+
+def _failed_result(content, structured) -> bool:
+    """Whether a tool's converted result carries ``success: false``"""
+    if isinstance(structured, dict):
+        return structured.get("success") is False
+    texts = [block.text for block in content if getattr(block, "text", None)]
+    if len(texts) != 1 or len(texts[0]) > ERROR_RESULT_MAX_BYTES:
+        return False
+    try:
+        value = json.loads(texts[0])
+    except ValueError:
+        return False
+    return isinstance(value, dict) and value.get("success") is False
+
+class InstrumentedMCP(FastMCP):
+    """FastMCP that records latency, errors and response size of every tool call"""
+
+    async def call_tool(self, name: str, arguments: dict):
+        if not registry.enabled:
+            return await super().call_tool(name, arguments)
+        started = time.perf_counter()
+        try:
+            result = await super().call_tool(name, arguments)
+        except Exception as e:
+            # 工具内部的异常被包装成 ToolError，按原始异常类型计数
+            registry.inc("arxiv_tool_errors_total", tool=name, type=type(e.__cause__ or e).__name__)
+            registry.inc("arxiv_tool_calls_total", tool=name, status="error")
+            raise
+        finally:
+            registry.observe("arxiv_tool_seconds", time.perf_counter() - started, tool=name)
+        if isinstance(result, CallToolResult):
+            content, structured = result.content, result.structuredContent
+        elif isinstance(result, tuple):
+            content, structured = result
+        else:
+            content, structured = result, None
+        # 按已经序列化好的文本计算返回的字节数，不再重新序列化
+        size = sum(len(block.text.encode("utf-8")) for block in content if getattr(block, "text", None))
+        registry.inc("arxiv_tool_response_bytes_total", size, tool=name)
+        if _failed_result(content, structured):
+            registry.inc("arxiv_tool_errors_total", tool=name, type="error_result")
+            registry.inc("arxiv_tool_calls_total", tool=name, status="error")
+        else:
+            registry.inc("arxiv_tool_calls_total", tool=name, status="ok")
+        return result
 
 # 创建MCP服务器
-mcp = FastMCP()
+mcp = InstrumentedMCP(lifespan=lifespan)
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request):
+    """Prometheus scrape endpoint (sse / streamable-http transports only)"""
+    from starlette.responses import PlainTextResponse
+
+    return PlainTextResponse(registry.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+def limited(fn):
+    """Run the tool inside the calling client's concurrency limit"""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        try:
+            session = mcp.get_context().session
+        except ValueError:  # 不在MCP请求中
+            session = None
+        async with client_limiter.slot(session):
+            return await fn(*args, **kwargs)
+    return wrapper
 
 @mcp.tool()
-async def crawl_latest_papers_tool() -> dict:
-    """Fetch the latest arXiv CS.AI paper titles by crawling the website.
+@limited
+async def crawl_latest_papers_tool(category: str = DEFAULT_CATEGORY, backend: str = "http",
+                                   force: bool = False) -> dict:
+    """Fetch the latest arXiv paper titles of a category (cs.AI by default) by crawling the website.
     
-    This will launch a browser and fetch today's papers from arXiv.
+    This will fetch today's listing page from arXiv over plain HTTP.
+    Pass backend="playwright" to use the server's warm browser instead (fallback).
+    If the category was already crawled today within the last hour, the stored
+    result is returned without crawling (fresh=true); pass force=True to crawl anyway.
+    Concurrent calls share one crawl.
     Use this when:
     - You need papers for today's date
     - There are no local files for today's date
@@ -55,32 +216,257 @@ async def crawl_latest_papers_tool() -> dict:
     
     Returns information about the crawling result, including date, paper count and filename
     """
-    return await crawl_latest_papers(BASE_DIR)
+    return await crawl_latest_papers(BASE_DIR, backend=backend, pool=browser_pool, category=category,
+                                     force=force)
 
 @mcp.tool()
-async def check_latest_paper_info_tool() -> dict:
-    """Check if there are already crawled arXiv papers for today's date.
+@limited
+async def crawl_categories_tool(categories: list[str] = None, backend: str = "http",
+                                force: bool = False) -> dict:
+    """Fetch the latest arXiv papers of several categories in one run.
+    
+    Categories default to cs.AI, cs.LG, cs.CL, cs.CV and stat.ML. They are
+    fetched in parallel over one shared connection (or browser) and each is
+    saved to its own file; cross-listed papers are recorded once.
+    Like crawl_latest_papers_tool, recent crawls are reused unless force=True.
+    
+    Returns one crawling result per category plus the number of distinct and cross-listed papers
+    """
+    return await crawl_categories(BASE_DIR, categories or list(CATEGORIES), backend=backend, pool=browser_pool,
+                                  force=force)
+
+@mcp.tool()
+@limited
+async def backfill_tool(date_from: str, date_to: str = None, categories: list[str] = None,
+                        concurrency: int = BACKFILL_CONCURRENCY) -> dict:
+    """Fetch past arXiv listing days that were never crawled.
+    
+    Walks every day of date_from..date_to (YYYY-MM-DD, date_to defaults to today)
+    for the given categories (default cs.AI) and stores them like the daily crawl.
+    Days already stored are skipped and progress is checkpointed, so calling it
+    again after an interruption resumes where it stopped. Requests slow down
+    automatically when arXiv answers 429/503.
+    
+    Returns the number of fetched, empty (no announcement), skipped and failed days and days/minute
+    """
+    return await backfill(BASE_DIR, date_from, date_to or date.today().isoformat(),
+                          categories or [DEFAULT_CATEGORY], concurrency=concurrency)
+
+@mcp.tool()
+@limited
+async def check_latest_paper_info_tool(category: str = DEFAULT_CATEGORY) -> dict:
+    """Check if there are already crawled arXiv papers of a category (cs.AI by default) for today's date.
     
     This will look for files matching the pattern arxiv_AI_YYYY-MM-DD_(140entries).txt
-    and check if any are from today.
+    (arxiv_LG_..., arxiv_stat.ML_... for other categories) and check if any are from today.
     
     Returns information about whether papers are available and if they are current
     """
-    return await check_latest_paper_info(BASE_DIR)
+    return await check_latest_paper_info(BASE_DIR, category=category)
 
 @mcp.tool()
-async def get_latest_titles_tool() -> dict:
-    """Get the latest arXiv CS.AI paper titles from the local file.
+@limited
+async def get_latest_titles_tool(category: str = DEFAULT_CATEGORY, offset: int = 0, limit: int = None,
+                                 cursor: str = None, fields: str = "titles", compact: bool = False,
+                                 dedup: bool = False) -> dict:
+    """Get the latest arXiv paper titles of a category (cs.AI by default) from the local file.
     
     This will read the most recent file containing paper titles.
     Use this when:
     - You want to get the titles from the most recent crawl
     - You don't need to fetch new data
     
+    Big days (500+ entries) should be read in pages:
+    - offset/limit: which slice of the day to return, e.g. limit=100
+    - cursor: pass next_cursor of the previous page to continue on the same day
+    - fields: "titles" (default) or "records" for id, authors, categories and links
+    - compact: titles as one newline-separated text, records as columns + rows
+    - dedup: leave out replacements, cross-lists and reworded copies of papers listed before
+    
     Returns the list of paper titles from the most recent crawl
     """
-    return await get_latest_titles(BASE_DIR)
+    return await get_latest_titles(BASE_DIR, category=category, offset=offset, limit=limit,
+                                   cursor=cursor, fields=fields, compact=compact, dedup=dedup)
+
+@mcp.tool()
+@limited
+async def search_titles_tool(query: str, date_range: str = None, category: str = None, limit: int = 20,
+                             dedup: bool = False) -> dict:
+    """Full-text search over the titles and authors of every crawled day.
+    
+    Results are ranked by BM25 and only the top `limit` (max 100) are returned,
+    each with a highlighted snippet. Use this instead of get_latest_titles_tool
+    when looking for specific topics, methods or authors.
+    - query: words to search for; supports "exact phrase", AND/OR/NOT and prefix*
+    - date_range: "YYYY-MM-DD..YYYY-MM-DD" (either side optional) or a single day
+    - category: only papers listed in this category, e.g. cs.LG
+    - dedup: one hit per group of near-duplicate papers (the others under "duplicates")
+    
+    Returns the ranked hits with arXiv id, title, authors, categories, date and links
+    """
+    return await search_titles(BASE_DIR, query, date_range=date_range, category=category, limit=limit,
+                               dedup=dedup)
+
+@mcp.tool()
+@limited
+async def find_duplicates_tool(arxiv_id: str = None, title: str = None) -> dict:
+    """Find the near-duplicates and versions of a paper among all crawled days.
+    
+    Papers with almost the same title (MinHash + LSH over the stored titles)
+    are grouped as one work, so the lookup does not scan every title.
+    Use this when:
+    - You want to know whether a paper is new or a resubmission / replacement of an earlier one
+    - You want the version history of a paper (which day each version was first listed)
+    
+    - arxiv_id: a stored paper, e.g. 2504.01234
+    - title: any title; returns the stored papers that nearly match it
+    
+    Returns the matching groups, each paper with its first listing day and versions
+    """
+    return await find_duplicates(BASE_DIR, arxiv_id=arxiv_id, title=title)
+
+@mcp.tool()
+@limited
+async def topics_for_day_tool(category: str = DEFAULT_CATEGORY, date: str = None) -> dict:
+    """Get the topics of one crawled day (the latest by default), computed locally.
+    
+    The day's titles are clustered with TF-IDF and k-means when the day is
+    stored, so this answers without reading the titles again.
+    Use this when:
+    - You want to know what a day's papers are about, grouped by theme
+    - You want to classify papers by topic and count papers per topic
+    
+    Returns every topic's label, number of papers, top terms and the most
+    representative papers (id and title), largest topic first
+    """
+    return await topics_for_day(BASE_DIR, category=category, date=date)
+
+@mcp.tool()
+@limited
+async def trend_tool(term: str, date_range: str = None, category: str = DEFAULT_CATEGORY) -> dict:
+    """Get how often a word or two-word phrase appears in titles, day by day.
+    
+    Answered from per-day term counts, so months of history are cheap.
+    Use this when:
+    - You want to know whether a topic (e.g. "diffusion", "language model") is rising or falling
+    - You want to compare how popular terms are over a period
+    
+    - term: one word or a two-word phrase (case-insensitive, no stopwords)
+    - date_range: "YYYY-MM-DD..YYYY-MM-DD" (either side optional) or a single day
+    
+    Returns per-day counts and shares, the totals and the share in the first and second half of the range
+    """
+    return await trend(BASE_DIR, term, date_range=date_range, category=category)
+
+@mcp.tool()
+async def scheduler_state_tool() -> dict:
+    """Get the state of the background crawl scheduler.
+    
+    When enabled (ARXIV_SCHEDULER=1), the server crawls the configured categories
+    shortly after every arXiv announcement, so the read tools find fresh data.
+    Shows whether it is running, the next run time, and the duration, attempts
+    and result of the last run.
+    """
+    return {
+        "success": True,
+        "data": scheduler.get_state()
+    }
+
+@mcp.tool()
+async def browser_pool_stats_tool() -> dict:
+    """Get statistics of the server's shared browser pool.
+    
+    Shows launches, reuses, recycles, health-check failures, idle shutdowns
+    and the time crawls waited for a page, to confirm the warm path is hit.
+    """
+    return {
+        "success": True,
+        "data": browser_pool.get_stats()
+    }
+
+@mcp.tool()
+async def read_cache_stats_tool() -> dict:
+    """Get hit/miss statistics of the read cache behind the title and info tools.
+    
+    Repeat calls of check_latest_paper_info_tool and get_latest_titles_tool are
+    answered from memory until a crawl (in any process) changes the store.
+    """
+    return {
+        "success": True,
+        "data": cache_stats()
+    }
+
+@mcp.tool()
+async def server_stats_tool(spans: int = 20) -> dict:
+    """Get the server's own metrics: latency per tool and per crawl stage, counters and recent spans.
+    
+    Use this when:
+    - A tool call or crawl is slow and you want to know which stage the time goes to
+    - You want to see error counts by type, bytes returned or how many crawls were
+      answered from the store
+    
+    Tools show call count, mean/p50/p95/p99/max latency in ms, errors and bytes
+    returned; stages (crawl.fetch, crawl.parse, crawl.write_files, browser.goto, ...)
+    the same latencies plus errors by exception type.  Also includes the read cache,
+    browser pool, client limiter and crawl coalescing stats, and, with ARXIV_TRACING=1,
+    the last ``spans`` spans.  Disabled with ARXIV_METRICS=0.
+    """
+    return {
+        "success": True,
+        "data": registry.snapshot(spans=spans)
+    }
+
+async def serve(transport: str, host: str = HOST, port: int = PORT):
+    """Serve until stopped (Ctrl+C / SIGTERM), then shut down gracefully"""
+    try:
+        if transport == "stdio":
+            await mcp.run_stdio_async()
+        else:
+            import uvicorn
+
+            class DrainingServer(uvicorn.Server):
+                """Let running tool calls send their results before uvicorn closes the streams"""
+
+                def handle_exit(self, sig, frame):
+                    if client_limiter.closing:  # 再按一次 Ctrl+C 立即退出
+                        self.force_exit = True
+                        self.should_exit = True
+                        return
+                    logger.info("Shutting down, waiting for running tool calls")
+                    loop.call_soon_threadsafe(lambda: loop.create_task(self.drain()))
+
+                async def drain(self):
+                    await client_limiter.drain(SHUTDOWN_TIMEOUT)
+                    self.should_exit = True
+
+            # 所有客户端共享同一个进程里的抓取结果、读缓存和浏览器池
+            loop = asyncio.get_running_loop()
+            app = mcp.sse_app() if transport == "sse" else mcp.streamable_http_app()
+            config = uvicorn.Config(app, host=host, port=port, log_level="warning",
+                                    timeout_graceful_shutdown=SHUTDOWN_TIMEOUT)
+            logger.info(f"Serving MCP over {transport} on http://{host}:{port}")
+            await DrainingServer(config).serve()
+    finally:
+        await shutdown()
 
 if __name__ == "__main__":
-    log_debug("Starting MCP server...")
-    mcp.run(transport='stdio') 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="arXiv papers MCP server")
+    parser.add_argument("--transport", choices=["stdio", "sse", "streamable-http"], default=TRANSPORT)
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+
+    # 配置日志：经队列由后台线程写入日志文件和 stderr（stdout 用于MCP的stdio协议）
+    # 日志级别由 ARXIV_LOG_LEVEL 设置，默认 INFO
+    configure_logging(os.path.join(BASE_DIR, 'arxiv_server0.log'))
+    # 记录基本环境信息
+    log_debug(f"Base directory: {BASE_DIR}")
+    log_debug(f"Current working directory: {os.getcwd()}")
+
+    logger.info("Starting MCP server...")
+    try:
+        asyncio.run(serve(args.transport, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_logging()
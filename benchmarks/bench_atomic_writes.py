@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""Stress test: concurrent readers and writers of the day files.
+
+Every writer process keeps rewriting its own day with new versions of the
+titles (sometimes with one entry more, so the file name changes and the old
+files are removed like a re-crawl does).  Reader processes keep globbing
+and reading the days (crawls of one day are serialized by the crawl lock,
+so writers do not share a day).  A read is torn when the titles do not all come from
+one version, when their number differs from the count in the file name or
+when the records do not match the titles.  Runs the old direct
+``open(..., "w")`` writes and the atomic writes with manifests:
+
+    python benchmarks/bench_atomic_writes.py --writers 2 --readers 4 --seconds 5 --entries 2000
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import multiprocessing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tools.storage import (TornRead, find_day_files, parse_day_filename, read_day_files,
+                           records_filename, day_filename, write_day_files)
+
+CATEGORY = "cs.AI"
+
+def version_titles(writer: int, version: int, entries: int) -> list:
+    return [f"Writer {writer} version {version} paper {i} " + "x" * 40 for i in range(entries)]
+
+def write_direct(base_dir: str, day: str, titles: list):
+    """The old way: write straight onto the final names"""
+    filename = day_filename(CATEGORY, day, len(titles))
+    with open(os.path.join(base_dir, filename), "w", encoding="utf-8") as f:
+        f.write("\n".join(titles))
+    with open(os.path.join(base_dir, records_filename(filename)), "w", encoding="utf-8") as f:
+        for title in titles:
+            f.write(json.dumps({"title": title}, ensure_ascii=False))
+            f.write("\n")
+    return filename
+
+def write_atomic(base_dir: str, day: str, titles: list):
+    return write_day_files(base_dir, CATEGORY, day, iter(titles), ({"title": title} for title in titles))["filename"]
+
+def writer_day(n: int) -> str:
+    return f"2025-04-{n + 1:02d}"
+
+def writer(mode: str, base_dir: str, n: int, entries: int, deadline: float, counter):
+    write = write_atomic if mode == "atomic" else write_direct
+    day = writer_day(n)
+    version = 0
+    while time.time() < deadline:
+        version += 1
+        titles = version_titles(n, version, entries + version % 2)
+        filename = write(base_dir, day, titles)
+        # 条目数变化时删掉旧文件，与重新抓取时相同
+        for path in find_day_files(base_dir, CATEGORY):
+            if parse_day_filename(path, CATEGORY)[0] == day and os.path.basename(path) != filename:
+                for name in (path, records_filename(path), os.path.splitext(path)[0] + ".manifest.json"):
+                    try:
+                        os.remove(name)
+                    except FileNotFoundError:
+                        pass
+        with counter.get_lock():
+            counter.value += 1
+
+def check(path: str, titles: list, records: list) -> bool:
+    """True if the read is consistent (one version, count as named)"""
+    _, named = parse_day_filename(path, CATEGORY)
+    if len(titles) != named or not titles:
+        return False
+    prefix = titles[0].split(" paper ")[0]
+    if any(not title.startswith(prefix + " paper ") for title in titles):
+        return False
+    return records is None or [r["title"] for r in records] == titles
+
+def reader(base_dir: str, deadline: float, results):
+    reads = torn = vanished = unreadable = 0
+    while time.time() < deadline:
+        for path in find_day_files(base_dir, CATEGORY):
+            try:
+                files = read_day_files(path)
+            except FileNotFoundError:
+                vanished += 1
+                continue
+            except TornRead:
+                # 重试之后仍不匹配：读取方识别出来并拒绝，不算撕裂读
+                unreadable += 1
+                continue
+            except (ValueError, KeyError):
+                # 写了一半的 JSON 记录
+                torn += 1
+                continue
+            reads += 1
+            if not check(path, files["titles"], files["records"]):
+                torn += 1
+    results.put({"reads": reads, "torn": torn, "vanished": vanished, "rejected": unreadable})
+
+def run(mode: str, writers: int, readers: int, seconds: float, entries: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        write = write_atomic if mode == "atomic" else write_direct
+        for n in range(writers):
+            write(tmp, writer_day(n), version_titles(n, 0, entries))
+        deadline = time.time() + seconds
+        counter = multiprocessing.Value("i", 0)
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=writer, args=(mode, tmp, n, entries, deadline, counter))
+                     for n in range(writers)]
+        processes += [multiprocessing.Process(target=reader, args=(tmp, deadline, results))
+                      for _ in range(readers)]
+        for p in processes:
+            p.start()
+        totals = {"reads": 0, "torn": 0, "vanished": 0, "rejected": 0}
+        for _ in range(readers):
+            for key, value in results.get().items():
+                totals[key] += value
+        for p in processes:
+            p.join()
+        leftovers = [name for name in os.listdir(tmp) if name.endswith(".tmp")]
+        return dict(totals, writes=counter.value, leftovers=len(leftovers))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each mode")
+    parser.add_argument("--entries", type=int, default=2000, help="titles per day file")
+    parser.add_argument("--modes", nargs="+", default=["direct", "atomic"], choices=["direct", "atomic"])
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds}s per mode, {args.entries} titles per day")
+    print(f"{'mode':<8}{'writes':>8}{'reads':>8}{'torn':>7}{'rejected':>10}{'vanished':>10}{'tmp left':>10}")
+    for mode in args.modes:
+        stats = run(mode, args.writers, args.readers, args.seconds, args.entries)
+        print(f"{mode:<8}{stats['writes']:>8}{stats['reads']:>8}{stats['torn']:>7}{stats['rejected']:>10}"
+              f"{stats['vanished']:>10}{stats['leftovers']:>10}")
+        if mode == "atomic":
+            assert stats["torn"] == 0, f"{stats['torn']} torn reads with atomic writes"
+            assert stats["leftovers"] == 0, "temporary files left behind"
+    print("no torn reads with atomic writes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""Backfill throughput, rate-limit adaptation and resume after a kill.
+
+Backfills ``--days`` past days of two categories from the fixture server
+(which injects latency, 503s and 429s) at several worker counts and
+reports days/minute; then kills a backfill half way and resumes it:
+
+    python benchmarks/bench_backfill.py --days 60 --latency 0.2 --fail-rate 0.03 --throttle-rate 0.03
+"""
+import os
+import sys
+import json
+import time
+import signal
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_server import FixtureServer
+from tools.backfill import CHECKPOINT_FILENAME, backfill
+from tools.paper_store import close_stores, open_store
+
+CATEGORIES = ["cs.AI", "cs.LG"]
+
+CHILD = """
+import sys, asyncio
+sys.path.insert(0, {root!r})
+from tools.backfill import backfill
+asyncio.run(backfill({base_dir!r}, {date_from!r}, {date_to!r}, {categories!r}, base_url={base_url!r},
+                     concurrency=2, retry_backoff=0.1))
+"""
+
+def weekdays(date_from: date, days: int) -> int:
+    return sum(1 for i in range(days) if (date_from + timedelta(days=i)).weekday() < 5)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--fail-rate", type=float, default=0.03)
+    parser.add_argument("--throttle-rate", type=float, default=0.03)
+    args = parser.parse_args()
+
+    start_day = date(2024, 1, 1)
+    date_from = start_day.isoformat()
+    date_to = (start_day + timedelta(days=args.days - 1)).isoformat()
+    expected = weekdays(start_day, args.days) * len(CATEGORIES)
+
+    with FixtureServer(latency=args.latency, fail_rate=args.fail_rate,
+                       throttle_rate=args.throttle_rate) as server:
+        print(f"{args.days} days x {len(CATEGORIES)} categories, {expected} listing days")
+        print(f"{'workers':<9}{'seconds':>9}{'days/min':>10}{'fetched':>9}{'empty':>7}{'failed':>8}"
+              f"{'429/503 backoffs':>18}")
+        for concurrency in args.concurrency:
+            with tempfile.TemporaryDirectory() as tmp:
+                result = asyncio.run(backfill(tmp, date_from, date_to, CATEGORIES, base_url=server.base_url,
+                                              concurrency=concurrency, retry_backoff=0.1))
+                assert result["success"], result
+                assert result["fetched"] == expected, result
+                print(f"{concurrency:<9}{result['elapsed']:>9.2f}{result['days_per_minute']:>10}"
+                      f"{result['fetched']:>9}{result['empty']:>7}{len(result['failed']):>8}"
+                      f"{result['rate_limit']['throttled']:>18}")
+                close_stores()
+
+        # 中途杀掉后重新运行，应从检查点继续
+        with tempfile.TemporaryDirectory() as tmp:
+            child = subprocess.Popen([sys.executable, "-c", CHILD.format(
+                root=ROOT, base_dir=tmp, date_from=date_from, date_to=date_to,
+                categories=CATEGORIES, base_url=server.base_url)])
+            checkpoint = os.path.join(tmp, CHECKPOINT_FILENAME)
+            deadline = time.time() + 60
+            while time.time() < deadline:
+                if os.path.exists(checkpoint):
+                    with open(checkpoint, encoding="utf-8") as f:
+                        done = sum(len(days) for days in json.load(f)["done"].values())
+                    if done >= args.days // 2:
+                        break
+                time.sleep(0.05)
+            child.send_signal(signal.SIGKILL)
+            child.wait()
+
+            result = asyncio.run(backfill(tmp, date_from, date_to, CATEGORIES, base_url=server.base_url,
+                                          concurrency=4, retry_backoff=0.1))
+            assert result["success"], result
+            store = open_store(tmp)
+            stored = sum(1 for c in CATEGORIES for i in range(args.days)
+                         if store.get_day(c, (start_day + timedelta(days=i)).isoformat()))
+            assert stored == expected, (stored, expected)
+            print(f"killed after {done} days; resumed run skipped {result['skipped']}, "
+                  f"fetched {result['fetched']}, all {stored} listing days stored")
+            close_stores()
+
+if __name__ == "__main__":
+    main()
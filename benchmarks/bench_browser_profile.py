@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""Per-stage timings of the browser crawl with the debug and fast profiles.
+
+Serves listing pages that pull in a stylesheet, a web font, MathJax, an
+analytics script and figure thumbnails, each delayed by ``--asset-latency``
+(see ``fixture_server.py --heavy-assets``), and fetches them through
+``PlaywrightFetcher`` with every profile.  Reports launch, goto, extract
+and close times, how many subresources reached the server and how many
+the browser aborted, and checks that all profiles parse the same records.
+Needs Chromium (``playwright install chromium``):
+
+    python benchmarks/bench_browser_profile.py --pages 5 --asset-latency 0.3
+    python benchmarks/bench_browser_profile.py --headed     # debug profile in a visible window
+"""
+import os
+import sys
+import asyncio
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_server import ASSETS, FixtureServer
+from tools.browser_profile import PROFILES, should_block
+from tools.fetcher import PlaywrightFetcher, listing_url
+from tools.listing_parser import parse_listing
+
+STAGES = ("launch", "goto", "extract", "close", "total")
+
+# fixture 页面引用的资源在浏览器里的资源类型
+RESOURCE_TYPES = {"css": "stylesheet", "fonts": "font", "mathjax": "script", "js": "script", "images": "image"}
+
+def check_rules():
+    """Every heavy subresource of the fixture page must be blocked, the page itself not"""
+    for path in list(ASSETS) + ["/static/images/figure_0.png"]:
+        resource_type = RESOURCE_TYPES[path.split("/")[2]]
+        assert should_block(resource_type, f"http://127.0.0.1{path}"), path
+    assert not should_block("document", listing_url("cs.AI", base_url="http://127.0.0.1"))
+
+async def run_profile(profile: str, server: FixtureServer, pages: int, headed: bool) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        fetcher = PlaywrightFetcher(user_data_dir=tmp, profile=profile,
+                                    headless=False if headed else True)
+        requests_before = dict(server.state.asset_requests)
+        records = []
+        async with fetcher:
+            for i in range(pages):
+                html = await fetcher.fetch(listing_url("cs.AI", base_url=server.base_url))
+                records.append(parse_listing(html)["entries"])
+        assets = sum(server.state.asset_requests.values()) - sum(requests_before.values())
+        return dict(fetcher.get_stats(), assets=assets, records=records)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=5, help="listing pages fetched per browser launch")
+    parser.add_argument("--entries", type=int, default=250)
+    parser.add_argument("--asset-latency", type=float, default=0.3, help="seconds to delay each subresource")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument("--headed", action="store_true", help="run every profile in a visible window")
+    args = parser.parse_args()
+
+    check_rules()
+    results = {}
+    with FixtureServer(entries=args.entries, heavy_assets=True, asset_latency=args.asset_latency) as server:
+        for profile in args.profiles:
+            results[profile] = asyncio.run(run_profile(profile, server, args.pages, args.headed))
+
+    print(f"{args.pages} pages of {args.entries} entries, subresources delayed {args.asset_latency}s "
+          f"({'headed' if args.headed else 'headless'})")
+    print(f"{'profile':<9}" + "".join(f"{stage + ' ms':>12}" for stage in STAGES)
+          + f"{'assets':>8}{'blocked':>9}")
+    for profile, result in results.items():
+        stages = result["stages"]
+        print(f"{profile:<9}" + "".join(f"{stages.get(stage, 0.0):>12.1f}" for stage in STAGES)
+              + f"{result['assets']:>8}{result['requests']['blocked']:>9}")
+
+    # 拦截资源不能影响解析结果
+    expected = next(iter(results.values()))["records"]
+    for profile, result in results.items():
+        assert result["records"] == expected, f"{profile} parsed different records"
+    if "fast" in results:
+        assert results["fast"]["assets"] == 0, "fast profile loaded subresources"
+    print("all profiles parsed the same records")
+
+if __name__ == "__main__":
+    main()
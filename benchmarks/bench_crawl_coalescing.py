@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""Concurrent crawl requests against one base directory.
+
+Fires ``--callers`` simultaneous ``crawl_latest_papers`` calls in one
+process, then ``--processes`` separate processes at once, and counts the
+listing requests the fixture server actually received:
+
+    python benchmarks/bench_crawl_coalescing.py --callers 10 --processes 3 --latency 0.2
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_server import FixtureServer
+from tools.crawler import crawl_flights, crawl_latest_papers
+from tools.paper_store import close_stores
+
+CHILD = """
+import sys, asyncio
+sys.path.insert(0, {root!r})
+from tools.crawler import crawl_latest_papers
+result = asyncio.run(crawl_latest_papers({base_dir!r}, base_url={base_url!r}, force={force!r}))
+assert result["success"], result
+print("fresh" if result.get("fresh") else "crawled")
+"""
+
+def run_processes(base_dir: str, base_url: str, n: int, force: bool) -> list:
+    children = [subprocess.Popen([sys.executable, "-c", CHILD.format(root=ROOT, base_dir=base_dir,
+                                                                     base_url=base_url, force=force)],
+                                 stdout=subprocess.PIPE, text=True)
+                for _ in range(n)]
+    return [child.communicate()[0].strip() for child in children]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callers", type=int, default=10)
+    parser.add_argument("--processes", type=int, default=3)
+    parser.add_argument("--entries", type=int, default=600)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with FixtureServer(entries=args.entries, latency=args.latency) as server:
+        with tempfile.TemporaryDirectory() as tmp:
+            async def burst(force=False):
+                return await asyncio.gather(*(crawl_latest_papers(tmp, base_url=server.base_url, force=force)
+                                              for _ in range(args.callers)))
+
+            start = time.perf_counter()
+            results = asyncio.run(burst())
+            elapsed = time.perf_counter() - start
+            assert all(r["success"] for r in results)
+            print(f"{args.callers} concurrent callers: {server.state.requests} listing requests, "
+                  f"{elapsed:.2f}s, flights={crawl_flights.get_stats()}")
+
+            before = server.state.requests
+            start = time.perf_counter()
+            result = asyncio.run(crawl_latest_papers(tmp, base_url=server.base_url))
+            print(f"repeat call: fresh={result.get('fresh')}, {server.state.requests - before} requests, "
+                  f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+            before = server.state.requests
+            result = asyncio.run(crawl_latest_papers(tmp, base_url=server.base_url, force=True))
+            print(f"force=True: fresh={result.get('fresh')}, {server.state.requests - before} requests")
+
+            # 强制抓取与普通调用同时到达时不能加入普通调用的抓取
+            server.state.announce(added=1)
+            async def mixed():
+                return await asyncio.gather(crawl_latest_papers(tmp, base_url=server.base_url),
+                                            crawl_latest_papers(tmp, base_url=server.base_url, force=True))
+            before = server.state.requests
+            plain, forced = asyncio.run(mixed())
+            assert plain["success"] and forced["success"]
+            assert not forced.get("fresh") and forced["changed"], forced
+            print(f"plain + force=True together: plain fresh={plain.get('fresh')}, "
+                  f"forced changed={forced['changed']}, {server.state.requests - before} requests")
+            close_stores()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            before = server.state.requests
+            start = time.perf_counter()
+            outcomes = run_processes(tmp, server.base_url, args.processes, force=False)
+            print(f"{args.processes} processes: {outcomes}, {server.state.requests - before} listing requests, "
+                  f"{time.perf_counter() - start:.2f}s")
+
+            before = server.state.requests
+            outcomes = run_processes(tmp, server.base_url, args.processes, force=True)
+            print(f"{args.processes} processes, force=True: {outcomes}, "
+                  f"{server.state.requests - before} listing requests")
+
+if __name__ == "__main__":
+    main()
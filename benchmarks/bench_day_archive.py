@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+"""Day files versus the monthly compressed archive (``tools/day_archive.py``).
+
+Writes ``--days`` synthetic days of ``--entries`` records as day files
+(titles, .jsonl records and manifest), packs them into segments with the
+importer and compares:
+
+  footprint   files and bytes on disk (allocated blocks, not just sizes)
+  cold open   a fresh process listing every stored day, and one reading the
+              last ``--range`` days (page cache dropped first when running
+              as root, else only the process is fresh)
+  range read  records per second reading ``--range`` consecutive days (warm)
+  random      one entry of a random day, latency per lookup
+
+    python benchmarks/bench_day_archive.py --days 750 --entries 300 --range 90
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import subprocess
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_server import synthetic_entries
+from tools.day_archive import ARCHIVE_DIRNAME, DayArchive, import_day_files
+from tools.storage import find_day_files, parse_day_filename, read_day_files, write_day_files
+
+CATEGORY = "cs.AI"
+START = date(2023, 1, 2)
+
+def listing_days(n: int) -> list:
+    """The first ``n`` weekdays from START"""
+    days, day = [], START
+    while len(days) < n:
+        if day.weekday() < 5:
+            days.append(day.isoformat())
+        day += timedelta(days=1)
+    return days
+
+def footprint(paths) -> tuple:
+    files = size = allocated = 0
+    for path in paths:
+        stat = os.stat(path)
+        files += 1
+        size += stat.st_size
+        allocated += stat.st_blocks * 512
+    return files, size, allocated
+
+def day_file_paths(base_dir: str) -> list:
+    return [name for path in find_day_files(base_dir, CATEGORY)
+            for name in (path, os.path.splitext(path)[0] + ".jsonl", os.path.splitext(path)[0] + ".manifest.json")]
+
+def archive_paths(base_dir: str) -> list:
+    root = os.path.join(base_dir, ARCHIVE_DIRNAME)
+    return [os.path.join(directory, name) for directory, _, names in os.walk(root) for name in names]
+
+def drop_caches() -> bool:
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("1\n")
+        return True
+    except OSError:
+        return False
+
+# ---- 子进程：冷启动后列出所有日期 ----
+
+def list_files(base_dir: str) -> int:
+    paths = find_day_files(base_dir, CATEGORY)
+    days = sorted(parse_day_filename(path, CATEGORY) for path in paths)
+    return sum(entries for _, entries in days)
+
+def list_archive(base_dir: str) -> int:
+    return sum(entries for _, entries in DayArchive(base_dir).list_days(CATEGORY))
+
+def range_files(base_dir: str, days: int) -> int:
+    paths = sorted(find_day_files(base_dir, CATEGORY), key=lambda path: parse_day_filename(path, CATEGORY)[0])
+    return sum(len(read_day_files(path)["records"]) for path in paths[-days:])
+
+def range_archive(base_dir: str, days: int) -> int:
+    archive = DayArchive(base_dir)
+    stored = archive.list_days(CATEGORY)[-days:]
+    return sum(len(records) for _, records in archive.iter_range(CATEGORY, stored[0][0], stored[-1][0]))
+
+def run_worker(layout: str, operation: str, base_dir: str, days: str):
+    start = time.perf_counter()
+    if operation == "list":
+        entries = (list_files if layout == "files" else list_archive)(base_dir)
+    else:
+        entries = (range_files if layout == "files" else range_archive)(base_dir, int(days))
+    print(json.dumps({"seconds": time.perf_counter() - start, "entries": entries}))
+
+def cold_open(layout: str, operation: str, base_dir: str, days: int, repeat: int) -> tuple:
+    best, dropped = float("inf"), False
+    for _ in range(repeat):
+        dropped = drop_caches()
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", layout, operation,
+                                 base_dir, str(days)],
+                                check=True, capture_output=True, text=True).stdout
+        result = json.loads(output)
+        best = min(best, result["seconds"])
+    return best, result["entries"], dropped
+
+# ---- 读取 ----
+
+def read_range_files(base_dir: str, days: list) -> int:
+    paths = {parse_day_filename(path, CATEGORY)[0]: path for path in find_day_files(base_dir, CATEGORY)}
+    return sum(len(read_day_files(paths[day])["records"]) for day in days)
+
+def read_range_archive(archive: DayArchive, days: list) -> int:
+    return sum(len(records) for _, records in archive.iter_range(CATEGORY, days[0], days[-1]))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=750, help="listing days (about three years)")
+    parser.add_argument("--entries", type=int, default=300, help="records per day")
+    parser.add_argument("--range", type=int, default=90, help="days per range read")
+    parser.add_argument("--lookups", type=int, default=2000, help="random single-entry lookups")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--worker", nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return run_worker(*args.worker)
+
+    days = listing_days(args.days)
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        for i, day in enumerate(days):
+            entries = synthetic_entries(args.entries, seed=i, id_prefix=f"{i:04d}")
+            write_day_files(tmp, CATEGORY, day, (entry["title"] for entry in entries), entries)
+        write_time = time.perf_counter() - start
+        start = time.perf_counter()
+        counts = import_day_files(tmp, categories=[CATEGORY])
+        import_time = time.perf_counter() - start
+        print(f"{len(days)} days x {args.entries} records ({days[0]}..{days[-1]}); "
+              f"day files written in {write_time:.1f}s, packed into {counts['segments']} segments "
+              f"in {import_time:.1f}s")
+
+        print(f"\n{'layout':<10}{'files':>8}{'bytes':>14}{'on disk':>14}")
+        sizes = {"files": footprint(day_file_paths(tmp)), "archive": footprint(archive_paths(tmp))}
+        for layout, (files, size, allocated) in sizes.items():
+            print(f"{layout:<10}{files:>8}{size:>14,}{allocated:>14,}")
+        print(f"archive is {sizes['files'][2] / sizes['archive'][2]:.1f}x smaller on disk")
+
+        print(f"\n{'layout':<10}{'cold list ms':>14}{'entries':>10}{'cold range ms':>15}{'entries':>10}")
+        for layout in ("files", "archive"):
+            list_seconds, listed, dropped = cold_open(layout, "list", tmp, args.range, args.repeat)
+            range_seconds, read, dropped = cold_open(layout, "range", tmp, args.range, args.repeat)
+            print(f"{layout:<10}{list_seconds * 1000:>14.1f}{listed:>10}{range_seconds * 1000:>15.1f}{read:>10}")
+        print("page cache dropped before every open" if dropped else "page cache not dropped (not root)")
+
+        # 区间读取：随机选几个起点，每次读 --range 天
+        rng = random.Random(0)
+        firsts = [rng.randrange(max(1, len(days) - args.range)) for _ in range(args.repeat)]
+        lookups = [(rng.choice(days), rng.randrange(args.entries)) for _ in range(args.lookups)]
+        archive = DayArchive(tmp)
+        print(f"\n{'layout':<10}{'range ms':>10}{'records/s':>12}{'lookup us':>11}")
+        for layout in ("files", "archive"):
+            best = float("inf")
+            for first in firsts:
+                window = days[first:first + args.range]
+                start = time.perf_counter()
+                n = read_range_files(tmp, window) if layout == "files" else read_range_archive(archive, window)
+                best = min(best, time.perf_counter() - start)
+                assert n == len(window) * args.entries, n
+
+            start = time.perf_counter()
+            if layout == "files":
+                paths = {parse_day_filename(p, CATEGORY)[0]: p for p in find_day_files(tmp, CATEGORY)}
+                found = [read_day_files(paths[day])["records"][i] for day, i in lookups]
+            else:
+                found = [archive.get_entry(CATEGORY, day, i) for day, i in lookups]
+            lookup = (time.perf_counter() - start) / len(lookups)
+            if layout == "files":
+                expected = found
+            else:
+                assert found == expected, "archive returned different records"
+            print(f"{layout:<10}{best * 1000:>10.1f}{n / best:>12,.0f}{lookup * 1e6:>11.1f}")
+        archive.close()
+
+if __name__ == "__main__":
+    main()
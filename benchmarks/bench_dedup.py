@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+"""Near-duplicate index (``tools/dedup.py``): ingest and lookup time at scale.
+
+Stores ``--titles`` synthetic titles (``--per-day`` per listing day, drawn
+from a large vocabulary so unrelated titles rarely collide) and plants:
+
+  reworded    a copy of an earlier paper under a new id with one or two
+              words dropped, swapped, added or re-cased (``--reworded``)
+  replaced    an earlier paper listed again on a later day as a new
+              version (``--replaced``)
+
+then measures building the index over everything, indexing one more day on
+top of it (what each crawl costs), a title lookup through the LSH buckets
+against a linear scan of every title, reopening the index in a fresh
+object, and ``get_latest_titles(dedup=True)``.  Recall is the share of
+planted rewordings that ended up in the cluster of their original.
+
+    python benchmarks/bench_dedup.py --titles 1000000 --per-day 300
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tools.dedup import DEDUP_DB_FILENAME, DedupIndex, close_dedup_indexes, jaccard, normalize, open_dedup_index, shingles
+from tools.paper_store import close_stores, open_store
+from tools.titles import get_latest_titles
+
+CATEGORY = "cs.AI"
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "ta", "vo", "zi", "pe", "sa", "do", "fu", "gra", "tri", "ber", "lin",
+             "mor", "qua", "sten", "vex"]
+FILLERS = ["towards", "efficient", "scalable", "a", "survey", "robust", "learning", "via", "improved", "on"]
+
+def vocabulary(n: int, rng: random.Random) -> list:
+    words = set()
+    while len(words) < n:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+def reword(title: str, rng: random.Random) -> str:
+    words = title.split()
+    for _ in range(rng.randint(1, 2)):
+        edit = rng.random()
+        if edit < 0.3 and len(words) > 6:
+            del words[rng.randrange(len(words))]
+        elif edit < 0.6:
+            i = rng.randrange(len(words) - 1)
+            words[i], words[i + 1] = words[i + 1], words[i]
+        elif edit < 0.8:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(FILLERS))
+        else:
+            words = [word.upper() if rng.random() < 0.5 else word for word in words]
+    return " ".join(words) + rng.choice(["", ".", ":", " (extended version)"])
+
+def listing_days(n: int, start: date) -> list:
+    days, day = [], start
+    while len(days) < n:
+        if day.weekday() < 5:
+            days.append(day.isoformat())
+        day += timedelta(days=1)
+    return days
+
+def generate(args, rng: random.Random) -> tuple:
+    """Listings of every day and the planted (copy, original) pairs"""
+    words = vocabulary(20_000, rng)
+    n_days = -(-args.titles // args.per_day)
+    days = listing_days(n_days + 1, date(2015, 1, 1))
+    titles, planted, listings = [], [], {}
+    for d, day in enumerate(days):
+        entries = []
+        for i in range(args.per_day):
+            arxiv_id = f"{d:05d}.{i:05d}"
+            roll = rng.random()
+            if titles and roll < args.reworded:
+                original = rng.randrange(len(titles))
+                planted.append((arxiv_id, titles[original][0]))
+                entries.append({"arxiv_id": arxiv_id, "version": 1, "title": reword(titles[original][1], rng)})
+            elif titles and roll < args.reworded + args.replaced:
+                original_id, title, version = titles[rng.randrange(len(titles))]
+                entries.append({"arxiv_id": original_id, "version": version + 1, "title": title})
+                continue
+            else:
+                title = " ".join(rng.choice(words) for _ in range(rng.randint(6, 14))).capitalize()
+                entries.append({"arxiv_id": arxiv_id, "version": 1, "title": title})
+            titles.append((arxiv_id, entries[-1]["title"], 1))
+        listings[day] = entries
+    return days, listings, planted
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=1_000_000)
+    parser.add_argument("--per-day", type=int, default=300)
+    parser.add_argument("--reworded", type=float, default=0.03, help="share of reworded copies")
+    parser.add_argument("--replaced", type=float, default=0.05, help="share of replacements")
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--scans", type=int, default=2, help="linear scans to compare a lookup with")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    days, listings, planted = generate(args, rng)
+    new_day, days = days[-1], days[:-1]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = open_store(tmp)
+        start = time.perf_counter()
+        for i in range(0, len(days), 100):
+            store.upsert_days([{"category": CATEGORY, "date": day, "entries": listings[day], "crawled_at": n}
+                               for n, day in enumerate(days[i:i + 100], i)])
+        entries = sum(len(listings[day]) for day in days)
+        print(f"{entries} listed titles over {len(days)} days ({days[0]}..{days[-1]}), "
+              f"{len(planted)} reworded copies planted; stored in {time.perf_counter() - start:.1f}s")
+
+        index = open_dedup_index(tmp)
+        start = time.perf_counter()
+        counts = index.update(store, CATEGORY)
+        build = time.perf_counter() - start
+        stats = index.get_stats()
+        print(f"index built in {build:.1f}s ({counts['papers'] / build:,.0f} papers/s, "
+              f"{os.path.getsize(index.path) / 1e6:.0f} MB): {stats['papers']} papers in {stats['clusters']} clusters, "
+              f"{stats['candidates_checked'] / max(1, stats['papers']):.2f} candidates checked per paper")
+
+        # 每次抓取的增量：在已有索引上加入新的一天
+        store.upsert_day(CATEGORY, new_day, listings[new_day], crawled_at=len(days))
+        start = time.perf_counter()
+        counts = index.update(store, CATEGORY)
+        print(f"new day of {len(listings[new_day])} titles indexed in {(time.perf_counter() - start) * 1000:.0f} ms "
+              f"({counts['duplicates']} near-duplicates flagged)")
+
+        keys = index.clusters([copy for copy, _ in planted] + [original for _, original in planted])
+        found = sum(keys[copy][0] == keys[original][0] for copy, original in planted)
+        sample = planted[:2000]
+        reachable = sum(jaccard(shingles(normalize(title_of(store, copy))),
+                                shingles(normalize(title_of(store, original)))) >= index.threshold
+                        for copy, original in sample)
+        print(f"{found / len(planted):.3f} of the planted copies clustered with their original "
+              f"({reachable / len(sample):.3f} of a sample are similar enough to be found at all)")
+
+        queries = [reword(title_of(store, rng.choice(planted)[1]), rng) for _ in range(args.lookups)]
+        start = time.perf_counter()
+        hits = sum(bool(index.find(query)) for query in queries)
+        lookup = (time.perf_counter() - start) / len(queries)
+
+        # 不用索引：和每个标题逐一比较
+        all_titles = [(paper, normalize(title)) for paper, title in index.conn.execute("SELECT paper, title FROM papers")]
+        start = time.perf_counter()
+        for query in queries[:args.scans]:
+            grams = shingles(normalize(query))
+            [paper for paper, other in all_titles if jaccard(grams, shingles(other)) >= index.threshold]
+        scan = (time.perf_counter() - start) / args.scans
+        print(f"lookup of a reworded title: {lookup * 1000:.2f} ms through LSH ({hits}/{len(queries)} found), "
+              f"{scan * 1000:.0f} ms scanning every title ({scan / lookup:,.0f}x)")
+
+        start = time.perf_counter()
+        fresh = DedupIndex(os.path.join(tmp, DEDUP_DB_FILENAME))
+        fresh.find(queries[0])
+        print(f"reopened and first lookup in {(time.perf_counter() - start) * 1000:.0f} ms")
+        fresh.close()
+
+        start = time.perf_counter()
+        result = asyncio.run(get_latest_titles(tmp, dedup=True))
+        assert result["success"], result.get("error")
+        print(f"get_latest_titles(dedup=True): {(time.perf_counter() - start) * 1000:.1f} ms, "
+              f"{result['data']['distinct_entries']} of {result['data']['total_entries']} titles are new work")
+
+        close_dedup_indexes()
+        close_stores()
+
+def title_of(store, arxiv_id: str) -> str:
+    row = store.conn.execute("SELECT title FROM papers WHERE arxiv_id = ?", (arxiv_id,)).fetchone()
+    return row[0]
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""Repeat crawls of an unchanged and of a slightly changed listing day.
+
+Crawls ``--entries`` papers once, then crawls again (``force=True``, so the
+freshness TTL does not short-cut it) with the server honouring validators,
+with validators switched off, after announcing new and replaced papers, and
+after replacing papers on the last page only (with and without validators):
+
+    python benchmarks/bench_delta_crawl.py --entries 2000 --latency 0.05
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_server import FixtureServer
+from tools.crawler import crawl_latest_papers
+from tools.paper_store import close_stores
+
+def crawl(server: FixtureServer, base_dir: str, label: str) -> dict:
+    before = server.state.requests
+    start = time.perf_counter()
+    result = asyncio.run(crawl_latest_papers(base_dir, base_url=server.base_url, force=True))
+    elapsed = time.perf_counter() - start
+    assert result["success"], result.get("error")
+    print(f"{label:<28}{elapsed:>8.3f}{server.state.requests - before:>10}"
+          f"{result.get('added', '-'):>8}{result.get('updated', '-'):>9}{result.get('unchanged', '-'):>11}"
+          f"  {result['filename']}")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--added", type=int, default=25)
+    parser.add_argument("--replaced", type=int, default=10)
+    args = parser.parse_args()
+
+    with FixtureServer(entries=args.entries, latency=args.latency) as server:
+        with tempfile.TemporaryDirectory() as tmp:
+            print(f"{'crawl':<28}{'seconds':>8}{'requests':>10}{'added':>8}{'updated':>9}{'unchanged':>11}")
+            crawl(server, tmp, "first crawl")
+
+            result = crawl(server, tmp, "unchanged (304)")
+            assert not result["changed"] and server.state.not_modified == result["pages"]
+            assert result["unchanged"] == args.entries
+
+            server.state.validators = False
+            result = crawl(server, tmp, "unchanged (no validators)")
+            assert not result["changed"]
+            server.state.validators = True
+
+            server.state.announce(added=args.added, replaced=args.replaced)
+            result = crawl(server, tmp, f"+{args.added} new, {args.replaced} replaced")
+            assert result["changed"] and result["added"] == args.added and result["updated"] == args.replaced
+            assert result["unchanged"] == args.entries - args.replaced
+            day_files = [name for name in os.listdir(tmp) if name.endswith(".txt")]
+            assert day_files == [result["filename"]], day_files
+
+            result = crawl(server, tmp, "unchanged again (304)")
+            assert not result["changed"]
+
+            # 只改最后一页：第一页 304 也要发现后面页的变化
+            total = len(server.state.entries)
+            before = server.state.requests
+            server.state.announce(replaced=args.replaced, offset=total - args.replaced)
+            result = crawl(server, tmp, f"{args.replaced} replaced on last page")
+            assert result["changed"] and result["added"] == 0 and result["updated"] == args.replaced, result
+            pages = result["pages"]
+            server.state.validators = False
+            server.state.announce(replaced=args.replaced, offset=total - args.replaced)
+            result = crawl(server, tmp, "same, no validators")
+            assert result["changed"] and result["updated"] == args.replaced, result
+            server.state.validators = True
+            result = crawl(server, tmp, "unchanged again (304)")
+            assert not result["changed"] and result["unchanged"] == total
+            print(f"\nlast-page change found with {pages} request(s) "
+                  f"({server.state.requests - before} in the last three crawls)")
+            close_stores()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""Micro-benchmark: per-element versus bulk extraction of a listing page.
+
+Modes:
+  parser   - one ``parse_listing`` sweep over the HTML (no browser)
+  locator  - the old loop, one ``inner_text()`` IPC round trip per title
+  dom      - one ``page.evaluate`` returning every record
+  content  - one ``page.content()`` round trip, then ``parse_listing``
+
+The browser modes need Chromium (``playwright install chromium``):
+
+    python benchmarks/bench_extraction.py --entries 250 1000
+    python benchmarks/bench_extraction.py --modes parser
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_server import FixtureServer
+from tools.listing_parser import parse_listing
+
+MODES = ("parser", "locator", "dom", "content")
+
+# 一次 DOM 求值取出所有记录
+EXTRACT_JS = """
+() => Array.from(document.querySelectorAll("dl#articles > dd")).map(dd => {
+  const dt = dd.previousElementSibling;
+  const abs = dt.querySelector('a[title="Abstract"]');
+  const text = sel => { const el = dd.querySelector(sel); return el ? el.innerText : null; };
+  return {
+    arxiv_id: abs ? abs.getAttribute("href").replace(/^.*\\/abs\\//, "") : null,
+    title: (text("div.list-title") || "").replace("Title:", "").trim(),
+    authors: Array.from(dd.querySelectorAll("div.list-authors a")).map(a => a.innerText.trim()),
+    subjects: text("div.list-subjects"),
+    comments: text("div.list-comments"),
+  };
+})
+"""
+
+async def extract_locator(page) -> list:
+    title_elements = page.locator("dd div.list-title.mathjax")
+    titles = []
+    for i in range(await title_elements.count()):
+        title = await title_elements.nth(i).inner_text()
+        titles.append(title.replace("Title:", "").strip())
+    return titles
+
+async def extract_dom(page) -> list:
+    return await page.evaluate(EXTRACT_JS)
+
+async def extract_content(page) -> list:
+    return parse_listing(await page.content())["entries"]
+
+async def run_browser_modes(modes, url: str, repeat: int) -> dict:
+    from playwright.async_api import async_playwright
+
+    timings = {}
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.goto(url, wait_until="domcontentloaded")
+        extractors = {"locator": extract_locator, "dom": extract_dom, "content": extract_content}
+        for mode in modes:
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                count = len(await extractors[mode](page))
+                best = min(best, time.perf_counter() - start)
+            timings[mode] = (best, count)
+        await browser.close()
+    return timings
+
+def run_parser(html: str, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = len(parse_listing(html)["entries"])
+        best = min(best, time.perf_counter() - start)
+    return best, count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, nargs="+", default=[250, 1000])
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'entries':<9}{'mode':<10}{'time (ms)':>11}{'records':>9}{'speed-up':>10}")
+    for n in args.entries:
+        with FixtureServer(entries=n, max_show=n) as server:
+            url = f"{server.base_url}/list/cs.AI/recent?show={n}"
+            timings = {}
+            if "parser" in args.modes:
+                import httpx
+                timings["parser"] = run_parser(httpx.get(url).text, args.repeat)
+            browser_modes = [m for m in args.modes if m != "parser"]
+            if browser_modes:
+                timings.update(asyncio.run(run_browser_modes(browser_modes, url, args.repeat)))
+        baseline = timings.get("locator", (None,))[0]
+        for mode in args.modes:
+            elapsed, count = timings[mode]
+            speedup = f"{baseline / elapsed:.1f}x" if baseline else "-"
+            print(f"{n:<9}{mode:<10}{elapsed * 1000:>11.1f}{count:>9}{speedup:>10}")
+
+if __name__ == "__main__":
+    main()
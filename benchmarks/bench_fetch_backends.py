@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""Compare wall time and peak RSS of the crawl fetch backends.
+
+Each backend runs ``crawl_latest_papers`` in a fresh subprocess against the
+local fixture server, so the numbers include interpreter and browser start-up:
+
+    python benchmarks/bench_fetch_backends.py --entries 250 --runs 3
+    python benchmarks/bench_fetch_backends.py --backends http
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import resource
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_server import FixtureServer
+from tools.fetcher import BACKENDS, create_fetcher
+from tools.listing_parser import parse_listing
+
+FIXTURE = "list_cs.AI_recent_2025-04-02.html"
+FIXTURE_TITLES = os.path.join(ROOT, "benchmarks", "fixtures", "list_cs.AI_recent_2025-04-02.expected.txt")
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+def tree_rss(proc) -> int:
+    """Resident memory of a process and all of its children, in bytes"""
+    total = 0
+    for p in [proc] + proc.children(recursive=True):
+        try:
+            total += p.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+async def check_fixture(backend: str, base_url: str):
+    """Parse the saved fixture through a backend and compare with the stored titles"""
+    with tempfile.TemporaryDirectory() as tmp:
+        async with create_fetcher(backend, tmp) as fetcher:
+            html = await fetcher.fetch(f"{base_url}/fixtures/{FIXTURE}")
+    listing = parse_listing(html)
+    with open(FIXTURE_TITLES, encoding="utf-8") as f:
+        expected = [line.strip() for line in f if line.strip()]
+    assert listing["date"] == "2025-04-02", listing["date"]
+    assert listing["total_entries"] == 140, listing["total_entries"]
+    assert listing["titles"] == expected, "parsed titles differ from the expected fixture titles"
+
+def run_worker(backend: str, base_url: str):
+    """Child process: one crawl, result printed as JSON"""
+    from tools.crawler import crawl_latest_papers
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        result = asyncio.run(crawl_latest_papers(tmp, backend=backend, base_url=base_url))
+        result["wall"] = time.perf_counter() - start
+    print(json.dumps(result))
+
+def measure(backend: str, base_url: str) -> dict:
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", backend, "--base-url", base_url]
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    peak = 0
+    if psutil is not None:
+        handle = psutil.Process(proc.pid)
+        while proc.poll() is None:
+            try:
+                peak = max(peak, tree_rss(handle))
+            except psutil.Error:
+                break
+            time.sleep(0.02)
+    out, _ = proc.communicate()
+    wall = time.perf_counter() - start
+    if psutil is None:
+        # 只能拿到最大的单个子进程
+        peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+    result = json.loads(out.strip().splitlines()[-1])
+    if not result.get("success"):
+        raise RuntimeError(f"{backend} crawl failed: {result.get('error')}")
+    return {"wall": wall, "crawl": result["wall"], "peak_rss": peak, "entries": result["total_entries"]}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--entries", type=int, default=250)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--worker", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return run_worker(args.worker, args.base_url)
+
+    with FixtureServer(entries=args.entries) as server:
+        print(f"fixture server: {server.base_url} ({args.entries} entries)")
+        for backend in args.backends:
+            asyncio.run(check_fixture(backend, server.base_url))
+            print(f"[{backend}] fixture parse OK")
+
+        print(f"{'backend':<12}{'wall (s)':>10}{'crawl (s)':>11}{'peak RSS (MB)':>15}")
+        for backend in args.backends:
+            runs = [measure(backend, server.base_url) for _ in range(args.runs)]
+            wall = min(r["wall"] for r in runs)
+            crawl = min(r["crawl"] for r in runs)
+            peak = max(r["peak_rss"] for r in runs) / 2**20
+            print(f"{backend:<12}{wall:>10.2f}{crawl:>11.2f}{peak:>15.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+"""Load test of one HTTP-mode server shared by many MCP clients.
+
+Starts ``arxiv_server.py --transport streamable-http`` on a temporary base
+directory, crawls the fixture server once, then drives N concurrent
+clients, each with its own MCP session making ``--calls`` mixed read calls
+(title pages, latest paper info, searches, and a crawl that the server
+answers from the stored result).  Reports throughput and tail latency for
+every N, the latency of well-behaved clients next to one client firing a
+burst of calls of searches (with and without the per-client limit), and what happens to
+calls in flight when the server gets SIGTERM:
+
+    python benchmarks/bench_http_clients.py --clients 1 10 50 --calls 20
+"""
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from contextlib import contextmanager
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+from fixture_server import FixtureServer
+
+QUERIES = ["neural network", "reinforcement learning", "language model", "graph", "diffusion"]
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_ready(process, url: str, timeout: float = 20):
+    """Wait until the server answers HTTP on ``url``.
+
+    A bare TCP connect is not enough: to a port in the ephemeral range it
+    can connect to itself before uvicorn listens.  Any HTTP response (the
+    MCP endpoint answers a plain GET with 4xx) means the app is serving.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.TransportError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                if process.poll() is None:
+                    process.kill()
+                raise RuntimeError(f"Server did not start: {process.stderr.read().decode(errors='replace')}")
+            time.sleep(0.1)
+
+@contextmanager
+def mcp_server(base_dir: str, base_url: str, client_concurrency: int):
+    port = free_port()
+    env = dict(os.environ, ARXIV_BASE_DIR=base_dir, ARXIV_BASE_URL=base_url, ARXIV_LOG_LEVEL="WARNING",
+               ARXIV_CLIENT_CONCURRENCY=str(client_concurrency))
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, "arxiv_server.py"),
+                                "--transport", "streamable-http", "--port", str(port)],
+                               env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    url = f"http://127.0.0.1:{port}/mcp"
+    try:
+        wait_ready(process, url)
+        yield process, url
+    finally:
+        if process.poll() is None:
+            process.terminate()
+            process.wait(timeout=60)
+
+def call_args(i: int) -> tuple:
+    kind = i % 4
+    if kind == 0:
+        return "get_latest_titles_tool", {"offset": (i * 37) % 400, "limit": 50, "fields": "records"}
+    if kind == 1:
+        return "check_latest_paper_info_tool", {}
+    if kind == 2:
+        return "search_titles_tool", {"query": QUERIES[i % len(QUERIES)], "limit": 20}
+    return "crawl_latest_papers_tool", {}
+
+def heavy_call_args(i: int) -> tuple:
+    # 覆盖面很广的检索，主要耗在I/O线程池里
+    return "search_titles_tool", {"query": "learning OR model OR network OR data", "limit": 100}
+
+async def call(session: ClientSession, name: str, arguments: dict) -> dict:
+    result = await session.call_tool(name, arguments)
+    if result.isError:
+        raise RuntimeError(result.content[0].text if result.content else name)
+    return result.structuredContent or json.loads(result.content[0].text)
+
+async def client(url: str, calls: int, seed: int, latencies: list, errors: list, parallel: bool = False,
+                 args_for=call_args):
+    """One MCP session making ``calls`` calls, one after another or all at once"""
+    async with streamablehttp_client(url) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+
+            async def timed(i):
+                name, arguments = args_for(seed + i)
+                start = time.perf_counter()
+                try:
+                    result = await call(session, name, arguments)
+                    if not result.get("success"):
+                        errors.append(result.get("error"))
+                except Exception as e:
+                    errors.append(str(e))
+                latencies.append(time.perf_counter() - start)
+
+            if parallel:
+                await asyncio.gather(*(timed(i) for i in range(calls)))
+            else:
+                for i in range(calls):
+                    await timed(i)
+
+def percentile(values: list, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+async def load(url: str, clients: int, calls: int) -> dict:
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(url, calls, n * calls, latencies, errors) for n in range(clients)))
+    wall = time.perf_counter() - start
+    return {"latencies": latencies, "errors": errors, "wall": wall}
+
+async def burst(url: str, polite: int, calls: int, burst_calls: int) -> dict:
+    """``polite`` sequential clients next to one client firing ``burst_calls`` at once"""
+    polite_latencies, burst_latencies, errors = [], [], []
+    await asyncio.gather(client(url, burst_calls, 0, burst_latencies, errors, parallel=True,
+                                args_for=heavy_call_args),
+                         *(client(url, calls, n * calls, polite_latencies, errors) for n in range(polite)))
+    return {"polite": polite_latencies, "burst": burst_latencies, "errors": errors}
+
+async def crawl_then_terminate(url: str, process, fixture: FixtureServer, delay: float) -> list:
+    """Start slow crawls from two clients, send SIGTERM ``delay`` s after the server runs both"""
+    results = []
+    calls = [["cs.CV"], ["cs.LG", "cs.CL"]]
+    # 替身服务器收到两个调用的列表请求后才发信号：发得太早，还没到达的调用会被正在关闭的服务器拒绝
+    before = {category: fixture.state.paths[f"/list/{category}/recent"] for category, *_ in calls}
+
+    async def crawl(n):
+        async with streamablehttp_client(url) as (read, write, _):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                try:
+                    result = await call(session, "crawl_categories_tool", {"categories": calls[n], "force": True})
+                    results.append("ok" if result.get("success") else result.get("error"))
+                except Exception as e:
+                    results.append(f"{type(e).__name__}: {e}")
+
+    async def terminate():
+        while any(fixture.state.paths[f"/list/{category}/recent"] == count for category, count in before.items()):
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(delay)
+        process.send_signal(signal.SIGTERM)
+
+    await asyncio.wait_for(asyncio.gather(crawl(0), crawl(1), terminate()), 60)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--calls", type=int, default=20, help="calls per client")
+    parser.add_argument("--entries", type=int, default=500, help="papers per synthetic listing")
+    parser.add_argument("--limit", type=int, default=4, help="per-client concurrency limit of the server")
+    parser.add_argument("--burst", type=int, default=100, help="searches the greedy client fires at once")
+    parser.add_argument("--history-from", default="2025-01-01", help="backfill past days from this date")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, FixtureServer(entries=args.entries, latency=0.05) as fixture:
+        with mcp_server(tmp, fixture.base_url, args.limit) as (process, url):
+            async def prepare():
+                async with streamablehttp_client(url) as (read, write, _):
+                    async with ClientSession(read, write) as session:
+                        await session.initialize()
+                        history = await call(session, "backfill_tool", {"date_from": args.history_from,
+                                                                        "date_to": "2025-03-31"})
+                        assert history["success"], history.get("error")
+                        return await call(session, "crawl_latest_papers_tool", {})
+            result = asyncio.run(prepare())
+            assert result["success"], result.get("error")
+            requests_start = fixture.state.requests
+            print(f"one server, {result['total_entries']} papers today plus history since {args.history_from}, "
+                  f"{args.calls} calls per client, "
+                  f"per-client limit {args.limit}")
+            print(f"{'clients':>8}{'calls':>7}{'calls/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+                  f"{'max ms':>9}{'errors':>8}")
+            for clients in args.clients:
+                stats = asyncio.run(load(url, clients, args.calls))
+                latencies = stats["latencies"]
+                print(f"{clients:>8}{len(latencies):>7}{len(latencies) / stats['wall']:>9.1f}"
+                      f"{percentile(latencies, 50) * 1000:>9.1f}{percentile(latencies, 95) * 1000:>9.1f}"
+                      f"{percentile(latencies, 99) * 1000:>9.1f}{max(latencies) * 1000:>9.1f}"
+                      f"{len(stats['errors']):>8}")
+                for error in stats["errors"][:3]:
+                    print(f"    error: {error}")
+            load_requests = fixture.state.requests - requests_start
+
+        # 一个客户端一次发出大量调用时，其它客户端的延迟（有/无每客户端并发限制）
+        print(f"\n5 clients calling one at a time next to one client firing {args.burst} searches at once")
+        print(f"{'limit':>8}{'polite p50':>12}{'polite p99':>12}{'burst p99':>11}{'errors':>8}")
+        for limit in (args.burst, args.limit):
+            with mcp_server(tmp, fixture.base_url, limit) as (process, url):
+                stats = asyncio.run(burst(url, 5, args.calls, args.burst))
+                label = "none" if limit == args.burst else str(limit)
+                print(f"{label:>8}{percentile(stats['polite'], 50) * 1000:>12.1f}"
+                      f"{percentile(stats['polite'], 99) * 1000:>12.1f}"
+                      f"{percentile(stats['burst'], 99) * 1000:>11.1f}{len(stats['errors']):>8}")
+
+        # 正在抓取时收到 SIGTERM：进行中的调用应当完成，进程正常退出
+        fixture.state.latency = 0.3
+        with mcp_server(tmp, fixture.base_url, args.limit) as (process, url):
+            start = time.perf_counter()
+            results = asyncio.run(crawl_then_terminate(url, process, fixture, delay=0.2))
+            code = process.wait(timeout=60)
+            print(f"\nSIGTERM during 2 crawls: results {results}, exit code {code}, "
+                  f"stopped {time.perf_counter() - start:.2f}s after the calls started")
+            assert results == ["ok", "ok"] and code == 0, (results, code)
+        print(f"fixture requests during the load test: {load_requests} (crawls reused the stored listing)")
+
+if __name__ == "__main__":
+    main()
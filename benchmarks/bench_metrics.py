@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""Cost of the metrics layer (``tools/metrics.py``) and where a crawl's time goes.
+
+1. one ``span`` plus one ``inc``, per call, with metrics off
+   (``ARXIV_METRICS=0``), on, and on with tracing (``ARXIV_TRACING=1``)
+2. ``get_latest_titles_tool`` called in process through the server's
+   instrumented ``call_tool``, in the same three modes
+3. the stage breakdown (``crawl.fetch``, ``crawl.parse``, ...) of one
+   crawl of ``--entries`` entries from the fixture server, as
+   ``server_stats_tool`` reports it
+
+    python benchmarks/bench_metrics.py --entries 10000 --latency 0.05
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_server import FixtureServer
+
+MODES = (("off", False, False), ("on", True, False), ("tracing", True, True))
+
+def set_mode(registry, enabled: bool, tracing: bool):
+    registry.enabled = enabled
+    registry.tracing = enabled and tracing
+    registry.reset()
+
+def bench_primitives(registry, n: int):
+    from tools.metrics import inc, span
+
+    print(f"{'mode':<10}{'span+inc ns':>13}")
+    for mode, enabled, tracing in MODES:
+        set_mode(registry, enabled, tracing)
+        start = time.perf_counter()
+        for _ in range(n):
+            with span("bench.stage", n=1):
+                inc("bench_total")
+        print(f"{mode:<10}{(time.perf_counter() - start) / n * 1e9:>13.0f}")
+
+async def bench_tool(server, registry, repeat: int):
+    print(f"\n{'mode':<10}{'get_latest_titles_tool ms':>27}")
+    arguments = {"category": "cs.AI"}
+    await server.mcp.call_tool("get_latest_titles_tool", arguments)
+    for mode, enabled, tracing in MODES:
+        set_mode(registry, enabled, tracing)
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await server.mcp.call_tool("get_latest_titles_tool", arguments)
+            times.append(time.perf_counter() - start)
+        print(f"{mode:<10}{statistics.median(times) * 1000:>27.3f}")
+
+async def crawl(server, base_url: str):
+    from tools.crawler import crawl_latest_papers
+
+    result = await crawl_latest_papers(server.BASE_DIR, base_url=base_url, category="cs.AI", force=True)
+    assert result["success"], result.get("error")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=10000, help="size of the crawled listing")
+    parser.add_argument("--latency", type=float, default=0.05, help="fixture server delay per request, seconds")
+    parser.add_argument("--calls", type=int, default=200000, help="span+inc calls per mode")
+    parser.add_argument("--repeat", type=int, default=200, help="tool calls per mode")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 服务器模块在导入时读取 ARXIV_BASE_DIR
+        os.environ["ARXIV_BASE_DIR"] = tmp
+        os.environ.setdefault("ARXIV_LOG_LEVEL", "WARNING")
+        import arxiv_server as server
+        from tools.metrics import registry
+
+        bench_primitives(registry, args.calls)
+        with FixtureServer(entries=args.entries, latency=args.latency) as fixture:
+            async def run():
+                await crawl(server, fixture.base_url)
+                await bench_tool(server, registry, args.repeat)
+
+                # 公告新论文，保证这次抓取会取回并写入整个列表
+                fixture.state.announce(added=1)
+                set_mode(registry, True, False)
+                start = time.perf_counter()
+                result = await crawl(server, fixture.base_url)
+                elapsed = time.perf_counter() - start
+                stats = (await server.server_stats_tool(spans=0))["data"]["stages"]
+                await server.shutdown()
+                return result, elapsed, stats
+
+            result, elapsed, stages = asyncio.run(run())
+
+        print(f"\ncrawl of {result['total_entries']} entries in {result['pages']} page(s): {elapsed:.2f} s")
+        print(f"{'stage':<20}{'count':>7}{'total s':>10}{'mean ms':>10}{'max ms':>10}")
+        for stage, summary in sorted(stages.items(), key=lambda item: -item[1]["mean_ms"] * item[1]["count"]):
+            total = summary["mean_ms"] * summary["count"] / 1000
+            print(f"{stage:<20}{summary['count']:>7}{total:>10.2f}{summary['mean_ms']:>10.1f}{summary['max_ms']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
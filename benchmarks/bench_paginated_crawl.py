@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""Paginated crawl against a large synthetic day.
+
+The fixture server caps pages at ``--max-show`` entries, delays every
+response and fails a fraction of requests with 503, so the crawler has to
+page, retry and merge.  Checks that the saved file holds every entry in
+listing order, then times the page fetch at several concurrency limits.
+The default latency is that of a remote server, so the fetch is bound by
+round trips rather than by parsing, and the best limit must beat one page
+at a time by ``--min-speedup``:
+
+    python benchmarks/bench_paginated_crawl.py --entries 5000 --latency 0.2 --fail-rate 0.05
+"""
+import os
+import re
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_server import FixtureServer
+from tools.crawler import crawl_latest_papers, fetch_listing
+from tools.executor import CPU_WORKERS, shutdown
+from tools.fetcher import HttpFetcher
+
+async def check_crawl(server: FixtureServer, page_size: int):
+    expected = [entry["title"] for entry in server.state.entries]
+    with tempfile.TemporaryDirectory() as tmp:
+        result = await crawl_latest_papers(tmp, base_url=server.base_url, page_size=page_size)
+        assert result["success"], result.get("error")
+        n = int(re.search(r"\((\d+)entries\)", result["filename"]).group(1))
+        with open(os.path.join(tmp, result["filename"]), encoding="utf-8") as f:
+            titles = f.read().split("\n")
+    assert n == len(titles) == len(expected), (n, len(titles), len(expected))
+    assert titles == expected, "titles out of order or missing"
+    print(f"crawl OK: {result['filename']} from {result['pages']} pages")
+
+async def time_fetch(server: FixtureServer, page_size: int, concurrency: int) -> float:
+    async with HttpFetcher() as fetcher:
+        start = time.perf_counter()
+        listing = await fetch_listing(fetcher, base_url=server.base_url, page_size=page_size,
+                                      concurrency=concurrency, retry_backoff=0.1)
+        elapsed = time.perf_counter() - start
+    assert len(listing["entries"]) == len(server.state.entries)
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=250)
+    parser.add_argument("--max-show", type=int, default=250)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--fail-rate", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--min-speedup", type=float, default=1.5)
+    args = parser.parse_args()
+
+    with FixtureServer(entries=args.entries, latency=args.latency, fail_rate=args.fail_rate,
+                       max_show=args.max_show) as server:
+        asyncio.run(check_crawl(server, args.page_size))
+        print(f"parsing in {CPU_WORKERS} process(es)" if CPU_WORKERS > 0 else "parsing in the I/O thread pool")
+        print(f"{'concurrency':<13}{'time (s)':>10}{'entries/s':>12}{'speedup':>9}")
+        times = {}
+        for concurrency in args.concurrency:
+            times[concurrency] = elapsed = asyncio.run(time_fetch(server, args.page_size, concurrency))
+            print(f"{concurrency:<13}{elapsed:>10.2f}{args.entries / elapsed:>12.0f}"
+                  f"{times[min(times)] / elapsed:>8.2f}x")
+        print(f"server: {server.state.requests} requests, {server.state.failures} injected failures")
+    shutdown()
+
+    if 1 in times and len(times) > 1:
+        speedup = times[1] / min(times.values())
+        assert speedup >= args.min_speedup, f"best concurrency only {speedup:.2f}x faster than 1"
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""Read-tool latency: glob-and-scan of day files versus the SQLite store.
+
+Creates an archive of N synthetic ``arxiv_AI_<date>_(<N>entries).txt``
+files, imports it once, then times ``get_latest_titles`` and
+``check_latest_paper_info`` against the old file-scanning logic:
+
+    python benchmarks/bench_paper_store.py --days 10 1000 10000 --entries 50
+"""
+import os
+import re
+import sys
+import glob
+import time
+import asyncio
+import argparse
+import tempfile
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_server import synthetic_entries
+from tools.paper_info import check_latest_paper_info
+from tools.paper_store import PaperStore, DB_FILENAME, close_stores
+from tools.titles import get_latest_titles
+
+FILE_RE = re.compile(r'arxiv_AI_(\d{4}-\d{2}-\d{2})_\((\d+)entries\)\.txt')
+
+def legacy_latest_titles(base_dir: str) -> list:
+    """What get_latest_titles did before the store: glob, stat all, regex, read"""
+    all_files = glob.glob(os.path.join(base_dir, "arxiv_AI_*.txt"))
+    latest_file = max(all_files, key=os.path.getmtime)
+    with open(latest_file, "r", encoding="utf-8") as f:
+        titles = [line.strip() for line in f if line.strip()]
+    FILE_RE.search(latest_file)
+    return titles
+
+def legacy_latest_info(base_dir: str) -> tuple:
+    all_files = glob.glob(os.path.join(base_dir, "arxiv_AI_*.txt"))
+    for path in all_files:
+        os.path.getmtime(path)
+        os.path.getsize(path)
+    latest_file = max(all_files, key=os.path.getmtime)
+    match = FILE_RE.search(latest_file)
+    return match.group(1), int(match.group(2))
+
+def make_archive(base_dir: str, days: int, entries: int):
+    titles = [e["title"] for e in synthetic_entries(entries)]
+    start = date(2025, 4, 2) - timedelta(days=days)
+    now = time.time()
+    for i in range(days):
+        day = (start + timedelta(days=i + 1)).isoformat()
+        path = os.path.join(base_dir, f"arxiv_AI_{day}_({entries}entries).txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(titles))
+        os.utime(path, (now - days + i, now - days + i))
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--entries", type=int, default=50, help="titles per day")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'days':<8}{'import (s)':>11}{'titles: files':>15}{'store':>9}{'info: files':>13}{'store':>9}  (ms)")
+    for days in args.days:
+        with tempfile.TemporaryDirectory() as tmp:
+            make_archive(tmp, days, args.entries)
+
+            start = time.perf_counter()
+            store = PaperStore(os.path.join(tmp, DB_FILENAME))
+            store.import_day_files(tmp, categories=["cs.AI"])
+            store.close()
+            imported = time.perf_counter() - start
+
+            legacy_titles = best_of(lambda: legacy_latest_titles(tmp), args.repeat)
+            legacy_info = best_of(lambda: legacy_latest_info(tmp), args.repeat)
+
+            result = asyncio.run(get_latest_titles(tmp))
+            assert result["success"] and result["data"]["titles"] == legacy_latest_titles(tmp)
+            store_titles = best_of(lambda: asyncio.run(get_latest_titles(tmp)), args.repeat)
+            store_info = best_of(lambda: asyncio.run(check_latest_paper_info(tmp)), args.repeat)
+            close_stores()
+
+        print(f"{days:<8}{imported:>11.2f}{legacy_titles * 1000:>15.2f}{store_titles * 1000:>9.2f}"
+              f"{legacy_info * 1000:>13.2f}{store_info * 1000:>9.2f}")
+
+if __name__ == "__main__":
+    main()
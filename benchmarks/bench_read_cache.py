@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""Repeat-call latency of the read tools with and without the read cache.
+
+Stores ``--days`` synthetic days and calls ``check_latest_paper_info`` and
+``get_latest_titles`` ``--calls`` times, first straight against the store,
+then through the cache; a write from a second process must invalidate it:
+
+    python benchmarks/bench_read_cache.py --days 1000 --entries 250 --calls 200
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_server import synthetic_entries
+from tools.cache import read_cache
+from tools.paper_info import check_latest_paper_info
+from tools.paper_store import PaperStore, DB_FILENAME, open_store, close_stores
+from tools.titles import get_latest_titles
+
+WRITER = """
+import sys
+sys.path.insert(0, {root!r})
+from tools.paper_store import PaperStore
+store = PaperStore({path!r})
+store.upsert_day("cs.AI", "2099-01-01", [{{"arxiv_id": "2099.00001", "title": "Written by another process"}}])
+store.close()
+"""
+
+def fill_store(base_dir: str, days: int, entries: int):
+    store = PaperStore(os.path.join(base_dir, DB_FILENAME))
+    start = date(2025, 4, 2) - timedelta(days=days)
+    batch = [{"category": "cs.AI", "date": (start + timedelta(days=i)).isoformat(),
+              "entries": synthetic_entries(entries, seed=i, id_prefix=f"{i:04d}"),
+              "crawled_at": 1.0e9 + i}
+             for i in range(days)]
+    store.upsert_days(batch)
+    store.close()
+
+def per_call(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=1000)
+    parser.add_argument("--entries", type=int, default=250)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fill_store(tmp, args.days, args.entries)
+        store = open_store(tmp)
+        cache = read_cache(tmp)
+
+        def titles(source):
+            latest = source.latest_day("cs.AI")
+            return source.get_titles("cs.AI", latest["date"])
+
+        print(f"{'per call (ms)':<30}{'store':>10}{'cached':>10}")
+        info_store = per_call(lambda: store.latest_day("cs.AI"), args.calls)
+        info_cached = per_call(lambda: cache.latest_day("cs.AI"), args.calls)
+        print(f"{'latest day':<30}{info_store * 1000:>10.3f}{info_cached * 1000:>10.3f}")
+        titles_store = per_call(lambda: titles(store), args.calls)
+        titles_cached = per_call(lambda: titles(cache), args.calls)
+        print(f"{'latest titles':<30}{titles_store * 1000:>10.3f}{titles_cached * 1000:>10.3f}")
+        info_tool = per_call(lambda: asyncio.run(check_latest_paper_info(tmp)), args.calls)
+        titles_tool = per_call(lambda: asyncio.run(get_latest_titles(tmp)), args.calls)
+        print(f"tool calls incl. asyncio.run: info {info_tool * 1000:.3f} ms, titles {titles_tool * 1000:.3f} ms")
+
+        stats = cache.get_stats()
+        print(f"hits={stats['hits']} misses={stats['misses']} hit_rate={stats['hit_rate']}")
+
+        # 另一个进程写入后，缓存必须失效
+        subprocess.run([sys.executable, "-c", WRITER.format(root=ROOT, path=store.path)], check=True)
+        result = asyncio.run(get_latest_titles(tmp))
+        assert result["data"]["titles"] == ["Written by another process"], result
+        print(f"invalidated by another process: invalidations={cache.get_stats()['invalidations']}")
+        close_stores()
+
+if __name__ == "__main__":
+    main()
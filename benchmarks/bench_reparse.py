@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""Offline re-parse of HTML snapshots (``tools/reparse.py``): pages/sec by worker count.
+
+Writes snapshots of ``--days`` listing days of ``--entries`` entries each
+(pages of 250, like the crawler fetches them) for every ``--categories``,
+then rebuilds the store from them with 1, 2, 4 and 8 worker processes,
+each run on a fresh copy.  Parsing scales with the cores the machine has;
+writing the changed days to the store stays in the main process.  With two
+or more cores the run fails unless 2 workers parse at least 1.3x faster
+than 1; on a single core no speed-up is possible and none is asserted.
+
+    python benchmarks/bench_reparse.py --days 65 --entries 600
+"""
+import os
+import sys
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_server import render_listing, synthetic_entries
+from tools.fetcher import archive_url
+from tools.paper_store import close_stores, open_store
+from tools.reparse import reparse
+from tools.snapshots import SNAPSHOTS_DIRNAME, write_snapshot
+
+PAGE = 250
+
+def listing_days(n: int, start: date) -> list:
+    days, day = [], start
+    while len(days) < n:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+def write_snapshots(base_dir: str, categories: list, days: list, entries: int) -> tuple:
+    pages = size = 0
+    for category in categories:
+        for n, day in enumerate(days):
+            listing = synthetic_entries(entries, seed=n, id_prefix=f"{n:04d}", primary=category)
+            raw = {archive_url(category, day.isoformat(), show=PAGE, skip=skip):
+                   (time.time(), render_listing(listing, day, category, skip=skip, show=PAGE))
+                   for skip in range(0, entries, PAGE)}
+            path = write_snapshot(base_dir, category, raw, day.isoformat())
+            pages += len(raw)
+            size += os.path.getsize(path)
+    return pages, size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=65, help="listing days per category (65 is about 3 months)")
+    parser.add_argument("--entries", type=int, default=600)
+    parser.add_argument("--categories", nargs="+", default=["cs.AI", "cs.LG"])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    days = listing_days(args.days, date(2025, 1, 6))
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source")
+        pages, size = write_snapshots(source, args.categories, days, args.entries)
+        print(f"{pages} pages in {len(days) * len(args.categories)} snapshots "
+              f"({size / 1e6:.1f} MB compressed), {os.cpu_count()} CPU(s)")
+
+        print(f"\n{'workers':>8}{'parse s':>9}{'pages/s':>9}{'speed-up':>10}{'total s':>9}{'days':>6}")
+        base = None
+        speedups = {}
+        for workers in args.workers:
+            base_dir = os.path.join(tmp, f"run{workers}")
+            shutil.copytree(os.path.join(source, SNAPSHOTS_DIRNAME), os.path.join(base_dir, SNAPSHOTS_DIRNAME))
+            result = asyncio.run(reparse(base_dir, workers=workers))
+            assert result["success"], result.get("error") or result["failed"]
+            base = base or result["pages_per_second"]
+            speedups[workers] = result["pages_per_second"] / base
+            print(f"{workers:>8}{result['parse_time']:>9.2f}{result['pages_per_second']:>9.0f}"
+                  f"{result['pages_per_second'] / base:>9.2f}x{result['elapsed']:>9.2f}{result['changed']:>6}")
+            store = open_store(base_dir)
+            assert sum(store.get_day(c, d.isoformat())["total_entries"]
+                       for c in args.categories for d in days) == len(days) * len(args.categories) * args.entries
+            close_stores()
+
+    cpus = os.cpu_count() or 1
+    usable = [workers for workers in speedups if 1 < workers <= cpus]
+    if not usable:
+        print(f"\n{cpus} CPU: parsing cannot scale here, run on a multi-core machine to see the speed-up")
+        return
+    best = max(speedups[workers] for workers in usable)
+    print(f"\nbest speed-up with up to {cpus} workers: {best:.2f}x")
+    assert best >= 1.3, f"parsing did not scale with worker processes ({best:.2f}x on {cpus} CPUs)"
+
+if __name__ == "__main__":
+    main()
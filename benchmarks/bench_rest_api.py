@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+"""Cost of polling the REST API: full responses, compression and 304s.
+
+Stores ``--days`` synthetic days of ``--entries`` papers, serves the API on
+a local port and measures the latest-day endpoint uncompressed and with
+gzip/br, a poll with If-None-Match, and a streamed range of every stored
+day (time to first byte and total).  Then a new day is stored and the next
+poll must see a new ETag:
+
+    python benchmarks/bench_rest_api.py --days 365 --entries 500 --polls 500
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from datetime import date, timedelta
+import httpx
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_server import synthetic_entries
+from tools.paper_store import PaperStore, DB_FILENAME, close_stores
+from tools.rest_api import brotli, create_app
+
+START = date(2025, 4, 2)
+IDENTITY = {"Accept-Encoding": "identity"}
+
+class QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+def fill_store(base_dir: str, days: int, entries: int):
+    store = PaperStore(os.path.join(base_dir, DB_FILENAME))
+    first = START - timedelta(days=days - 1)
+    store.upsert_days([{"category": "cs.AI", "date": (first + timedelta(days=i)).isoformat(),
+                        "entries": synthetic_entries(entries, seed=i, id_prefix=f"{i:04d}"),
+                        "crawled_at": 1.0e9 + i}
+                       for i in range(days)])
+    store.close()
+
+def timed_get(client: httpx.Client, url: str, repeat: int, **headers) -> tuple:
+    """Best latency over ``repeat`` GETs and the last response (body left encoded)"""
+    best, response = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with client.stream("GET", url, headers=headers) as response:
+            body = b"".join(response.iter_raw())
+        best = min(best, time.perf_counter() - start)
+    return best, response, body
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--entries", type=int, default=500)
+    parser.add_argument("--polls", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fill_store(tmp, args.days, args.entries)
+        server = make_server("127.0.0.1", 0, create_app(tmp), threaded=True, request_handler=QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_port}/api/categories/cs.AI"
+
+        with httpx.Client() as client:
+            print(f"{args.days} days x {args.entries} entries")
+            print(f"{'request':<34}{'status':>7}{'bytes':>11}{'ms':>9}")
+            cases = [("latest titles", "/latest", IDENTITY),
+                     ("latest titles, gzip", "/latest", {"Accept-Encoding": "gzip"}),
+                     ("latest records", "/latest?fields=records", IDENTITY),
+                     ("latest records, gzip", "/latest?fields=records", {"Accept-Encoding": "gzip"})]
+            if brotli is not None:
+                cases.append(("latest records, br", "/latest?fields=records", {"Accept-Encoding": "br"}))
+            for name, path, headers in cases:
+                elapsed, response, body = timed_get(client, base + path, args.repeat, **headers)
+                print(f"{name:<34}{response.status_code:>7}{len(body):>11}{elapsed * 1000:>9.2f}")
+                if name == "latest records, gzip":
+                    etag = response.headers["ETag"]
+
+            # 轮询：数据没变时只有一次索引查询和一个空的 304
+            start = time.perf_counter()
+            sizes = 0
+            for _ in range(args.polls):
+                with client.stream("GET", base + "/latest?fields=records",
+                                   headers={"If-None-Match": etag, "Accept-Encoding": "gzip"}) as response:
+                    sizes += len(b"".join(response.iter_raw()))
+                assert response.status_code == 304, response.status_code
+                # 304 必须带上与 200 相同的验证器
+                assert response.headers["ETag"] == etag, response.headers["ETag"]
+            per_poll = (time.perf_counter() - start) / args.polls
+            print(f"{'poll with If-None-Match':<34}{304:>7}{sizes // args.polls:>11}{per_poll * 1000:>9.2f}")
+
+            # 整个区间流式返回：首字节时间与总时间
+            for name, headers in (("range, all days", IDENTITY),
+                                  ("range, all days, gzip", {"Accept-Encoding": "gzip"})):
+                start = time.perf_counter()
+                with client.stream("GET", base + "/days?fields=records", headers=headers) as response:
+                    chunks = response.iter_raw()
+                    size = len(next(chunks))
+                    first_byte = time.perf_counter() - start
+                    size += sum(len(chunk) for chunk in chunks)
+                total = time.perf_counter() - start
+                print(f"{name:<34}{response.status_code:>7}{size:>11}{total * 1000:>9.2f}"
+                      f"   (first byte after {first_byte * 1000:.1f} ms)")
+            range_etag = response.headers["ETag"]
+            response = client.get(base + "/days?fields=records",
+                                  headers={"If-None-Match": range_etag, "Accept-Encoding": "gzip"})
+            assert response.status_code == 304 and response.headers["ETag"] == range_etag
+            print(f"{'range with If-None-Match':<34}{response.status_code:>7}{len(response.content):>11}")
+            # 另一种压缩方式是另一个表示，不能用 gzip 表示的 ETag 得到 304
+            response = client.get(base + "/days?fields=records",
+                                  headers={"If-None-Match": range_etag, **IDENTITY})
+            assert response.status_code == 200 and response.headers["ETag"] != range_etag
+            days = client.get(base + "/days?fields=titles").json()["data"]["days"]
+            assert len(days) == args.days, len(days)
+
+            # 写入新的一天后，ETag 必须变化
+            store = PaperStore(os.path.join(tmp, DB_FILENAME))
+            store.upsert_day("cs.AI", (START + timedelta(days=1)).isoformat(),
+                             synthetic_entries(args.entries, seed=99999, id_prefix="9999"), crawled_at=2.0e9)
+            store.close()
+            response = client.get(base + "/latest?fields=records", headers={"If-None-Match": etag})
+            assert response.status_code == 200 and response.headers["ETag"] != etag
+            print(f"after a new day was stored: {response.status_code}, date {response.json()['data']['date']}")
+
+        server.shutdown()
+        close_stores()
+
+if __name__ == "__main__":
+    main()
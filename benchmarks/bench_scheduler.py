@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""Simulate the crawl scheduler over several weeks with a fake clock.
+
+Every run must land between ``delay`` and ``delay + jitter`` after an
+arXiv announcement (20:00 US Eastern, Sunday to Thursday, across DST
+changes); injected failures must be retried with backoff.  Finally one
+scheduled crawl runs for real against the fixture server:
+
+    python benchmarks/bench_scheduler.py --weeks 8 --fail-rate 0.2
+"""
+import os
+import sys
+import random
+import asyncio
+import argparse
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_server import FixtureServer
+from tools.crawler import crawl_categories
+from tools.paper_store import close_stores, open_store
+from tools.scheduler import ANNOUNCE_HOUR, ANNOUNCE_TZ, ANNOUNCE_WEEKDAYS, CrawlScheduler, FakeClock
+
+async def simulate(weeks: int, fail_rate: float, delay: float, jitter: float) -> list:
+    clock = FakeClock(datetime(2025, 3, 1, 12, tzinfo=timezone.utc))
+    end = clock.now() + timedelta(weeks=weeks)
+    rng = random.Random(1)
+    attempts = []
+
+    async def crawl(categories):
+        attempts.append(clock.now())
+        clock.advance(30)  # 一次抓取耗时30秒
+        if rng.random() < fail_rate:
+            return {"success": False, "message": "injected failure"}
+        return {"success": True, "message": "ok", "categories": {c: {"success": True} for c in categories}}
+
+    scheduler = CrawlScheduler(crawl, ["cs.AI"], clock=clock, delay=delay, jitter=jitter,
+                               retries=3, retry_delay=60, seed=0)
+    task = scheduler.start()
+    while clock.now() < end:
+        await asyncio.sleep(0)
+    await scheduler.stop()
+    assert task.done()
+    return attempts, scheduler.get_state()
+
+def check(attempts: list, delay: float, jitter: float) -> int:
+    """Group attempts into runs and check when each run started; returns the number of runs"""
+    runs = []
+    for at in attempts:
+        if runs and (at - runs[-1][-1]).total_seconds() < 6 * 3600:
+            runs[-1].append(at)
+        else:
+            runs.append([at])
+    for run in runs:
+        local = run[0].astimezone(ANNOUNCE_TZ)
+        announced = local.replace(hour=ANNOUNCE_HOUR, minute=0, second=0, microsecond=0)
+        if local < announced:
+            announced -= timedelta(days=1)
+        offset = (local - announced).total_seconds()
+        assert announced.weekday() in ANNOUNCE_WEEKDAYS, run[0]
+        assert delay <= offset <= delay + jitter, (run[0], offset)
+        # 重试间隔按指数退避增长（每次抓取本身耗时30秒）
+        gaps = [(b - a).total_seconds() - 30 for a, b in zip(run, run[1:])]
+        assert gaps == [60 * 2 ** i for i in range(len(gaps))], gaps
+    return len(runs)
+
+async def live_run(server: FixtureServer, base_dir: str) -> dict:
+    async def crawl(categories):
+        return await crawl_categories(base_dir, categories, base_url=server.base_url, force=True)
+
+    scheduler = CrawlScheduler(crawl, ["cs.AI", "cs.LG"], delay=0, jitter=0)
+    await scheduler.run_once()
+    return scheduler.get_state()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weeks", type=int, default=8)
+    parser.add_argument("--fail-rate", type=float, default=0.2)
+    parser.add_argument("--delay", type=float, default=600)
+    parser.add_argument("--jitter", type=float, default=300)
+    args = parser.parse_args()
+
+    attempts, state = asyncio.run(simulate(args.weeks, args.fail_rate, args.delay, args.jitter))
+    runs = check(attempts, args.delay, args.jitter)
+    print(f"{args.weeks} simulated weeks: {state['runs']} scheduled runs, all within "
+          f"{args.delay:.0f}..{args.delay + args.jitter:.0f}s after an announcement; "
+          f"{len(attempts) - runs} retries, {state['failures']} gave up")
+    assert state["runs"] == runs == args.weeks * len(ANNOUNCE_WEEKDAYS)
+
+    with FixtureServer(entries=300) as server, tempfile.TemporaryDirectory() as tmp:
+        state = asyncio.run(live_run(server, tmp))
+        assert state["last_result"]["success"], state
+        store = open_store(tmp)
+        print(f"live run: {state['last_result']['message']} in {state['last_duration']}s, "
+              f"stored {[store.latest_day(c)['total_entries'] for c in ('cs.AI', 'cs.LG')]}")
+        close_stores()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""Full-text search latency over years of crawled titles.
+
+Fills a fresh store with ``--titles`` synthetic papers spread over daily
+listings of five categories, then times ``search_titles`` queries:
+
+    python benchmarks/bench_search.py --titles 200000 --per-day 250
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_server import synthetic_entries
+from tools.paper_store import PaperStore, DB_FILENAME, close_stores
+from tools.search import search_titles
+from tools.storage import CATEGORIES
+
+QUERIES = [
+    ("language models", {}),
+    ("graph AND neural", {}),
+    ('"reinforcement learning"', {}),
+    ("diffus*", {"category": "cs.CV"}),
+    ("agents planning", {"date_range": "2023-02-01..2023-03-31"}),
+    ("robust alignment safety", {"category": "cs.LG", "date_range": "2023-05-01.."}),
+]
+
+def fill_store(base_dir: str, titles: int, per_day: int):
+    store = PaperStore(os.path.join(base_dir, DB_FILENAME))
+    day = date(2023, 1, 1)
+    written = 0
+    batch = []
+    while written < titles:
+        for category in CATEGORIES:
+            n = min(per_day, titles - written)
+            if n <= 0:
+                break
+            entries = synthetic_entries(n, seed=written, id_prefix=f"{day:%y%m}")
+            for i, entry in enumerate(entries):
+                entry["arxiv_id"] = f"{day:%y%m%d}.{category}.{i:05d}"
+            batch.append({"category": category, "date": day.isoformat(), "entries": entries})
+            written += n
+        if len(batch) >= 50:
+            store.upsert_days(batch)
+            batch = []
+        day += timedelta(days=1)
+    if batch:
+        store.upsert_days(batch)
+    store.close()
+    return day
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=200000)
+    parser.add_argument("--per-day", type=int, default=250, help="titles per category per day")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        last_day = fill_store(tmp, args.titles, args.per_day)
+        print(f"indexed {args.titles} titles up to {last_day} in {time.perf_counter() - start:.1f}s")
+
+        print(f"{'query':<28}{'filters':<48}{'hits':>5}{'p50 (ms)':>10}{'p99 (ms)':>10}{'bytes':>8}")
+        for query, kwargs in QUERIES:
+            samples = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                result = asyncio.run(search_titles(tmp, query, limit=args.limit, **kwargs))
+                samples.append(time.perf_counter() - t0)
+            assert result["success"], result.get("error")
+            samples.sort()
+            p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+            size = len(json.dumps(result, ensure_ascii=False).encode("utf-8"))
+            print(f"{query:<28}{json.dumps(kwargs):<48}{len(result['data']['hits']):>5}"
+                  f"{statistics.median(samples) * 1000:>10.2f}{p99 * 1000:>10.2f}{size:>8}")
+        close_stores()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""Payload size and latency of get_latest_titles on one very large day.
+
+Stores a single synthetic day of ``--entries`` papers and times the full
+response against paged, compact and record responses, for the first and
+the last page:
+
+    python benchmarks/bench_titles_pagination.py --entries 5000 --page 100
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_server import synthetic_entries
+from tools.cache import read_cache
+from tools.paper_store import PaperStore, DB_FILENAME, close_stores
+from tools.titles import get_latest_titles
+
+def best_of(fn, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PaperStore(os.path.join(tmp, DB_FILENAME))
+        store.upsert_day("cs.AI", "2025-04-02", synthetic_entries(args.entries))
+        store.close()
+
+        def call(**kwargs):
+            # 测的是索引库分页本身，每次先清空读缓存
+            read_cache(tmp).invalidate()
+            return asyncio.run(get_latest_titles(tmp, **kwargs))
+
+        last = args.entries - args.page
+        cases = [
+            ("full titles", {}),
+            ("page 1", {"limit": args.page}),
+            ("last page", {"offset": last, "limit": args.page}),
+            ("page 1 compact", {"limit": args.page, "compact": True}),
+            ("last page compact", {"offset": last, "limit": args.page, "compact": True}),
+            ("page 1 records", {"limit": args.page, "fields": "records"}),
+            ("last page records", {"offset": last, "limit": args.page, "fields": "records"}),
+            ("records compact", {"limit": args.page, "fields": "records", "compact": True}),
+            ("full records", {"fields": "records"}),
+        ]
+
+        print(f"{args.entries} entries, page size {args.page}")
+        print(f"{'response':<22}{'items':>7}{'bytes':>10}{'ms':>9}")
+        for name, kwargs in cases:
+            elapsed, result = best_of(lambda: call(**kwargs), args.repeat)
+            assert result["success"], result.get("error")
+            data = result["data"]
+            items = len(data.get("titles") or data.get("records") or data.get("rows")
+                        or data.get("text", "").split("\n"))
+            size = len(json.dumps(result, ensure_ascii=False).encode("utf-8"))
+            print(f"{name:<22}{items:>7}{size:>10}{elapsed * 1000:>9.2f}")
+
+        # 用游标把整天翻完，确认拼起来和一次性返回的一致
+        pages, titles, cursor = 0, [], None
+        start = time.perf_counter()
+        while True:
+            result = call(limit=args.page, cursor=cursor)
+            titles.extend(result["data"]["titles"])
+            pages += 1
+            cursor = result["data"]["next_cursor"]
+            if not cursor:
+                break
+        elapsed = time.perf_counter() - start
+        assert titles == asyncio.run(get_latest_titles(tmp))["data"]["titles"]
+        print(f"walked {pages} pages by cursor in {elapsed * 1000:.1f} ms")
+        close_stores()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+"""Latency of 100 simultaneous tool calls, blocking handlers vs the I/O pool.
+
+Stores ``--days`` synthetic days, then fires ``--calls`` concurrent calls
+(title pages, latest paper info and searches) at the tool functions while a
+ticker measures how late the event loop wakes up.  "before" runs the blocking
+work inline on the event loop and logs every DEBUG line synchronously to a
+file and stdout (the old server setup); "after" uses the I/O pool and the
+queued INFO logging.  ``--disk-latency`` adds a sleep to every store read to
+stand in for a slow disk:
+
+    python benchmarks/bench_tool_concurrency.py --calls 100 --disk-latency 0.005
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+import functools
+import statistics
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_server import synthetic_entries
+from tools import executor
+from tools.cache import read_cache
+from tools.logs import configure_logging, stop_logging
+from tools.paper_info import check_latest_paper_info
+from tools.paper_store import PaperStore, DB_FILENAME, close_stores
+from tools.search import search_titles
+from tools.titles import get_latest_titles
+
+QUERIES = ["neural network", "reinforcement learning", "language model", "graph", "diffusion"]
+
+def fill_store(base_dir: str, days: int, entries: int):
+    store = PaperStore(os.path.join(base_dir, DB_FILENAME))
+    start = date(2025, 4, 2) - timedelta(days=days)
+    store.upsert_days([{"category": "cs.AI", "date": (start + timedelta(days=i)).isoformat(),
+                        "entries": synthetic_entries(entries, seed=i, id_prefix=f"{i:04d}"),
+                        "crawled_at": 1.0e9 + i}
+                       for i in range(days)])
+    store.close()
+
+def slow_reads(delay: float):
+    """Make every store read sleep ``delay`` seconds first"""
+    for name in ("latest_day", "get_day", "get_titles", "get_records", "search", "version"):
+        original = getattr(PaperStore, name)
+
+        @functools.wraps(original)
+        def slow(*args, _original=original, **kwargs):
+            time.sleep(delay)
+            return _original(*args, **kwargs)
+        setattr(PaperStore, name, slow)
+
+def configure_old_logging(log_path: str, stdout):
+    """The server's logging before: DEBUG, written synchronously to a file and stdout"""
+    stop_logging()
+    for handler in logging.root.handlers[:]:
+        logging.root.removeHandler(handler)
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                        handlers=[logging.FileHandler(log_path, mode='w', encoding='utf-8'),
+                                  logging.StreamHandler(stdout)])
+
+def make_calls(base_dir: str, calls: int, entries: int) -> list:
+    result = []
+    for i in range(calls):
+        kind = i % 3
+        if kind == 0:
+            # 每次都取不同的页，不会命中读缓存
+            offset = (i * 7) % max(1, entries - 20)
+            result.append(("titles", lambda o=offset: get_latest_titles(base_dir, offset=o, limit=20,
+                                                                        fields="records")))
+        elif kind == 1:
+            result.append(("info", lambda: check_latest_paper_info(base_dir)))
+        else:
+            query = QUERIES[i % len(QUERIES)]
+            result.append(("search", lambda q=query: search_titles(base_dir, q, limit=20)))
+    return result
+
+async def run_calls(base_dir: str, calls: list, tick: float) -> dict:
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        # 事件循环被阻塞的时间 = 实际唤醒时间 - 预定唤醒时间
+        while not done.is_set():
+            expected = time.perf_counter() + tick
+            await asyncio.sleep(tick)
+            lags.append(time.perf_counter() - expected)
+
+    # 所有请求同时到达，延迟从到达时刻算起
+    async def timed(fn):
+        result = await fn()
+        assert result["success"], result.get("error")
+        return time.perf_counter() - start
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(timed(fn) for _, fn in calls))
+    wall = time.perf_counter() - start
+    done.set()
+    await ticker_task
+    return {"latencies": sorted(latencies), "lags": sorted(lags) or [0.0], "wall": wall}
+
+def percentile(values: list, p: float) -> float:
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=200)
+    parser.add_argument("--entries", type=int, default=250)
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--disk-latency", type=float, default=0.005, help="seconds added to every store read")
+    parser.add_argument("--tick", type=float, default=0.005, help="event loop probe interval")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fill_store(tmp, args.days, args.entries)
+        if args.disk_latency:
+            slow_reads(args.disk_latency)
+        log_path = os.path.join(tmp, "bench.log")
+
+        print(f"{args.calls} concurrent calls, {args.days} days x {args.entries} entries, "
+              f"disk latency {args.disk_latency * 1000:.1f} ms, {executor.IO_WORKERS} I/O workers")
+        print(f"{'mode':<8}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}{'wall ms':>9}"
+              f"{'loop lag p50':>14}{'loop lag max':>14}")
+        devnull = open(os.devnull, "w")
+        # 先预热一遍，两种模式都从热的 SQLite 页缓存开始
+        configure_logging(log_path, level="INFO", console=False)
+        asyncio.run(run_calls(tmp, make_calls(tmp, args.calls, args.entries), args.tick))
+        for mode in ("before", "after"):
+            if mode == "before":
+                executor.inline = True
+                configure_old_logging(log_path, devnull)
+            else:
+                executor.inline = False
+                configure_logging(log_path, level="INFO", console=True)
+            read_cache(tmp).invalidate()
+            stats = asyncio.run(run_calls(tmp, make_calls(tmp, args.calls, args.entries), args.tick))
+            latencies, lags = stats["latencies"], stats["lags"]
+            print(f"{mode:<8}{percentile(latencies, 50) * 1000:>9.1f}{percentile(latencies, 99) * 1000:>9.1f}"
+                  f"{latencies[-1] * 1000:>9.1f}{stats['wall'] * 1000:>9.1f}"
+                  f"{statistics.median(lags) * 1000:>14.1f}{lags[-1] * 1000:>14.1f}")
+        stop_logging()
+        devnull.close()
+        executor.shutdown()
+        close_stores()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""Topic index build time and trend query latency versus re-reading titles.
+
+Stores ``--titles`` synthetic titles (``--per-day`` per listing day), builds
+the topic index, then compares:
+
+  trend     per-day term counts from the index against reading every title
+            of the range from the store and counting (what a client re-reading
+            the raw titles does), over ranges of 1, 3 and 12 months
+  topics    the stored topics of a day against clustering it on the spot
+  update    indexing one new day on top of the built index
+
+    python benchmarks/bench_topics.py --titles 100000 --per-day 300
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_server import synthetic_entries
+from tools.paper_store import close_stores, open_store
+from tools.topics import (cluster_day, close_topic_indexes, normalize_term, open_topic_index, title_terms,
+                          topics_for_day, trend)
+
+CATEGORY = "cs.AI"
+TERMS = ["reinforcement learning", "diffusion", "language models", "graph neural", "safety"]
+
+def listing_days(n: int, start: date) -> list:
+    days, day = [], start
+    while len(days) < n:
+        if day.weekday() < 5:
+            days.append(day.isoformat())
+        day += timedelta(days=1)
+    return days
+
+def naive_trend(store, term: str, days: list) -> list:
+    """Count by re-reading and tokenizing every title of the range"""
+    counts = []
+    for day in days:
+        titles = store.get_titles(CATEGORY, day)
+        counts.append(sum(term in set(title_terms(title)) for title in titles))
+    return counts
+
+def best_of(repeat: int, fn) -> tuple:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=100_000)
+    parser.add_argument("--per-day", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    n_days = -(-args.titles // args.per_day)
+    days = listing_days(n_days + 1, date(2024, 1, 1))
+    new_day, days = days[-1], days[:-1]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = open_store(tmp)
+        for start in range(0, len(days), 50):
+            store.upsert_days([{"category": CATEGORY, "date": day,
+                                "entries": synthetic_entries(args.per_day, seed=i, id_prefix=f"{i:04d}")}
+                               for i, day in enumerate(days[start:start + 50], start)])
+        print(f"{len(days) * args.per_day} titles over {len(days)} days ({days[0]}..{days[-1]})")
+
+        index = open_topic_index(tmp)
+        start = time.perf_counter()
+        index.update(store, CATEGORY)
+        build = time.perf_counter() - start
+        stats = index.get_stats()
+        print(f"index built in {build:.1f}s ({build / len(days) * 1000:.1f} ms per day, "
+              f"{stats['terms']} distinct terms, {os.path.getsize(index.path) / 1e6:.1f} MB)")
+
+        print(f"\n{'trend over':<12}{'days':>6}{'index ms':>10}{'re-read ms':>12}{'speed-up':>10}")
+        for months in (1, 3, 12):
+            window = [day for day in days if day >= (date.fromisoformat(days[-1]) - timedelta(days=30 * months)).isoformat()]
+            term = normalize_term(TERMS[months % len(TERMS)])
+            indexed, result = best_of(args.repeat, lambda: asyncio.run(
+                trend(tmp, term, date_range=f"{window[0]}..{window[-1]}", category=CATEGORY)))
+            reread, counts = best_of(1, lambda: naive_trend(store, term, window))
+            assert result["success"], result.get("error")
+            assert [day["count"] for day in result["data"]["days"]] == counts, "index and re-read disagree"
+            print(f"{f'{months} months':<12}{len(window):>6}{indexed * 1000:>10.1f}{reread * 1000:>12.1f}"
+                  f"{reread / indexed:>9.0f}x")
+
+        stored, result = best_of(args.repeat, lambda: asyncio.run(topics_for_day(tmp, CATEGORY, days[-1])))
+        assert result["success"], result.get("error")
+        records = store.get_records(CATEGORY, days[-1])
+        idf = index._idf({term for record in records for term in title_terms(record["title"])})
+        on_the_spot, topics = best_of(args.repeat, lambda: cluster_day(records, idf))
+        print(f"\ntopics of one day: stored {stored * 1000:.1f} ms, clustered on the spot {on_the_spot * 1000:.1f} ms "
+              f"({len(topics)} topics)")
+        for topic in result["data"]["topics"][:3]:
+            print(f"  {topic['size']:>4}  {topic['label']}")
+
+        store.upsert_day(CATEGORY, new_day, synthetic_entries(args.per_day, seed=len(days), id_prefix="9999"))
+        start = time.perf_counter()
+        indexed_days = index.update(store, CATEGORY)
+        print(f"\nnew day indexed in {(time.perf_counter() - start) * 1000:.0f} ms ({indexed_days} day re-indexed)")
+
+        close_topic_indexes()
+        close_stores()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+#!/usr/bin/env python
+"""Local stand-in for arxiv.org used by the benchmarks.
+
+Serves saved HTML fixtures from ``benchmarks/fixtures`` under
+``/fixtures/<name>``, synthetic arXiv-style listing pages under
+``/list/<category>/recent`` and past days under
+``/catchup/<category>/<YYYY-MM-DD>`` (404 on weekends), so crawls can run offline.
+With ``--heavy-assets`` listing pages pull in a stylesheet, a web font,
+MathJax, an analytics script and figure thumbnails from ``/static/``, each
+delayed by ``--asset-latency``, like the real pages do:
+
+    python benchmarks/fixture_server.py --port 8000 --entries 340
+    ARXIV_BASE_URL=http://127.0.0.1:8000 python arxiv_server.py
+"""
+import os
+import re
+import sys
+import time
+import zlib
+import random
+import argparse
+import threading
+from html import escape
+from collections import Counter
+from datetime import date, datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+WORDS = (
+    "learning agents language models reasoning graph neural diffusion planning "
+    "reinforcement multimodal benchmark retrieval alignment robust efficient "
+    "transformer causal federated vision policy safety evaluation knowledge "
+    "generative symbolic optimization uncertainty memory tool embodied"
+).split()
+
+SURNAMES = "Smith Wang Zhang Li Garcia Kumar Müller Rossi Chen Tanaka Novak Silva".split()
+
+SUBJECTS = {
+    "cs.AI": "Artificial Intelligence",
+    "cs.LG": "Machine Learning",
+    "cs.CL": "Computation and Language",
+    "cs.CV": "Computer Vision and Pattern Recognition",
+    "stat.ML": "Machine Learning",
+    "cs.RO": "Robotics",
+}
+
+def synthetic_entries(n: int, seed: int = 0, id_prefix: str = "2504", primary: str = "cs.AI") -> list:
+    """Generate n deterministic arXiv-style entries"""
+    rng = random.Random(seed)
+    others = [c for c in SUBJECTS if c != primary]
+    entries = []
+    for i in range(n):
+        words = rng.sample(WORDS, rng.randint(4, 9))
+        entries.append({
+            "arxiv_id": f"{id_prefix}.{i + 1:05d}",
+            "version": 1 if rng.random() < 0.8 else rng.randint(2, 4),
+            "title": " ".join(words).capitalize(),
+            "authors": [f"{chr(65 + rng.randrange(26))}. {rng.choice(SURNAMES)}"
+                        for _ in range(rng.randint(1, 5))],
+            "categories": [primary] + rng.sample(others, rng.randint(0, 2)),
+            "comments": f"{rng.randint(4, 40)} pages, {rng.randint(1, 12)} figures" if rng.random() < 0.6 else None,
+        })
+    return entries
+
+def render_entry(index: int, entry: dict) -> str:
+    arxiv_id = entry["arxiv_id"]
+    version = entry.get("version", 1)
+    authors = ", ".join(
+        f'<a href="https://arxiv.org/a/{escape(a.split()[-1].lower())}_1">{escape(a)}</a>'
+        for a in entry.get("authors", [])
+    )
+    categories = entry.get("categories") or ["cs.AI"]
+    subjects = "; ".join(
+        [f'<span class="primary-subject">{SUBJECTS.get(categories[0], categories[0])} ({categories[0]})</span>']
+        + [f"{SUBJECTS.get(c, c)} ({c})" for c in categories[1:]]
+    )
+    comments = ""
+    if entry.get("comments"):
+        comments = f"""
+      <div class='list-comments mathjax'><span class='descriptor'>Comments:</span>
+        {escape(entry["comments"])}
+      </div>"""
+    return f"""  <dt>
+    <a name='item{index}'>[{index}]</a>
+    <a href ="/abs/{arxiv_id}" title="Abstract" id="{arxiv_id}">
+      arXiv:{arxiv_id}
+    </a>
+    [<a href="/pdf/{arxiv_id}" title="Download PDF" id="pdf-{arxiv_id}" aria-labelledby="pdf-{arxiv_id}">pdf</a>, <a href="https://arxiv.org/html/{arxiv_id}v{version}" title="View HTML" id="html-{arxiv_id}" aria-labelledby="html-{arxiv_id}" rel="noopener noreferrer" target="_blank">html</a>, <a href="/format/{arxiv_id}" title="Other formats" id="oth-{arxiv_id}" aria-labelledby="oth-{arxiv_id}">other</a>]
+  </dt>
+  <dd>
+    <div class='meta'>
+      <div class='list-title mathjax'><span class='descriptor'>Title:</span>
+        {escape(entry["title"])}
+      </div>
+      <div class='list-authors'>{authors}</div>{comments}
+      <div class='list-subjects'><span class='descriptor'>Subjects:</span>
+        {subjects}
+      </div>
+    </div>
+  </dd>
+"""
+
+# 列表页引用的静态资源：路径 -> (Content-Type, 字节数)
+ASSETS = {
+    "/static/css/arXiv.css": ("text/css", 60_000),
+    "/static/fonts/lmroman10-regular.woff2": ("font/woff2", 150_000),
+    "/static/mathjax/tex-mml-chtml.js": ("application/javascript", 500_000),
+    "/static/js/analytics.js": ("application/javascript", 80_000),
+}
+IMAGE_SIZE = 40_000
+MAX_IMAGES = 20
+
+def asset_body(path: str) -> tuple:
+    """Content type and body of a static asset, None if unknown"""
+    if path.startswith("/static/images/"):
+        content_type, size = "image/png", IMAGE_SIZE
+    elif path in ASSETS:
+        content_type, size = ASSETS[path]
+    else:
+        return None
+    if content_type == "text/css":
+        rule = ("@font-face{font-family:LMRoman;src:url(/static/fonts/lmroman10-regular.woff2)}"
+                "body{font-family:LMRoman,serif}\n")
+        return content_type, (rule + "/* padding */\n" * ((size - len(rule)) // 15)).encode()
+    if content_type == "application/javascript":
+        return content_type, (f"window.__loaded=(window.__loaded||[]).concat({path!r});\n"
+                              + "//" + "x" * size).encode()
+    return content_type, random.Random(path).randbytes(size)
+
+def render_assets(count: int) -> tuple:
+    """(head tags, figure thumbnails) of a listing with ``count`` entries"""
+    head = """<link rel="stylesheet" type="text/css" media="screen" href="/static/css/arXiv.css" />
+<script src="/static/mathjax/tex-mml-chtml.js"></script>
+<script src="/static/js/analytics.js"></script>
+"""
+    images = "".join(f'<img src="/static/images/figure_{i}.png" alt="" width="120" height="80" />\n'
+                     for i in range(min(count, MAX_IMAGES)))
+    return head, images
+
+def render_listing(entries: list, listing_date: date, category: str = "cs.AI",
+                   skip: int = 0, show: int = 250, assets: bool = False) -> str:
+    """Render one page of an arXiv ``/list/<category>/recent`` listing"""
+    total = len(entries)
+    page = entries[skip:skip + show]
+    showing = "showing first" if skip == 0 and len(page) < total else "showing"
+    header = (f"{listing_date.strftime('%a')}, {listing_date.day} "
+              f"{listing_date.strftime('%b %Y')} ({showing} {len(page)} of {total} entries )")
+    items = "".join(render_entry(skip + i + 1, e) for i, e in enumerate(page))
+    head, images = render_assets(len(page)) if assets else ("", "")
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head><title>{category} recent submissions</title>
+{head}</head>
+<body>
+<div id="content">
+<h1>Artificial Intelligence</h1>
+{images}
+<div id='dlpage'>
+<dl id='articles'>
+<h3>{header}</h3>
+{items}</dl>
+</div>
+</div>
+</body>
+</html>
+"""
+
+class FixtureState:
+    """Mutable server configuration, shared with the request handler.
+
+    ``latency`` delays every response, ``fail_rate`` answers that fraction of
+    listing requests with 503, and ``max_show`` caps the page size like arXiv does.
+    With ``validators`` listing pages carry ETag / Last-Modified and
+    conditional requests for an unchanged page get 304 Not Modified.
+    ``throttle_rate`` answers that fraction with 429 (optionally with
+    ``retry_after``), and past days have about ``archive_entries`` entries.
+    ``heavy_assets`` makes listing pages reference the ``/static/`` assets,
+    which are delayed by ``asset_latency`` and counted in ``asset_requests``.
+    """
+
+    def __init__(self, entries: int = 340, listing_date: date = date(2025, 4, 2), seed: int = 0,
+                 latency: float = 0.0, fail_rate: float = 0.0, max_show: int = 2000,
+                 cross_list_rate: float = 0.2, validators: bool = True, throttle_rate: float = 0.0,
+                 retry_after: float = None, archive_entries: int = 150, heavy_assets: bool = False,
+                 asset_latency: float = 0.3):
+        self.entries = synthetic_entries(entries, seed=seed)
+        self.cross_list_rate = cross_list_rate
+        self._category_entries = {"cs.AI": self.entries}
+        self.listing_date = listing_date
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.max_show = max_show
+        self.validators = validators
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.archive_entries = archive_entries
+        self.heavy_assets = heavy_assets
+        self.asset_latency = asset_latency
+        self.asset_requests = {}
+        self._day_entries = {}
+        self.modified = datetime.combine(listing_date, datetime.min.time(), timezone.utc)
+        self.rng = random.Random(seed)
+        self.requests = 0
+        # 每个路径收到的请求数
+        self.paths = Counter()
+        self.failures = 0
+        self.not_modified = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def entries_for(self, category: str) -> list:
+        """Entries of a category; other categories cross-list part of cs.AI"""
+        with self.lock:
+            if category not in self._category_entries:
+                n = len(self.entries)
+                crc = zlib.crc32(category.encode())
+                own = synthetic_entries(n, seed=crc, id_prefix=f"25{crc % 90 + 10:02d}", primary=category)
+                shared = self.entries[:int(n * self.cross_list_rate)]
+                self._category_entries[category] = own[:n - len(shared)] + shared
+            return self._category_entries[category]
+
+    def announce(self, added: int = 0, replaced: int = 0, offset: int = 0):
+        """Change today's cs.AI listing: prepend new entries, bump the versions of some from ``offset``"""
+        with self.lock:
+            new = synthetic_entries(added, seed=len(self.entries), id_prefix="2599")
+            for i, entry in enumerate(new):
+                entry["arxiv_id"] = f"2599.{len(self.entries) + i:05d}"
+            for entry in self.entries[offset:offset + replaced]:
+                entry["version"] = (entry.get("version") or 1) + 1
+            self.entries[:0] = new
+            self.modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def day_entries(self, category: str, day: date):
+        """Entries announced on a past day, None on weekends"""
+        if day.weekday() >= 5:
+            return None
+        key = (category, day)
+        with self.lock:
+            if key not in self._day_entries:
+                crc = zlib.crc32(f"{category} {day}".encode())
+                n = max(1, self.archive_entries + crc % 41 - 20)
+                entries = synthetic_entries(n, seed=crc, id_prefix=day.strftime("%y%m"), primary=category)
+                for i, entry in enumerate(entries):
+                    entry["arxiv_id"] = f"{day:%y%m}.{day.day:02d}{crc % 10}{i:03d}"
+                self._day_entries[key] = entries
+            return self._day_entries[key]
+
+    def should_throttle(self) -> bool:
+        with self.lock:
+            if self.throttle_rate and self.rng.random() < self.throttle_rate:
+                self.throttled += 1
+                return True
+            return False
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            if self.fail_rate and self.rng.random() < self.fail_rate:
+                self.failures += 1
+                return True
+            return False
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    state: FixtureState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "text/html; charset=utf-8",
+              headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _not_modified(self, etag: str, modified: datetime) -> bool:
+        """Evaluate If-None-Match (preferred) or If-Modified-Since"""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return modified <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def do_GET(self):
+        with self.state.lock:
+            self.state.requests += 1
+        if self.state.latency:
+            time.sleep(self.state.latency)
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        with self.state.lock:
+            self.state.paths[url.path] += 1
+
+        # 保存的HTML快照: /fixtures/<name>
+        if url.path.startswith("/fixtures/"):
+            fixture = os.path.join(FIXTURES_DIR, os.path.basename(url.path))
+            if not os.path.isfile(fixture):
+                return self._send(404, b"not found", "text/plain")
+            with open(fixture, "rb") as f:
+                return self._send(200, f.read())
+
+        # 列表页引用的静态资源: /static/...
+        if url.path.startswith("/static/"):
+            asset = asset_body(url.path)
+            if asset is None:
+                return self._send(404, b"not found", "text/plain")
+            kind = url.path.split("/")[2]
+            with self.state.lock:
+                self.state.asset_requests[kind] = self.state.asset_requests.get(kind, 0) + 1
+            if self.state.asset_latency:
+                time.sleep(self.state.asset_latency)
+            return self._send(200, asset[1], asset[0], headers={"Cache-Control": "no-store"})
+
+        match = re.fullmatch(r"/list/([\w.\-]+)/recent", url.path)
+        catchup = re.fullmatch(r"/catchup/([\w.\-]+)/(\d{4}-\d{2}-\d{2})", url.path)
+        if not match and not catchup:
+            return self._send(404, b"not found", "text/plain")
+
+        if self.state.should_throttle():
+            headers = {"Retry-After": str(self.state.retry_after)} if self.state.retry_after else None
+            return self._send(429, b"too many requests", "text/plain", headers=headers)
+        if self.state.should_fail():
+            return self._send(503, b"service unavailable", "text/plain")
+
+        if catchup:
+            day = date.fromisoformat(catchup.group(2))
+            entries = self.state.day_entries(catchup.group(1), day)
+            if entries is None:
+                return self._send(404, b"no announcements on this day", "text/plain")
+            skip = int(query.get("skip", ["0"])[0])
+            show = min(int(query.get("show", ["250"])[0]), self.state.max_show)
+            html = render_listing(entries, day, category=catchup.group(1), skip=skip, show=show,
+                                  assets=self.state.heavy_assets)
+            return self._send(200, html.encode("utf-8"))
+
+        skip = int(query.get("skip", ["0"])[0])
+        show = min(int(query.get("show", ["250"])[0]), self.state.max_show)
+        html = render_listing(self.state.entries_for(match.group(1)), self.state.listing_date,
+                              category=match.group(1), skip=skip, show=show,
+                              assets=self.state.heavy_assets)
+        body = html.encode("utf-8")
+        if not self.state.validators:
+            return self._send(200, body)
+        etag = f'"{zlib.crc32(body):08x}"'
+        headers = {"ETag": etag, "Last-Modified": format_datetime(self.state.modified, usegmt=True)}
+        if self._not_modified(etag, self.state.modified):
+            with self.state.lock:
+                self.state.not_modified += 1
+            return self._send(304, b"", headers=headers)
+        self._send(200, body, headers=headers)
+
+class _QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # 客户端中途断开（例如被杀掉的进程）不打印堆栈
+        if not issubclass(sys.exc_info()[0], ConnectionError):
+            super().handle_error(request, client_address)
+
+class FixtureServer:
+    """Run the stand-in server on a background thread.
+
+    Usage::
+
+        with FixtureServer(entries=340) as server:
+            url = server.base_url
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **state_kwargs):
+        self.state = FixtureState(**state_kwargs)
+        handler = type("Handler", (FixtureHandler,), {"state": self.state})
+        self.httpd = _QuietServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--entries", type=int, default=340, help="synthetic entries per day")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to delay each response")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of listing requests answered with 503")
+    parser.add_argument("--max-show", type=int, default=2000, help="largest page size served")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of listing requests answered with 429")
+    parser.add_argument("--heavy-assets", action="store_true", help="listing pages reference CSS, fonts, MathJax, analytics and images")
+    parser.add_argument("--asset-latency", type=float, default=0.3, help="seconds to delay each static asset")
+    args = parser.parse_args()
+
+    server = FixtureServer(args.host, args.port, entries=args.entries, latency=args.latency,
+                           fail_rate=args.fail_rate, max_show=args.max_show,
+                           throttle_rate=args.throttle_rate, heavy_assets=args.heavy_assets,
+                           asset_latency=args.asset_latency)
+    print(f"Serving arXiv fixtures on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
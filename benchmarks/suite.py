@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+"""Whole crawl-to-query path, stage by stage, checked against a stored baseline.
+
+For every listing size in ``--entries`` the fixture server (``--latency``
+per request) serves a synthetic day and the suite times:
+
+  server_startup     spawning ``arxiv_server.py`` over stdio until the MCP
+                     session is initialized (measured once, entries 0)
+  browser_launch     Chromium launch, navigation and extraction of the
+  browser_goto       first listing page through ``PlaywrightFetcher``;
+  browser_extract    skipped when Chromium is not installed
+  navigate           GET of every page of the day over HTTP
+  extract            parsing those pages into records
+  file_write         writing the day files (titles, records, manifest)
+  crawl_latest_papers_tool, check_latest_paper_info_tool, get_latest_titles_tool
+                     each tool called through a real stdio MCP client; every
+                     crawl sees a changed listing, so it fetches and writes
+
+Every number is the median of ``--repeat`` runs, in seconds.  The results
+are written as JSON to ``--output``; with a baseline (``--baseline``, by
+default ``benchmarks/baseline.json``) every stage slower by more than
+``--tolerance`` (and ``--min-delta`` seconds) is a regression and the exit
+status is 1.  ``--update-baseline`` stores the results as the new baseline.
+
+A baseline that cannot gate this run is an error (exit status 2): one
+recorded on another machine or with another latency (``--allow-other-machine``
+to compare anyway), or one without numbers for a stage measured now, such as
+the ``browser_*`` stages of a baseline recorded without Chromium
+(``--allow-missing`` to gate only the stages it has).
+
+    python benchmarks/suite.py --entries 100 1000 10000 50000 --latency 0.05
+    python benchmarks/suite.py --update-baseline
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+import statistics
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import httpx
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from fixture_server import FixtureServer
+from tools.crawler import PAGE_CONCURRENCY, PAGE_SIZE
+from tools.fetcher import PlaywrightFetcher, listing_url
+from tools.listing_parser import merge_pages, parse_listing
+from tools.storage import write_day_files
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results.json")
+CATEGORY = "cs.AI"
+TOOLS = ("crawl_latest_papers_tool", "check_latest_paper_info_tool", "get_latest_titles_tool")
+
+def server_params(base_dir: str, base_url: str) -> StdioServerParameters:
+    env = dict(os.environ, ARXIV_BASE_DIR=base_dir, ARXIV_BASE_URL=base_url, ARXIV_LOG_LEVEL="WARNING")
+    return StdioServerParameters(command=sys.executable, args=[os.path.join(ROOT, "arxiv_server.py")], env=env)
+
+async def call(session: ClientSession, name: str, arguments: dict) -> dict:
+    result = await session.call_tool(name, arguments)
+    if result.isError:
+        raise RuntimeError(result.content[0].text if result.content else name)
+    data = result.structuredContent or json.loads(result.content[0].text)
+    if not data.get("success"):
+        raise RuntimeError(f"{name}: {data.get('error')}")
+    return data
+
+async def time_startup(base_url: str, repeat: int) -> list:
+    times = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            async with stdio_client(server_params(tmp, base_url)) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    times.append(time.perf_counter() - start)
+    return times
+
+async def time_tools(fixture: FixtureServer, repeat: int) -> dict:
+    """The three tools through one stdio session; the listing changes before every crawl"""
+    times = {name: [] for name in TOOLS}
+    with tempfile.TemporaryDirectory() as tmp:
+        async with stdio_client(server_params(tmp, fixture.base_url)) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                for _ in range(repeat):
+                    fixture.state.announce(added=1)
+                    for name, arguments in (("crawl_latest_papers_tool", {"category": CATEGORY, "force": True}),
+                                            ("check_latest_paper_info_tool", {"category": CATEGORY}),
+                                            ("get_latest_titles_tool", {"category": CATEGORY})):
+                        start = time.perf_counter()
+                        await call(session, name, arguments)
+                        times[name].append(time.perf_counter() - start)
+    return times
+
+async def fetch_pages(base_url: str, total: int) -> list:
+    """GET every page of the day, PAGE_CONCURRENCY at a time"""
+    semaphore = asyncio.Semaphore(PAGE_CONCURRENCY)
+    async with httpx.AsyncClient() as client:
+        async def get(skip):
+            async with semaphore:
+                response = await client.get(listing_url(CATEGORY, show=PAGE_SIZE, base_url=base_url, skip=skip))
+                response.raise_for_status()
+                return response.text
+        return await asyncio.gather(*(get(skip) for skip in range(0, max(total, 1), PAGE_SIZE)))
+
+def time_pipeline(base_url: str, entries: int, repeat: int) -> dict:
+    times = {"navigate": [], "extract": [], "file_write": []}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pages = asyncio.run(fetch_pages(base_url, entries))
+        times["navigate"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        listing = merge_pages([parse_listing(html) for html in pages])
+        times["extract"].append(time.perf_counter() - start)
+        assert len(listing["entries"]) >= entries, f"parsed {len(listing['entries'])} of {entries}"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            write_day_files(tmp, CATEGORY, listing["date"], listing["titles"], listing["entries"])
+            times["file_write"].append(time.perf_counter() - start)
+    return times
+
+async def time_browser(base_url: str, repeat: int) -> dict:
+    times = {"browser_launch": [], "browser_goto": [], "browser_extract": []}
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            fetcher = PlaywrightFetcher(user_data_dir=tmp)
+            async with fetcher:
+                await fetcher.fetch(listing_url(CATEGORY, show=PAGE_SIZE, base_url=base_url))
+            stages = fetcher.timer.get_stats()
+        for stage in ("launch", "goto", "extract"):
+            times[f"browser_{stage}"].append(stages[stage] / 1000)
+    return times
+
+def summarize(samples: list) -> dict:
+    return {"seconds": round(statistics.median(samples), 4), "runs": [round(s, 4) for s in samples]}
+
+def run_suite(args) -> dict:
+    results = {}
+
+    def record(entries: int, times: dict):
+        for stage, samples in times.items():
+            results.setdefault(stage, {})[str(entries)] = summarize(samples)
+            print(f"  {stage:<32}{entries:>7}{results[stage][str(entries)]['seconds'] * 1000:>11.1f} ms", flush=True)
+
+    browser_error = None if args.browser else "disabled with --no-browser"
+    with FixtureServer(entries=max(args.entries), latency=args.latency) as fixture:
+        print(f"{'stage':<34}{'entries':>7}{'median':>14}")
+        record(0, {"server_startup": asyncio.run(time_startup(fixture.base_url, args.repeat))})
+
+    for entries in args.entries:
+        with FixtureServer(entries=entries, latency=args.latency, max_show=PAGE_SIZE) as fixture:
+            if browser_error is None:
+                try:
+                    record(entries, asyncio.run(time_browser(fixture.base_url, args.repeat)))
+                except Exception as e:
+                    browser_error = f"{type(e).__name__}: {str(e).splitlines()[0]}"
+                    print(f"  browser stages skipped ({browser_error})")
+            record(entries, time_pipeline(fixture.base_url, entries, args.repeat))
+            record(entries, asyncio.run(time_tools(fixture, args.repeat)))
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "entries": args.entries,
+            "latency": args.latency,
+            "repeat": args.repeat,
+            "browser": browser_error or "ok",
+        },
+        "stages": results,
+    }
+
+def compare(current: dict, baseline: dict, tolerance: float, min_delta: float) -> list:
+    """Rows (stage, entries, baseline s, current s, regressed) for every measurement in both"""
+    rows = []
+    for stage, sizes in current["stages"].items():
+        for entries, result in sizes.items():
+            before = baseline["stages"].get(stage, {}).get(entries)
+            if before is None:
+                continue
+            now, then = result["seconds"], before["seconds"]
+            regressed = now > then * (1 + tolerance) and now - then > min_delta
+            rows.append((stage, int(entries), then, now, regressed))
+    return rows
+
+def missing_stages(current: dict, baseline: dict) -> list:
+    """(stage, entries) measured in ``current`` that ``baseline`` has no number for"""
+    return [(stage, int(entries)) for stage, sizes in current["stages"].items() for entries in sizes
+            if entries not in baseline["stages"].get(stage, {})]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="listing sizes to run (100 to 50000)")
+    parser.add_argument("--latency", type=float, default=0.05, help="fixture server delay per request, seconds")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write the results JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown, 0.5 = 50%%")
+    parser.add_argument("--min-delta", type=float, default=0.02,
+                        help="ignore slowdowns smaller than this many seconds")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--no-browser", dest="browser", action="store_false", help="skip the Chromium stages")
+    parser.add_argument("--allow-other-machine", action="store_true",
+                        help="compare with a baseline recorded on another machine or with another latency")
+    parser.add_argument("--allow-missing", action="store_true",
+                        help="gate only the stages the baseline has numbers for")
+    args = parser.parse_args()
+
+    current = run_suite(args)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    print(f"\nresults written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"baseline updated: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}, run with --update-baseline to store one")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    usable = True
+    mismatch = [key for key in ("cpus", "latency", "platform") if baseline["meta"].get(key) != current["meta"][key]]
+    if mismatch:
+        print(f"\n{'warning' if args.allow_other_machine else 'error'}: the baseline was recorded with another "
+              + ", ".join(f"{key} ({baseline['meta'].get(key)} vs {current['meta'][key]} now)" for key in mismatch))
+        if not args.allow_other_machine:
+            print("  its timings do not apply here; record one with --update-baseline on this machine "
+                  "or pass --allow-other-machine")
+            usable = False
+    missing = missing_stages(current, baseline)
+    if missing:
+        print(f"\n{'warning' if args.allow_missing else 'error'}: the baseline has no numbers for "
+              f"{len(missing)} measurement(s) of this run, they are not checked:")
+        for stage, entries in missing:
+            print(f"  {stage} ({entries} entries)")
+        if baseline["meta"].get("browser", "ok") != "ok" and any(stage.startswith("browser_") for stage, _ in missing):
+            print(f"  the baseline ran without the browser: {baseline['meta']['browser']}")
+        if not args.allow_missing:
+            print("  record a baseline where every stage runs (--update-baseline) or pass --allow-missing")
+            usable = False
+    skipped = sorted({stage for stage in baseline["stages"] if stage not in current["stages"]})
+    if skipped:
+        print(f"\nnot measured in this run: {', '.join(skipped)}"
+              + (f" (browser: {current['meta']['browser']})" if current["meta"]["browser"] != "ok" else ""))
+
+    rows = compare(current, baseline, args.tolerance, args.min_delta)
+    print(f"\n{'stage':<34}{'entries':>7}{'baseline ms':>13}{'now ms':>10}{'change':>9}")
+    for stage, entries, then, now, regressed in rows:
+        change = (now / then - 1) * 100 if then else 0.0
+        print(f"{stage:<34}{entries:>7}{then * 1000:>13.1f}{now * 1000:>10.1f}{change:>+8.0f}%"
+              + ("  REGRESSION" if regressed else ""))
+    regressions = [row for row in rows if row[4]]
+    print(f"\n{len(regressions)} regression(s) in {len(rows)} measurements "
+          f"(tolerance {args.tolerance:.0%}, min delta {args.min_delta * 1000:.0f} ms)")
+    if not usable:
+        print("the baseline cannot gate this run (see above)")
+        return 2
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,71 +1,71 @@
 from playwright.sync_api import sync_playwright
 import random
+import sys
 import time
 from datetime import datetime
+from tools.browser_profile import StageTimer, get_profile, install_blocking_sync
+from tools.fetcher import listing_url
+from tools.storage import DEFAULT_CATEGORY, atomic_write, category_tag
 
-def arxiv_standard_crawler():
+def arxiv_standard_crawler(category=DEFAULT_CATEGORY, profile=None):
+    profile = get_profile(profile)
+    timer = StageTimer()
     with sync_playwright() as p:
         # ===== 浏览器配置 =====
-        browser = p.chromium.launch(
-            headless=False,
-            channel="chrome",
-            args=[
-                "--start-maximized",
-                f"--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{random.randint(110, 125)}.0.0.0 Safari/537.36"
-            ],
-            slow_mo=500
-        )
+        with timer.stage("launch"):
+            browser = p.chromium.launch(
+                headless=profile["headless"],
+                channel="chrome",
+                args=profile["args"] + [
+                    f"--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{random.randint(110, 125)}.0.0.0 Safari/537.36"
+                ],
+                slow_mo=profile["slow_mo"]
+            )
 
-        context = browser.new_context(
-            viewport={"width": 1920, "height": 1080},
-            locale="en-US"
-        )
+            context = browser.new_context(
+                viewport=profile["viewport"],
+                locale="en-US"
+            )
 
-        # ===== 资源过滤 =====
-        def route_interceptor(route):
-            if any(ext in route.request.url for ext in [".jpg", ".png", ".gif"]):
-                route.abort()
-            else:
-                route.continue_()
-        context.route("**/*", route_interceptor)
+            # ===== 资源过滤（按资源类型拦截图片、字体、CSS、MathJax和统计脚本） =====
+            if profile["block"]:
+                install_blocking_sync(context)
 
-        page = context.new_page()
+            page = context.new_page()
 
         try:
             # ===== 访问页面 =====
             print(f"🕒 {datetime.now().strftime('%H:%M:%S')} 访问arXiv...")
-            page.goto(
-                "https://arxiv.org/list/cs.AI/recent?skip=0&show=250",
-                timeout=30000,
-                wait_until="domcontentloaded"
-            )
-            
-            # ===== 等待加载 =====
-            title_selector = "dd div.list-title.mathjax"
-            for _ in range(3):
-                if page.locator(title_selector).count() > 0:
-                    break
-                time.sleep(2)
-                page.mouse.wheel(0, 500)
-            else:
-                raise Exception("元素加载超时")
+            with timer.stage("goto"):
+                page.goto(
+                    listing_url(category),
+                    timeout=30000,
+                    wait_until="domcontentloaded"
+                )
 
-            # ===== 数据提取 =====
-            print("📊 提取数据中...")
-            titles = page.locator(title_selector).all_inner_texts()
-            titles = [t.replace("Title:", "").strip() for t in titles]
+            # ===== 等待加载并提取数据 =====
+            title_selector = "dd div.list-title.mathjax"
+            with timer.stage("extract"):
+                try:
+                    page.wait_for_selector(title_selector, state="attached", timeout=30000)
+                except Exception:
+                    raise Exception("元素加载超时")
+                print("📊 提取数据中...")
+                titles = page.locator(title_selector).all_inner_texts()
+                titles = [t.replace("Title:", "").strip() for t in titles]
             
             # ===== 优化结果显示 =====
             print(f"\n✅ 成功获取 {len(titles)} 篇论文")
             print("最新完整标题：")
             for i, title in enumerate(titles[:50], 1):
                 print(f"{i}. {title}")  # 完整显示标题
-                
-                # 如果需要保存到文件（含完整标题）
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                with open(f"arxiv_full_titles_{timestamp}.txt", "w", encoding="utf-8") as f:
-                    f.write("\n".join(titles))
-                    
+
+            # 保存到文件（含完整标题），只写一次，写完再原子重命名
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            with atomic_write(f"arxiv_full_titles_{category_tag(category)}_{timestamp}.txt") as writer:
+                for title in titles:
+                    writer.write_line(title)
+
             return titles
 
         except Exception as e:
@@ -73,15 +73,16 @@ def arxiv_standard_crawler():
             page.screenshot(path="arxiv_error.png")
             raise
         finally:
-            time.sleep(2)
-            context.close()
-            browser.close()
+            with timer.stage("close"):
+                context.close()
+                browser.close()
+            print(f"⏱️ 各阶段耗时: {timer.format()}")
 
 if __name__ == "__main__":
     print("🚀 arXiv爬虫启动（完整标题版）")
     start_time = time.time()
     try:
-        results = arxiv_standard_crawler()
+        results = arxiv_standard_crawler(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CATEGORY)
         print(f"⏱️ 总耗时: {time.time() - start_time:.2f}秒")
     except Exception as e:
         print(f"⚠️ 执行失败: {str(e)}")
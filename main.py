@@ -1,31 +1,49 @@
 from playwright.sync_api import sync_playwright
 import re
+import sys
 import time
 from datetime import datetime
+from tools.browser_profile import READY_SELECTOR, StageTimer, get_profile, install_blocking_sync
+from tools.fetcher import listing_url
+from tools.snapshots import SNAPSHOTS, write_snapshot
+from tools.storage import DEFAULT_CATEGORY, write_day_files
 
-def arxiv_dynamic_crawler():
+def arxiv_dynamic_crawler(category=DEFAULT_CATEGORY, profile=None):
+    profile = get_profile(profile)
+    timer = StageTimer()
+    url = listing_url(category)
+    raw = {}
     with sync_playwright() as p:
         # ===== 浏览器配置 =====
-        browser = p.chromium.launch(
-            headless=False,
-            channel="chrome",
-            args=["--start-maximized"],
-            slow_mo=500
-        )
-        context = browser.new_context(viewport={"width": 1920, "height": 1080})
-        page = context.new_page()
+        with timer.stage("launch"):
+            browser = p.chromium.launch(
+                headless=profile["headless"],
+                channel="chrome",
+                args=profile["args"],
+                slow_mo=profile["slow_mo"]
+            )
+            context = browser.new_context(viewport=profile["viewport"])
+            if profile["block"]:
+                install_blocking_sync(context)
+            page = context.new_page()
 
         try:
             # ===== 访问目标页面 =====
             print(f"🕒 {datetime.now().strftime('%H:%M:%S')} 访问arXiv...")
-            page.goto(
-                "https://arxiv.org/list/cs.AI/recent?show=250",
-                timeout=30000,
-                wait_until="domcontentloaded"
-            )
+            with timer.stage("goto"):
+                page.goto(
+                    url,
+                    timeout=30000,
+                    wait_until="domcontentloaded"
+                )
 
             # ===== 提取H3文本 =====
-            h3_text = page.locator("dl#articles > h3").first.inner_text()
+            with timer.stage("extract"):
+                page.wait_for_selector(READY_SELECTOR, state="attached", timeout=30000)
+                if SNAPSHOTS:
+                    # 保留原始页面，解析出错时可以用 tools.reparse 恢复
+                    raw[url] = (time.time(), page.content())
+                h3_text = page.locator(READY_SELECTOR).first.inner_text()
             print(f"🔍 原始文本: {h3_text}")
 
             # ===== 提取日期部分 =====
@@ -53,9 +71,9 @@ def arxiv_dynamic_crawler():
             print(f"📊 检测到 {total_entries} 篇当日论文")
 
             # ===== 提取所有标题 =====
-            title_elements = page.locator("dd div.list-title.mathjax")
-            titles = [title.inner_text().replace("Title:", "").strip() 
-                     for title in title_elements.all()]
+            with timer.stage("extract"):
+                titles = [title.replace("Title:", "").strip()
+                          for title in page.locator("dd div.list-title.mathjax").all_inner_texts()]
             
             # ===== 结果验证 =====
             if len(titles) != total_entries:
@@ -63,27 +81,32 @@ def arxiv_dynamic_crawler():
                 if len(titles) < total_entries:
                     print("💡 建议: 修改URL中的show参数为更大值，如 ?show=500")
 
-            # ===== 保存结果 =====
-            filename = f"arxiv_AI_{formatted_date}_({total_entries}entries).txt"
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write("\n".join(titles[:total_entries]))
+            # ===== 保存结果（先写临时文件，校验信息写入清单后再原子重命名） =====
+            filename = write_day_files(".", category, formatted_date, titles[:total_entries],
+                                       ({"title": title} for title in titles[:total_entries]))["filename"]
             print(f"💾 结果已保存到: {filename}")
+            if raw:
+                write_snapshot(".", category, raw, formatted_date)
             
             return {
                 "date": formatted_date,
                 "total_entries": total_entries,
                 "titles": titles,
-                "filename": filename
+                "filename": filename,
+                "stages": timer.get_stats()
             }
 
         except Exception as e:
             print(f"❌ 发生错误: {str(e)}")
             page.screenshot(path="arxiv_error.png")
+            if raw:
+                print(f"📦 原始页面已保存到: {write_snapshot('.', category, raw)}")
             raise
         finally:
-            time.sleep(2)
-            context.close()
-            browser.close()
+            with timer.stage("close"):
+                context.close()
+                browser.close()
+            print(f"⏱️ 各阶段耗时: {timer.format()}")
 
 if __name__ == "__main__":
     print("🚀 arXiv动态数量爬虫启动")
@@ -91,7 +114,7 @@ if __name__ == "__main__":
     start_time = time.time()
     
     try:
-        results = arxiv_dynamic_crawler()
+        results = arxiv_dynamic_crawler(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CATEGORY)
         print("\n" + "="*50)
         print(f"⏱️ 总耗时: {time.time() - start_time:.2f}秒")
         print(f"📅 发布日期: {results['date']}")
@@ -104,3 +127,4 @@ if __name__ == "__main__":
         print("1. 检查截图 arxiv_error.png")
         print("2. 手动访问页面确认日期格式")
         print("3. 检查网络连接")
+        print("4. 修好解析后运行 python -m tools.reparse，从 snapshots/ 中保存的原始页面恢复数据")
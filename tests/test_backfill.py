@@ -0,0 +1,64 @@
+"""The backfill checkpoint and a small resumable backfill"""
+import asyncio
+import json
+import threading
+
+import pytest
+
+from fixture_server import FixtureServer
+from tools.backfill import CHECKPOINT_FILENAME, Checkpoint, backfill, date_range
+from tools.paper_store import close_stores, open_store
+
+def test_date_range():
+    assert date_range("2025-02-27", "2025-03-02") == ["2025-02-27", "2025-02-28", "2025-03-01", "2025-03-02"]
+    assert date_range("2025-03-02", "2025-03-02") == ["2025-03-02"]
+    with pytest.raises(ValueError):
+        date_range("2025-03-02", "2025-03-01")
+
+def test_checkpoint_persists(tmp_path):
+    path = str(tmp_path / CHECKPOINT_FILENAME)
+    checkpoint = Checkpoint(path)
+    checkpoint.mark_done("cs.AI", "2025-03-04")
+    checkpoint.mark_done("cs.AI", "2025-03-03")
+    checkpoint.mark_done("cs.LG", "2025-03-03")
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {"done": {"cs.AI": ["2025-03-03", "2025-03-04"], "cs.LG": ["2025-03-03"]}}
+    reloaded = Checkpoint(path)
+    assert reloaded.is_done("cs.AI", "2025-03-04") and not reloaded.is_done("cs.LG", "2025-03-04")
+
+def test_checkpoint_from_many_threads(tmp_path):
+    path = str(tmp_path / CHECKPOINT_FILENAME)
+    checkpoint = Checkpoint(path)
+    days = date_range("2020-01-01", "2020-12-31")
+
+    def worker(n):
+        for day in days[n::8]:
+            checkpoint.mark_done("cs.AI", day)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 每一次写文件都包含当时已完成的全部日期，最后一次写入不会丢掉别的线程的日期
+    assert Checkpoint(path).done == {"cs.AI": set(days)}
+
+def test_backfill_resumes(tmp_path):
+    base_dir = str(tmp_path)
+    with FixtureServer(archive_entries=30) as server:
+        def run(date_from, date_to):
+            return asyncio.run(backfill(base_dir, date_from, date_to, ["cs.AI"], base_url=server.base_url,
+                                        concurrency=2, retry_backoff=0))
+
+        try:
+            # 3月3日是周一：5个工作日有列表，周末没有
+            first = run("2025-03-03", "2025-03-09")
+            assert first["success"], first.get("error")
+            assert (first["fetched"], first["empty"], first["skipped"]) == (5, 2, 0)
+            stored = open_store(base_dir).list_days("cs.AI", "2025-03-03", "2025-03-09")
+            assert [day["date"] for day in stored] == date_range("2025-03-03", "2025-03-07")
+
+            second = run("2025-03-03", "2025-03-11")
+            assert (second["fetched"], second["empty"], second["skipped"]) == (2, 0, 7)
+        finally:
+            close_stores()
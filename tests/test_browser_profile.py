@@ -0,0 +1,92 @@
+"""Request blocking of the browser profiles, without a browser"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from tools.browser_profile import BlockStats, get_profile, install_blocking, install_blocking_sync, should_block
+
+LISTING = "https://arxiv.org/list/cs.AI/recent?show=250"
+
+@pytest.mark.parametrize("resource_type, url", [
+    ("image", "https://arxiv.org/static/browse/0.3.4/images/arxiv-logo.svg"),
+    ("stylesheet", "https://arxiv.org/static/browse/0.3.4/css/arXiv.css"),
+    ("font", "https://arxiv.org/static/fonts/Lato.woff2"),
+    ("media", "https://arxiv.org/intro.mp4"),
+    ("script", "https://static.arxiv.org/MathJax-2.7.3/MathJax.js?config=TeX-AMS"),
+    ("script", "https://www.googletagmanager.com/gtag/js?id=G-1"),
+    ("script", "https://www.google-analytics.com/analytics.js"),
+    ("script", "https://matomo.example.org/piwik.js"),
+])
+def test_blocks_subresources(resource_type, url):
+    assert should_block(resource_type, url)
+
+@pytest.mark.parametrize("resource_type, url", [
+    ("document", LISTING),
+    ("script", "https://arxiv.org/static/browse/0.3.4/js/toggle-labs.js"),
+    ("xhr", "https://arxiv.org/list/cs.AI/recent?skip=250&show=250"),
+    ("fetch", "https://export.arxiv.org/api/query"),
+])
+def test_keeps_document_and_scripts(resource_type, url):
+    assert not should_block(resource_type, url)
+
+class FakeRoute:
+    """The part of a Playwright ``Route`` the handlers use"""
+
+    def __init__(self, resource_type: str, url: str):
+        self.request = SimpleNamespace(resource_type=resource_type, url=url)
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = "aborted"
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+class FakeTarget:
+    def __init__(self):
+        self.routes = []
+
+    async def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+ROUTES = [("document", LISTING), ("stylesheet", "https://arxiv.org/a.css"), ("image", "https://arxiv.org/a.png"),
+          ("script", "https://arxiv.org/MathJax.js"), ("script", "https://arxiv.org/app.js")]
+
+def test_install_blocking_routes_every_request():
+    target = FakeTarget()
+    stats = BlockStats()
+
+    async def run():
+        await install_blocking(target, stats)
+        [(pattern, handler)] = target.routes
+        assert pattern == "**/*"
+        routes = [FakeRoute(*args) for args in ROUTES]
+        for route in routes:
+            await handler(route)
+        return routes
+
+    routes = asyncio.run(run())
+    assert [route.outcome for route in routes] == ["continued", "aborted", "aborted", "aborted", "continued"]
+    assert stats.get_stats() == {"blocked": 3, "allowed": 2}
+
+def test_install_blocking_sync():
+    class SyncRoute(FakeRoute):
+        def abort(self):
+            self.outcome = "aborted"
+
+        def continue_(self):
+            self.outcome = "continued"
+
+    handlers = []
+    install_blocking_sync(SimpleNamespace(route=lambda pattern, handler: handlers.append(handler)))
+    routes = [SyncRoute(*args) for args in ROUTES]
+    for route in routes:
+        handlers[0](route)
+    assert [route.outcome for route in routes] == ["continued", "aborted", "aborted", "aborted", "continued"]
+
+def test_profiles():
+    assert get_profile("fast")["block"] and get_profile("fast")["headless"]
+    assert not get_profile("debug")["block"]
+    with pytest.raises(ValueError):
+        get_profile("nope")
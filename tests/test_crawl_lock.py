@@ -0,0 +1,138 @@
+"""SingleFlight, CrawlLock and file_lock, and how crawls use them"""
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from fixture_server import FixtureServer
+from tools.crawl_lock import LOCK_FILENAME, CrawlLock, SingleFlight, file_lock
+from tools.crawler import crawl_categories, crawl_flights
+from tools.paper_store import close_stores
+
+def test_single_flight_coalesces_same_key():
+    flights = SingleFlight()
+    calls = []
+
+    async def work(key):
+        calls.append(key)
+        await asyncio.sleep(0.05)
+        return f"result {key}"
+
+    async def run():
+        return await asyncio.gather(*(flights.run(key, lambda key=key: work(key)) for key in "aab"))
+
+    assert asyncio.run(run()) == ["result a", "result a", "result b"]
+    assert sorted(calls) == ["a", "b"]
+    assert flights.get_stats() == {"started": 2, "coalesced": 1, "in_flight": 0}
+
+def test_single_flight_shares_errors_and_forgets_the_key():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("crawl failed")
+
+    async def run():
+        results = await asyncio.gather(flights.run("k", fail), flights.run("k", fail), return_exceptions=True)
+        assert [str(r) for r in results] == ["crawl failed", "crawl failed"]
+        # 失败后同一个键重新开始，不会一直拿到旧的错误
+        return await flights.run("k", lambda: asyncio.sleep(0, result="ok"))
+
+    assert asyncio.run(run()) == "ok"
+    assert flights.stats["started"] == 2
+
+def test_single_flight_survives_a_cancelled_caller():
+    flights = SingleFlight()
+
+    async def run():
+        first = asyncio.ensure_future(flights.run("k", lambda: asyncio.sleep(0.05, result="done")))
+        second = asyncio.ensure_future(flights.run("k", lambda: asyncio.sleep(0, result="other")))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "done"
+
+def test_crawl_lock_excludes_and_times_out(tmp_path):
+    async def run():
+        async with CrawlLock(str(tmp_path)):
+            with open(os.path.join(str(tmp_path), LOCK_FILENAME)) as f:
+                assert f.read() == str(os.getpid())
+            with pytest.raises(TimeoutError):
+                await CrawlLock(str(tmp_path), timeout=0.1, poll_interval=0.02).acquire()
+        # 释放后可以立即再次获取
+        async with CrawlLock(str(tmp_path), timeout=0.1):
+            pass
+
+    asyncio.run(run())
+
+def test_crawl_lock_across_processes(tmp_path):
+    holder = subprocess.Popen([sys.executable, "-c", f"""
+import sys, time, asyncio
+sys.path.insert(0, {os.path.dirname(os.path.dirname(os.path.abspath(__file__)))!r})
+from tools.crawl_lock import CrawlLock
+async def main():
+    async with CrawlLock({str(tmp_path)!r}):
+        print("locked", flush=True)
+        time.sleep(0.5)
+asyncio.run(main())
+"""], stdout=subprocess.PIPE, text=True)
+    try:
+        assert holder.stdout.readline().strip() == "locked"
+        start = time.monotonic()
+
+        async def run():
+            async with CrawlLock(str(tmp_path), timeout=10, poll_interval=0.02):
+                return time.monotonic() - start
+
+        # 另一个进程释放锁之后才拿到
+        assert asyncio.run(run()) > 0.2
+    finally:
+        holder.wait(timeout=10)
+
+def test_file_lock_serializes_threads(tmp_path):
+    path = os.path.join(str(tmp_path), ".lock")
+    inside = []
+    overlaps = []
+
+    def worker():
+        for _ in range(20):
+            with file_lock(path):
+                inside.append(1)
+                if len(inside) > 1:
+                    overlaps.append(len(inside))
+                time.sleep(0.001)
+                inside.pop()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert overlaps == []
+
+def test_forced_crawl_does_not_join_a_plain_one(tmp_path):
+    with FixtureServer(entries=50, latency=0.1) as server:
+        async def crawl(force):
+            return await crawl_categories(str(tmp_path), ["cs.AI"], base_url=server.base_url, force=force)
+
+        async def run():
+            await crawl(True)
+            before = dict(crawl_flights.stats)
+            # 两个普通调用合并成一次；强制抓取单独进行，不拿普通调用的"新鲜"结果
+            plain, plain_again, forced = await asyncio.gather(crawl(False), crawl(False), crawl(True))
+            started = crawl_flights.stats["started"] - before["started"]
+            coalesced = crawl_flights.stats["coalesced"] - before["coalesced"]
+            return plain, plain_again, forced, started, coalesced
+
+        try:
+            plain, plain_again, forced, started, coalesced = asyncio.run(run())
+        finally:
+            close_stores()
+    assert started == 2 and coalesced == 1
+    assert plain == plain_again and plain["categories"]["cs.AI"].get("fresh")
+    assert forced["success"] and not forced["categories"]["cs.AI"].get("fresh")
@@ -0,0 +1,94 @@
+"""Round trip of the monthly day-archive segments and the checks against damaged ones"""
+import os
+
+import pytest
+
+from tools.day_archive import (HEADER, CorruptSegment, DayArchive, Segment, archived_days, import_day_files)
+from tools.storage import write_day_files
+
+def records(day: str, n: int) -> list:
+    return [{"arxiv_id": f"2504.{i:05d}", "version": 1, "title": f"Paper {i} of {day}"} for i in range(n)]
+
+DAYS = {"2025-04-01": records("2025-04-01", 10), "2025-04-02": records("2025-04-02", 3),
+        "2025-04-03": [], "2025-05-02": records("2025-05-02", 4)}
+
+def test_round_trip(tmp_path):
+    # 小块：一天跨多个块，切片只解压用到的块
+    archive = DayArchive(str(tmp_path), block_size=4)
+    try:
+        paths = archive.add_days("cs.AI", DAYS)
+        assert [os.path.basename(path) for path in paths] == ["2025-04.seg", "2025-05.seg"]
+        assert archive.months("cs.AI") == ["2025-04", "2025-05"]
+        for day, day_records in DAYS.items():
+            assert archive.get_day("cs.AI", day) == day_records
+        assert archive.get_day("cs.AI", "2025-04-04") is None
+        assert archive.get_day("cs.LG", "2025-04-01") is None
+        assert archive.get_day("cs.AI", "2025-04-01", offset=3, limit=6) == DAYS["2025-04-01"][3:9]
+        assert archive.get_entry("cs.AI", "2025-04-01", 9) == DAYS["2025-04-01"][9]
+        assert archive.get_entry("cs.AI", "2025-04-01", 10) is None
+        assert archive.list_days("cs.AI", "2025-04-02", "2025-05-31") == [
+            ("2025-04-02", 3), ("2025-04-03", 0), ("2025-05-02", 4)]
+
+        # 加入一天会和同月已有的日子合并，替换同一天，读者看到重写后的段
+        archive.add_day("cs.AI", "2025-04-02", records("2025-04-02", 5))
+        assert archive.get_day("cs.AI", "2025-04-02") == records("2025-04-02", 5)
+        assert archive.get_day("cs.AI", "2025-04-01") == DAYS["2025-04-01"]
+        # 另一个对象（相当于另一个进程）读到同样的内容
+        other = DayArchive(str(tmp_path))
+        assert dict((day, len(day_records)) for day, day_records in other.iter_range("cs.AI")) == {
+            "2025-04-01": 10, "2025-04-02": 5, "2025-04-03": 0, "2025-05-02": 4}
+        other.close()
+    finally:
+        archive.close()
+
+def test_import_day_files(tmp_path):
+    base_dir = str(tmp_path)
+    for day, day_records in DAYS.items():
+        write_day_files(base_dir, "cs.AI", day, [r["title"] for r in day_records], day_records)
+    counts = import_day_files(base_dir, DayArchive(base_dir), categories=["cs.AI"])
+    assert counts == {"days": 4, "entries": 17, "segments": 2, "skipped": 0}
+    assert {day: day_records for day, day_records, _ in archived_days(base_dir, "cs.AI")} == DAYS
+
+def damage(path: str, offset: int):
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        byte = f.read(1)
+        f.seek(offset)
+        f.write(bytes([byte[0] ^ 0xFF]))
+
+def test_corrupt_block(tmp_path):
+    archive = DayArchive(str(tmp_path), block_size=4)
+    path = archive.add_days("cs.AI", DAYS)[0]
+    archive.close()
+    # 第一个块紧接在头部之后
+    damage(path, HEADER.size + 2)
+    segment = Segment(path)
+    try:
+        with pytest.raises(CorruptSegment, match="checksum mismatch"):
+            segment.get_day("2025-04-01")
+        # 其它块不受影响
+        assert segment.get_day("2025-04-02") == DAYS["2025-04-02"]
+    finally:
+        segment.close()
+
+@pytest.mark.parametrize("how", ["truncated", "magic", "tables"])
+def test_corrupt_segment(tmp_path, how):
+    path = DayArchive(str(tmp_path)).add_days("cs.AI", DAYS)[0]
+    size = os.path.getsize(path)
+    if how == "truncated":
+        with open(path, "r+b") as f:
+            f.truncate(size - 1)
+    elif how == "magic":
+        damage(path, 0)
+    else:
+        # 头部里的条目总数，和日期表对不上
+        damage(path, 20)
+    with pytest.raises(CorruptSegment):
+        Segment(path)
+
+def test_archived_days_skips_damaged_segments(tmp_path):
+    base_dir = str(tmp_path)
+    paths = DayArchive(base_dir).add_days("cs.AI", DAYS)
+    with open(paths[0], "r+b") as f:
+        f.truncate(HEADER.size - 1)
+    assert [day for day, _, _ in archived_days(base_dir, "cs.AI")] == ["2025-05-02"]
@@ -0,0 +1,112 @@
+"""Near-duplicate clusters of the dedup index over a small stored set"""
+import asyncio
+
+import numpy as np
+
+from tools.dedup import (DEDUP_DB_FILENAME, THRESHOLD, DedupIndex, close_dedup_indexes, find_duplicates, jaccard,
+                         normalize, open_dedup_index, shingles, signatures, update_dedup_index)
+from tools.paper_store import close_stores, open_store
+
+GRAPHS = "Scalable graph neural networks for molecular property prediction"
+# 换了几个词的重投：不同的id，标题仍高于阈值
+REWORDED = "Scalable graph neural network for molecular property predictions"
+DRONES = "Reinforcement learning agents for autonomous drone navigation"
+
+def entry(arxiv_id: str, title: str, version: int = 1) -> dict:
+    return {"arxiv_id": arxiv_id, "version": version, "title": title, "authors": ["A. Smith"]}
+
+def store_days(base_dir: str) -> list:
+    """Store two days like two crawls, indexing after each; returns the counts of both updates"""
+    store = open_store(base_dir)
+    store.upsert_day("cs.AI", "2025-04-01", [entry("2504.00001", GRAPHS), entry("2504.00002", DRONES)])
+    # 索引库只保存最新版本，版本首次出现的日期要靠每次抓取后更新索引
+    counts = [update_dedup_index(base_dir, ["cs.AI", "cs.LG"])]
+    # 第二天：2504.00001 的替换版本、它在 cs.LG 的交叉列出和改写了标题的重投
+    store.upsert_day("cs.AI", "2025-04-02", [entry("2504.00001", GRAPHS, version=2),
+                                             entry("2504.00300", REWORDED)])
+    store.upsert_day("cs.LG", "2025-04-02", [entry("2504.00001", GRAPHS, version=2)])
+    counts.append(update_dedup_index(base_dir, ["cs.AI", "cs.LG"]))
+    return counts
+
+def test_signatures_of_a_batch_match_single_texts():
+    texts = [normalize(title) for title in (GRAPHS, REWORDED, DRONES, "GAN")]
+    batch = signatures(texts)
+    assert batch.shape == (4, 100) and batch.dtype == np.uint32
+    for text, row in zip(texts, batch):
+        assert (signatures([text])[0] == row).all()
+    # 相同的签名位数的比例估计的是 5-gram 的 Jaccard 相似度
+    estimate = (batch[0] == batch[1]).mean()
+    assert abs(estimate - jaccard(shingles(texts[0]), shingles(texts[1]))) < 0.2
+    assert (batch[0] == batch[2]).mean() < 0.2
+
+def test_clusters(tmp_path):
+    base_dir = str(tmp_path)
+    assert jaccard(shingles(normalize(GRAPHS)), shingles(normalize(REWORDED))) >= THRESHOLD
+    try:
+        first, second = store_days(base_dir)
+        assert first["cs.AI"] == {"days": 1, "papers": 2, "duplicates": 0}
+        # 替换版本也改变了第一天的摘要，第一天重新索引，但没有新论文
+        assert second["cs.AI"] == {"days": 2, "papers": 1, "duplicates": 1}
+        assert second["cs.LG"] == {"days": 1, "papers": 0, "duplicates": 0}
+
+        index = open_dedup_index(base_dir)
+        original, reworded, drones = (index.paper(key) for key in ("2504.00001", "2504.00300", "2504.00002"))
+        assert original["cluster"] == reworded["cluster"]
+        assert drones["cluster"] != original["cluster"]
+
+        members = index.cluster_members(original["cluster"])
+        assert [member["arxiv_id"] for member in members] == ["2504.00001", "2504.00300"]
+        assert members[0]["first_date"] == "2025-04-01"
+        assert [(v["version"], v["date"]) for v in members[0]["versions"]] == [(1, "2025-04-01"), (2, "2025-04-02")]
+
+        # 第二天列出的都是已有的工作：替换版本和重投重复了第一天，cs.LG 的交叉列出也一样
+        assert index.duplicates_of_day("2025-04-02", ["2504.00001", "2504.00300"]) == {
+            0: ("2504.00001", "2025-04-01"), 1: ("2504.00001", "2025-04-01")}
+        assert index.duplicates_of_day("2025-04-01", ["2504.00001", "2504.00002"]) == {}
+
+        # 没有变化的日子不会重新索引
+        assert update_dedup_index(base_dir, ["cs.AI"])["cs.AI"]["days"] == 0
+    finally:
+        close_dedup_indexes()
+        close_stores()
+
+def test_find_duplicates_by_title(tmp_path):
+    base_dir = str(tmp_path)
+    try:
+        store_days(base_dir)
+        result = asyncio.run(find_duplicates(base_dir, title=GRAPHS.upper() + "!"))
+        assert result["success"], result
+        [cluster] = result["data"]["clusters"]
+        assert {paper["arxiv_id"] for paper in cluster["papers"]} == {"2504.00001", "2504.00300"}
+
+        result = asyncio.run(find_duplicates(base_dir, title="Protein folding with diffusion models"))
+        assert result["success"] and result["data"]["clusters"] == []
+
+        result = asyncio.run(find_duplicates(base_dir, arxiv_id="2504.99999"))
+        assert not result["success"] and "not in the stored listings" in result["error"]
+    finally:
+        close_dedup_indexes()
+        close_stores()
+
+def test_band_index_sees_papers_of_another_process(tmp_path):
+    base_dir = str(tmp_path)
+    path = str(tmp_path / DEDUP_DB_FILENAME)
+    # 两个连接同一个库的索引，相当于两个服务进程
+    reader, writer = DedupIndex(path), DedupIndex(path)
+    try:
+        store = open_store(base_dir)
+        store.upsert_day("cs.AI", "2025-04-01", [entry("2504.00002", DRONES)])
+        writer.update(store, "cs.AI")
+        assert reader.find(GRAPHS) == []
+
+        store.upsert_day("cs.AI", "2025-04-02", [entry("2504.00001", GRAPHS)])
+        writer.update(store, "cs.AI")
+        # 读方已经加载过分带，只补上另一个连接新加的论文
+        [match] = reader.find(REWORDED)
+        assert match["similarity"] >= THRESHOLD
+        assert len(reader.find(DRONES)) == 1
+        assert reader.get_stats()["loaded"] == 2
+    finally:
+        reader.close()
+        writer.close()
+        close_stores()
@@ -0,0 +1,67 @@
+"""The HTTP fetch backend and paged fetching against the local fixture server"""
+import asyncio
+
+import httpx
+import pytest
+
+from fixture_server import FixtureServer
+from tools.crawler import fetch_listing
+from tools.fetcher import HttpFetcher, archive_url, listing_url
+from tools.listing_parser import parse_listing
+
+@pytest.fixture
+def server():
+    with FixtureServer(entries=340, max_show=100) as server:
+        yield server
+
+def test_urls():
+    assert listing_url("cs.LG", show=100, base_url="http://h/") == "http://h/list/cs.LG/recent?show=100"
+    assert listing_url("cs.LG", show=100, base_url="http://h", skip=200) == \
+        "http://h/list/cs.LG/recent?skip=200&show=100"
+    assert archive_url("cs.AI", "2025-03-03", show=50, base_url="http://h", skip=50) == \
+        "http://h/catchup/cs.AI/2025-03-03?skip=50&show=50"
+
+def test_fetch_and_parse(server):
+    async def run():
+        async with HttpFetcher() as fetcher:
+            return await fetcher.fetch(listing_url(show=100, base_url=server.base_url))
+
+    listing = parse_listing(asyncio.run(run()))
+    assert listing["total_entries"] == 340
+    assert [e["arxiv_id"] for e in listing["entries"]] == [e["arxiv_id"] for e in server.state.entries[:100]]
+
+def test_conditional_fetch(server):
+    url = listing_url(show=100, base_url=server.base_url)
+
+    async def run():
+        async with HttpFetcher() as fetcher:
+            html, validators = await fetcher.fetch_if_changed(url)
+            assert html and validators["etag"] and validators["last_modified"]
+            assert await fetcher.fetch_if_changed(url, validators) == (None, validators)
+            server.state.announce(added=1)
+            html, changed = await fetcher.fetch_if_changed(url, validators)
+            assert html and changed["etag"] != validators["etag"]
+
+    asyncio.run(run())
+    assert server.state.not_modified == 1
+
+def test_missing_page_raises(server):
+    async def run():
+        async with HttpFetcher() as fetcher:
+            await fetcher.fetch(f"{server.base_url}/no/such/page")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(run())
+
+def test_fetch_listing_pages_and_retries():
+    # 服务器每页最多100条，约一半请求返回503
+    with FixtureServer(entries=340, max_show=100, fail_rate=0.5, seed=3) as server:
+        async def run():
+            async with HttpFetcher() as fetcher:
+                return await fetch_listing(fetcher, base_url=server.base_url, page_size=250,
+                                           retries=10, retry_backoff=0)
+
+        listing = asyncio.run(run())
+        assert server.state.failures > 0
+        assert listing["pages"] == 4 and not listing["unchanged"]
+        assert [e["arxiv_id"] for e in listing["entries"]] == [e["arxiv_id"] for e in server.state.entries]
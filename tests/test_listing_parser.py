@@ -0,0 +1,79 @@
+"""parse_listing / merge_pages on the saved arXiv page and on rendered listings"""
+import os
+from datetime import date
+
+import pytest
+
+from fixture_server import render_listing, synthetic_entries
+from tools.listing_parser import merge_pages, parse_header, parse_listing
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures")
+DAY = date(2025, 4, 2)
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+def test_saved_page():
+    listing = parse_listing(read_fixture("list_cs.AI_recent_2025-04-02.html"))
+    expected = read_fixture("list_cs.AI_recent_2025-04-02.expected.txt").splitlines()
+    assert listing["date"] == "2025-04-02" and listing["arxiv_date"] == "Wed, 2 Apr 2025"
+    assert listing["total_entries"] == 140
+    # 下一天（4月1日）的3篇不算在内
+    assert listing["titles"] == expected and len(listing["entries"]) == 140
+
+    first, second = listing["entries"][:2]
+    assert first["arxiv_id"] == "2504.00001" and first["version"] == 1
+    assert first["authors"] == ["Y. Rossi", "P. Novak", "M. Li", "D. Rossi"]
+    assert first["primary_category"] == "cs.AI" and first["categories"] == ["cs.AI"]
+    assert first["abs_url"] == "https://arxiv.org/abs/2504.00001"
+    assert first["pdf_url"] == "https://arxiv.org/pdf/2504.00001"
+    assert first["comments"] is None and second["comments"] == "38 pages, 1 figures"
+
+def test_rendered_page_round_trip():
+    entries = synthetic_entries(30, seed=7)
+    listing = parse_listing(render_listing(entries, DAY))
+    assert listing["total_entries"] == 30
+    for parsed, entry in zip(listing["entries"], entries):
+        assert parsed["arxiv_id"] == entry["arxiv_id"]
+        assert parsed["version"] == entry["version"]
+        assert parsed["title"] == entry["title"]
+        assert parsed["authors"] == entry["authors"]
+        assert parsed["primary_category"] == entry["categories"][0]
+        assert parsed["categories"] == entry["categories"]
+        assert parsed["comments"] == entry["comments"]
+
+def test_page_of_a_longer_day():
+    entries = synthetic_entries(600)
+    listing = parse_listing(render_listing(entries, DAY, skip=250, show=250))
+    assert listing["total_entries"] == 600
+    assert [e["arxiv_id"] for e in listing["entries"]] == [e["arxiv_id"] for e in entries[250:500]]
+
+def test_header():
+    header = parse_header(" Wed, 2 Apr 2025 (showing first 250 of 340 entries ) ")
+    assert header["date"] == "2025-04-02" and header["total_entries"] == 340
+    with pytest.raises(Exception, match="date"):
+        parse_header("Recent submissions")
+    with pytest.raises(Exception, match="count"):
+        parse_header("Wed, 2 Apr 2025")
+
+def test_page_without_listing():
+    with pytest.raises(Exception, match="listing header"):
+        parse_listing("<html><body><h1>Service Unavailable</h1></body></html>")
+
+def test_merge_pages_in_order_without_duplicates():
+    entries = synthetic_entries(600)
+    pages = [parse_listing(render_listing(entries, DAY, skip=skip, show=250)) for skip in (0, 250, 500)]
+    # 两页之间列表前移，同一篇出现在两页上
+    pages[1]["entries"].insert(0, pages[0]["entries"][-1])
+    merged = merge_pages(pages)
+    assert [e["arxiv_id"] for e in merged["entries"]] == [e["arxiv_id"] for e in entries]
+    assert merged["titles"] == [e["title"] for e in entries]
+    assert merged["total_entries"] == 600
+
+def test_merge_pages_of_different_days():
+    entries = synthetic_entries(300)
+    pages = [parse_listing(render_listing(entries, DAY)),
+             parse_listing(render_listing(entries, date(2025, 4, 3), skip=250))]
+    with pytest.raises(Exception, match="changed while crawling"):
+        merge_pages(pages)
@@ -0,0 +1,61 @@
+"""Recovering snapshots of failed crawls with tools.reparse"""
+import asyncio
+import os
+import time
+from datetime import date
+
+from fixture_server import render_listing, synthetic_entries
+from tools.fetcher import listing_url
+from tools.paper_store import close_stores, open_store
+from tools.reparse import reparse
+from tools.snapshots import SNAPSHOTS_DIRNAME, UNPARSED_DIRNAME, snapshot_path, write_snapshot
+from tools.storage import read_day_files
+
+DAY = "2025-05-06"
+
+def failed_crawl(base_dir: str) -> str:
+    """The snapshot a crawl leaves behind when its pages did not parse"""
+    html = render_listing(synthetic_entries(40), date(2025, 5, 6))
+    return write_snapshot(base_dir, "cs.AI", {listing_url(show=250): (time.time(), html)}, day=None)
+
+def test_recovers_into_a_new_month(tmp_path):
+    base_dir = str(tmp_path)
+    unparsed = failed_crawl(base_dir)
+    month = os.path.dirname(snapshot_path(base_dir, "cs.AI", DAY))
+    assert not os.path.exists(month)
+    try:
+        result = asyncio.run(reparse(base_dir, workers=1))
+        assert result["success"], result.get("error")
+        assert result["changed"] == 1 and result["recovered"] == 1
+        assert os.path.exists(snapshot_path(base_dir, "cs.AI", DAY)) and not os.path.exists(unparsed)
+        day = open_store(base_dir).get_day("cs.AI", DAY)
+        assert day["total_entries"] == 40
+        assert len(read_day_files(os.path.join(base_dir, day["filename"]))["titles"]) == 40
+
+        # 再跑一次没有变化
+        again = asyncio.run(reparse(base_dir, workers=1))
+        assert (again["changed"], again["unchanged"], again["recovered"]) == (0, 1, 0)
+    finally:
+        close_stores()
+
+def test_failed_move_keeps_files_and_store_in_step(tmp_path):
+    base_dir = str(tmp_path)
+    unparsed = failed_crawl(base_dir)
+    # 月份目录的位置被一个文件占着，快照无法归位
+    month = os.path.dirname(snapshot_path(base_dir, "cs.AI", DAY))
+    with open(month, "w") as f:
+        f.write("")
+    try:
+        result = asyncio.run(reparse(base_dir, workers=1))
+        assert not result["success"]
+        # 当天的文件已写，索引库里也有；快照留在 unparsed 下，下次还能归位
+        day = open_store(base_dir).get_day("cs.AI", DAY)
+        assert day is not None and os.path.exists(os.path.join(base_dir, day["filename"]))
+        assert os.path.exists(unparsed)
+        assert os.listdir(os.path.join(base_dir, SNAPSHOTS_DIRNAME, "AI", UNPARSED_DIRNAME))
+
+        os.remove(month)
+        again = asyncio.run(reparse(base_dir, workers=1))
+        assert again["success"] and (again["unchanged"], again["recovered"]) == (1, 1)
+    finally:
+        close_stores()
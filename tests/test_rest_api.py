@@ -0,0 +1,94 @@
+"""ETag, compression and conditional GET of the REST API"""
+import gzip
+import json
+
+import pytest
+
+from fixture_server import synthetic_entries
+from tools.paper_store import close_stores, open_store
+from tools.rest_api import create_app
+
+LATEST = "/api/categories/cs.AI/latest"
+
+@pytest.fixture
+def base_dir(tmp_path):
+    entries = synthetic_entries(200)
+    open_store(str(tmp_path)).upsert_days([
+        {"category": "cs.AI", "date": "2025-04-01", "entries": entries[100:]},
+        {"category": "cs.AI", "date": "2025-04-02", "entries": entries[:100]},
+    ])
+    yield str(tmp_path)
+    close_stores()
+
+@pytest.fixture
+def client(base_dir):
+    return create_app(base_dir).test_client()
+
+def get(client, url, encoding="gzip", etag=None):
+    headers = {"Accept-Encoding": encoding}
+    if etag:
+        headers["If-None-Match"] = etag
+    return client.get(url, headers=headers)
+
+def test_gzip_response_and_304_with_the_same_etag(client):
+    response = get(client, LATEST)
+    assert response.status_code == 200 and response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    etag = response.headers["ETag"]
+    assert etag.endswith('-gzip"')
+    data = json.loads(gzip.decompress(response.data))
+    assert data["data"]["date"] == "2025-04-02" and len(data["data"]["titles"]) == 100
+
+    again = get(client, LATEST, etag=etag)
+    assert again.status_code == 304 and not again.data
+    assert again.headers["ETag"] == etag
+
+def test_etag_must_match_exactly(client):
+    etag = get(client, LATEST).headers["ETag"]
+    # 去掉压缩方式后缀、换一个后缀，都不算匹配
+    assert get(client, LATEST, etag=etag.replace("-gzip", "")).status_code == 200
+    assert get(client, LATEST, etag=etag.replace("-gzip", "-br")).status_code == 200
+    assert get(client, LATEST, etag=etag[:-2] + 'x"').status_code == 200
+    # 弱比较：W/ 前缀和列表中的一项都可以
+    assert get(client, LATEST, etag=f"W/{etag}").status_code == 304
+    assert get(client, LATEST, etag=f'"other", {etag}').status_code == 304
+    assert get(client, LATEST, etag="*").status_code == 304
+
+def test_identity_client_with_a_gzip_tag(client):
+    etag = get(client, LATEST).headers["ETag"]
+    response = get(client, LATEST, encoding="identity", etag=etag)
+    assert response.status_code == 200 and "Content-Encoding" not in response.headers
+    assert response.headers["ETag"] != etag
+    assert json.loads(response.data)["data"]["total_entries"] == 100
+    plain = response.headers["ETag"]
+    assert get(client, LATEST, encoding="identity", etag=plain).status_code == 304
+
+def test_small_body_keeps_the_negotiated_tag(client):
+    response = get(client, "/api/categories")
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["ETag"].endswith('-gzip"')
+    assert get(client, "/api/categories", etag=response.headers["ETag"]).status_code == 304
+
+def test_etag_changes_with_the_day(client, base_dir):
+    etag = get(client, LATEST).headers["ETag"]
+    records_etag = get(client, LATEST + "?fields=records").headers["ETag"]
+    assert records_etag != etag
+    open_store(base_dir).upsert_days([{"category": "cs.AI", "date": "2025-04-02",
+                                       "entries": synthetic_entries(101)}])
+    response = get(client, LATEST, etag=etag)
+    assert response.status_code == 200 and response.headers["ETag"] != etag
+
+def test_streamed_range(client):
+    url = "/api/categories/cs.AI/days?range=2025-04-01..2025-04-02"
+    response = get(client, url)
+    assert response.status_code == 200 and response.headers["Content-Encoding"] == "gzip"
+    days = json.loads(gzip.decompress(response.data))["data"]["days"]
+    assert [day["date"] for day in days] == ["2025-04-01", "2025-04-02"]
+    again = get(client, url, etag=response.headers["ETag"])
+    assert again.status_code == 304 and again.headers["ETag"] == response.headers["ETag"]
+
+def test_errors(client):
+    assert get(client, "/api/categories/cs.XX/latest").status_code == 404
+    assert get(client, "/api/categories/CS AI!/latest").status_code == 400
+    assert get(client, LATEST + "?fields=nope").status_code == 400
+    assert get(client, "/api/search?q=").status_code == 400
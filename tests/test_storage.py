@@ -0,0 +1,71 @@
+"""Atomic day-file writes and the manifest check of read_day_files"""
+import json
+import os
+
+import pytest
+
+from tools.storage import (TornRead, atomic_write, day_filename, manifest_filename, read_day_files,
+                           records_filename, write_day_files)
+
+TITLES = ["First paper", "Second paper", "Third paper"]
+ENTRIES = [{"arxiv_id": f"2504.0000{i}", "version": 1, "title": title} for i, title in enumerate(TITLES, 1)]
+
+def write_day(base_dir: str) -> str:
+    result = write_day_files(str(base_dir), "cs.AI", "2025-04-02", iter(TITLES), iter(ENTRIES))
+    return os.path.join(str(base_dir), result["filename"])
+
+def test_round_trip(tmp_path):
+    path = write_day(tmp_path)
+    assert os.path.basename(path) == day_filename("cs.AI", "2025-04-02", 3)
+    day = read_day_files(path)
+    assert day == {"titles": TITLES, "records": ENTRIES, "checked": True}
+    with open(manifest_filename(path), encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert manifest["files"][os.path.basename(path)]["entries"] == 3
+    # 没有留下临时文件
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+def test_empty_day(tmp_path):
+    result = write_day_files(str(tmp_path), "cs.AI", "2025-04-05", [], [])
+    day = read_day_files(os.path.join(str(tmp_path), result["filename"]))
+    assert day == {"titles": [], "records": [], "checked": True}
+
+@pytest.mark.parametrize("damage", ["titles", "records"])
+def test_torn_read(tmp_path, damage):
+    path = write_day(tmp_path)
+    target = path if damage == "titles" else records_filename(path)
+    # 模拟另一个写入方只替换了一半：内容与清单不符
+    with open(target, "a", encoding="utf-8") as f:
+        f.write("\nextra line")
+    with pytest.raises(TornRead, match="does not match its manifest"):
+        read_day_files(path, retries=1)
+
+def test_missing_records_file(tmp_path):
+    path = write_day(tmp_path)
+    os.remove(records_filename(path))
+    with pytest.raises(TornRead):
+        read_day_files(path, retries=0)
+
+def test_day_without_manifest(tmp_path):
+    path = write_day(tmp_path)
+    os.remove(manifest_filename(path))
+    os.remove(records_filename(path))
+    assert read_day_files(path) == {"titles": TITLES, "records": None, "checked": False}
+
+def test_atomic_write_keeps_old_file_on_error(tmp_path):
+    path = os.path.join(str(tmp_path), "day.txt")
+    with atomic_write(path) as writer:
+        writer.write_line("old")
+    with pytest.raises(RuntimeError):
+        with atomic_write(path) as writer:
+            writer.write_line("new")
+            raise RuntimeError("crawl failed halfway")
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "old"
+    assert os.listdir(tmp_path) == ["day.txt"]
+
+def test_atomic_write_summary(tmp_path):
+    with atomic_write(os.path.join(str(tmp_path), "a.txt")) as writer:
+        writer.write_line("a")
+        writer.write_line("b")
+    assert writer.summary()["entries"] == 2 and writer.summary()["bytes"] == len(b"a\nb")
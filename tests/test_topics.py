@@ -0,0 +1,77 @@
+"""Per-day topics and term trends of the topic index over a small stored set"""
+import asyncio
+
+import pytest
+
+from tools.paper_store import close_stores, open_store
+from tools.topics import close_topic_indexes, normalize_term, open_topic_index, title_terms, topics_for_day, trend
+
+GRAPH_TITLES = [f"Graph neural networks for {subject} molecules" for subject in (
+    "drug", "protein", "crystal", "polymer", "catalyst")]
+AGENT_TITLES = [f"Reinforcement learning agents for {task} control" for task in (
+    "robot", "traffic", "drone", "power", "robot arm")]
+
+def entries(titles: list, day: int = 1) -> list:
+    return [{"arxiv_id": f"2504.{day:02d}{i:03d}", "version": 1, "title": title} for i, title in enumerate(titles)]
+
+def test_title_terms():
+    assert title_terms("A Survey of Graph Neural Networks") == [
+        "survey", "graph", "neural", "networks", "graph neural", "neural networks"]
+    assert normalize_term("  Diffusion MODELS ") == "diffusion models"
+    with pytest.raises(ValueError):
+        normalize_term("large language models")
+    with pytest.raises(ValueError, match="stopword"):
+        normalize_term("the graph")
+
+def test_topics_of_a_day(tmp_path):
+    base_dir = str(tmp_path)
+    try:
+        # 两组用词不重叠的标题，每组 25 篇，正好两个主题
+        open_store(base_dir).upsert_day("cs.AI", "2025-04-01", entries(GRAPH_TITLES * 5 + AGENT_TITLES * 5))
+        result = asyncio.run(topics_for_day(base_dir, "cs.AI"))
+        assert result["success"], result
+        data = result["data"]
+        assert data["date"] == "2025-04-01" and data["total_entries"] == 50
+        assert [topic["size"] for topic in data["topics"]] == [25, 25]
+        for topic in data["topics"]:
+            titles = {paper["title"] for paper in topic["papers"]}
+            assert titles <= set(GRAPH_TITLES) or titles <= set(AGENT_TITLES)
+            assert len(topic["papers"]) == 5
+        labels = " ".join(topic["label"] for topic in data["topics"])
+        assert "graph" in labels and "reinforcement" in labels
+
+        result = asyncio.run(topics_for_day(base_dir, "cs.AI", date="2025-04-02"))
+        assert not result["success"] and "No papers stored" in result["error"]
+    finally:
+        close_topic_indexes()
+        close_stores()
+
+def test_trend(tmp_path):
+    base_dir = str(tmp_path)
+    store = open_store(base_dir)
+    try:
+        # 图神经网络的标题逐日增加：1/5、2/5、3/5、4/5
+        for day in range(1, 5):
+            store.upsert_day("cs.AI", f"2025-04-0{day}",
+                             entries(GRAPH_TITLES[:day] + AGENT_TITLES[:5 - day], day))
+        result = asyncio.run(trend(base_dir, "Graph Neural", "2025-04-01..2025-04-04"))
+        assert result["success"], result
+        data = result["data"]
+        assert data["term"] == "graph neural"
+        assert [(day["date"], day["count"], day["total"]) for day in data["days"]] == [
+            ("2025-04-01", 1, 5), ("2025-04-02", 2, 5), ("2025-04-03", 3, 5), ("2025-04-04", 4, 5)]
+        assert data["count"] == 10 and data["papers"] == 20 and data["share"] == 0.5
+        assert data["first_half_share"] == 0.3 and data["second_half_share"] == 0.7
+
+        # 改变了的日子重新索引，词频总数同时更新
+        store.upsert_day("cs.AI", "2025-04-04", entries(AGENT_TITLES, 4))
+        data = asyncio.run(trend(base_dir, "graph", "2025-04-03..2025-04-04"))["data"]
+        assert [day["count"] for day in data["days"]] == [3, 0]
+        index = open_topic_index(base_dir)
+        assert index.conn.execute("SELECT count FROM term_totals WHERE term = 'graph'").fetchone() == (6,)
+
+        result = asyncio.run(trend(base_dir, "of graphs"))
+        assert not result["success"] and "stopword" in result["error"]
+    finally:
+        close_topic_indexes()
+        close_stores()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+"""Backfill past listing days into the same files and store as the daily crawl.
+
+Every (category, day) of a date range is fetched from arXiv's per-day
+catchup listings by a pool of async workers sharing one HTTP client.  An
+adaptive rate limiter spaces the requests out whenever the server answers
+429/503, and a checkpoint file records the finished days so that a killed
+run picks up where it stopped:
+
+    python -m tools.backfill --from 2025-03-01 --to 2025-03-31 --categories cs.AI cs.LG
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+import argparse
+import threading
+from datetime import date, datetime, timedelta
+import httpx
+from tools.crawl_lock import CrawlLock
+from tools.crawler import CRAWL_LOCK_TIMEOUT, PAGE_SIZE, fetch_listing, save_listing, save_snapshot
+from tools.executor import run_blocking
+from tools.fetcher import HttpFetcher
+from tools.paper_store import open_store
+from tools.snapshots import SNAPSHOTS
+from tools.storage import CATEGORIES, DEFAULT_CATEGORY, atomic_write, validate_category
+
+logger = logging.getLogger(__name__)
+
+def log_debug(message):
+    """Write debug message to log file"""
+    logger.debug(message)
+
+CHECKPOINT_FILENAME = ".backfill_checkpoint.json"
+BACKFILL_CONCURRENCY = 4
+THROTTLE_STATUSES = (429, 503)
+
+class AdaptiveRateLimiter:
+    """Spaces out request starts; the gap grows on 429/503 and decays on success"""
+
+    def __init__(self, min_interval: float = 0.0, max_interval: float = 30.0,
+                 backoff_factor: float = 2.0, recovery: float = 0.5):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.recovery = recovery
+        self.interval = min_interval
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+        self.stats = {"requests": 0, "throttled": 0, "waited": 0.0, "max_interval": min_interval}
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+            self.stats["requests"] += 1
+        if delay > 0:
+            self.stats["waited"] += delay
+            await asyncio.sleep(delay)
+
+    def success(self):
+        self.interval = max(self.min_interval, self.interval * self.recovery)
+        if self.interval < 0.01:
+            self.interval = self.min_interval
+
+    def throttled(self, retry_after: float = None):
+        self.stats["throttled"] += 1
+        self.interval = min(self.max_interval, max(self.interval * self.backoff_factor, 0.25))
+        self.stats["max_interval"] = max(self.stats["max_interval"], self.interval)
+        pause = min(self.max_interval, max(self.interval, retry_after or 0))
+        self._next_start = max(self._next_start, time.monotonic() + pause)
+        log_debug(f"Throttled, request interval now {self.interval:.2f}s (pause {pause:.2f}s)")
+
+    def get_stats(self) -> dict:
+        return dict(self.stats, interval=round(self.interval, 3), waited=round(self.stats["waited"], 2))
+
+def _retry_after(response) -> float:
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+class RateLimitedFetcher:
+    """Wraps a fetcher: waits for the limiter and retries 429/503 answers"""
+
+    def __init__(self, fetcher, limiter: AdaptiveRateLimiter, max_attempts: int = 8):
+        self.fetcher = fetcher
+        self.limiter = limiter
+        self.max_attempts = max_attempts
+
+    async def _call(self, method, url: str, *args):
+        for attempt in range(1, self.max_attempts + 1):
+            await self.limiter.wait()
+            try:
+                result = await method(url, *args)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in THROTTLE_STATUSES or attempt == self.max_attempts:
+                    raise
+                self.limiter.throttled(_retry_after(e.response))
+                continue
+            self.limiter.success()
+            return result
+
+    async def fetch(self, url: str) -> str:
+        return await self._call(self.fetcher.fetch, url)
+
+    async def fetch_if_changed(self, url: str, validators: dict = None) -> tuple:
+        return await self._call(self.fetcher.fetch_if_changed, url, validators)
+
+class Checkpoint:
+    """Finished (category, day) pairs, saved atomically after every day (thread-safe)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.done = {category: set(days) for category, days in json.load(f).get("done", {}).items()}
+
+    def is_done(self, category: str, day: str) -> bool:
+        with self._lock:
+            return day in self.done.get(category, ())
+
+    def mark_done(self, category: str, day: str):
+        # 多个工作线程同时完成：修改和写文件都在锁内，文件总是包含所有已完成的日期
+        with self._lock:
+            self.done.setdefault(category, set()).add(day)
+            with atomic_write(self.path) as writer:
+                writer.write_line(json.dumps({"done": {category: sorted(days)
+                                                       for category, days in self.done.items()}}))
+
+def date_range(date_from: str, date_to: str) -> list:
+    start = datetime.strptime(date_from, "%Y-%m-%d").date()
+    end = datetime.strptime(date_to, "%Y-%m-%d").date()
+    if end < start:
+        raise ValueError(f"Empty date range {date_from}..{date_to}")
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+def plan_backfill(base_dir: str, days: list, categories: list, restart: bool = False):
+    """Open the store and the checkpoint; return them with the (category, day) pairs still to fetch"""
+    store = open_store(base_dir)
+    checkpoint_path = os.path.join(base_dir, CHECKPOINT_FILENAME)
+    if restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    checkpoint = Checkpoint(checkpoint_path)
+    todo = [(category, day) for day in days for category in categories
+            if not (checkpoint.is_done(category, day) or store.get_day(category, day))]
+    return store, checkpoint, todo
+
+async def backfill(base_dir: str, date_from: str, date_to: str, categories: list = None,
+                   base_url: str = None, concurrency: int = BACKFILL_CONCURRENCY,
+                   page_size: int = PAGE_SIZE, min_interval: float = 0.0, restart: bool = False,
+                   retry_backoff: float = 1.0) -> dict:
+    """Fetch every listing day of ``date_from``..``date_to`` for the given categories.
+
+    Days already stored (or recorded in the checkpoint) are skipped, days
+    without an announcement (weekends, holidays) are recorded as empty.
+    ``concurrency`` workers share one HTTP client; the request rate adapts
+    to 429/503 answers.  Every day is stored under the crawl lock of
+    ``base_dir``, like a crawl.  ``restart=True`` ignores the checkpoint.
+
+    Returns the counts of fetched/empty/skipped/failed days and days per minute
+    """
+    try:
+        categories = list(dict.fromkeys(validate_category(c) for c in (categories or [DEFAULT_CATEGORY])))
+        days = date_range(date_from, date_to)
+        log_debug(f"Backfilling {date_from}..{date_to} for {categories} with {concurrency} workers")
+
+        # 打开索引库、读检查点和逐日查询都是同步I/O，放到线程池里，长时间补抓时不阻塞其它客户端
+        store, checkpoint, todo = await run_blocking(plan_backfill, base_dir, days, categories, restart)
+
+        counts = {"fetched": 0, "empty": 0, "skipped": len(days) * len(categories) - len(todo), "entries": 0}
+        failed = []
+        queue = asyncio.Queue()
+        for item in todo:
+            queue.put_nowait(item)
+        pending = queue.qsize()
+
+        limiter = AdaptiveRateLimiter(min_interval=min_interval)
+        # 写入时持有抓取锁，不会和定时/按需抓取（包括其它进程）交错写同一分类的文件和索引库；
+        # 进程内先排队，只有一个工作协程去轮询文件锁
+        store_lock = asyncio.Lock()
+        start = time.perf_counter()
+
+        async def locked(fn, *args):
+            async with store_lock:
+                async with CrawlLock(base_dir, timeout=CRAWL_LOCK_TIMEOUT):
+                    return await run_blocking(fn, *args)
+
+        def store_day(category, day, listing, raw):
+            result = save_listing(base_dir, category, listing)
+            save_snapshot(base_dir, category, raw, listing["date"])
+            # 抓取时间取该日零点（不晚于现在），这样补抓的旧日期不会变成“最新”的一天
+            day_start = datetime.strptime(listing["date"], "%Y-%m-%d").timestamp()
+            store.upsert_day(category, listing["date"], listing["entries"],
+                             filename=result["filename"], crawled_at=min(time.time(), day_start))
+            checkpoint.mark_done(category, day)
+            return result
+
+        async def worker(fetcher):
+            while True:
+                try:
+                    category, day = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                raw = {} if SNAPSHOTS else None
+                try:
+                    listing = await fetch_listing(fetcher, category, base_url=base_url, day=day,
+                                                  page_size=page_size, concurrency=1,
+                                                  retry_backoff=retry_backoff, raw=raw)
+                    result = await locked(store_day, category, day, listing, raw)
+                    counts["fetched"] += 1
+                    counts["entries"] += result["total_entries"]
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code != 404:
+                        log_debug(f"[{category} {day}] Failed: {str(e)}")
+                        failed.append({"category": category, "date": day, "error": str(e)})
+                        continue
+                    counts["empty"] += 1
+                    await run_blocking(checkpoint.mark_done, category, day)
+                except Exception as e:
+                    log_debug(f"[{category} {day}] Failed: {str(e)}")
+                    failed.append({"category": category, "date": day, "error": str(e)})
+                    await locked(save_snapshot, base_dir, category, raw, None)
+                finished = counts["fetched"] + counts["empty"] + len(failed)
+                log_debug(f"Backfill progress: {finished}/{pending}")
+
+        async with HttpFetcher() as http:
+            fetcher = RateLimitedFetcher(http, limiter)
+            await asyncio.gather(*(worker(fetcher) for _ in range(max(1, concurrency))))
+
+        elapsed = time.perf_counter() - start
+        done = counts["fetched"] + counts["empty"]
+        days_per_minute = round(done / elapsed * 60, 1) if elapsed > 0 else None
+        return {
+            "success": not failed,
+            "date_from": date_from,
+            "date_to": date_to,
+            "categories": categories,
+            **counts,
+            "failed": failed,
+            "elapsed": round(elapsed, 2),
+            "days_per_minute": days_per_minute,
+            "rate_limit": limiter.get_stats(),
+            "message": f"Backfilled {counts['fetched']} days ({counts['entries']} papers), "
+                       f"{counts['empty']} without listing, {counts['skipped']} skipped, "
+                       f"{len(failed)} failed; {days_per_minute} days/minute"
+        }
+
+    except Exception as e:
+        log_debug(f"Error in backfill: {str(e)}")
+        return {
+            "success": False,
+            "message": "Failed to backfill",
+            "error": str(e)
+        }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--from", dest="date_from", required=True, help="first day, YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", default=date.today().isoformat(), help="last day, YYYY-MM-DD")
+    parser.add_argument("--categories", nargs="+", default=[DEFAULT_CATEGORY], choices=CATEGORIES)
+    parser.add_argument("--concurrency", type=int, default=BACKFILL_CONCURRENCY)
+    parser.add_argument("--min-interval", type=float, default=0.0, help="minimum seconds between requests")
+    parser.add_argument("--base-url", default=None, help="arXiv base URL (default $ARXIV_BASE_URL)")
+    parser.add_argument("--base-dir", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint of an earlier run")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    result = asyncio.run(backfill(args.base_dir, args.date_from, args.date_to, args.categories,
+                                  base_url=args.base_url, concurrency=args.concurrency,
+                                  min_interval=args.min_interval, restart=args.restart))
+    print(json.dumps(result, ensure_ascii=False, indent=2))
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from tools.browser_profile import BlockStats, get_profile, install_blocking
+from tools.browser_profile import launch_options as profile_launch_options
+from tools.metrics import span
+
+logger = logging.getLogger(__name__)
+
+def log_debug(message):
+    """Write debug message to log file"""
+    logger.debug(message)
+
+class BrowserPool:
+    """A lazily started, long-lived Chromium context shared by all crawls.
+
+    The persistent profile in ``chrome_data`` can only be opened by one
+    browser at a time, so the pool owns a single persistent context and
+    hands out up to ``size`` pages concurrently.  The browser is launched on
+    first use, recycled after ``max_navigations`` page leases, relaunched if
+    it dies, and closed again after ``idle_timeout`` seconds without use.
+    The browser is launched with ``profile`` (see ``tools.browser_profile``)
+    unless explicit ``launch_options`` are given.
+    """
+
+    def __init__(self, user_data_dir: str, size: int = 2, idle_timeout: float = 300.0,
+                 max_navigations: int = 100, launch_options: dict = None, profile: str = None):
+        self.user_data_dir = user_data_dir
+        self.size = max(1, size)
+        self.idle_timeout = idle_timeout
+        self.max_navigations = max_navigations
+        self.profile = get_profile(profile)
+        self.launch_options = launch_options or profile_launch_options(self.profile)
+        self.block_stats = BlockStats()
+
+        self._playwright = None
+        self._context = None
+        self._context_closed = True
+        self._navigations = 0
+        self._active = 0
+        self._last_used = 0.0
+        self._lock = None
+        self._slots = None
+        self._idle_task = None
+
+        self.stats = {
+            "launches": 0,
+            "reuses": 0,
+            "recycles": 0,
+            "health_failures": 0,
+            "idle_shutdowns": 0,
+            "leases": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "launch_time_total": 0.0,
+        }
+
+    def _ensure_primitives(self):
+        # 延迟创建，确保绑定到服务器的事件循环
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+            self._slots = asyncio.Semaphore(self.size)
+
+    @property
+    def is_running(self) -> bool:
+        return self._context is not None and not self._context_closed
+
+    def get_stats(self) -> dict:
+        """Pool counters plus the current state, e.g. for an MCP stats tool"""
+        leases = self.stats["leases"]
+        return dict(
+            self.stats,
+            wait_time_avg=self.stats["wait_time_total"] / leases if leases else 0.0,
+            running=self.is_running,
+            active_pages=self._active,
+            navigations_since_launch=self._navigations,
+            size=self.size,
+            idle_timeout=self.idle_timeout,
+            max_navigations=self.max_navigations,
+            profile=self.profile["name"],
+            requests=self.block_stats.get_stats(),
+        )
+
+    async def _launch(self):
+        from playwright.async_api import async_playwright
+
+        log_debug(f"Launching pooled browser ({self.profile['name']} profile)...")
+        started = time.perf_counter()
+        with span("browser.launch", pooled=True):
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._context = await self._playwright.chromium.launch_persistent_context(
+                user_data_dir=self.user_data_dir,
+                **self.launch_options,
+            )
+            if self.profile["block"]:
+                # 路由装在上下文上，之后租出的每个页面都生效
+                await install_blocking(self._context, self.block_stats)
+        self.stats["launch_time_total"] += time.perf_counter() - started
+        self._context_closed = False
+        self._context.on("close", self._on_context_close)
+        self._navigations = 0
+        self.stats["launches"] += 1
+
+    def _on_context_close(self, *args):
+        self._context_closed = True
+
+    async def _close_context(self):
+        if self._context is not None:
+            log_debug("Closing pooled browser...")
+            try:
+                await self._context.close()
+            except Exception as e:
+                log_debug(f"Error closing pooled browser: {str(e)}")
+            self._context = None
+            self._context_closed = True
+
+    async def _healthy(self) -> bool:
+        """Cheap liveness probe of the current browser"""
+        if not self.is_running:
+            return False
+        try:
+            # 持久化上下文没有Browser对象，用一次CDP往返检测进程是否还活着
+            await asyncio.wait_for(self._context.cookies("about:blank"), timeout=5)
+            return True
+        except Exception as e:
+            log_debug(f"Pooled browser failed health check: {str(e)}")
+            return False
+
+    async def _get_context(self):
+        async with self._lock:
+            if self._context is not None and self._active == 0 \
+                    and self._navigations >= self.max_navigations:
+                log_debug(f"Recycling browser after {self._navigations} navigations")
+                self.stats["recycles"] += 1
+                await self._close_context()
+
+            if self._context is None:
+                await self._launch()
+            elif not await self._healthy():
+                self.stats["health_failures"] += 1
+                await self._close_context()
+                await self._launch()
+            else:
+                self.stats["reuses"] += 1
+            return self._context
+
+    @asynccontextmanager
+    async def page(self):
+        """Lease a page from the shared browser; it is closed on release."""
+        self._ensure_primitives()
+        started = time.perf_counter()
+        await self._slots.acquire()
+        try:
+            context = await self._get_context()
+            self._active += 1
+            try:
+                waited = time.perf_counter() - started
+                self.stats["leases"] += 1
+                self.stats["wait_time_total"] += waited
+                self.stats["wait_time_max"] = max(self.stats["wait_time_max"], waited)
+
+                page = await context.new_page()
+                self._navigations += 1
+                try:
+                    yield page
+                finally:
+                    try:
+                        await page.close()
+                    except Exception as e:
+                        log_debug(f"Error closing pooled page: {str(e)}")
+            finally:
+                self._active -= 1
+        finally:
+            self._last_used = time.monotonic()
+            self._slots.release()
+            self._schedule_idle_shutdown()
+
+    def _schedule_idle_shutdown(self):
+        if self.idle_timeout is None or self.idle_timeout <= 0:
+            return
+        if self._idle_task is None or self._idle_task.done():
+            self._idle_task = asyncio.get_running_loop().create_task(self._idle_watch())
+
+    async def _idle_watch(self):
+        while self.is_running:
+            remaining = self._last_used + self.idle_timeout - time.monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+                continue
+            async with self._lock:
+                if self._active > 0:
+                    # 页面释放时会重新安排
+                    return
+                if time.monotonic() - self._last_used >= self.idle_timeout:
+                    log_debug(f"Browser idle for {self.idle_timeout}s, shutting down")
+                    self.stats["idle_shutdowns"] += 1
+                    await self._close_context()
+                    return
+
+    async def close(self):
+        """Close the browser and the Playwright driver"""
+        self._ensure_primitives()
+        if self._idle_task is not None and self._idle_task is not asyncio.current_task():
+            self._idle_task.cancel()
+        async with self._lock:
+            await self._close_context()
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
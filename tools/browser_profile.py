@@ -0,0 +1,127 @@
+"""Launch and page-load profiles shared by the Playwright crawlers.
+
+The listing pages only need their HTML, so the ``fast`` profile runs
+headless without ``slow_mo`` and aborts every request for images, media,
+fonts and stylesheets (by Playwright resource type) and for MathJax and
+analytics scripts (by URL).  Pages are considered loaded as soon as the
+listing header is in the DOM, instead of after a fixed sleep.  The
+``debug`` profile is the old headed, slowed-down browser for watching a
+crawl.  ``ARXIV_BROWSER_PROFILE`` picks the default.
+
+``StageTimer`` records how long each stage (launch, goto, extract, close)
+took, so the profiles can be compared; each stage is also recorded as a
+``browser.<stage>`` span in ``tools.metrics``.
+"""
+import os
+import re
+import time
+import logging
+from contextlib import contextmanager
+from tools.metrics import span
+
+logger = logging.getLogger(__name__)
+
+def log_debug(message):
+    """Write debug message to log file"""
+    logger.debug(message)
+
+BLOCKED_RESOURCE_TYPES = ("image", "media", "font", "stylesheet")
+# MathJax 和统计脚本的资源类型是 script，只能按 URL 拦截
+BLOCKED_URL_RE = re.compile(r"mathjax|google-analytics|googletagmanager|gtag/js|analytics|matomo|piwik", re.I)
+
+# 列表页的标题区域出现即可提取
+READY_SELECTOR = "dl#articles > h3"
+
+PROFILES = {
+    "fast": {
+        "headless": True,
+        "slow_mo": 0,
+        "args": [],
+        "viewport": {"width": 1280, "height": 800},
+        "block": True,
+    },
+    "debug": {
+        "headless": False,
+        "slow_mo": 500,
+        "args": ["--start-maximized"],
+        "viewport": {"width": 1920, "height": 1080},
+        "block": False,
+    },
+}
+
+BROWSER_PROFILE = os.environ.get("ARXIV_BROWSER_PROFILE", "fast")
+
+def get_profile(name: str = None) -> dict:
+    name = name or BROWSER_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Unknown browser profile: {name} (expected one of {', '.join(PROFILES)})")
+    return dict(PROFILES[name], name=name)
+
+def launch_options(profile: dict) -> dict:
+    """Keyword arguments for ``launch_persistent_context`` / ``launch`` + ``new_context``"""
+    return {key: profile[key] for key in ("headless", "slow_mo", "args", "viewport")}
+
+def should_block(resource_type: str, url: str) -> bool:
+    return resource_type in BLOCKED_RESOURCE_TYPES or BLOCKED_URL_RE.search(url) is not None
+
+class BlockStats:
+    """Counts of aborted and allowed requests"""
+
+    def __init__(self):
+        self.blocked = 0
+        self.allowed = 0
+
+    def get_stats(self) -> dict:
+        return {"blocked": self.blocked, "allowed": self.allowed}
+
+async def install_blocking(target, stats: BlockStats = None):
+    """Abort unneeded subresources of every page of a context (or of one page), async API"""
+    async def route(route):
+        request = route.request
+        if should_block(request.resource_type, request.url):
+            if stats:
+                stats.blocked += 1
+            await route.abort()
+        else:
+            if stats:
+                stats.allowed += 1
+            await route.continue_()
+    await target.route("**/*", route)
+
+def install_blocking_sync(target, stats: BlockStats = None):
+    """``install_blocking`` for the sync Playwright API"""
+    def route(route):
+        request = route.request
+        if should_block(request.resource_type, request.url):
+            if stats:
+                stats.blocked += 1
+            route.abort()
+        else:
+            if stats:
+                stats.allowed += 1
+            route.continue_()
+    target.route("**/*", route)
+
+class StageTimer:
+    """Wall time of named stages, in milliseconds; repeated stages add up"""
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            # 同时作为 browser.<name> 阶段计入指标
+            with span(f"browser.{name}"):
+                yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.stages[name] = round(self.stages.get(name, 0.0) + elapsed, 1)
+            log_debug(f"Stage {name}: {elapsed:.1f} ms")
+
+    def get_stats(self) -> dict:
+        return dict(self.stages, total=round(sum(self.stages.values()), 1))
+
+    def format(self) -> str:
+        return ", ".join(f"{name} {ms:.0f} ms" for name, ms in self.get_stats().items())
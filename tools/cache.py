@@ -0,0 +1,102 @@
+"""Process-wide cache in front of the paper store for the read-side tools.
+
+``check_latest_paper_info`` and ``get_latest_titles`` are called over and
+over between crawls with the same answer.  The cache keeps the latest day
+of every category plus a bounded LRU of title/record pages, and drops all
+of it as soon as the store version changes (a crawl in this process, or a
+commit from another process).
+"""
+import threading
+from collections import OrderedDict
+from tools.paper_store import open_store
+
+MAX_PAGES = 64
+
+class ReadCache:
+    """Latest-day lookups and an LRU of pages, validated against ``store.version()``"""
+
+    def __init__(self, store, max_pages: int = MAX_PAGES):
+        self.store = store
+        self.max_pages = max_pages
+        self._lock = threading.Lock()
+        self._version = None
+        self._latest = {}
+        self._pages = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    def _validate(self):
+        version = self.store.version()
+        if version != self._version:
+            if self._version is not None:
+                self.stats["invalidations"] += 1
+            self._version = version
+            self._latest.clear()
+            self._pages.clear()
+
+    def latest_day(self, category: str):
+        with self._lock:
+            self._validate()
+            if category in self._latest:
+                self.stats["hits"] += 1
+                return self._latest[category]
+            self.stats["misses"] += 1
+            latest = self._latest[category] = self.store.latest_day(category)
+            return latest
+
+    def get_day(self, category: str, date: str):
+        return self._page(("day", category, date), lambda: self.store.get_day(category, date))
+
+    def get_titles(self, category: str, date: str, offset: int = 0, limit: int = None) -> list:
+        return self._page(("titles", category, date, offset, limit),
+                          lambda: self.store.get_titles(category, date, offset=offset, limit=limit))
+
+    def get_records(self, category: str, date: str, offset: int = 0, limit: int = None) -> list:
+        return self._page(("records", category, date, offset, limit),
+                          lambda: self.store.get_records(category, date, offset=offset, limit=limit))
+
+    def _page(self, key: tuple, load):
+        with self._lock:
+            self._validate()
+            if key in self._pages:
+                self.stats["hits"] += 1
+                self._pages.move_to_end(key)
+                return self._pages[key]
+            self.stats["misses"] += 1
+            value = self._pages[key] = load()
+            if len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+                self.stats["evictions"] += 1
+            return value
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+            self._latest.clear()
+            self._pages.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else None,
+                "cached_categories": len(self._latest),
+                "cached_pages": len(self._pages),
+                "max_pages": self.max_pages,
+            }
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def read_cache(base_dir: str) -> ReadCache:
+    """Process-wide read cache of a base directory's store"""
+    store = open_store(base_dir)
+    with _caches_lock:
+        cache = _caches.get(store.path)
+        if cache is None or cache.store is not store:
+            cache = _caches[store.path] = ReadCache(store)
+        return cache
+
+def cache_stats() -> dict:
+    with _caches_lock:
+        return {path: cache.get_stats() for path, cache in _caches.items()}
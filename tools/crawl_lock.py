@@ -0,0 +1,125 @@
+"""Keep concurrent crawls of one base directory from running twice.
+
+``SingleFlight`` coalesces identical crawls inside one server process: later
+callers await the crawl already in flight and get its result.  ``CrawlLock``
+is an OS file lock on ``.arxiv_crawl.lock`` in the base directory, so
+separate server processes (and the browser profile they share) take turns.
+``file_lock`` is the blocking counterpart for short critical sections that
+run on a worker thread, such as rewriting one archive segment.
+"""
+import os
+import time
+import asyncio
+import logging
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+def log_debug(message):
+    """Write debug message to log file"""
+    logger.debug(message)
+
+LOCK_FILENAME = ".arxiv_crawl.lock"
+
+class SingleFlight:
+    """Run one task per key at a time; concurrent callers share its result"""
+
+    def __init__(self):
+        self._flights = {}
+        self.stats = {"started": 0, "coalesced": 0}
+
+    async def run(self, key, coro_factory):
+        task = self._flights.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            log_debug(f"Joining in-flight crawl {key}")
+        else:
+            self.stats["started"] += 1
+            task = asyncio.ensure_future(coro_factory())
+            self._flights[key] = task
+            task.add_done_callback(lambda _: self._flights.pop(key, None))
+        # 某个调用方被取消时不影响其它等待者
+        return await asyncio.shield(task)
+
+    def get_stats(self) -> dict:
+        return dict(self.stats, in_flight=len(self._flights))
+
+class CrawlLock:
+    """Async, cross-process exclusive lock on a file in the base directory"""
+
+    def __init__(self, base_dir: str, timeout: float = 600, poll_interval: float = 0.2):
+        self.path = os.path.join(base_dir, LOCK_FILENAME)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._fd = None
+
+    def _try_lock(self) -> bool:
+        try:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    async def acquire(self):
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + self.timeout
+        while not self._try_lock():
+            if time.monotonic() >= deadline:
+                os.close(self._fd)
+                self._fd = None
+                raise TimeoutError(f"Another process is still crawling (lock {self.path} held > {self.timeout}s)")
+            await asyncio.sleep(self.poll_interval)
+        os.ftruncate(self._fd, 0)
+        os.write(self._fd, str(os.getpid()).encode("ascii"))
+        log_debug(f"Acquired crawl lock {self.path}")
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+@contextmanager
+def file_lock(path: str):
+    """Blocking, cross-process exclusive lock on ``path`` (created if missing)"""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
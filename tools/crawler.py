@@ -1,12 +1,23 @@
 from typing import Dict, Any
 import os
-import sys
+import time
 import asyncio
 import logging
+import contextlib
 import json
 from datetime import date, datetime
-import re
-from playwright.async_api import async_playwright
+import httpx
+from tools.crawl_lock import CrawlLock, SingleFlight
+from tools.day_archive import open_archive
+from tools.day_diff import diff_entries, remove_day_files
+from tools.dedup import update_dedup_index
+from tools.executor import run_blocking, run_cpu
+from tools.fetcher import archive_url, create_fetcher, listing_url
+from tools.listing_parser import merge_pages, parse_listing
+from tools.metrics import inc, span
+from tools.paper_store import open_store
+from tools.snapshots import SNAPSHOTS, snapshot_path, write_snapshot
+from tools.storage import DEFAULT_CATEGORY, validate_category, write_day_files
 
 logger = logging.getLogger(__name__)
 
@@ -14,137 +25,497 @@ def log_debug(message):
     """Write debug message to log file"""
     logger.debug(message)
 
-async def crawl_latest_papers(base_dir: str) -> dict:
-    """Crawl the latest arXiv CS.AI papers.
-    
-    This will launch a browser and fetch today's papers from arXiv.
-    Use this when:
-    - You need papers for today's date
-    - There are no local files for today's date
-    - You want to refresh the data for today
-    
-    Returns information about the crawling result, including date, paper count and filename
+# 分页抓取配置
+PAGE_SIZE = 250
+PAGE_CONCURRENCY = 4
+PAGE_RETRIES = 3
+
+# 当天 CRAWL_TTL 秒内抓过就直接返回已存结果（force=True 时强制重新抓取）
+CRAWL_TTL = float(os.environ.get("ARXIV_CRAWL_TTL", "3600"))
+CRAWL_LOCK_TIMEOUT = float(os.environ.get("ARXIV_CRAWL_LOCK_TIMEOUT", "600"))
+
+# 抓取结果的存放格式：files 每天一组 txt/jsonl 文件，archive 按月写入压缩段（见 tools/day_archive.py）
+DAY_FORMAT = os.environ.get("ARXIV_DAY_FORMAT", "files")
+
+crawl_flights = SingleFlight()
+
+async def _fetch_page(fetcher, url: str, retries: int, retry_backoff: float,
+                      validators: dict = None, raw: dict = None, semaphore: asyncio.Semaphore = None) -> dict:
+    """Fetch and parse one listing page, retrying with exponential backoff.
+
+    With ``validators`` the request is conditional: returns None when the
+    server answers 304 Not Modified, else the page with its new ``validators``.
+    The fetched HTML is kept in ``raw`` (url -> (fetched_at, html)) before
+    it is parsed, so it survives a parser failure.  Only the request holds
+    the ``semaphore``; pages are parsed in the CPU pool while others download.
     """
+    semaphore = semaphore or contextlib.nullcontext()
+    for attempt in range(1, retries + 1):
+        try:
+            async with semaphore:
+                with span("crawl.fetch", url=url, attempt=attempt) as fetch_span:
+                    if validators is None:
+                        html, new_validators = await fetcher.fetch(url), None
+                    else:
+                        html, new_validators = await fetcher.fetch_if_changed(url, validators)
+                    fetch_span.set(not_modified=html is None)
+            if html is None:
+                inc("arxiv_pages_fetched_total", status="not_modified")
+                return None
+            inc("arxiv_pages_fetched_total", status="ok")
+            inc("arxiv_fetched_bytes_total", len(html))
+            if raw is not None:
+                raw[url] = (time.time(), html)
+            # 解析是纯Python的CPU计算，放进进程池，多页可以同时解析
+            with span("crawl.parse", url=url):
+                page = await run_cpu(parse_listing, html)
+            return page if validators is None else dict(page, validators=new_validators)
+        except Exception as e:
+            # 404（该日没有列表）不重试
+            if attempt == retries or getattr(getattr(e, "response", None), "status_code", None) == 404:
+                raise
+            delay = retry_backoff * 2 ** (attempt - 1)
+            log_debug(f"Fetching {url} failed (attempt {attempt}/{retries}): {str(e)}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+async def fetch_listing(fetcher, category: str = DEFAULT_CATEGORY, base_url: str = None,
+                        page_size: int = PAGE_SIZE, concurrency: int = PAGE_CONCURRENCY,
+                        retries: int = PAGE_RETRIES, retry_backoff: float = 1.0,
+                        semaphore: asyncio.Semaphore = None, validators: dict = None,
+                        known: dict = None, day: str = None, raw: dict = None) -> dict:
+    """Fetch every page of the latest day's listing.
+
+    The first page tells us ``total_entries``; the remaining ``skip=``/``show=``
+    pages are then fetched concurrently (at most ``concurrency`` at a time, or
+    under a ``semaphore`` shared with other categories), merged in listing
+    order and de-duplicated by arXiv id.
+
+    Every page is requested conditionally with its ``validators`` (page URL
+    -> ETag/Last-Modified) from the last crawl.  While the first page matches
+    the ``known`` stored day (304, or the same date, count and ids/versions),
+    each further page must too: either 304 or the same ids/versions as the
+    stored day at that offset.  Then the result has ``unchanged: true``;
+    otherwise the pages that answered 304 are fetched again so the listing
+    is complete.  The result's ``validators`` are those of the pages the
+    server sent.
+
+    With ``day`` (YYYY-MM-DD) the listing announced on that past day is
+    fetched instead of the recent one.  The raw HTML of every fetched page
+    is collected in ``raw`` for ``tools.snapshots``.
+    """
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(concurrency)
+    validators = validators or {}
+    new_validators = {}
+
+    async def fetch_page(url, conditional=True):
+        # 不带条件头的请求也记下新的验证器，供下次抓取使用
+        page = await _fetch_page(fetcher, url, retries, retry_backoff,
+                                 validators.get(url, {}) if conditional else {}, raw, semaphore)
+        if page is not None:
+            new_validators[url] = page.pop("validators")
+        return page
+
+    def page_url(show, skip=0):
+        if day:
+            return archive_url(category, day, show=show, base_url=base_url, skip=skip)
+        return listing_url(category, show=show, base_url=base_url, skip=skip)
+
+    def matches(page, skip):
+        # 与已存当天同一位置的 id/版本逐条比较
+        keys = [(e["arxiv_id"], e["version"]) for e in page["entries"]]
+        return page["date"] == known["date"] and page["total_entries"] == known["total_entries"] \
+            and keys == known["keys"][skip:skip + len(keys)]
+
+    first_url = page_url(page_size)
+    first = await fetch_page(first_url)
+    if known is None or first is not None and not matches(first, 0):
+        if first is None:
+            log_debug(f"[{category}] Not modified since the last crawl")
+            return {"category": category, "unchanged": True, "pages": 1, "validators": new_validators}
+        total_entries = first["total_entries"]
+        # 服务器可能限制每页条数，以第一页实际返回的数量为步长
+        step = min(page_size, len(first["entries"])) or page_size
+        skips = list(range(step, total_entries, step))
+        log_debug(f"[{category}] Found {total_entries} papers, fetching {len(skips)} more page(s) of {step}")
+        pages = [first] + list(await asyncio.gather(
+            *(fetch_page(page_url(step, skip), conditional=False) for skip in skips)
+        ))
+        return dict(merge_pages(pages), category=category, pages=len(pages), unchanged=False,
+                    validators=new_validators)
+
+    # 第一页没变：其余页也逐页条件请求，304 或与已存内容一致才算整天没变
+    total_entries = known["total_entries"]
+    step = min(page_size, len(first["entries"]) if first else total_entries) or page_size
+    skips = list(range(step, total_entries, step))
+    urls = [first_url] + [page_url(step, skip) for skip in skips]
+    pages = [first] + list(await asyncio.gather(*(fetch_page(url) for url in urls[1:])))
+    changed = [skip for page, skip in zip(pages, [0] + skips) if page is not None and not matches(page, skip)]
+    if not changed:
+        log_debug(f"[{category}] All {len(pages)} page(s) match the stored day")
+        return {"category": category, "unchanged": True, "pages": len(pages), "validators": new_validators}
+
+    # 后面的页变了：304 的页重新完整抓取，得到完整的列表
+    missing = [i for i, page in enumerate(pages) if page is None]
+    log_debug(f"[{category}] Page(s) at {changed} changed, fetching {len(missing)} unchanged page(s) again")
+    refetched = await asyncio.gather(*(fetch_page(urls[i], conditional=False) for i in missing))
+    for i, page in zip(missing, refetched):
+        pages[i] = page
+    return dict(merge_pages(pages), category=category, pages=len(pages) + len(missing), unchanged=False,
+                validators=new_validators)
+
+def save_listing(base_dir: str, category: str, listing: dict) -> dict:
+    """Write a fetched listing to the category's day file and describe the result"""
+    formatted_date = listing["date"]
+    titles = listing["titles"]
+    log_debug(f"[{category}] arXiv date: {listing['arxiv_date']}")
+    log_debug(f"[{category}] Fetched {len(titles)} papers in {listing['pages']} page(s)")
+
+    # 结果验证：文件名中的数量始终等于实际写入的条目数
+    total_entries = len(titles)
+    if total_entries != listing["total_entries"]:
+        log_debug(f"Warning: Found {total_entries} titles (listing reports {listing['total_entries']})")
+
+    if DAY_FORMAT == "archive":
+        # 写入该月的压缩段（整段原子替换），不再每天生成小文件
+        filename = records_file = os.path.relpath(
+            open_archive(base_dir).add_day(category, formatted_date, listing["entries"]), base_dir)
+    else:
+        # 保存结果：标题、结构化记录（id、版本、作者、分类、链接等，同名 .jsonl）和清单
+        # 都先写临时文件再原子重命名，读取方不会看到写了一半的文件
+        files = write_day_files(base_dir, category, formatted_date, titles, listing["entries"])
+        filename = files["filename"]
+        records_file = files["records_filename"]
+    log_debug(f"Saved to file: {os.path.join(base_dir, filename)}")
+
+    return {
+        "success": True,
+        "category": category,
+        "date": formatted_date,
+        "total_entries": total_entries,
+        "reported_entries": listing["total_entries"],
+        "pages": listing["pages"],
+        "filename": filename,
+        "records_filename": records_file,
+        "message": f"Successfully crawled {total_entries} papers"
+    }
+
+def _stored_result(base_dir: str, categories: list, since: float):
+    """Result built from the store if every category was crawled after ``since``, else None"""
+    store = open_store(base_dir)
+    days = {category: store.latest_day(category) for category in categories}
+    if any(day is None or day["crawled_at"] < since for day in days.values()):
+        return None
+    results = {}
+    for category, day in days.items():
+        crawled = datetime.fromtimestamp(day["crawled_at"]).strftime("%H:%M:%S")
+        results[category] = {
+            "success": True,
+            "category": category,
+            "date": day["date"],
+            "total_entries": day["total_entries"],
+            "filename": day["filename"],
+            "crawled_at": day["crawled_at"],
+            "fresh": True,
+            "message": f"Already crawled {day['total_entries']} papers from {day['date']} at {crawled}, "
+                       f"pass force=True to crawl again"
+        }
+    papers, cross_listed = store.count_papers([(c, d["date"]) for c, d in days.items()])
+    return {
+        "success": True,
+        "categories": results,
+        "papers": papers,
+        "cross_listed": cross_listed,
+        "fresh": True,
+        "message": f"All {len(categories)} categories were crawled recently, {papers} distinct papers"
+    }
+
+async def crawl_categories(base_dir: str, categories: list, backend: str = "http",
+                           base_url: str = None, pool=None, page_size: int = PAGE_SIZE,
+                           concurrency: int = PAGE_CONCURRENCY, force: bool = False,
+                           ttl: float = CRAWL_TTL) -> dict:
+    """Crawl the latest listings of several arXiv categories in one run.
+
+    All categories are fetched in parallel over one shared HTTP client (or
+    browser), with ``concurrency`` bounding the page requests of the whole
+    run.  Every category gets its own day file.  A paper cross-listed in
+    several categories is kept as a single shared record; ``papers`` counts
+    the distinct papers and ``cross_listed`` those seen in more than one
+    category.
+
+    Categories crawled today within ``ttl`` seconds are answered from the
+    store (``fresh: true``) unless ``force=True``.  Concurrent calls for the
+    same categories, backend, ``base_url``, ``page_size`` and ``force`` share
+    one crawl, and a file lock in ``base_dir`` makes
+    other server processes wait for it instead of crawling twice.
+
+    Returns one result per category (see ``crawl_latest_papers``) plus totals
+    """
+    try:
+        categories = list(dict.fromkeys(validate_category(c) for c in categories))
+    except Exception as e:
+        log_debug(f"Error in crawl_categories: {str(e)}")
+        return {
+            "success": False,
+            "message": str(e),
+            "error": str(e)
+        }
+
+    # 只有参数完全相同的调用才共享一次抓取：强制抓取不会拿到普通调用从索引库返回的结果，
+    # 浏览器后端的请求也不会拿到HTTP抓取的结果
+    forced = force or ttl <= 0
+    key = (os.path.abspath(base_dir), tuple(sorted(categories)), forced, backend, base_url, page_size)
+    return await crawl_flights.run(key, lambda: _locked_crawl(
+        base_dir, categories, backend, base_url, pool, page_size, concurrency, force, ttl))
+
+async def _locked_crawl(base_dir: str, categories: list, backend: str, base_url: str, pool,
+                        page_size: int, concurrency: int, force: bool, ttl: float) -> dict:
+    requested_at = time.time()
+    today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+    fresh_since = max(requested_at - ttl, today_start)
+    try:
+        if not force and ttl > 0:
+            stored = await run_blocking(_stored_result, base_dir, categories, fresh_since)
+            if stored:
+                log_debug(f"Skipping crawl of {categories}: {stored['message']}")
+                inc("arxiv_crawls_total", outcome="fresh")
+                return stored
+
+        async with CrawlLock(base_dir, timeout=CRAWL_LOCK_TIMEOUT):
+            # 等锁期间其它进程可能刚抓完；强制抓取时只接受本次请求之后的结果
+            since = requested_at if force or ttl <= 0 else fresh_since
+            stored = await run_blocking(_stored_result, base_dir, categories, since)
+            if stored:
+                log_debug(f"Another process crawled {categories} while waiting for the lock")
+                inc("arxiv_crawls_total", outcome="fresh")
+                return stored
+            result = await _crawl_categories(base_dir, categories, backend, base_url, pool,
+                                             page_size, concurrency)
+            inc("arxiv_crawls_total", outcome="crawled" if result["success"] else "failed")
+            return result
+    except Exception as e:
+        error_msg = str(e)
+        log_debug(f"Error in crawl_categories: {error_msg}")
+        inc("arxiv_crawls_total", outcome="failed")
+        return {
+            "success": False,
+            "message": error_msg,
+            "error": error_msg
+        }
+
+def _known_day(store, category: str):
+    """What the store holds for a category's latest day, to recognise an unchanged listing"""
+    latest = store.latest_day(category)
+    if latest is None:
+        return None
+    return dict(latest, keys=store.get_versions(category, latest["date"]))
+
+async def _crawl_categories(base_dir: str, categories: list, backend: str, base_url: str, pool,
+                            page_size: int, concurrency: int) -> dict:
     try:
         log_debug("Starting crawler...")
         log_debug(f"Base directory: {base_dir}")
-        
+        log_debug(f"Fetch backend: {backend}, categories: {categories}")
+
         # 获取今天的日期
         today = date.today().strftime("%Y-%m-%d")
         log_debug(f"Today's date: {today}")
-        
-        # 使用传入的基础目录
-        user_data_dir = os.path.join(base_dir, "chrome_data")
-        
-        log_debug("Launching browser...")
-        async with async_playwright() as p:
-            # 使用持久化上下文
-            context = await p.chromium.launch_persistent_context(
-                user_data_dir=user_data_dir,
-                headless=False,
-                args=['--start-maximized'],
-                slow_mo=500  # 添加延迟以提高稳定性
-            )
-            
-            # 创建新页面
-            page = await context.new_page()
-            
-            # 设置视口大小
-            await page.set_viewport_size({"width": 1920, "height": 1080})
-            
-            # 设置页面加载超时
-            page.set_default_timeout(30000)
-            
-            log_debug("Navigating to arXiv...")
-            await page.goto(
-                "https://arxiv.org/list/cs.AI/recent?show=250",
-                wait_until="domcontentloaded"
-            )
-            
-            # 提取H3文本
-            h3_element = page.locator("dl#articles > h3").first
-            h3_text = await h3_element.inner_text()
-            log_debug(f"Raw text: {h3_text}")
-            
-            # 提取日期部分
-            date_match = re.search(r'^([A-Za-z]{3},\s\d{1,2}\s[A-Za-z]{3}\s\d{4})', h3_text)
-            if not date_match:
-                raise Exception(f"Could not extract date from text: {h3_text}")
-            
-            arxiv_date_str = date_match.group(1)
-            log_debug(f"arXiv date: {arxiv_date_str}")
-            
-            # 将arXiv日期转换为标准格式
-            try:
-                arxiv_date = datetime.strptime(arxiv_date_str, "%a, %d %b %Y")
-                formatted_date = arxiv_date.strftime("%Y-%m-%d")
-            except ValueError as e:
-                log_debug(f"Date format conversion failed, using original string: {str(e)}")
-                formatted_date = arxiv_date_str.replace(",", "").replace(" ", "_")
-            
-            # 解析论文数量
-            count_match = re.search(r'showing (?:first )?\d+ of (\d+) entries', h3_text)
-            if not count_match:
-                raise Exception(f"Could not parse paper count")
-            
-            total_entries = int(count_match.group(1))
-            log_debug(f"Found {total_entries} papers")
-            
-            # 提取标题
-            log_debug("Extracting titles...")
-            title_elements = page.locator("dd div.list-title.mathjax")
-            titles = []
-            for i in range(await title_elements.count()):
-                title = await title_elements.nth(i).inner_text()
-                titles.append(title.replace("Title:", "").strip())
-            
-            # 结果验证
-            if len(titles) != total_entries:
-                log_debug(f"Warning: Found {len(titles)} titles (expected {total_entries})")
-                if len(titles) < total_entries:
-                    log_debug("Suggestion: Increase show parameter in URL to ?show=500")
-            
-            # 保存结果
-            filename = f"arxiv_AI_{formatted_date}_({total_entries}entries).txt"
-            filepath = os.path.join(base_dir, filename)
-            log_debug(f"Current working directory: {os.getcwd()}")
-            log_debug(f"Script directory: {base_dir}")
-            log_debug(f"Saving to file: {filepath}")
-            
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write("\n".join(titles[:total_entries]))
-            
-            # 等待一段时间确保资源释放
-            await asyncio.sleep(2)
-            
-            log_debug("Closing browser...")
-            await context.close()
-            
-            # 返回结果
-            result = {
-                "success": True,
-                "date": formatted_date,
-                "total_entries": total_entries,
-                "filename": filename,
-                "message": f"Successfully crawled {len(titles)} papers"
-            }
-            
+
+        # 上次抓取各页的验证器（ETag/Last-Modified）和已存的当天列表，用于增量抓取
+        known, validators = await run_blocking(_load_known, base_dir, categories, base_url, page_size)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        # 每个分类抓到的原始页面，写入快照
+        raw = {category: {} if SNAPSHOTS else None for category in categories}
+        with span("crawl", categories=",".join(categories), backend=backend) as crawl_span:
+            async with create_fetcher(backend, base_dir, pool=pool) as fetcher:
+                listings = await asyncio.gather(
+                    *(fetch_listing(fetcher, category, base_url=base_url, page_size=page_size,
+                                    semaphore=semaphore, validators=validators[category],
+                                    known=known[category], raw=raw[category]) for category in categories),
+                    return_exceptions=True,
+                )
+
+            # 文件和索引库的写入在I/O线程池里执行
+            with span("crawl.store"):
+                result = await run_blocking(_store_listings, base_dir, categories, listings, known,
+                                            backend, raw)
+            crawl_span.set(success=result["success"], papers=result["papers"])
+        if logger.isEnabledFor(logging.DEBUG):
             log_debug(f"Returning result: {json.dumps(result)}")
-            return result
-            
+        return result
+
     except Exception as e:
         error_msg = str(e)
-        log_debug(f"Error in crawl_latest_papers: {error_msg}")
-        
-        # 保存错误截图
-        try:
-            if 'page' in locals():
-                await page.screenshot(path=os.path.join(base_dir, "arxiv_error.png"))
-        except Exception as screenshot_error:
-            log_debug(f"Failed to save error screenshot: {str(screenshot_error)}")
-        
+        log_debug(f"Error in crawl_categories: {error_msg}")
         return {
             "success": False,
             "message": error_msg,
             "error": error_msg
-        } 
\ No newline at end of file
+        }
+
+def _index_duplicates(base_dir: str, categories: list) -> dict:
+    """Flag the near-duplicates of the stored listings right away; on failure the next lookup does it"""
+    try:
+        return update_dedup_index(base_dir, categories)
+    except Exception as e:
+        log_debug(f"Error updating the dedup index: {str(e)}")
+        return {}
+
+def save_snapshot(base_dir: str, category: str, pages: dict, day: str = None, replace: bool = True):
+    """Keep the raw pages of a crawl (of a failed one with ``day=None``); never fails the crawl"""
+    if not pages or not replace and os.path.exists(snapshot_path(base_dir, category, day)):
+        return
+    try:
+        with span("crawl.snapshot", category=category):
+            write_snapshot(base_dir, category, pages, day)
+    except Exception as e:
+        log_debug(f"[{category}] Error saving the HTML snapshot: {str(e)}")
+
+def _load_known(base_dir: str, categories: list, base_url: str, page_size: int) -> tuple:
+    store = open_store(base_dir)
+    known = {category: _known_day(store, category) for category in categories}
+    validators = {}
+    for category in categories:
+        validators[category] = {}
+        if known[category]:
+            # 与 fetch_listing 相同的分页方式
+            total_entries = known[category]["total_entries"]
+            step = min(page_size, total_entries) or page_size
+            for skip in range(0, max(total_entries, 1), step):
+                url = listing_url(category, show=step if skip else page_size, base_url=base_url, skip=skip)
+                validators[category][url] = store.get_validators(url)
+    return known, validators
+
+def _store_listings(base_dir: str, categories: list, listings: list, known: dict,
+                    backend: str, raw: dict = None) -> dict:
+    """Write the changed listings to their day files and the store; describe every category.
+
+    The raw pages in ``raw`` are kept as HTML snapshots next to the day
+    files, and those of a category that failed to parse as unparsed ones.
+    """
+    raw = raw or {}
+    store = open_store(base_dir)
+    # 交叉列出的论文只保留一份记录
+    papers = {}
+    results = {}
+    stored_days = []
+    touched_days = []
+    for category, listing in zip(categories, listings):
+        if isinstance(listing, BaseException):
+            log_debug(f"[{category}] Error: {str(listing)}")
+            # 页面已经抓到但解析失败：保留原始页面，修好解析器后用 tools.reparse 恢复
+            if not isinstance(listing, httpx.HTTPError):
+                save_snapshot(base_dir, category, raw.get(category), day=None)
+            results[category] = {
+                "success": False,
+                "category": category,
+                "message": str(listing),
+                "error": str(listing)
+            }
+            continue
+
+        day = known[category]
+        if not listing["unchanged"]:
+            for i, entry in enumerate(listing["entries"]):
+                key = entry["arxiv_id"] or entry["title"]
+                listing["entries"][i] = papers.setdefault(key, entry)
+            stored = store.get_records(category, listing["date"]) if store.get_day(category, listing["date"]) else []
+            diff = diff_entries(stored, listing["entries"])
+            changed = diff["changed"]
+            # 内容没变时只补上缺少的快照
+            save_snapshot(base_dir, category, raw.get(category), listing["date"], replace=changed)
+            if changed:
+                log_debug(f"[{category}] {len(diff['added'])} added, {len(diff['updated'])} updated, "
+                          f"{diff['unchanged']} unchanged, {diff['removed']} removed")
+                with span("crawl.write_files", category=category):
+                    result = save_listing(base_dir, category, listing)
+                previous = store.get_day(category, listing["date"])
+                # 只删除旧的日期文件；月度段里的其它日期仍然有效
+                if previous and (previous["filename"] or "").endswith(".txt") \
+                        and previous["filename"] != result["filename"]:
+                    remove_day_files(base_dir, previous["filename"])
+                results[category] = dict(result, backend=backend, changed=True,
+                                         added=len(diff["added"]), updated=len(diff["updated"]),
+                                         unchanged=diff["unchanged"], removed=diff["removed"])
+                stored_days.append({"category": category, "date": listing["date"],
+                                    "entries": listing["entries"],
+                                    "papers": diff["added"] + diff["updated"],
+                                    "filename": result["filename"]})
+                continue
+            day = store.get_day(category, listing["date"])
+
+        # 没有变化：不重写文件，只刷新抓取时间
+        log_debug(f"[{category}] Listing of {day['date']} unchanged since the last crawl")
+        touched_days.append((category, day["date"]))
+        results[category] = {
+            "success": True,
+            "category": category,
+            "date": day["date"],
+            "total_entries": day["total_entries"],
+            "pages": listing["pages"],
+            "filename": day["filename"],
+            "backend": backend,
+            "changed": False,
+            "added": 0,
+            "updated": 0,
+            "unchanged": day["total_entries"],
+            "removed": 0,
+            "message": f"No changes since the last crawl ({day['total_entries']} papers)"
+        }
+
+    # 所有分类一次事务写入索引库，写入成功后再记住新的验证器
+    if stored_days:
+        with span("crawl.store_db", days=len(stored_days)):
+            store.upsert_days(stored_days)
+        # 新论文立即进入去重索引，版本首次出现的日期也在此时记录
+        with span("crawl.dedup_index"):
+            dedup = _index_duplicates(base_dir, sorted({day["category"] for day in stored_days}))
+        for day in stored_days:
+            if day["category"] in dedup:
+                results[day["category"]]["duplicates"] = dedup[day["category"]]["duplicates"]
+    for category, day_date in touched_days:
+        store.touch_day(category, day_date)
+    for category, listing in zip(categories, listings):
+        if not isinstance(listing, BaseException):
+            for url, page_validators in listing.get("validators", {}).items():
+                store.set_validators(url, page_validators)
+
+    succeeded = [c for c in categories if results[c]["success"]]
+    distinct, cross_listed = store.count_papers([(c, results[c]["date"]) for c in succeeded])
+    return {
+        "success": len(succeeded) == len(categories),
+        "categories": results,
+        "papers": distinct,
+        "cross_listed": cross_listed,
+        "backend": backend,
+        "message": f"Crawled {len(succeeded)}/{len(categories)} categories, {distinct} distinct papers"
+    }
+
+async def crawl_latest_papers(base_dir: str, backend: str = "http", base_url: str = None,
+                              pool=None, page_size: int = PAGE_SIZE,
+                              concurrency: int = PAGE_CONCURRENCY,
+                              category: str = DEFAULT_CATEGORY, force: bool = False,
+                              ttl: float = CRAWL_TTL) -> dict:
+    """Crawl the latest arXiv papers of one category (CS.AI by default).
+
+    This will fetch today's listing page from arXiv and parse the titles.
+    The default "http" backend uses a plain async HTTP client; pass
+    backend="playwright" to fall back to a real browser; with a ``BrowserPool``
+    the browser stays warm between crawls.  Days with more than
+    ``page_size`` entries are fetched page by page, ``concurrency`` pages at a time.
+    A category already crawled today within ``ttl`` seconds is returned from
+    the store without crawling again, unless ``force=True``.
+    Use this when:
+    - You need papers for today's date
+    - There are no local files for today's date
+    - You want to refresh the data for today
+
+    Returns information about the crawling result, including date, paper count and filename
+    """
+    result = await crawl_categories(base_dir, [category], backend=backend, base_url=base_url,
+                                    pool=pool, page_size=page_size, concurrency=concurrency,
+                                    force=force, ttl=ttl)
+    if "categories" not in result:
+        return result
+    return result["categories"][category]
@@ -0,0 +1,371 @@
+#!/usr/bin/env python
+"""Compact archive of crawled days: one compressed segment per category and month.
+
+Years of ``arxiv_AI_<date>_(<N>entries).txt`` files become a few dozen
+segments under ``archive/<tag>/<YYYY-MM>.seg``.  A segment is::
+
+    header   magic, block size, day/block/entry counts, table offsets
+    blocks   zlib-compressed JSON lines, ``block_size`` records each;
+             a block never spans two days
+    days     fixed-width rows (date, first block, blocks, entries), sorted
+    blocks   fixed-width rows (offset, compressed length, CRC-32)
+
+Segments are opened with mmap.  Finding day D is a binary search over the
+day table, and entry i of a day decompresses one block, so neither needs the
+rest of the segment.  The tables are checked against the file size when a
+segment is opened and every block against its CRC when it is read; a
+damaged segment raises ``CorruptSegment`` instead of returning garbage.
+
+Adding a day rewrites its month atomically under a lock file next to the
+segments, so server processes sharing a base directory do not lose each
+other's days; readers holding the old mapping keep a consistent view and
+reopen on the next call.  The paper store rebuilds its days from the
+segments as well as from day files (``archived_days``).
+
+Import the existing day files with:
+
+    python -m tools.day_archive import [--base-dir DIR]
+"""
+import os
+import json
+import mmap
+import time
+import zlib
+import struct
+import bisect
+import logging
+import argparse
+import threading
+from tools.crawl_lock import file_lock
+from tools.storage import (CATEGORIES, TornRead, atomic_write, category_tag, find_day_files,
+                           parse_day_filename, read_day_files)
+
+logger = logging.getLogger(__name__)
+
+def log_debug(message):
+    """Write debug message to log file"""
+    logger.debug(message)
+
+ARCHIVE_DIRNAME = "archive"
+SEGMENT_SUFFIX = ".seg"
+MAGIC = b"ARXSEG02"
+# 旧格式（块表中没有CRC）仍然可以读取
+MAGIC_V1 = b"ARXSEG01"
+LOCK_FILENAME = ".lock"
+# 每个压缩块的记录数：越小随机读取越快，越大压缩率越高
+BLOCK_SIZE = int(os.environ.get("ARXIV_ARCHIVE_BLOCK_SIZE", "64"))
+COMPRESS_LEVEL = 6
+
+HEADER = struct.Struct("<8sIIIIQQ")  # magic, block_size, days, blocks, entries, day table, block table
+DAY_ROW = struct.Struct("<10sIII")   # date, first block, blocks, entries
+BLOCK_ROW = struct.Struct("<QII")    # offset, compressed length, CRC-32 of the compressed block
+BLOCK_ROW_V1 = struct.Struct("<QI")  # offset, compressed length
+
+class CorruptSegment(Exception):
+    pass
+
+def encode_segment(days: dict, block_size: int = BLOCK_SIZE):
+    """Yield the bytes of a segment holding ``{date: [records]}``"""
+    blocks, day_rows, entries = [], [], 0
+    for day in sorted(days):
+        records = days[day]
+        first = len(blocks)
+        for start in range(0, len(records), block_size):
+            chunk = "\n".join(json.dumps(record, ensure_ascii=False) for record in records[start:start + block_size])
+            blocks.append(zlib.compress(chunk.encode("utf-8"), COMPRESS_LEVEL))
+        day_rows.append(DAY_ROW.pack(day.encode("ascii"), first, len(blocks) - first, len(records)))
+        entries += len(records)
+
+    # 偏移量在写之前就能算出来，整个段可以顺序写出
+    offset = HEADER.size
+    block_rows = []
+    for block in blocks:
+        block_rows.append(BLOCK_ROW.pack(offset, len(block), zlib.crc32(block)))
+        offset += len(block)
+    day_table = offset
+    block_table = day_table + DAY_ROW.size * len(day_rows)
+    yield HEADER.pack(MAGIC, block_size, len(day_rows), len(blocks), entries, day_table, block_table)
+    yield from blocks
+    yield b"".join(day_rows)
+    yield b"".join(block_rows)
+
+class Segment:
+    """Read-only, mmap-backed view of one segment file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.key = _file_key(stat)
+            if stat.st_size < HEADER.size:
+                raise CorruptSegment(f"{path} is too short for a segment header")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._check_header(stat.st_size)
+            self._days = [DAY_ROW.unpack_from(self._mm, self._day_table + i * DAY_ROW.size)
+                          for i in range(self.day_count)]
+            self._check_days()
+        except CorruptSegment:
+            self._mm.close()
+            raise
+        except (struct.error, UnicodeDecodeError) as e:
+            self._mm.close()
+            raise CorruptSegment(f"{path}: {str(e)}") from e
+        # 日期表很小，解析一次即可二分查找
+        self.dates = [row[0].decode("ascii") for row in self._days]
+
+    def _check_header(self, size: int):
+        (magic, self.block_size, self.day_count, self.block_count, self.entry_count,
+         self._day_table, self._block_table) = HEADER.unpack_from(self._mm, 0)
+        if magic not in (MAGIC, MAGIC_V1):
+            raise CorruptSegment(f"{self.path} is not a day archive segment")
+        self._block_row = BLOCK_ROW if magic == MAGIC else BLOCK_ROW_V1
+        # 两张表必须紧接在块之后、正好到文件末尾
+        if self.block_size < 1 or not HEADER.size <= self._day_table \
+                or self._block_table != self._day_table + self.day_count * DAY_ROW.size \
+                or self._block_table + self.block_count * self._block_row.size != size:
+            raise CorruptSegment(f"{self.path}: tables do not match the file size {size}")
+
+    def _check_days(self):
+        dates, blocks, entries = [], 0, 0
+        for date, first, count, day_entries in self._days:
+            if first != blocks or day_entries > count * self.block_size \
+                    or day_entries <= (count - 1) * self.block_size:
+                raise CorruptSegment(f"{self.path}: inconsistent day table row for {date!r}")
+            dates.append(date)
+            blocks += count
+            entries += day_entries
+        if blocks != self.block_count or entries != self.entry_count or dates != sorted(dates):
+            raise CorruptSegment(f"{self.path}: day table does not add up to the header counts")
+
+    def close(self):
+        self._mm.close()
+
+    def _day_row(self, day: str):
+        i = bisect.bisect_left(self.dates, day)
+        if i == len(self.dates) or self.dates[i] != day:
+            return None
+        return self._days[i][1:]
+
+    def _block(self, index: int) -> list:
+        row = self._block_row.unpack_from(self._mm, self._block_table + index * self._block_row.size)
+        offset, length = row[:2]
+        if offset < HEADER.size or offset + length > self._day_table:
+            raise CorruptSegment(f"{self.path}: block {index} lies outside the data area")
+        data = self._mm[offset:offset + length]
+        if len(row) > 2 and zlib.crc32(data) != row[2]:
+            raise CorruptSegment(f"{self.path}: checksum mismatch in block {index}")
+        try:
+            return zlib.decompress(data).decode("utf-8").split("\n")
+        except (zlib.error, UnicodeDecodeError) as e:
+            raise CorruptSegment(f"{self.path}: block {index} does not decompress: {str(e)}") from e
+
+    def day_size(self, day: str):
+        row = self._day_row(day)
+        return None if row is None else row[2]
+
+    def get_day(self, day: str, offset: int = 0, limit: int = None):
+        """Records of a day (optionally a slice), None if the day is not stored"""
+        row = self._day_row(day)
+        if row is None:
+            return None
+        first, blocks, entries = row
+        end = entries if limit is None else min(entries, offset + limit)
+        records = []
+        # 只解压覆盖 [offset, end) 的块
+        for block in range(offset // self.block_size, (end - 1) // self.block_size + 1 if end > offset else 0):
+            lines = self._block(first + block)
+            start = block * self.block_size
+            # 一次解析整块比逐行 json.loads 快
+            records.extend(json.loads("[" + ",".join(lines[max(0, offset - start):end - start]) + "]"))
+        return records
+
+    def get_entry(self, day: str, index: int):
+        """Entry ``index`` of a day, decompressing a single block"""
+        row = self._day_row(day)
+        if row is None or not 0 <= index < row[2]:
+            return None
+        return json.loads(self._block(row[0] + index // self.block_size)[index % self.block_size])
+
+    def read_all(self) -> dict:
+        return {day: self.get_day(day) for day in self.dates}
+
+def _file_key(stat) -> tuple:
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+class DayArchive:
+    """The segments of a base directory, opened lazily and reopened when replaced"""
+
+    def __init__(self, base_dir: str, block_size: int = BLOCK_SIZE):
+        self.root = os.path.join(base_dir, ARCHIVE_DIRNAME)
+        self.block_size = block_size
+        self._segments = {}
+        self._lock = threading.RLock()
+        self.stats = {"opens": 0, "days_written": 0, "segments_written": 0}
+
+    def segment_path(self, category: str, month: str) -> str:
+        return os.path.join(self.root, category_tag(category), month + SEGMENT_SUFFIX)
+
+    def months(self, category: str) -> list:
+        directory = os.path.join(self.root, category_tag(category))
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-len(SEGMENT_SUFFIX)] for name in os.listdir(directory)
+                      if name.endswith(SEGMENT_SUFFIX) and not name.startswith("."))
+
+    def segment(self, category: str, month: str):
+        """The open segment of a month, None if there is none"""
+        path = self.segment_path(category, month)
+        with self._lock:
+            try:
+                key = _file_key(os.stat(path))
+            except FileNotFoundError:
+                self._segments.pop(path, None)
+                return None
+            segment = self._segments.get(path)
+            if segment is None or segment.key != key:
+                # 段被重写过：旧的映射留给仍在使用它的读者，由垃圾回收关闭
+                segment = self._segments[path] = Segment(path)
+                self.stats["opens"] += 1
+            return segment
+
+    def list_days(self, category: str, date_from: str = None, date_to: str = None) -> list:
+        """(date, entries) of the stored days in a range, oldest first"""
+        days = []
+        for month in self.months(category):
+            if (date_from and month < date_from[:7]) or (date_to and month > date_to[:7]):
+                continue
+            segment = self.segment(category, month)
+            if segment is None:
+                continue
+            for day in segment.dates:
+                if (not date_from or day >= date_from) and (not date_to or day <= date_to):
+                    days.append((day, segment.day_size(day)))
+        return days
+
+    def get_day(self, category: str, day: str, offset: int = 0, limit: int = None):
+        segment = self.segment(category, day[:7])
+        return None if segment is None else segment.get_day(day, offset, limit)
+
+    def get_entry(self, category: str, day: str, index: int):
+        segment = self.segment(category, day[:7])
+        return None if segment is None else segment.get_entry(day, index)
+
+    def iter_range(self, category: str, date_from: str = None, date_to: str = None):
+        """Yield (date, records) of every stored day in a range, oldest first"""
+        for day, _ in self.list_days(category, date_from, date_to):
+            yield day, self.get_day(category, day)
+
+    def write_month(self, category: str, month: str, days: dict):
+        """Replace a month's segment with ``{date: [records]}``"""
+        path = self.segment_path(category, month)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with atomic_write(path) as writer:
+            for chunk in encode_segment(days, self.block_size):
+                writer.write(chunk)
+        self.stats["segments_written"] += 1
+        self.stats["days_written"] += len(days)
+        log_debug(f"Wrote {path}: {len(days)} days, {writer.bytes} bytes")
+        return path
+
+    def add_days(self, category: str, days: dict) -> list:
+        """Merge ``{date: [records]}`` into their months (replacing stored days)"""
+        by_month = {}
+        for day, records in days.items():
+            by_month.setdefault(day[:7], {})[day] = records
+        paths = []
+        directory = os.path.join(self.root, category_tag(category))
+        os.makedirs(directory, exist_ok=True)
+        # 读出、合并、重写整段期间持有锁：进程内用线程锁，进程间用分类目录下的锁文件，避免丢失别人的更新
+        with self._lock, file_lock(os.path.join(directory, LOCK_FILENAME)):
+            for month, new_days in sorted(by_month.items()):
+                segment = self.segment(category, month)
+                merged = segment.read_all() if segment is not None else {}
+                merged.update(new_days)
+                paths.append(self.write_month(category, month, merged))
+        return paths
+
+    def add_day(self, category: str, day: str, records: list) -> str:
+        return self.add_days(category, {day: records})[0]
+
+    def close(self):
+        with self._lock:
+            for segment in self._segments.values():
+                segment.close()
+            self._segments.clear()
+
+    def get_stats(self) -> dict:
+        return dict(self.stats, open_segments=len(self._segments))
+
+_archives = {}
+_archives_lock = threading.Lock()
+
+def open_archive(base_dir: str) -> DayArchive:
+    """Process-wide archive of a base directory"""
+    with _archives_lock:
+        archive = _archives.get(base_dir)
+        if archive is None:
+            archive = _archives[base_dir] = DayArchive(base_dir)
+        return archive
+
+def archived_days(base_dir: str, category: str):
+    """Yield (date, records, segment path) of every day archived for a category.
+
+    Damaged segments are skipped with a log message, like torn day files.
+    """
+    archive = open_archive(base_dir)
+    for month in archive.months(category):
+        try:
+            segment = archive.segment(category, month)
+        except CorruptSegment as e:
+            log_debug(f"Skipping damaged archive segment: {str(e)}")
+            continue
+        if segment is None:
+            continue
+        for day in segment.dates:
+            try:
+                records = segment.get_day(day)
+            except CorruptSegment as e:
+                log_debug(f"Skipping damaged archived day {day}: {str(e)}")
+                continue
+            yield day, records, segment.path
+
+def import_day_files(base_dir: str, archive: DayArchive = None, categories=CATEGORIES) -> dict:
+    """Pack the existing day files (and their .jsonl records) into monthly segments.
+
+    The day files are left in place; delete them once the archive is checked.
+    """
+    archive = archive or open_archive(base_dir)
+    counts = {"days": 0, "entries": 0, "segments": 0, "skipped": 0}
+    for category in categories:
+        days = {}
+        for path in find_day_files(base_dir, category):
+            match = parse_day_filename(path, category)
+            if not match:
+                log_debug(f"Skipping file with invalid name: {path}")
+                continue
+            try:
+                files = read_day_files(path)
+            except TornRead as e:
+                log_debug(f"Skipping day file that does not match its manifest: {str(e)}")
+                counts["skipped"] += 1
+                continue
+            days[match[0]] = files["records"] or [{"title": title} for title in files["titles"]]
+        if not days:
+            continue
+        counts["segments"] += len(archive.add_days(category, days))
+        counts["days"] += len(days)
+        counts["entries"] += sum(len(records) for records in days.values())
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["import"])
+    parser.add_argument("--base-dir", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = import_day_files(args.base_dir)
+    print(f"Packed {counts['days']} days / {counts['entries']} entries into {counts['segments']} segments "
+          f"under {os.path.join(args.base_dir, ARCHIVE_DIRNAME)} in {time.perf_counter() - start:.2f}s"
+          + (f" ({counts['skipped']} damaged day files skipped)" if counts["skipped"] else ""))
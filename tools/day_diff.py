@@ -0,0 +1,55 @@
+"""Compare a fetched listing day with the stored one, shared by crawls and reparse.
+
+``diff_entries`` splits the fetched entries into added / updated /
+unchanged against the stored records; ``remove_day_files`` deletes the
+files of a day that was saved under a new name.
+"""
+import os
+import logging
+from tools.paper_store import RECORD_FIELDS
+from tools.storage import manifest_filename, records_filename
+
+logger = logging.getLogger(__name__)
+
+def log_debug(message):
+    """Write debug message to log file"""
+    logger.debug(message)
+
+def entry_key(entry: dict) -> str:
+    return entry["arxiv_id"] or entry["title"]
+
+def diff_entries(stored: list, entries: list) -> dict:
+    """Split fetched entries into added / updated / unchanged against the stored day.
+
+    ``changed`` is False only when a stored day exists and the listing has
+    the same entries, fields and order.
+    """
+    stored_by_key = {entry_key(record): record for record in stored}
+    added, updated, unchanged = [], [], 0
+    for entry in entries:
+        record = stored_by_key.get(entry_key(entry))
+        if record is None:
+            added.append(entry)
+        elif any(entry.get(field) != record[field] for field in RECORD_FIELDS):
+            updated.append(entry)
+        else:
+            unchanged += 1
+    keys = [entry_key(entry) for entry in entries]
+    removed = len(set(stored_by_key) - set(keys))
+    reordered = keys != list(stored_by_key)
+    return {
+        "added": added,
+        "updated": updated,
+        "unchanged": unchanged,
+        "removed": removed,
+        "reordered": reordered,
+        "changed": not (stored and not added and not updated and not removed and not reordered),
+    }
+
+def remove_day_files(base_dir: str, filename: str):
+    """Delete a day's titles file with its records and manifest"""
+    for name in (filename, records_filename(filename), manifest_filename(filename)):
+        path = os.path.join(base_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+            log_debug(f"Removed outdated file: {path}")
@@ -0,0 +1,605 @@
+#!/usr/bin/env python
+"""Near-duplicate and version index over the stored papers (MinHash + LSH).
+
+arXiv listings repeat work: replacements list a paper again under a new
+version, cross-lists put it in several categories, and the same work comes
+back under a new id with a slightly reworded title.  For every stored paper
+the index keeps, in ``arxiv_dedup.db`` next to the paper store:
+
+- a MinHash signature of its normalized title (character 5-grams, 100
+  hashes), cut into 20 bands of 5; papers sharing a band are candidates,
+  so a lookup touches a handful of papers instead of every title,
+- its cluster: candidates whose exact 5-gram Jaccard similarity (title and
+  abstract when both have one) reaches ``ARXIV_DEDUP_THRESHOLD`` (0.7) are
+  merged into one cluster of the same work,
+- the first day it was listed, and the day each of its versions was first
+  seen.  The store only keeps the latest version of a paper, so versions
+  are exact from the time the index follows the crawls (the crawler updates
+  it right after storing a listing).
+
+Days whose digest changed since they were indexed are indexed on the next
+lookup, or explicitly with ``python -m tools.dedup build``.
+"""
+import os
+import re
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+import unicodedata
+import numpy as np
+from tools.executor import run_blocking
+from tools.paper_store import legacy_id, open_store
+from tools.storage import CATEGORIES, validate_category
+
+logger = logging.getLogger(__name__)
+
+def log_debug(message):
+    """Write debug message to log file"""
+    logger.debug(message)
+
+DEDUP_DB_FILENAME = "arxiv_dedup.db"
+
+SHINGLE = 5
+NUM_PERM = 100
+BANDS = 20
+ROWS = NUM_PERM // BANDS
+# 20×5 的分带：Jaccard 0.7 的两篇成为候选的概率约 97.5%，0.8 的 99.9%，0.3 的不到 5%
+THRESHOLD = float(os.environ.get("ARXIV_DEDUP_THRESHOLD", "0.7"))
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# 哈希参数固定，签名在所有进程中一致
+_rng = np.random.default_rng(20250401)
+_A = _rng.integers(1, 2 ** 63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64)
+_BAND_MIX = np.array([0x9E3779B1, 0x85EBCA77, 0xC2B2AE3D, 0x27D4EB2F, 0x165667B1], dtype=np.uint64)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS indexed_days (
+    category TEXT NOT NULL,
+    date     TEXT NOT NULL,
+    digest   TEXT NOT NULL,
+    PRIMARY KEY (category, date)
+);
+
+CREATE TABLE IF NOT EXISTS papers (
+    paper          INTEGER PRIMARY KEY,
+    key            TEXT NOT NULL UNIQUE,
+    title          TEXT NOT NULL,
+    abstract       TEXT,
+    cluster        INTEGER NOT NULL,
+    first_date     TEXT NOT NULL,
+    first_category TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_papers_cluster ON papers (cluster);
+
+-- 分带哈希单独成表：启动时顺序读入内存，不必扫过标题
+CREATE TABLE IF NOT EXISTS signatures (
+    paper INTEGER PRIMARY KEY,
+    bands BLOB NOT NULL
+);
+
+-- 每个版本第一次出现在列表中的日期
+CREATE TABLE IF NOT EXISTS versions (
+    key      TEXT NOT NULL,
+    version  INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    date     TEXT NOT NULL,
+    PRIMARY KEY (key, version)
+) WITHOUT ROWID;
+"""
+
+def normalize(text: str) -> str:
+    """Lower-case ASCII words separated by single spaces (accents and punctuation dropped)"""
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii")
+    return " ".join(TOKEN_RE.findall(text.lower()))
+
+def shingles(text: str) -> set:
+    """Character 5-grams of a normalized text"""
+    text = text.ljust(SHINGLE)
+    return {text[i:i + SHINGLE] for i in range(len(text) - SHINGLE + 1)}
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+def signatures(texts: list) -> np.ndarray:
+    """MinHash signatures (n × NUM_PERM, uint32) of normalized texts, computed for all at once"""
+    texts = [text.ljust(SHINGLE) for text in texts]
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    data = np.frombuffer("".join(texts).encode("ascii"), dtype=np.uint8).astype(np.uint64)
+    # 5个字节正好放进一个 uint64：每个5-gram本身就是一个整数，不需要再哈希
+    n = len(data) - SHINGLE + 1
+    grams = np.zeros(n, dtype=np.uint64)
+    for j in range(SHINGLE):
+        grams = (grams << np.uint64(8)) | data[j:j + n]
+    counts = lengths - SHINGLE + 1
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    # 去掉跨越两个文本边界的 gram
+    offsets = np.cumsum(lengths) - lengths
+    grams = grams[np.repeat(offsets - starts, counts) + np.arange(ends[-1])]
+    result = np.empty((len(texts), NUM_PERM), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for p in range(NUM_PERM):
+            # 乘法-移位哈希：取高32位，先求最小值再移位结果相同
+            result[:, p] = np.minimum.reduceat(grams * _A[p] + _B[p], starts)
+    return (result >> np.uint64(32)).astype(np.uint32)
+
+def band_hashes(signature: np.ndarray) -> np.ndarray:
+    """One 32-bit bucket per band (n × BANDS, uint32)"""
+    rows = signature.reshape(len(signature), BANDS, ROWS).astype(np.uint64)
+    with np.errstate(over="ignore"):
+        mixed = (rows * _BAND_MIX).sum(axis=2)
+    return ((mixed ^ (mixed >> np.uint64(29))) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+class BandRun:
+    """Papers and their band hashes, sorted once per band for binary search"""
+
+    def __init__(self, papers: np.ndarray, bands: np.ndarray):
+        self.papers = papers
+        self.bands = bands
+        columns = np.ascontiguousarray(bands.T)
+        self.order = np.argsort(columns, axis=1)
+        self.sorted = np.take_along_axis(columns, self.order, axis=1)
+
+    def __len__(self):
+        return len(self.papers)
+
+    def candidates(self, bands: np.ndarray, found: list):
+        for j in range(BANDS):
+            lo = np.searchsorted(self.sorted[j], bands[:, j], side="left")
+            hi = np.searchsorted(self.sorted[j], bands[:, j], side="right")
+            for i in np.flatnonzero(hi > lo):
+                found[i].update(self.papers[self.order[j, lo[i]:hi[i]]].tolist())
+
+class BandIndex:
+    """LSH buckets as a few sorted runs, merged like a binary counter as papers are added"""
+
+    def __init__(self, papers: np.ndarray, bands: np.ndarray):
+        self.runs = [BandRun(papers, bands)] if len(papers) else []
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    def candidates(self, bands: np.ndarray) -> list:
+        """Papers sharing at least one band with each row of ``bands``"""
+        found = [set() for _ in range(len(bands))]
+        for run in self.runs:
+            run.candidates(bands, found)
+        return found
+
+    def add(self, papers: list, bands: np.ndarray):
+        run = BandRun(np.asarray(papers, dtype=np.int64), bands)
+        # 新的一段不小于前一段的一半时合并：段数保持在 O(log n)，每篇论文只被重排 O(log n) 次
+        while self.runs and len(self.runs[-1]) <= 2 * len(run):
+            last = self.runs.pop()
+            run = BandRun(np.concatenate([last.papers, run.papers]), np.concatenate([last.bands, run.bands]))
+        self.runs.append(run)
+
+def _shared_buckets(bands: np.ndarray) -> dict:
+    """Rows of a batch sharing a band bucket with earlier rows: row -> earlier rows"""
+    earlier = {}
+    for j in range(BANDS):
+        _, inverse, counts = np.unique(bands[:, j], return_inverse=True, return_counts=True)
+        for group in np.flatnonzero(counts > 1):
+            rows = np.flatnonzero(inverse == group).tolist()
+            for k in range(1, len(rows)):
+                earlier.setdefault(rows[k], set()).update(rows[:k])
+    return earlier
+
+class DedupIndex:
+    """Clusters of near-duplicate papers and their versions, kept in step with the paper store"""
+
+    def __init__(self, path: str, threshold: float = THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._bands = None
+        self._loaded = 0
+        self._data_version = None
+        self.stats = {"days_indexed": 0, "papers_indexed": 0, "duplicates_found": 0,
+                      "candidates_checked": 0, "index_time": 0.0, "lookups": 0}
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # ---- 分带索引 ----
+
+    def _band_index(self) -> BandIndex:
+        """The in-memory buckets, loaded once and topped up with papers other processes added"""
+        data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._bands is None:
+            papers, bands = self._load_bands(0)
+            self._bands = BandIndex(papers, bands)
+        elif data_version != self._data_version:
+            papers, bands = self._load_bands(self._loaded)
+            if len(papers):
+                self._bands.add(papers.tolist(), bands)
+        self._data_version = data_version
+        return self._bands
+
+    def _load_bands(self, after: int) -> tuple:
+        rows = self.conn.execute("SELECT paper, bands FROM signatures WHERE paper > ? ORDER BY paper",
+                                 (after,)).fetchall()
+        papers = np.array([paper for paper, _ in rows], dtype=np.int64)
+        bands = np.frombuffer(b"".join(blob for _, blob in rows), dtype=np.uint32).reshape(-1, BANDS)
+        if rows:
+            self._loaded = rows[-1][0]
+        return papers, bands
+
+    def _texts(self, papers) -> dict:
+        texts = {}
+        papers = list(papers)
+        for start in range(0, len(papers), 500):
+            chunk = papers[start:start + 500]
+            for paper, title, abstract, cluster in self.conn.execute(
+                    f"SELECT paper, title, abstract, cluster FROM papers WHERE paper IN ({', '.join('?' * len(chunk))})",
+                    chunk):
+                texts[paper] = [title, abstract, cluster]
+        return texts
+
+    def _similarity(self, title: str, abstract, other: list, cache: dict) -> float:
+        def grams(text):
+            if text not in cache:
+                cache[text] = shingles(normalize(text))
+            return cache[text]
+        if abstract and other[1]:
+            return jaccard(grams(f"{title} {abstract}"), grams(f"{other[0]} {other[1]}"))
+        return jaccard(grams(title), grams(other[0]))
+
+    # ---- 索引 ----
+
+    def update(self, store, category: str) -> dict:
+        """Index the days of a category that are new or changed in the store.
+
+        Returns how many days and new papers were indexed and how many of
+        those papers are near-duplicates of an earlier one.
+        """
+        with self._lock:
+            indexed = dict(self.conn.execute(
+                "SELECT date, digest FROM indexed_days WHERE category = ?", (category,)).fetchall())
+            stale = [day for day in store.list_days(category) if indexed.get(day["date"]) != day["digest"]]
+            counts = {"days": len(stale), "papers": 0, "duplicates": 0}
+            if not stale:
+                return counts
+            start = time.perf_counter()
+            self._band_index()
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for day in stale:
+                    day_counts = self._index_day(category, day["date"], store.get_records(category, day["date"]),
+                                                 new_day=day["date"] not in indexed)
+                    counts["papers"] += day_counts["papers"]
+                    counts["duplicates"] += day_counts["duplicates"]
+                    self.conn.execute("INSERT OR REPLACE INTO indexed_days (category, date, digest) VALUES (?, ?, ?)",
+                                      (category, day["date"], day["digest"]))
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                # 内存中的分带可能已经加入了回滚掉的论文，下次重新加载
+                self._bands = None
+                raise
+            elapsed = time.perf_counter() - start
+            self.stats["days_indexed"] += counts["days"]
+            self.stats["papers_indexed"] += counts["papers"]
+            self.stats["duplicates_found"] += counts["duplicates"]
+            self.stats["index_time"] += elapsed
+            log_debug(f"Indexed {counts['days']} days / {counts['papers']} papers of {category} "
+                      f"in {elapsed:.2f}s, {counts['duplicates']} near-duplicates")
+            return counts
+
+    def _index_day(self, category: str, date: str, records: list, new_day: bool = True) -> dict:
+        keys = [record.get("arxiv_id") or legacy_id(record["title"]) for record in records]
+        known = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            for row in self.conn.execute(
+                    f"SELECT key, paper, title, abstract, first_date FROM papers WHERE key IN ({', '.join('?' * len(chunk))})",
+                    chunk):
+                known[row[0]] = row[1:]
+        if new_day:
+            # 已索引过的日子重新索引时，记录里是论文的最新版本（替换版本改变了旧日子的摘要），
+            # 不是那天列出的版本；替换版本总会列在它自己的新日子里
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO versions (key, version, category, date) VALUES (?, ?, ?, ?)",
+                [(key, record["version"], category, date) for key, record in zip(keys, records)
+                 if record.get("version") is not None])
+
+        pending, queued = [], set()
+        for key, record in zip(keys, records):
+            abstract = record.get("abstract") or None
+            normalized = normalize(record["title"])
+            if key in queued or not normalized:
+                continue
+            queued.add(key)
+            if key in known:
+                paper, title, old_abstract, first_date = known[key]
+                if date < first_date:
+                    # 补抓的更早日期
+                    self.conn.execute("UPDATE papers SET first_date = ?, first_category = ? WHERE paper = ?",
+                                      (date, category, paper))
+                if title == record["title"] and old_abstract == abstract:
+                    continue
+                pending.append((key, record["title"], abstract, paper, normalized))
+            else:
+                pending.append((key, record["title"], abstract, None, normalized))
+        if not pending:
+            return {"papers": 0, "duplicates": 0}
+
+        bands = band_hashes(signatures([item[4] for item in pending]))
+        index = self._band_index()
+        candidates = index.candidates(bands)
+        texts = self._texts(set().union(*candidates))
+        earlier = _shared_buckets(bands)
+        cache = {}
+        next_paper = self.conn.execute("SELECT COALESCE(MAX(paper), 0) + 1 FROM papers").fetchone()[0]
+        added, changed, papers = [], [], []
+        counts = {"papers": 0, "duplicates": 0}
+        for i, (key, title, abstract, paper, _) in enumerate(pending):
+            # 同一天里先处理的论文也要参与比较
+            found = candidates[i].union(papers[row] for row in earlier.get(i, ()))
+            found.discard(paper)
+            self.stats["candidates_checked"] += len(found)
+            missing = [candidate for candidate in found if candidate not in texts]
+            if missing:
+                texts.update(self._texts(missing))
+            clusters = {texts[candidate][2] for candidate in found
+                        if self._similarity(title, abstract, texts[candidate], cache) >= self.threshold}
+            if clusters:
+                counts["duplicates"] += 1
+            if paper is None:
+                paper = next_paper
+                next_paper += 1
+                counts["papers"] += 1
+            else:
+                # 改了标题的新版本仍是同一篇论文，保留原来的簇
+                clusters.add(self.conn.execute("SELECT cluster FROM papers WHERE paper = ?", (paper,)).fetchone()[0])
+            cluster = min(clusters) if clusters else paper
+            merged = sorted(clusters - {cluster})
+            if merged:
+                self._merge_clusters(cluster, merged, texts)
+            texts[paper] = [title, abstract, cluster]
+            (changed if pending[i][3] is not None else added).append((paper, key, title, abstract))
+            papers.append(paper)
+
+        # 同一批里后来合并的簇以 texts 中的为准
+        self.conn.executemany(
+            "INSERT INTO papers (paper, key, title, abstract, cluster, first_date, first_category) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(paper, key, title, abstract, texts[paper][2], date, category) for paper, key, title, abstract in added])
+        self.conn.executemany(
+            "UPDATE papers SET title = ?, abstract = ?, cluster = ? WHERE paper = ?",
+            [(title, abstract, texts[paper][2], paper) for paper, _, title, abstract in changed])
+        self.conn.executemany("INSERT OR REPLACE INTO signatures (paper, bands) VALUES (?, ?)",
+                              [(paper, bands[i].tobytes()) for i, paper in enumerate(papers)])
+        index.add(papers, bands)
+        self._loaded = max(self._loaded, max(papers))
+        return counts
+
+    def _merge_clusters(self, cluster: int, merged: list, texts: dict):
+        """Fold ``merged`` clusters into ``cluster``, in the table and in the loaded texts"""
+        self.conn.execute(f"UPDATE papers SET cluster = ? WHERE cluster IN ({', '.join('?' * len(merged))})",
+                          [cluster] + merged)
+        merged = set(merged)
+        for text in texts.values():
+            if text[2] in merged:
+                text[2] = cluster
+
+    # ---- 查询 ----
+
+    def find(self, title: str, abstract: str = None) -> list:
+        """Stored papers whose title (and abstract) is a near-duplicate of the given one"""
+        with self._lock:
+            self.stats["lookups"] += 1
+            bands = band_hashes(signatures([normalize(title)]))
+            found = self._band_index().candidates(bands)[0]
+            texts = self._texts(found)
+            self.stats["candidates_checked"] += len(found)
+            cache, matches = {}, []
+            for paper, text in texts.items():
+                similarity = self._similarity(title, abstract, text, cache)
+                if similarity >= self.threshold:
+                    matches.append({"paper": paper, "similarity": round(similarity, 4), "cluster": text[2]})
+            return sorted(matches, key=lambda match: -match["similarity"])
+
+    def paper(self, key: str):
+        with self._lock:
+            row = self.conn.execute("SELECT paper, cluster FROM papers WHERE key = ?", (key,)).fetchone()
+        return None if row is None else {"paper": row[0], "cluster": row[1]}
+
+    def cluster_members(self, cluster: int) -> list:
+        """Every paper of a cluster with its first listing and versions, oldest first"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT paper, key, title, first_date, first_category FROM papers WHERE cluster = ? "
+                "ORDER BY first_date, paper", (cluster,)).fetchall()
+            versions = {}
+            for key, version, category, date in self.conn.execute(
+                    "SELECT v.key, v.version, v.category, v.date FROM versions v JOIN papers p ON p.key = v.key "
+                    "WHERE p.cluster = ? ORDER BY v.key, v.version", (cluster,)):
+                versions.setdefault(key, []).append({"version": version, "date": date, "category": category})
+        return [{"paper": paper,
+                 "arxiv_id": None if key.startswith("legacy:") else key,
+                 "title": title,
+                 "first_date": first_date,
+                 "first_category": first_category,
+                 "versions": versions.get(key, [])}
+                for paper, key, title, first_date, first_category in rows]
+
+    def clusters(self, keys: list) -> dict:
+        """key -> (cluster, first date of the cluster, key first listed in it) for the stored keys"""
+        with self._lock:
+            found = {}
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                found.update((key, cluster) for key, cluster in self.conn.execute(
+                    f"SELECT key, cluster FROM papers WHERE key IN ({', '.join('?' * len(chunk))})", chunk))
+            clusters = sorted(set(found.values()))
+            first = {}
+            for start in range(0, len(clusters), 500):
+                chunk = clusters[start:start + 500]
+                for cluster, date, key in self.conn.execute(
+                        "SELECT cluster, first_date, key FROM papers "
+                        f"WHERE cluster IN ({', '.join('?' * len(chunk))}) ORDER BY first_date DESC, paper DESC",
+                        chunk):
+                    # 倒序遍历，最后留下的是最早的
+                    first[cluster] = (date, key)
+        return {key: (cluster,) + first[cluster] for key, cluster in found.items()}
+
+    def duplicates_of_day(self, date: str, keys: list) -> dict:
+        """Positions of a day's listing that repeat earlier work: position -> (first key, first date).
+
+        A paper is a repeat when its cluster was listed on an earlier day (a
+        replacement, a later cross-list or a resubmission), or earlier in the
+        same listing.
+        """
+        clusters = self.clusters(keys)
+        seen = {}
+        duplicates = {}
+        for position, key in enumerate(keys):
+            if key not in clusters:
+                continue
+            cluster, first_date, first_key = clusters[key]
+            if first_date < date:
+                duplicates[position] = (first_key, first_date)
+            elif cluster in seen:
+                duplicates[position] = (seen[cluster], date)
+            else:
+                seen[cluster] = key
+        return duplicates
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            days, papers, clusters = self.conn.execute(
+                "SELECT (SELECT COUNT(*) FROM indexed_days), COUNT(*), COUNT(DISTINCT cluster) FROM papers").fetchone()
+        return dict(self.stats, index_time=round(self.stats["index_time"], 3), days=days, papers=papers,
+                    clusters=clusters, loaded=0 if self._bands is None else len(self._bands))
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def open_dedup_index(base_dir: str) -> DedupIndex:
+    """Process-wide dedup index of a base directory"""
+    path = os.path.join(base_dir, DEDUP_DB_FILENAME)
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = DedupIndex(path)
+        return index
+
+def close_dedup_indexes():
+    with _indexes_lock:
+        for index in _indexes.values():
+            index.close()
+        _indexes.clear()
+
+def update_dedup_index(base_dir: str, categories=CATEGORIES) -> dict:
+    """Bring the index up to date with the store; returns the counts per category"""
+    store = open_store(base_dir)
+    index = open_dedup_index(base_dir)
+    return {category: index.update(store, category) for category in categories}
+
+def day_duplicates(base_dir: str, category: str, date: str, keys: list) -> dict:
+    """Positions of a stored day's listing that repeat earlier work (see ``DedupIndex.duplicates_of_day``)"""
+    index = open_dedup_index(base_dir)
+    index.update(open_store(base_dir), category)
+    return index.duplicates_of_day(date, keys)
+
+def collapse_hits(base_dir: str, hits: list) -> list:
+    """Keep the best-ranked hit of every cluster; the others are listed under ``duplicates``"""
+    index = open_dedup_index(base_dir)
+    store = open_store(base_dir)
+    for category in sorted({category for hit in hits for category in hit.get("listed_in") or ()} & set(CATEGORIES)):
+        index.update(store, category)
+    keys = [hit["arxiv_id"] or legacy_id(hit["title"]) for hit in hits]
+    clusters = index.clusters(keys)
+    kept, by_cluster = [], {}
+    for key, hit in zip(keys, hits):
+        cluster = clusters.get(key, (key,))[0]
+        if cluster in by_cluster:
+            by_cluster[cluster].setdefault("duplicates", []).append(
+                {"arxiv_id": hit["arxiv_id"], "title": hit["title"], "date": hit.get("date")})
+            continue
+        by_cluster[cluster] = hit
+        kept.append(hit)
+    return kept
+
+def _find_duplicates(base_dir: str, arxiv_id: str, title: str) -> dict:
+    index = open_dedup_index(base_dir)
+    store = open_store(base_dir)
+    for category in CATEGORIES:
+        index.update(store, category)
+    if arxiv_id:
+        paper = index.paper(arxiv_id)
+        if paper is None:
+            raise LookupError(f"{arxiv_id} is not in the stored listings")
+        members = index.cluster_members(paper["cluster"])
+        for member in members:
+            member["query"] = member["paper"] == paper["paper"]
+        clusters = [members]
+    else:
+        matches = index.find(title)
+        similarity = {match["paper"]: match["similarity"] for match in matches}
+        clusters = []
+        for cluster in dict.fromkeys(match["cluster"] for match in matches):
+            members = index.cluster_members(cluster)
+            for member in members:
+                member["similarity"] = similarity.get(member["paper"])
+            clusters.append(members)
+    for members in clusters:
+        for member in members:
+            del member["paper"]
+    return {"arxiv_id": arxiv_id, "title": title, "threshold": index.threshold,
+            "clusters": [{"size": len(members), "first_date": members[0]["first_date"], "papers": members}
+                         for members in clusters]}
+
+async def find_duplicates(base_dir: str, arxiv_id: str = None, title: str = None) -> dict:
+    """Near-duplicates and versions of a stored paper (by arXiv id) or of any title.
+
+    Returns the matching clusters, each paper with its first listing day and
+    the day each of its versions was first seen
+    """
+    try:
+        if not arxiv_id and not (title and title.strip()):
+            raise ValueError("Pass an arXiv id or a title")
+        if title and not normalize(title):
+            raise ValueError(f"Title {title!r} has no words to compare")
+        data = await run_blocking(_find_duplicates, base_dir, arxiv_id, title)
+        papers = sum(cluster["size"] for cluster in data["clusters"])
+        return {
+            "success": True,
+            "message": f"{papers} papers in {len(data['clusters'])} clusters",
+            "data": data
+        }
+    except Exception as e:
+        log_debug(f"Error in find_duplicates: {str(e)}")
+        return {
+            "success": False,
+            "message": "Failed to find duplicates",
+            "error": str(e)
+        }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--base-dir", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument("--categories", nargs="+", default=list(CATEGORIES))
+    args = parser.parse_args()
+    for category in args.categories:
+        validate_category(category)
+
+    start = time.perf_counter()
+    counts = update_dedup_index(args.base_dir, args.categories)
+    index = open_dedup_index(args.base_dir)
+    stats = index.get_stats()
+    print(f"Indexed {sum(c['days'] for c in counts.values())} days / {sum(c['papers'] for c in counts.values())} "
+          f"papers into {index.path} in {time.perf_counter() - start:.2f}s: "
+          f"{stats['papers']} papers in {stats['clusters']} clusters")
+    close_dedup_indexes()
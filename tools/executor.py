@@ -0,0 +1,70 @@
+"""Bounded thread pool for the blocking parts of the async tool handlers.
+
+SQLite queries, file reads/writes and HTML parsing are synchronous; running
+them directly in a coroutine stalls every other MCP request on the event
+loop.  ``run_blocking`` hands them to at most ``ARXIV_IO_WORKERS`` threads.
+CPU-bound work that holds the GIL (HTML parsing) goes through ``run_cpu``
+instead, which can use ``ARXIV_CPU_WORKERS`` processes (off by default).
+"""
+import os
+import asyncio
+import functools
+import contextvars
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+IO_WORKERS = int(os.environ.get("ARXIV_IO_WORKERS", "4"))
+# 进程池需要显式开启：0（默认）时 run_cpu 用I/O线程池。spawn 的子进程会重新导入主模块，
+# 启动慢、占内存，只在多核机器上解析大量页面时才值得
+CPU_WORKERS = int(os.environ.get("ARXIV_CPU_WORKERS", "0"))
+
+_executor = None
+_process_executor = None
+_executor_lock = threading.Lock()
+# 仅用于性能对比：为 True 时直接在事件循环里执行（旧行为）
+inline = False
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="arxiv-io")
+        return _executor
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a blocking call in the I/O pool and await its result"""
+    if inline:
+        return fn(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    # 带上当前上下文，线程里开的 span 才能挂到调用方的 span 下面
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_executor(), functools.partial(context.run, fn, *args, **kwargs))
+
+def get_process_executor() -> ProcessPoolExecutor:
+    global _process_executor
+    with _executor_lock:
+        if _process_executor is None:
+            # spawn：不在多线程的服务进程里 fork
+            _process_executor = ProcessPoolExecutor(max_workers=CPU_WORKERS,
+                                                    mp_context=multiprocessing.get_context("spawn"))
+        return _process_executor
+
+async def run_cpu(fn, *args, **kwargs):
+    """Run a CPU-bound call in the process pool (``fn`` and its arguments must pickle)"""
+    if inline:
+        return fn(*args, **kwargs)
+    if CPU_WORKERS <= 0:
+        return await run_blocking(fn, *args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_executor(), functools.partial(fn, *args, **kwargs))
+
+def shutdown():
+    global _executor, _process_executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+        if _process_executor is not None:
+            _process_executor.shutdown(wait=False, cancel_futures=True)
+            _process_executor = None
@@ -0,0 +1,223 @@
+import os
+import asyncio
+import logging
+import httpx
+from tools.browser_profile import (READY_SELECTOR, BlockStats, StageTimer, get_profile,
+                                   install_blocking, launch_options)
+
+logger = logging.getLogger(__name__)
+
+def log_debug(message):
+    """Write debug message to log file"""
+    logger.debug(message)
+
+# 可以通过环境变量指向本地的替身服务器（见 benchmarks/fixture_server.py）
+ARXIV_BASE_URL = os.environ.get("ARXIV_BASE_URL", "https://arxiv.org")
+
+DEFAULT_HEADERS = {
+    "User-Agent": "arxiv_demo1/0.1 (+https://github.com/lemonhall/arxiv_demo1)",
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+def listing_url(category: str = "cs.AI", show: int = 250, base_url: str = None, skip: int = 0) -> str:
+    """Build the URL of (one page of) the recent listing page for a category"""
+    url = f"{(base_url or ARXIV_BASE_URL).rstrip('/')}/list/{category}/recent"
+    if skip:
+        return f"{url}?skip={skip}&show={show}"
+    return f"{url}?show={show}"
+
+def archive_url(category: str, day: str, show: int = 250, base_url: str = None, skip: int = 0) -> str:
+    """Build the URL of (one page of) the listing announced on a past day (YYYY-MM-DD)"""
+    url = f"{(base_url or ARXIV_BASE_URL).rstrip('/')}/catchup/{category}/{day}"
+    if skip:
+        return f"{url}?skip={skip}&show={show}"
+    return f"{url}?show={show}"
+
+class HttpFetcher:
+    """Fetch listing pages with a plain async HTTP client.
+
+    The arXiv listing pages are static HTML, so no browser is needed.
+    """
+
+    name = "http"
+
+    def __init__(self, timeout: float = 30.0, headers: dict = None):
+        self.timeout = timeout
+        self.headers = dict(DEFAULT_HEADERS, **(headers or {}))
+        self._client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def fetch(self, url: str) -> str:
+        log_debug(f"GET {url}")
+        response = await self._get_client().get(url)
+        response.raise_for_status()
+        return response.text
+
+    async def fetch_if_changed(self, url: str, validators: dict = None) -> tuple:
+        """Conditional GET with ETag / Last-Modified.
+
+        Returns ``(None, validators)`` on 304 Not Modified, else the page and
+        the validators of the new response.
+        """
+        validators = validators or {}
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        log_debug(f"GET {url} (conditional: {bool(headers)})")
+        response = await self._get_client().get(url, headers=headers)
+        if response.status_code == 304:
+            return None, validators
+        response.raise_for_status()
+        new_validators = {"etag": response.headers.get("ETag"),
+                          "last_modified": response.headers.get("Last-Modified")}
+        return response.text, {key: value for key, value in new_validators.items() if value}
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+class PlaywrightFetcher:
+    """Fetch listing pages through a persistent Chromium profile.
+
+    Opt-in fallback for when the plain HTTP path is blocked; returns the
+    rendered page HTML so both backends share the same parser.  When a
+    ``BrowserPool`` is passed, pages are leased from its warm browser and
+    closing the fetcher leaves the browser running.
+
+    ``profile`` names a ``tools.browser_profile`` profile (default
+    ``ARXIV_BROWSER_PROFILE``); ``headless`` and ``slow_mo`` override it.
+    ``timer`` holds the time spent launching, navigating, extracting and
+    closing.
+    """
+
+    name = "playwright"
+
+    def __init__(self, user_data_dir: str, headless: bool = None, slow_mo: int = None,
+                 timeout: float = 30.0, error_screenshot: str = None, pool=None, profile: str = None):
+        self.user_data_dir = user_data_dir
+        self.pool = pool
+        self.profile = get_profile(profile)
+        if headless is not None:
+            self.profile["headless"] = headless
+        if slow_mo is not None:
+            self.profile["slow_mo"] = slow_mo
+        self.timeout = timeout
+        self.error_screenshot = error_screenshot
+        self.timer = StageTimer()
+        self.block_stats = BlockStats()
+        self._playwright = None
+        self._context = None
+        self._launch_lock = asyncio.Lock()
+
+    async def _ensure_context(self):
+        async with self._launch_lock:
+            if self._context is not None:
+                return self._context
+            from playwright.async_api import async_playwright
+
+            log_debug(f"Launching browser ({self.profile['name']} profile)...")
+            with self.timer.stage("launch"):
+                self._playwright = await async_playwright().start()
+                # 使用持久化上下文
+                self._context = await self._playwright.chromium.launch_persistent_context(
+                    user_data_dir=self.user_data_dir,
+                    **launch_options(self.profile),
+                )
+                if self.profile["block"]:
+                    await install_blocking(self._context, self.block_stats)
+            return self._context
+
+    async def fetch(self, url: str) -> str:
+        if self.pool is not None:
+            async with self.pool.page() as page:
+                return await self._fetch_page(page, url)
+
+        context = await self._ensure_context()
+        page = await context.new_page()
+        try:
+            return await self._fetch_page(page, url)
+        finally:
+            await page.close()
+
+    async def fetch_if_changed(self, url: str, validators: dict = None) -> tuple:
+        """The browser cannot send conditional requests; always fetches"""
+        return await self.fetch(url), {}
+
+    async def _fetch_page(self, page, url: str) -> str:
+        page.set_default_timeout(self.timeout * 1000)
+        try:
+            log_debug(f"Navigating to {url}")
+            with self.timer.stage("goto"):
+                response = await page.goto(url, wait_until="domcontentloaded")
+            with self.timer.stage("extract"):
+                # 等列表标题出现再取页面，错误页（如404）直接返回交给解析器
+                if response is None or response.ok:
+                    await page.wait_for_selector(READY_SELECTOR, state="attached")
+                return await page.content()
+        except Exception:
+            # 保存错误截图
+            if self.error_screenshot:
+                try:
+                    await page.screenshot(path=self.error_screenshot)
+                except Exception as screenshot_error:
+                    log_debug(f"Failed to save error screenshot: {str(screenshot_error)}")
+            raise
+
+    def get_stats(self) -> dict:
+        """Stage timings (ms) and blocked request counts"""
+        return {"profile": self.profile["name"], "stages": self.timer.get_stats(),
+                "requests": self.block_stats.get_stats()}
+
+    async def close(self):
+        if self._context is None and self._playwright is None:
+            return
+        with self.timer.stage("close"):
+            if self._context is not None:
+                log_debug("Closing browser...")
+                await self._context.close()
+                self._context = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+        log_debug(f"Browser stages: {self.timer.format()}")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+BACKENDS = ("http", "playwright")
+
+def create_fetcher(backend: str, base_dir: str, pool=None):
+    """Create the fetch backend by name ("http" or "playwright").
+
+    ``pool`` is an optional ``BrowserPool`` the playwright backend leases pages from.
+    """
+    if backend == "http":
+        return HttpFetcher()
+    if backend == "playwright":
+        return PlaywrightFetcher(
+            user_data_dir=os.path.join(base_dir, "chrome_data"),
+            error_screenshot=os.path.join(base_dir, "arxiv_error.png"),
+            pool=pool,
+        )
+    raise ValueError(f"Unknown fetch backend: {backend} (expected one of {', '.join(BACKENDS)})")
@@ -0,0 +1,77 @@
+"""Per-client limit on concurrent tool calls.
+
+Over SSE or streamable HTTP one server process serves many MCP clients.
+``ClientLimiter`` gives every client session its own semaphore, so one agent
+firing dozens of calls at once queues behind itself instead of starving the
+others.  It also counts the calls in flight so shutdown can refuse new calls
+and wait for the running ones.
+"""
+import time
+import asyncio
+import logging
+import weakref
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+def log_debug(message):
+    """Write debug message to log file"""
+    logger.debug(message)
+
+class _NoSession:
+    """Key for calls made outside an MCP request"""
+
+class ClientLimiter:
+    """At most ``max_concurrent`` tool calls per client session at a time"""
+
+    def __init__(self, max_concurrent: int = 4):
+        self.max_concurrent = max(1, max_concurrent)
+        # 会话结束后对应的信号量随之回收
+        self._slots = weakref.WeakKeyDictionary()
+        self._no_session = _NoSession()
+        self._in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.closing = False
+        self.stats = {"calls": 0, "queued": 0, "refused": 0, "wait_time": 0.0, "max_in_flight": 0}
+
+    @asynccontextmanager
+    async def slot(self, client=None):
+        if self.closing:
+            self.stats["refused"] += 1
+            raise RuntimeError("Server is shutting down")
+        client = self._no_session if client is None else client
+        semaphore = self._slots.get(client)
+        if semaphore is None:
+            semaphore = self._slots[client] = asyncio.Semaphore(self.max_concurrent)
+        if semaphore.locked():
+            self.stats["queued"] += 1
+            log_debug(f"Client {id(client):x} has {self.max_concurrent} calls running, queueing")
+        # 排队中的调用也算进行中，停止服务时同样等它们执行完
+        self._in_flight += 1
+        self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self._in_flight)
+        self._idle.clear()
+        start = time.monotonic()
+        try:
+            async with semaphore:
+                self.stats["wait_time"] += time.monotonic() - start
+                self.stats["calls"] += 1
+                yield
+        finally:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """Refuse new calls and wait until none is running; False if some still were after ``timeout``"""
+        self.closing = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"{self._in_flight} tool calls still running after {timeout}s")
+            return False
+
+    def get_stats(self) -> dict:
+        return dict(self.stats, wait_time=round(self.stats["wait_time"], 3), in_flight=self._in_flight,
+                    clients=len(self._slots), max_concurrent=self.max_concurrent, closing=self.closing)
@@ -0,0 +1,259 @@
+from html.parser import HTMLParser
+from datetime import datetime
+from urllib.parse import urljoin
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+def log_debug(message):
+    """Write debug message to log file"""
+    logger.debug(message)
+
+DATE_RE = re.compile(r'^([A-Za-z]{3},\s\d{1,2}\s[A-Za-z]{3}\s\d{4})')
+COUNT_RE = re.compile(r'showing (?:first )?\d+ of (\d+) entries')
+ABS_HREF_RE = re.compile(r'^.*/abs/')
+VERSION_RE = re.compile(r'v(\d+)/?$')
+SUBJECT_CODE_RE = re.compile(r'\(([a-z\-]+(?:\.[A-Za-z\-]+)?)\)')
+
+ARXIV_URL = "https://arxiv.org"
+
+# dd 中需要提取的字段: div的class -> 记录中的字段名
+FIELD_CLASSES = {
+    "list-title": "title",
+    "list-authors": "authors",
+    "list-comments": "comments",
+    "list-journal-ref": "journal_ref",
+    "list-subjects": "subjects",
+}
+
+def parse_header(h3_text: str) -> dict:
+    """Parse the listing h3 header, e.g. "Wed, 2 Apr 2025 (showing first 250 of 340 entries )".
+
+    Returns the raw arXiv date, the date formatted as YYYY-MM-DD and the total entry count.
+    """
+    h3_text = h3_text.strip()
+    date_match = DATE_RE.search(h3_text)
+    if not date_match:
+        raise Exception(f"Could not extract date from text: {h3_text}")
+
+    arxiv_date_str = date_match.group(1)
+
+    # 将arXiv日期转换为标准格式
+    try:
+        formatted_date = datetime.strptime(arxiv_date_str, "%a, %d %b %Y").strftime("%Y-%m-%d")
+    except ValueError as e:
+        log_debug(f"Date format conversion failed, using original string: {str(e)}")
+        formatted_date = arxiv_date_str.replace(",", "").replace(" ", "_")
+
+    count_match = COUNT_RE.search(h3_text)
+    if not count_match:
+        raise Exception(f"Could not parse paper count")
+
+    return {
+        "raw": h3_text,
+        "arxiv_date": arxiv_date_str,
+        "date": formatted_date,
+        "total_entries": int(count_match.group(1)),
+    }
+
+def _clean(parts) -> str:
+    return " ".join("".join(parts).split())
+
+class _ListingParser(HTMLParser):
+    """Single sweep over a listing page.
+
+    Collects the first ``dl#articles > h3`` header and one record per entry
+    that follows it (links from the ``dt``, title, authors, comments,
+    journal-ref and subjects from the ``dd``), stopping at the next day's h3.
+    """
+
+    def __init__(self, base_url: str = ARXIV_URL):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.in_articles = False
+        self.header_text = None
+        self.entries = []
+        self._entry = None
+        self._h3_parts = None
+        self._field = None
+        self._field_parts = None
+        self._field_depth = 0
+        self._descriptor_depth = 0
+        self._primary_parts = None
+        self._primary = None
+        self._author_parts = None
+        self._authors = None
+        self._done = False
+
+    def handle_starttag(self, tag, attrs):
+        if self._done:
+            return
+        attrs = dict(attrs)
+        if tag == "dl" and attrs.get("id") == "articles":
+            self.in_articles = True
+        elif not self.in_articles:
+            return
+        elif tag == "h3":
+            if self.header_text is not None:
+                # 下一天的列表开始
+                self._finish()
+                return
+            self._h3_parts = []
+        elif self._field is not None:
+            self._field_start(tag, attrs)
+        elif tag == "dt":
+            self._flush_entry()
+            self._entry = {}
+            self._primary = None
+        elif tag == "a" and self._entry is not None:
+            self._link(attrs)
+        elif tag == "div" and self._entry is not None:
+            for cls in (attrs.get("class") or "").split():
+                if cls in FIELD_CLASSES:
+                    self._field = FIELD_CLASSES[cls]
+                    self._field_parts = []
+                    self._field_depth = 1
+                    self._authors = [] if self._field == "authors" else None
+                    break
+
+    def _link(self, attrs):
+        href = attrs.get("href") or ""
+        title = attrs.get("title")
+        if title == "Abstract" and "arxiv_id" not in self._entry:
+            self._entry["arxiv_id"] = ABS_HREF_RE.sub("", href).strip() or attrs.get("id")
+            self._entry["abs_url"] = urljoin(self.base_url, href.strip())
+        elif title == "Download PDF":
+            self._entry["pdf_url"] = urljoin(self.base_url, href.strip())
+        elif title == "View HTML":
+            version = VERSION_RE.search(href)
+            if version:
+                self._entry["version"] = int(version.group(1))
+
+    def _field_start(self, tag, attrs):
+        classes = (attrs.get("class") or "").split()
+        if tag == "div":
+            self._field_depth += 1
+        elif tag == "span" and "descriptor" in classes:
+            self._descriptor_depth = 1
+        elif self._descriptor_depth and tag == "span":
+            self._descriptor_depth += 1
+        elif tag == "span" and "primary-subject" in classes:
+            self._primary_parts = []
+        elif tag == "a" and self._authors is not None:
+            self._author_parts = []
+
+    def handle_endtag(self, tag):
+        if self._done:
+            return
+        if tag == "h3" and self._h3_parts is not None:
+            self.header_text = "".join(self._h3_parts)
+            self._h3_parts = None
+        elif self._field is not None:
+            if tag == "span" and self._descriptor_depth:
+                self._descriptor_depth -= 1
+            elif tag == "span" and self._primary_parts is not None:
+                self._primary = _clean(self._primary_parts)
+                self._primary_parts = None
+            elif tag == "a" and self._author_parts is not None:
+                self._authors.append(_clean(self._author_parts))
+                self._author_parts = None
+            elif tag == "div":
+                self._field_depth -= 1
+                if self._field_depth == 0:
+                    self._end_field()
+        elif tag == "dd":
+            self._flush_entry()
+        elif tag == "dl" and self.in_articles and self.header_text is not None:
+            self._finish()
+
+    def handle_data(self, data):
+        if self._h3_parts is not None:
+            self._h3_parts.append(data)
+        elif self._field is not None and not self._descriptor_depth:
+            self._field_parts.append(data)
+            if self._primary_parts is not None:
+                self._primary_parts.append(data)
+            if self._author_parts is not None:
+                self._author_parts.append(data)
+
+    def _end_field(self):
+        text = _clean(self._field_parts)
+        if self._field == "title":
+            self._entry["title"] = text.replace("Title:", "", 1).strip()
+        elif self._field == "authors":
+            self._entry["authors"] = self._authors or [a.strip() for a in text.split(",") if a.strip()]
+        elif self._field == "subjects":
+            codes = SUBJECT_CODE_RE.findall(text)
+            primary_codes = SUBJECT_CODE_RE.findall(self._primary) if self._primary else []
+            self._entry["primary_category"] = (primary_codes or codes or [None])[0]
+            self._entry["categories"] = list(dict.fromkeys(codes))
+        else:
+            self._entry[self._field] = text
+        self._field = None
+        self._field_parts = None
+        self._authors = None
+
+    def _flush_entry(self):
+        entry = self._entry
+        self._entry = None
+        if entry and "title" in entry:
+            self.entries.append({
+                "arxiv_id": entry.get("arxiv_id"),
+                "version": entry.get("version"),
+                "title": entry["title"],
+                "authors": entry.get("authors", []),
+                "primary_category": entry.get("primary_category"),
+                "categories": entry.get("categories", []),
+                "comments": entry.get("comments"),
+                "journal_ref": entry.get("journal_ref"),
+                "abs_url": entry.get("abs_url"),
+                "pdf_url": entry.get("pdf_url"),
+            })
+
+    def _finish(self):
+        self._flush_entry()
+        self._done = True
+
+def parse_listing(html: str, base_url: str = ARXIV_URL) -> dict:
+    """Parse an arXiv ``/list/<category>/recent`` page.
+
+    Returns the parsed header (see ``parse_header``) plus one record per
+    entry of the first day on the page (``arxiv_id``, ``version``, ``title``,
+    ``authors``, ``primary_category``, ``categories``, ``comments``,
+    ``journal_ref``, ``abs_url``, ``pdf_url``) and the plain list of titles.
+    """
+    parser = _ListingParser(base_url)
+    parser.feed(html)
+    parser.close()
+    parser._flush_entry()
+
+    if parser.header_text is None:
+        raise Exception("Could not find listing header (dl#articles > h3)")
+    log_debug(f"Raw text: {parser.header_text.strip()}")
+
+    result = parse_header(parser.header_text)
+    result["entries"] = parser.entries
+    result["titles"] = [entry["title"] for entry in parser.entries]
+    return result
+
+def merge_pages(pages: list) -> dict:
+    """Merge the parsed pages of one listing day, in listing order.
+
+    Entries are de-duplicated by arXiv id; pages of a different day than the
+    first one mean the listing changed in between.  Returns the first page's
+    header with all ``entries`` and ``titles``.
+    """
+    first = pages[0]
+    entries = []
+    seen = set()
+    for page in pages:
+        if page["date"] != first["date"]:
+            raise Exception(f"Listing changed while crawling: {first['date']} -> {page['date']}")
+        for entry in page["entries"]:
+            key = entry["arxiv_id"] or entry["title"]
+            if key in seen:
+                continue
+            seen.add(key)
+            entries.append(entry)
+    return dict(first, entries=entries, titles=[entry["title"] for entry in entries])
@@ -0,0 +1,56 @@
+"""Logging for the server: handlers run on a background thread behind a queue.
+
+Tool handlers only put records on an in-memory queue; a ``QueueListener``
+writes them to the log file and stderr (stdout carries the MCP stdio
+protocol).  The level comes from ``ARXIV_LOG_LEVEL`` and defaults to INFO.
+The file is appended to across restarts and rotated at ``ARXIV_LOG_MAX_BYTES``
+(10 MB), keeping ``ARXIV_LOG_BACKUPS`` old files.
+"""
+import os
+import queue
+import atexit
+import logging
+import logging.handlers
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_LEVEL = os.environ.get("ARXIV_LOG_LEVEL", "INFO").upper()
+LOG_MAX_BYTES = int(os.environ.get("ARXIV_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUPS = int(os.environ.get("ARXIV_LOG_BACKUPS", "3"))
+
+_listener = None
+
+def configure_logging(log_path: str = None, level: str = LOG_LEVEL, console: bool = True):
+    """Route the root logger through a queue to a file and/or stderr handler"""
+    global _listener
+    stop_logging()
+    for handler in logging.root.handlers[:]:
+        logging.root.removeHandler(handler)
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if log_path:
+        # 追加模式并按大小轮转：重启不会清掉上一次运行的日志，文件也不会无限增长
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_path, mode='a', maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8'))
+    if console:
+        handlers.append(logging.StreamHandler())  # 默认输出到 stderr
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    logging.root.addHandler(logging.handlers.QueueHandler(records))
+    logging.root.setLevel(level)
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def stop_logging():
+    """Flush the queue and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+atexit.register(stop_logging)
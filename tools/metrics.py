@@ -0,0 +1,362 @@
+"""In-process metrics and tracing for the server.
+
+Latency histograms (per tool and per stage of a crawl), counters and,
+optionally, OpenTelemetry-style spans, all kept in memory::
+
+    with span("crawl.fetch", url=url):      # stage latency, errors by type
+        ...
+    inc("arxiv_fetched_bytes_total", len(html))
+
+``snapshot()`` summarizes everything for ``server_stats_tool``;
+``render_prometheus()`` gives the Prometheus text format, served on
+``/metrics`` over HTTP transports or written to ``ARXIV_METRICS_FILE``.
+Stats kept elsewhere (read cache, browser pool, ...) are added by collectors.
+
+``ARXIV_METRICS=0`` turns it all off: ``span`` then hands out one shared
+no-op object and ``inc``/``observe`` return at once.  Spans are only
+recorded with ``ARXIV_TRACING=1``; ``ARXIV_TRACE_FILE`` appends them as
+JSON lines.
+"""
+import os
+import json
+import time
+import bisect
+import random
+import asyncio
+import logging
+import threading
+import contextvars
+from collections import deque
+from tools.storage import atomic_write
+
+logger = logging.getLogger(__name__)
+
+def log_debug(message):
+    """Write debug message to log file"""
+    logger.debug(message)
+
+METRICS = os.environ.get("ARXIV_METRICS", "1").lower() not in ("0", "false", "no")
+TRACING = os.environ.get("ARXIV_TRACING", "0").lower() in ("1", "true", "yes")
+TRACE_FILE = os.environ.get("ARXIV_TRACE_FILE")
+METRICS_FILE = os.environ.get("ARXIV_METRICS_FILE")
+METRICS_INTERVAL = float(os.environ.get("ARXIV_METRICS_INTERVAL", "15"))
+# 内存中保留的最近的 span 数
+SPAN_BUFFER = int(os.environ.get("ARXIV_SPAN_BUFFER", "1000"))
+
+# 直方图的桶上界（秒），与 Prometheus 的 le 标签一致
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_current_span = contextvars.ContextVar("arxiv_span", default=None)
+
+class Histogram:
+    """Counts of observations per bucket, plus their count, sum and maximum"""
+
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        """Estimate of the q-th percentile, interpolated inside its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = BUCKETS[i - 1] if i else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / n)
+            seen += n
+        return self.max
+
+    def summary(self) -> dict:
+        """Milliseconds, for the stats tool"""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum / self.count * 1000, 2) if self.count else None,
+            "p50_ms": round(self.percentile(50) * 1000, 2),
+            "p95_ms": round(self.percentile(95) * 1000, 2),
+            "p99_ms": round(self.percentile(99) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+class _NoopSpan:
+    """What ``span`` hands out when metrics are off"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+class Span:
+    """Times one stage; with tracing on it is also recorded with its parent and attributes"""
+
+    __slots__ = ("registry", "name", "attributes", "trace_id", "span_id", "parent_id", "start", "_started",
+                 "_token")
+
+    def __init__(self, registry, name: str, attributes: dict):
+        self.registry = registry
+        self.name = name
+        self.attributes = attributes
+        self._token = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        if self.registry.tracing:
+            parent = _current_span.get()
+            self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+            self.span_id = f"{random.getrandbits(64):016x}"
+            self.parent_id = parent.span_id if parent else None
+            self.start = time.time()
+            self._token = _current_span.set(self)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._started
+        registry = self.registry
+        registry.observe("arxiv_stage_seconds", duration, stage=self.name)
+        if exc_type is not None:
+            registry.inc("arxiv_stage_errors_total", stage=self.name, type=exc_type.__name__)
+        if self._token is not None:
+            _current_span.reset(self._token)
+            registry.record_span({
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_id": self.parent_id,
+                "name": self.name,
+                "start": round(self.start, 6),
+                "duration_ms": round(duration * 1000, 3),
+                "status": "error" if exc_type is not None else "ok",
+                "error": f"{exc_type.__name__}: {exc}" if exc_type is not None else None,
+                "attributes": self.attributes,
+            })
+        return False
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+class Registry:
+    """Counters, histograms and recent spans of this process"""
+
+    def __init__(self, enabled: bool = METRICS, tracing: bool = TRACING, span_buffer: int = SPAN_BUFFER):
+        self.enabled = enabled
+        self.tracing = enabled and tracing
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._spans = deque(maxlen=span_buffer)
+        self._unexported = []
+        self._collectors = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def record_span(self, span: dict):
+        with self._lock:
+            self._spans.append(span)
+            if TRACE_FILE:
+                self._unexported.append(span)
+
+    def add_collector(self, name: str, collect):
+        """``collect()`` returns a stats dict kept elsewhere; numbers are exported as ``arxiv_<name>_<key>``"""
+        self._collectors[name] = collect
+
+    def _collect(self) -> dict:
+        values = {}
+        for name, collect in list(self._collectors.items()):
+            try:
+                values[name] = collect()
+            except Exception as e:
+                log_debug(f"Metrics collector {name} failed: {str(e)}")
+        return values
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._spans.clear()
+            self._unexported.clear()
+            self.started = time.time()
+
+    def snapshot(self, spans: int = 20) -> dict:
+        """Everything in one dict: latency summaries per tool and stage, counters, collected stats, spans"""
+        with self._lock:
+            histograms = {key: histogram.summary() for key, histogram in self._histograms.items()}
+            counters = dict(self._counters)
+            recent = list(self._spans)[-spans:] if spans else []
+
+        def by(name: str, label: str, source: dict) -> dict:
+            return {dict(labels).get(label): value for (metric, labels), value in source.items() if metric == name}
+
+        tools = by("arxiv_tool_seconds", "tool", histograms)
+        for tool, summary in tools.items():
+            summary["errors"] = sum(value for (metric, labels), value in counters.items()
+                                    if metric == "arxiv_tool_errors_total" and dict(labels).get("tool") == tool)
+            summary["bytes_returned"] = counters.get(("arxiv_tool_response_bytes_total", (("tool", tool),)), 0)
+        stages = by("arxiv_stage_seconds", "stage", histograms)
+        for (metric, labels), value in counters.items():
+            if metric == "arxiv_stage_errors_total":
+                labels = dict(labels)
+                errors = stages.setdefault(labels["stage"], {}).setdefault("errors", {})
+                errors[labels["type"]] = value
+        return {
+            "enabled": self.enabled,
+            "tracing": self.tracing,
+            "uptime": round(time.time() - self.started, 1),
+            "tools": tools,
+            "stages": stages,
+            "counters": {name + _format_labels(labels): value for (name, labels), value in sorted(counters.items())},
+            "collected": self._collect(),
+            "spans": recent,
+        }
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, (list(h.counts), h.count, h.sum)) for key, h in self._histograms.items())
+        lines, typed = [], set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), (counts, count, total) in histograms:
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, n in zip(BUCKETS + ("+Inf",), counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_format_labels(labels, (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        for collector, stats in sorted(self._collect().items()):
+            for key, value in stats.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                lines.append(f"# TYPE arxiv_{collector}_{key} gauge")
+                lines.append(f"arxiv_{collector}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export_spans(self, path: str = TRACE_FILE):
+        """Append the spans finished since the last export as JSON lines"""
+        with self._lock:
+            spans, self._unexported = self._unexported, []
+        if spans and path:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(span, ensure_ascii=False) + "\n" for span in spans))
+
+    def dump(self, metrics_file: str = METRICS_FILE, trace_file: str = TRACE_FILE):
+        """Write the Prometheus text to ``metrics_file`` (atomically) and export pending spans"""
+        if metrics_file:
+            with atomic_write(metrics_file) as writer:
+                writer.write(self.render_prometheus().encode("utf-8"))
+        self.export_spans(trace_file)
+
+registry = Registry()
+
+def span(name: str, **attributes):
+    """Context manager timing a stage (see ``Span``)"""
+    if not registry.enabled:
+        return NOOP_SPAN
+    return Span(registry, name, attributes)
+
+def inc(name: str, value: float = 1, **labels):
+    if registry.enabled:
+        registry.inc(name, value, **labels)
+
+def observe(name: str, seconds: float, **labels):
+    if registry.enabled:
+        registry.observe(name, seconds, **labels)
+
+class MetricsDumper:
+    """Writes ``ARXIV_METRICS_FILE`` / ``ARXIV_TRACE_FILE`` every ``interval`` seconds and on stop"""
+
+    def __init__(self, interval: float = METRICS_INTERVAL, metrics_file: str = METRICS_FILE,
+                 trace_file: str = TRACE_FILE):
+        self.interval = interval
+        self.metrics_file = metrics_file
+        self.trace_file = trace_file
+        self._task = None
+
+    @property
+    def configured(self) -> bool:
+        return registry.enabled and bool(self.metrics_file or self.trace_file)
+
+    def _dump(self):
+        try:
+            registry.dump(self.metrics_file, self.trace_file)
+        except Exception as e:
+            log_debug(f"Error dumping metrics: {str(e)}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            # 写文件不阻塞事件循环
+            await asyncio.get_running_loop().run_in_executor(None, self._dump)
+
+    def start(self):
+        """Start the background task once (safe to call from every session's lifespan)"""
+        if self.configured and self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.configured:
+            self._dump()
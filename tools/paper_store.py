@@ -0,0 +1,491 @@
+#!/usr/bin/env python
+"""SQLite-backed store of crawled days.
+
+The crawler upserts every crawl into ``arxiv_papers.db`` in the base
+directory; the read tools answer from indexed queries instead of globbing
+and re-reading the day files.  Existing ``arxiv_AI_<date>_(<N>entries).txt``
+files are imported automatically the first time the store is opened, or
+explicitly with:
+
+    python -m tools.paper_store import [--base-dir DIR]
+"""
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import argparse
+import threading
+from tools.day_archive import archived_days
+from tools.storage import CATEGORIES, TornRead, find_day_files, parse_day_filename, read_day_files
+
+logger = logging.getLogger(__name__)
+
+def log_debug(message):
+    """Write debug message to log file"""
+    logger.debug(message)
+
+DB_FILENAME = "arxiv_papers.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    category      TEXT NOT NULL,
+    date          TEXT NOT NULL,
+    total_entries INTEGER NOT NULL,
+    filename      TEXT,
+    crawled_at    REAL NOT NULL,
+    digest        TEXT,
+    PRIMARY KEY (category, date)
+);
+CREATE INDEX IF NOT EXISTS idx_days_latest ON days (category, crawled_at);
+
+CREATE TABLE IF NOT EXISTS papers (
+    arxiv_id         TEXT PRIMARY KEY,
+    version          INTEGER,
+    title            TEXT NOT NULL,
+    authors          TEXT,
+    primary_category TEXT,
+    categories       TEXT,
+    comments         TEXT,
+    journal_ref      TEXT,
+    abs_url          TEXT,
+    pdf_url          TEXT,
+    updated_at       REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS listings (
+    category TEXT NOT NULL,
+    date     TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    arxiv_id TEXT NOT NULL,
+    PRIMARY KEY (category, date, position)
+);
+CREATE INDEX IF NOT EXISTS idx_listings_paper ON listings (arxiv_id);
+CREATE INDEX IF NOT EXISTS idx_listings_date ON listings (date, category);
+
+CREATE TABLE IF NOT EXISTS validators (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    updated_at    REAL NOT NULL
+);
+"""
+
+# 标题和作者的全文索引，由触发器随每次写入增量更新
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+    title, authors, content='papers', content_rowid='rowid', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS papers_fts_insert AFTER INSERT ON papers BEGIN
+    INSERT INTO papers_fts (rowid, title, authors) VALUES (new.rowid, new.title, new.authors);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_fts_delete AFTER DELETE ON papers BEGIN
+    INSERT INTO papers_fts (papers_fts, rowid, title, authors) VALUES ('delete', old.rowid, old.title, old.authors);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_fts_update AFTER UPDATE OF title, authors ON papers BEGIN
+    INSERT INTO papers_fts (papers_fts, rowid, title, authors) VALUES ('delete', old.rowid, old.title, old.authors);
+    INSERT INTO papers_fts (rowid, title, authors) VALUES (new.rowid, new.title, new.authors);
+END;
+"""
+
+RECORD_FIELDS = ("arxiv_id", "version", "title", "authors", "primary_category",
+                 "categories", "comments", "journal_ref", "abs_url", "pdf_url")
+
+UPSERT_PAPER = (
+    f"INSERT INTO papers ({', '.join(RECORD_FIELDS)}, updated_at) "
+    f"VALUES ({', '.join('?' * (len(RECORD_FIELDS) + 1))}) "
+    f"ON CONFLICT (arxiv_id) DO UPDATE SET "
+    + ", ".join(f"{field} = excluded.{field}" for field in RECORD_FIELDS[1:] + ("updated_at",))
+)
+
+def legacy_id(title: str) -> str:
+    """Stable key for entries imported from plain title files (no arXiv id)"""
+    return "legacy:" + hashlib.sha1(title.encode("utf-8")).hexdigest()[:16]
+
+def _paper_row(entry: dict, now: float) -> tuple:
+    return (
+        entry.get("arxiv_id") or legacy_id(entry["title"]),
+        entry.get("version"),
+        entry["title"],
+        json.dumps(entry.get("authors") or [], ensure_ascii=False),
+        entry.get("primary_category"),
+        json.dumps(entry.get("categories") or [], ensure_ascii=False),
+        entry.get("comments"),
+        entry.get("journal_ref"),
+        entry.get("abs_url"),
+        entry.get("pdf_url"),
+        now,
+    )
+
+def _digest(category: str, date: str, rows: list) -> str:
+    """Content hash of a day: its listing order and every stored field of its papers"""
+    payload = json.dumps([category, date, rows], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def _record(row) -> dict:
+    record = dict(zip(RECORD_FIELDS, row))
+    record["authors"] = json.loads(record["authors"] or "[]")
+    record["categories"] = json.loads(record["categories"] or "[]")
+    if record["arxiv_id"].startswith("legacy:"):
+        record["arxiv_id"] = None
+    return record
+
+class PaperStore:
+    """Thread-safe wrapper around one SQLite connection in WAL mode"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        # 本进程内每次写入加一；其它进程的写入由 PRAGMA data_version 反映
+        self.generation = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(days)")]
+        if "digest" not in columns:
+            # 旧库升级：摘要在第一次读取该日时补算
+            self.conn.execute("ALTER TABLE days ADD COLUMN digest TEXT")
+        has_fts = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'papers_fts'").fetchone() is not None
+        self.conn.executescript(FTS_SCHEMA)
+        if not has_fts:
+            # 旧库升级：为已有的论文建立全文索引
+            self.conn.execute("INSERT INTO papers_fts (papers_fts) VALUES ('rebuild')")
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def version(self) -> tuple:
+        """Changes whenever any process commits to the store; reads no pages"""
+        with self._lock:
+            return self.generation, self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM days LIMIT 1").fetchone() is None
+
+    def upsert_days(self, days: list):
+        """Store several crawled days in one transaction.
+
+        Each item is a dict with ``category``, ``date``, ``entries`` and
+        optionally ``filename`` and ``crawled_at``.  A day that is stored
+        again replaces its previous listing, rewriting only the positions
+        whose paper changed.  With ``papers`` only those
+        entries are written to the papers table (a delta crawl passes just
+        the new and replaced ones).
+        """
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for day in days:
+                    entries = day["entries"]
+                    papers = day.get("papers")
+                    self.conn.executemany(UPSERT_PAPER, [_paper_row(entry, now) for entry in
+                                                         (entries if papers is None else papers)])
+                    # 只写入 id 变了的位置，再删掉多出来的尾部
+                    stored = dict(self.conn.execute(
+                        "SELECT position, arxiv_id FROM listings WHERE category = ? AND date = ?",
+                        (day["category"], day["date"])).fetchall())
+                    ids = [entry.get("arxiv_id") or legacy_id(entry["title"]) for entry in entries]
+                    self.conn.executemany(
+                        "INSERT OR REPLACE INTO listings (category, date, position, arxiv_id) VALUES (?, ?, ?, ?)",
+                        [(day["category"], day["date"], i, arxiv_id)
+                         for i, arxiv_id in enumerate(ids) if stored.get(i) != arxiv_id],
+                    )
+                    self.conn.execute("DELETE FROM listings WHERE category = ? AND date = ? AND position >= ?",
+                                      (day["category"], day["date"], len(ids)))
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO days (category, date, total_entries, filename, crawled_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (day["category"], day["date"], len(entries), day.get("filename"),
+                         day.get("crawled_at") or now),
+                    )
+                self._update_digests(days)
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            finally:
+                self.generation += 1
+
+    def _update_digests(self, days: list):
+        """Recompute the digest of the written days and of every other day listing a written paper"""
+        stale = {(day["category"], day["date"]) for day in days}
+        ids = list({entry.get("arxiv_id") or legacy_id(entry["title"])
+                    for day in days for entry in (day["entries"] if day.get("papers") is None else day["papers"])})
+        # 交叉列出或更新了版本的论文也会改变其它日期的内容
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            stale.update(self.conn.execute(
+                f"SELECT DISTINCT category, date FROM listings WHERE arxiv_id IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall())
+        for category, date in stale:
+            self._store_digest(category, date)
+
+    def _store_digest(self, category: str, date: str) -> str:
+        columns = ", ".join(f"p.{field}" for field in RECORD_FIELDS)
+        rows = self.conn.execute(
+            f"SELECT {columns} FROM listings l JOIN papers p ON p.arxiv_id = l.arxiv_id "
+            "WHERE l.category = ? AND l.date = ? ORDER BY l.position",
+            (category, date),
+        ).fetchall()
+        digest = _digest(category, date, rows)
+        self.conn.execute("UPDATE days SET digest = ? WHERE category = ? AND date = ?", (digest, category, date))
+        return digest
+
+    def upsert_day(self, category: str, date: str, entries: list, filename: str = None,
+                   crawled_at: float = None):
+        self.upsert_days([{"category": category, "date": date, "entries": entries,
+                           "filename": filename, "crawled_at": crawled_at}])
+
+    def touch_day(self, category: str, date: str, crawled_at: float = None):
+        """Mark a stored day as crawled again without changing its listing"""
+        with self._lock:
+            try:
+                self.conn.execute("UPDATE days SET crawled_at = ? WHERE category = ? AND date = ?",
+                                  (crawled_at or time.time(), category, date))
+            finally:
+                self.generation += 1
+
+    def get_validators(self, url: str) -> dict:
+        """HTTP validators (ETag / Last-Modified) seen for a URL, or {}"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified FROM validators WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return {}
+        return {key: value for key, value in zip(("etag", "last_modified"), row) if value}
+
+    def set_validators(self, url: str, validators: dict):
+        with self._lock:
+            if not validators:
+                self.conn.execute("DELETE FROM validators WHERE url = ?", (url,))
+                return
+            self.conn.execute(
+                "INSERT OR REPLACE INTO validators (url, etag, last_modified, updated_at) VALUES (?, ?, ?, ?)",
+                (url, validators.get("etag"), validators.get("last_modified"), time.time()),
+            )
+
+    def _day(self, category: str, row) -> dict:
+        date, total_entries, filename, crawled_at, digest = row
+        if digest is None:
+            digest = self._store_digest(category, date)
+        return {"category": category, "date": date, "total_entries": total_entries,
+                "filename": filename, "crawled_at": crawled_at, "digest": digest}
+
+    def latest_day(self, category: str):
+        """The most recently crawled day of a category, or None"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT date, total_entries, filename, crawled_at, digest FROM days "
+                "WHERE category = ? ORDER BY crawled_at DESC LIMIT 1",
+                (category,),
+            ).fetchone()
+            return None if row is None else self._day(category, row)
+
+    def get_day(self, category: str, date: str):
+        """One stored day; ``digest`` changes whenever the day's records do"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT date, total_entries, filename, crawled_at, digest FROM days WHERE category = ? AND date = ?",
+                (category, date),
+            ).fetchone()
+            return None if row is None else self._day(category, row)
+
+    def list_days(self, category: str, date_from: str = None, date_to: str = None) -> list:
+        """Stored days of a category between ``date_from`` and ``date_to`` (inclusive), oldest first"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT date, total_entries, filename, crawled_at, digest FROM days "
+                "WHERE category = ? AND date >= ? AND date <= ? ORDER BY date",
+                (category, date_from or "", date_to or "9999-99-99"),
+            ).fetchall()
+            return [self._day(category, row) for row in rows]
+
+    def count_papers(self, days: list) -> tuple:
+        """Distinct and cross-listed papers over several ``(category, date)`` days"""
+        if not days:
+            return 0, 0
+        where = " OR ".join("(category = ? AND date = ?)" for _ in days)
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT COUNT(DISTINCT category) FROM listings WHERE {where} GROUP BY arxiv_id",
+                [value for day in days for value in day],
+            ).fetchall()
+        return len(rows), sum(1 for row in rows if row[0] > 1)
+
+    def get_titles(self, category: str, date: str, offset: int = 0, limit: int = None) -> list:
+        """Titles of a day in listing order.
+
+        ``offset``/``limit`` seek straight to the page through the
+        (category, date, position) primary key, so later pages cost the
+        same as the first one.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT p.title FROM listings l JOIN papers p ON p.arxiv_id = l.arxiv_id "
+                "WHERE l.category = ? AND l.date = ? AND l.position >= ? ORDER BY l.position LIMIT ?",
+                (category, date, offset, -1 if limit is None else limit),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_versions(self, category: str, date: str) -> list:
+        """``(arxiv_id, version)`` of a day's papers in listing order"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT l.arxiv_id, p.version FROM listings l JOIN papers p ON p.arxiv_id = l.arxiv_id "
+                "WHERE l.category = ? AND l.date = ? ORDER BY l.position",
+                (category, date),
+            ).fetchall()
+        return [(None if arxiv_id.startswith("legacy:") else arxiv_id, version) for arxiv_id, version in rows]
+
+    def get_records(self, category: str, date: str, offset: int = 0, limit: int = None) -> list:
+        """Full records of a day in listing order (paged like ``get_titles``)"""
+        columns = ", ".join(f"p.{field}" for field in RECORD_FIELDS)
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT {columns} FROM listings l JOIN papers p ON p.arxiv_id = l.arxiv_id "
+                "WHERE l.category = ? AND l.date = ? AND l.position >= ? ORDER BY l.position LIMIT ?",
+                (category, date, offset, -1 if limit is None else limit),
+            ).fetchall()
+        return [_record(row) for row in rows]
+
+    def search(self, query: str, category: str = None, date_from: str = None,
+               date_to: str = None, limit: int = 20) -> list:
+        """BM25-ranked full-text search over titles and authors.
+
+        ``query`` uses the FTS5 query syntax (``graph AND neural``, ``"large
+        language"``, ``diffus*``); if it doesn't parse, its words are
+        searched as plain terms.  Only papers listed in ``category`` and/or
+        between ``date_from`` and ``date_to`` (inclusive) are returned.
+        """
+        filters = []
+        params = []
+        if category:
+            filters.append("l.category = ?")
+            params.append(category)
+        if date_from:
+            filters.append("l.date >= ?")
+            params.append(date_from)
+        if date_to:
+            filters.append("l.date <= ?")
+            params.append(date_to)
+        # 按论文查 listings，避免按分类扫描整张表
+        listed = ("FROM listings l INDEXED BY idx_listings_paper WHERE "
+                  + " AND ".join(["l.arxiv_id = p.arxiv_id"] + filters))
+        rank_sql = (
+            "SELECT papers_fts.rowid, rank FROM papers_fts "
+            "JOIN papers p ON p.rowid = papers_fts.rowid "
+            f"WHERE papers_fts MATCH ? AND EXISTS (SELECT 1 {listed}) "
+            "ORDER BY rank LIMIT ?"
+        )
+        columns = ", ".join(f"p.{field}" for field in RECORD_FIELDS)
+
+        def run(match):
+            # 先只取排名前k的rowid，再为这k条生成摘要
+            with self._lock:
+                ranked = self.conn.execute(rank_sql, [match] + params + [limit]).fetchall()
+                if not ranked:
+                    return []
+                details = self.conn.execute(
+                    f"SELECT papers_fts.rowid, {columns}, snippet(papers_fts, 0, '[', ']', '…', 16), "
+                    f"(SELECT MAX(l.date) {listed}), (SELECT group_concat(DISTINCT l.category) {listed}) "
+                    "FROM papers_fts JOIN papers p ON p.rowid = papers_fts.rowid "
+                    f"WHERE papers_fts MATCH ? AND papers_fts.rowid IN ({', '.join('?' * len(ranked))})",
+                    params + params + [match] + [rowid for rowid, _ in ranked],
+                ).fetchall()
+            by_rowid = {row[0]: row[1:] for row in details}
+            return [by_rowid[rowid] + (score,) for rowid, score in ranked if rowid in by_rowid]
+
+        try:
+            rows = run(query)
+        except sqlite3.OperationalError as e:
+            log_debug(f"FTS query {query!r} failed ({str(e)}), searching plain terms")
+            terms = [word.replace('"', '""') for word in query.split()]
+            if not terms:
+                return []
+            rows = run(" ".join(f'"{term}"' for term in terms))
+
+        hits = []
+        for row in rows:
+            hit = _record(row[:len(RECORD_FIELDS)])
+            snippet, last_date, listed_in, score = row[len(RECORD_FIELDS):]
+            hit.update(snippet=snippet, score=round(-score, 4), date=last_date,
+                       listed_in=sorted((listed_in or "").split(",")))
+            hits.append(hit)
+        return hits
+
+    def import_day_files(self, base_dir: str, categories=CATEGORIES) -> dict:
+        """One-shot import of the existing day files (and their .jsonl records) and archived days.
+
+        A day both archived (``ARXIV_DAY_FORMAT=archive``) and in day files is
+        taken from whichever was written last.
+        """
+        days = {}
+        for category in categories:
+            for day, entries, path in archived_days(base_dir, category):
+                days[(category, day)] = {"category": category, "date": day, "entries": entries,
+                                         "filename": os.path.relpath(path, base_dir),
+                                         "crawled_at": os.path.getmtime(path)}
+            for path in find_day_files(base_dir, category):
+                match = parse_day_filename(path, category)
+                if not match:
+                    log_debug(f"Skipping file with invalid name: {path}")
+                    continue
+                day, _ = match
+                try:
+                    files = read_day_files(path)
+                except TornRead as e:
+                    log_debug(f"Skipping day file that does not match its manifest: {str(e)}")
+                    continue
+                entries = files["records"] or [{"title": title} for title in files["titles"]]
+                crawled_at = os.path.getmtime(path)
+                archived = days.get((category, day))
+                if archived and archived["crawled_at"] > crawled_at:
+                    continue
+                days[(category, day)] = {"category": category, "date": day, "entries": entries,
+                                         "filename": os.path.basename(path), "crawled_at": crawled_at}
+        days = list(days.values())
+        if days:
+            self.upsert_days(days)
+        log_debug(f"Imported {len(days)} day files into {self.path}")
+        return {"days": len(days), "entries": sum(len(d["entries"]) for d in days)}
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def open_store(base_dir: str) -> PaperStore:
+    """Process-wide store of a base directory; imports legacy day files on first use"""
+    path = os.path.join(base_dir, DB_FILENAME)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = PaperStore(path)
+            if store.is_empty():
+                store.import_day_files(base_dir)
+            _stores[path] = store
+        return store
+
+def close_stores():
+    with _stores_lock:
+        for store in _stores.values():
+            store.close()
+        _stores.clear()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["import"])
+    parser.add_argument("--base-dir", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    args = parser.parse_args()
+
+    store = PaperStore(os.path.join(args.base_dir, DB_FILENAME))
+    start = time.perf_counter()
+    counts = store.import_day_files(args.base_dir)
+    print(f"Imported {counts['days']} days / {counts['entries']} entries "
+          f"into {store.path} in {time.perf_counter() - start:.2f}s")
+    store.close()
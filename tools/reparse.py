@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+"""Rebuild the stored days from the raw HTML snapshots, without fetching again.
+
+After a parser fix, every snapshot (``tools/snapshots.py``) is parsed again
+by a pool of worker processes; HTML parsing is pure Python, so it scales
+with cores instead of sharing one interpreter.  A day whose records come out
+different is written to its day file and the store like a crawl would; days
+that parse to what is already stored are left alone.  Pages of failed
+crawls that parse now are filed under their day:
+
+    python -m tools.reparse [--workers 4] [--from 2025-01-01] [--to 2025-03-31] [--categories cs.AI]
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from tools.crawl_lock import CrawlLock
+from tools.crawler import CRAWL_LOCK_TIMEOUT, save_listing
+from tools.day_diff import diff_entries, remove_day_files
+from tools.executor import run_blocking
+from tools.paper_store import open_store
+from tools.snapshots import UNPARSED_DIRNAME, find_snapshots, parse_snapshot, snapshot_path
+from tools.storage import CATEGORIES, validate_category
+
+logger = logging.getLogger(__name__)
+
+def log_debug(message):
+    """Write debug message to log file"""
+    logger.debug(message)
+
+REPARSE_WORKERS = int(os.environ.get("ARXIV_REPARSE_WORKERS", str(os.cpu_count() or 1)))
+# 每批写入索引库的天数
+STORE_BATCH = 100
+
+def parse_snapshots(paths: list, workers: int = REPARSE_WORKERS) -> list:
+    """Parse snapshots in ``workers`` processes; results in the order of ``paths``"""
+    if not paths:
+        return []
+    workers = max(1, workers)
+    # 每个进程分到若干块，减少进程间往返
+    chunksize = max(1, len(paths) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(parse_snapshot, paths, chunksize=chunksize))
+
+def _is_unparsed(path: str) -> bool:
+    return os.path.basename(os.path.dirname(path)) == UNPARSED_DIRNAME
+
+def _pick_listings(results: list, categories: list, date_from: str, date_to: str) -> tuple:
+    """Best parsed snapshot of every (category, day): complete listings first, then the newest.
+
+    Also returns the failures and the failed-crawl pages made redundant by a
+    better snapshot that is at least as new (a newer, incomplete one is kept).
+    """
+    best, failed, superseded = {}, [], []
+    for result in results:
+        if "error" in result:
+            failed.append({"path": result["path"], "error": result["error"]})
+            continue
+        listing = result["listing"]
+        day = listing["date"]
+        if categories and listing["category"] not in categories \
+                or date_from and day < date_from or date_to and day > date_to:
+            continue
+        rank = (len(listing["entries"]) >= listing["total_entries"], result["fetched_at"])
+        key = (listing["category"], day)
+        if key in best and rank <= best[key][0]:
+            loser, winner = result, best[key][1]
+        else:
+            loser, winner = best.get(key, (None, None))[1], result
+            best[key] = (rank, result)
+        if loser is not None and _is_unparsed(loser["path"]) and loser["fetched_at"] <= winner["fetched_at"]:
+            superseded.append(loser["path"])
+    return best, failed, superseded
+
+def _store_listings(base_dir: str, best: dict, superseded: list, dry_run: bool) -> dict:
+    """Write the days that parse differently from what is stored; file recovered snapshots.
+
+    Days go to the store in batches, and a recovered snapshot is moved only
+    after its day is stored.  If a day fails, the days whose files were
+    already written are stored before the error is raised, so the day files
+    and the store never disagree.
+    """
+    store = open_store(base_dir)
+    counts = {"changed": 0, "unchanged": 0, "kept": 0, "recovered": 0, "entries": 0}
+    changed = []
+    recovered = []
+
+    def flush():
+        if changed:
+            store.upsert_days(changed)
+            changed.clear()
+        for path, target in recovered:
+            # 该月可能还没有快照目录
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(path, target)
+            counts["recovered"] += 1
+        recovered.clear()
+
+    try:
+        for (category, day), ((complete, _), result) in sorted(best.items()):
+            listing = result["listing"]
+            stored_day = store.get_day(category, day)
+            stored = store.get_records(category, day) if stored_day else []
+            if not complete and stored_day and stored_day["total_entries"] >= len(listing["entries"]):
+                # 不完整的快照（抓取中途失败）不覆盖已存的一天
+                counts["kept"] += 1
+                continue
+            diff = diff_entries(stored, listing["entries"])
+            if not diff["changed"]:
+                counts["unchanged"] += 1
+            else:
+                log_debug(f"[{category} {day}] {len(diff['added'])} added, {len(diff['updated'])} updated, "
+                          f"{diff['removed']} removed")
+                counts["changed"] += 1
+                counts["entries"] += len(listing["entries"])
+                if not dry_run:
+                    saved = save_listing(base_dir, category, listing)
+                    if stored_day and (stored_day["filename"] or "").endswith(".txt") \
+                            and stored_day["filename"] != saved["filename"]:
+                        remove_day_files(base_dir, stored_day["filename"])
+                    changed.append({"category": category, "date": day, "entries": listing["entries"],
+                                    "filename": saved["filename"],
+                                    "crawled_at": stored_day["crawled_at"] if stored_day else result["fetched_at"]})
+            if _is_unparsed(result["path"]) and not dry_run:
+                # 现在能解析了：当天存好之后归到它那一天的快照下
+                recovered.append((result["path"], snapshot_path(base_dir, category, day)))
+            if len(changed) >= STORE_BATCH:
+                flush()
+    finally:
+        if not dry_run:
+            flush()
+    if not dry_run:
+        for path in superseded:
+            os.remove(path)
+    return counts
+
+async def reparse(base_dir: str, categories: list = None, date_from: str = None, date_to: str = None,
+                  workers: int = REPARSE_WORKERS, dry_run: bool = False) -> dict:
+    """Parse the snapshots of the given categories and date range again and store what changed.
+
+    ``workers`` processes parse the snapshots; the changed days are then
+    written under the crawl lock, so a crawl running meanwhile waits.
+    ``dry_run=True`` only reports what would change.
+
+    Returns the counts of snapshots, pages, changed/unchanged days, failures and pages per second
+    """
+    try:
+        categories = [validate_category(c) for c in categories] if categories else None
+        paths = await run_blocking(find_snapshots, base_dir, categories, date_from, date_to)
+        log_debug(f"Re-parsing {len(paths)} snapshots with {workers} workers")
+
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(None, parse_snapshots, paths, workers)
+        parse_time = time.perf_counter() - start
+        pages = sum(result["pages"] for result in results)
+
+        best, failed, superseded = _pick_listings(results, categories, date_from, date_to)
+        async with CrawlLock(base_dir, timeout=CRAWL_LOCK_TIMEOUT):
+            counts = await run_blocking(_store_listings, base_dir, best, superseded, dry_run)
+        elapsed = time.perf_counter() - start
+        pages_per_second = round(pages / parse_time, 1) if parse_time > 0 else None
+        return {
+            "success": not failed,
+            "snapshots": len(paths),
+            "pages": pages,
+            "days": len(best),
+            **counts,
+            "failed": failed,
+            "workers": workers,
+            "parse_time": round(parse_time, 2),
+            "elapsed": round(elapsed, 2),
+            "pages_per_second": pages_per_second,
+            "dry_run": dry_run,
+            "message": f"Re-parsed {pages} pages of {len(paths)} snapshots ({pages_per_second} pages/s): "
+                       f"{counts['changed']} days changed, {counts['unchanged']} unchanged, "
+                       f"{len(failed)} snapshots still failing"
+        }
+
+    except Exception as e:
+        log_debug(f"Error in reparse: {str(e)}")
+        return {
+            "success": False,
+            "message": "Failed to re-parse the snapshots",
+            "error": str(e)
+        }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--from", dest="date_from", default=None, help="first day, YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", default=None, help="last day, YYYY-MM-DD")
+    parser.add_argument("--categories", nargs="+", default=None, choices=CATEGORIES)
+    parser.add_argument("--workers", type=int, default=REPARSE_WORKERS)
+    parser.add_argument("--dry-run", action="store_true", help="only report which days would change")
+    parser.add_argument("--base-dir", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    result = asyncio.run(reparse(args.base_dir, args.categories, args.date_from, args.date_to,
+                                 workers=args.workers, dry_run=args.dry_run))
+    print(json.dumps(result, ensure_ascii=False, indent=2))
@@ -0,0 +1,218 @@
+"""Read-only HTTP API over the paper store, for dashboards and scripts.
+
+Serves the same data as the MCP read tools as plain JSON:
+
+    GET /api/categories                               latest day of every category
+    GET /api/categories/<category>/latest             latest day (?fields=titles|records)
+    GET /api/categories/<category>/days/<date>        one day
+    GET /api/categories/<category>/days?range=A..B    several days, streamed
+    GET /api/search?q=...&range=&category=&limit=     ranked full-text search
+
+Every response carries a strong ETag.  For days it comes from the digest
+the store keeps per day, so a poll with a matching ``If-None-Match`` is
+answered with 304 after one indexed lookup, without reading any records.
+Bodies are compressed with br (if ``brotli`` is installed) or gzip when
+the client accepts it.
+"""
+import json
+import zlib
+import hashlib
+import logging
+from flask import Flask, Response, request
+from tools.cache import read_cache
+from tools.paper_store import open_store
+from tools.search import MAX_LIMIT, parse_date_range
+from tools.storage import CATEGORIES, validate_category
+from tools.titles import FIELDS
+
+try:
+    import brotli
+except ImportError:  # 可选依赖，没有时只用 gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+def log_debug(message):
+    """Write debug message to log file"""
+    logger.debug(message)
+
+# 小于这个字节数的响应不压缩
+MIN_COMPRESS_SIZE = 1024
+
+class NotFound(Exception):
+    pass
+
+def _etag(*parts) -> str:
+    return hashlib.sha1("\x00".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:32]
+
+def _dumps(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _encoding() -> str:
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return request.accept_encodings.best_match(offered)
+
+def _compressor(encoding: str):
+    """(compress, flush) functions of a streaming encoder"""
+    if encoding == "br":
+        encoder = brotli.Compressor(quality=5)
+        return encoder.process, encoder.finish
+    encoder = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip 格式
+    return encoder.compress, encoder.flush
+
+def _tag(etag: str, encoding: str = None) -> str:
+    """The validator of the representation sent for the negotiated ``encoding``"""
+    return f"{etag}-{encoding}" if encoding else etag
+
+def _not_modified(tag: str) -> bool:
+    # If-None-Match 用弱比较（忽略 W/ 前缀），但标签本身（包括压缩方式后缀）必须完全一致
+    if request.if_none_match.star_tag:
+        return True
+    return tag in request.if_none_match.as_set(include_weak=True)
+
+def _headers(tag: str, content_encoding: str = None) -> dict:
+    headers = {
+        "ETag": f'"{tag}"',
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    return headers
+
+def conditional(etag: str, build) -> Response:
+    """304 if the client already has ``etag``, else the (compressed) JSON of ``build()``
+
+    The encoding is negotiated before the 304 check, so a 304 carries the
+    same ETag as the 200 it stands for.
+    """
+    encoding = _encoding()
+    tag = _tag(etag, encoding)
+    if _not_modified(tag):
+        return Response(status=304, headers=_headers(tag))
+    body = _dumps(build())
+    # 小响应不压缩，但 ETag 仍按协商的压缩方式区分
+    content_encoding = encoding if len(body) >= MIN_COMPRESS_SIZE else None
+    if content_encoding:
+        compress, flush = _compressor(content_encoding)
+        body = compress(body) + flush()
+    return Response(body, mimetype="application/json", headers=_headers(tag, content_encoding))
+
+def streamed(etag: str, chunks) -> Response:
+    """Like ``conditional`` but sends the JSON pieces from ``chunks`` as they are produced"""
+    encoding = _encoding()
+    tag = _tag(etag, encoding)
+    if _not_modified(tag):
+        return Response(status=304, headers=_headers(tag))
+
+    def generate():
+        if not encoding:
+            yield from chunks
+            return
+        compress, flush = _compressor(encoding)
+        for chunk in chunks:
+            data = compress(chunk)
+            if data:
+                yield data
+        yield flush()
+
+    return Response(generate(), mimetype="application/json", headers=_headers(tag, encoding))
+
+def _fields() -> str:
+    fields = request.args.get("fields", "titles")
+    if fields not in FIELDS:
+        raise ValueError(f"Invalid fields {fields!r}, expected one of {', '.join(FIELDS)}")
+    return fields
+
+def _day_data(cache, day: dict, fields: str) -> dict:
+    data = {key: day[key] for key in ("category", "date", "total_entries", "filename")}
+    if fields == "records":
+        data["records"] = cache.get_records(day["category"], day["date"])
+    else:
+        data["titles"] = cache.get_titles(day["category"], day["date"])
+    return data
+
+def create_app(base_dir: str) -> Flask:
+    app = Flask(__name__)
+
+    @app.errorhandler(ValueError)
+    def bad_request(e):
+        return {"success": False, "message": "Invalid request", "error": str(e)}, 400
+
+    @app.errorhandler(NotFound)
+    def not_found(e):
+        return {"success": False, "message": "Not found", "error": str(e)}, 404
+
+    @app.get("/api/categories")
+    def categories():
+        cache = read_cache(base_dir)
+        days = {category: cache.latest_day(category) for category in CATEGORIES}
+        etag = _etag("categories", *(day["digest"] if day else "-" for day in days.values()))
+        return conditional(etag, lambda: {
+            "success": True,
+            "data": [{key: day[key] for key in ("category", "date", "total_entries")}
+                     for day in days.values() if day]
+        })
+
+    @app.get("/api/categories/<category>/latest")
+    def latest(category):
+        validate_category(category)
+        fields = _fields()
+        cache = read_cache(base_dir)
+        day = cache.latest_day(category)
+        if day is None:
+            raise NotFound(f"No papers stored for {category}")
+        return conditional(_etag(day["digest"], fields),
+                           lambda: {"success": True, "data": _day_data(cache, day, fields)})
+
+    @app.get("/api/categories/<category>/days/<date>")
+    def day(category, date):
+        validate_category(category)
+        fields = _fields()
+        parse_date_range(date)
+        cache = read_cache(base_dir)
+        day = cache.get_day(category, date)
+        if day is None:
+            raise NotFound(f"No papers stored for {category} on {date}")
+        return conditional(_etag(day["digest"], fields),
+                           lambda: {"success": True, "data": _day_data(cache, day, fields)})
+
+    @app.get("/api/categories/<category>/days")
+    def days(category):
+        validate_category(category)
+        fields = _fields()
+        date_from, date_to = parse_date_range(request.args.get("range"))
+        store = open_store(base_dir)
+        stored = store.list_days(category, date_from, date_to)
+        etag = _etag("days", fields, *(day["digest"] for day in stored))
+
+        def chunks():
+            # 逐日读取、逐日发送，整个区间不会同时留在内存里
+            yield _dumps({"success": True, "data": {"category": category, "date_from": date_from,
+                                                    "date_to": date_to, "days": []}})[:-3]
+            for i, day in enumerate(stored):
+                yield (b"," if i else b"") + _dumps(_day_data(store, day, fields))
+            yield b"]}}"
+
+        log_debug(f"Streaming {len(stored)} days of {category} ({date_from}..{date_to})")
+        return streamed(etag, chunks())
+
+    @app.get("/api/search")
+    def search():
+        query = request.args.get("q", "")
+        if not query.strip():
+            raise ValueError("Empty search query")
+        category = request.args.get("category")
+        if category:
+            validate_category(category)
+        date_from, date_to = parse_date_range(request.args.get("range"))
+        limit = max(1, min(int(request.args.get("limit", 20)), MAX_LIMIT))
+        hits = open_store(base_dir).search(query, category=category, date_from=date_from,
+                                           date_to=date_to, limit=limit)
+        data = {"query": query, "date_from": date_from, "date_to": date_to, "category": category,
+                "hits": hits}
+        # 检索结果跨越整个库，ETag 取结果本身的哈希
+        etag = hashlib.sha1(_dumps(data)).hexdigest()[:32]
+        return conditional(etag, lambda: {"success": True, "data": data})
+
+    return app
@@ -0,0 +1,194 @@
+"""Background pre-fetch of the daily listings, shortly after arXiv announces them.
+
+arXiv announces new papers at 20:00 US Eastern, Sunday to Thursday.  The
+scheduler sleeps until ``delay`` after the next announcement (plus a random
+``jitter``), crawls the configured categories, retries failed crawls with
+exponential backoff and then waits for the next announcement.  Time comes
+from an injectable clock, so a whole week can be simulated instantly.
+"""
+import time
+import random
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from tools.executor import run_blocking
+
+try:
+    from zoneinfo import ZoneInfo
+    ANNOUNCE_TZ = ZoneInfo("America/New_York")
+except Exception:  # 没有时区数据库（如未安装 tzdata 的 Windows）时按美东标准时间处理
+    ANNOUNCE_TZ = timezone(timedelta(hours=-5), "EST")
+
+logger = logging.getLogger(__name__)
+
+def log_debug(message):
+    """Write debug message to log file"""
+    logger.debug(message)
+
+ANNOUNCE_HOUR = 20
+ANNOUNCE_WEEKDAYS = (6, 0, 1, 2, 3)  # 周日到周四
+
+class SystemClock:
+    """Wall clock time and asyncio sleep"""
+
+    def now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(max(0.0, seconds))
+
+class FakeClock:
+    """Clock for simulations: ``sleep`` advances time immediately"""
+
+    def __init__(self, start: datetime):
+        self._now = start
+
+    def now(self) -> datetime:
+        return self._now
+
+    def monotonic(self) -> float:
+        return self._now.timestamp()
+
+    def advance(self, seconds: float):
+        self._now += timedelta(seconds=seconds)
+
+    async def sleep(self, seconds: float):
+        self.advance(max(0.0, seconds))
+        await asyncio.sleep(0)
+
+def _announcements(around: datetime, delay: float, days: range):
+    local = around.astimezone(ANNOUNCE_TZ)
+    for offset in days:
+        day = (local + timedelta(days=offset)).date()
+        if day.weekday() in ANNOUNCE_WEEKDAYS:
+            announced = datetime(day.year, day.month, day.day, ANNOUNCE_HOUR, tzinfo=ANNOUNCE_TZ)
+            yield (announced + timedelta(seconds=delay)).astimezone(timezone.utc)
+
+def next_announcement(after: datetime, delay: float = 0.0) -> datetime:
+    """First announcement time (plus ``delay`` seconds) strictly after ``after``"""
+    return next(t for t in _announcements(after, delay, range(-1, 9)) if t > after)
+
+def previous_announcement(before: datetime, delay: float = 0.0) -> datetime:
+    """Last announcement time (plus ``delay`` seconds) at or before ``before``"""
+    return next(t for t in _announcements(before, delay, range(1, -9, -1)) if t <= before)
+
+def _summary(result: dict) -> dict:
+    """The part of a crawl result worth keeping in the scheduler state"""
+    summary = {key: result.get(key) for key in ("success", "message", "error", "papers") if key in result}
+    if "categories" in result:
+        summary["categories"] = {
+            category: {key: value for key, value in r.items()
+                       if key in ("success", "date", "total_entries", "added", "updated", "changed", "error")}
+            for category, r in result["categories"].items()
+        }
+    return summary
+
+class CrawlScheduler:
+    """Crawl ``categories`` after every arXiv announcement.
+
+    ``crawl`` is an async function taking the list of categories and
+    returning a crawl result dict (see ``crawl_categories``).  If
+    ``last_crawled`` (returning the datetime of the oldest stored crawl, or
+    None) says the local data predates the latest announcement, the first
+    crawl runs right away instead of at the next announcement.
+    """
+
+    def __init__(self, crawl, categories: list, clock=None, delay: float = 600,
+                 jitter: float = 300, retries: int = 3, retry_delay: float = 300, seed: int = None,
+                 last_crawled=None):
+        self.crawl = crawl
+        self.last_crawled = last_crawled
+        self.categories = list(categories)
+        self.clock = clock or SystemClock()
+        self.delay = delay
+        self.jitter = jitter
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.rng = random.Random(seed)
+        self._task = None
+        self.state = {
+            "enabled": False,
+            "categories": self.categories,
+            "next_run": None,
+            "last_run": None,
+            "last_duration": None,
+            "last_attempts": None,
+            "last_result": None,
+            "runs": 0,
+            "failures": 0,
+        }
+
+    def next_run(self) -> datetime:
+        run_at = next_announcement(self.clock.now(), self.delay)
+        return run_at + timedelta(seconds=self.rng.uniform(0, self.jitter))
+
+    async def run_once(self) -> dict:
+        """Crawl now, retrying failures with exponential backoff"""
+        started = self.clock.monotonic()
+        self.state["last_run"] = self.clock.now().isoformat()
+        for attempt in range(1, self.retries + 2):
+            try:
+                result = await self.crawl(self.categories)
+            except Exception as e:
+                result = {"success": False, "message": str(e), "error": str(e)}
+            if result.get("success") or attempt > self.retries:
+                break
+            delay = self.retry_delay * 2 ** (attempt - 1)
+            log_debug(f"Scheduled crawl failed (attempt {attempt}): {result.get('message')}, retrying in {delay:.0f}s")
+            self.state["next_run"] = (self.clock.now() + timedelta(seconds=delay)).isoformat()
+            await self.clock.sleep(delay)
+
+        self.state["runs"] += 1
+        if not result.get("success"):
+            self.state["failures"] += 1
+        self.state["last_attempts"] = attempt
+        self.state["last_duration"] = round(self.clock.monotonic() - started, 3)
+        self.state["last_result"] = _summary(result)
+        log_debug(f"Scheduled crawl finished in {self.state['last_duration']}s: {result.get('message')}")
+        return result
+
+    async def is_stale(self) -> bool:
+        if self.last_crawled is None:
+            return False
+        try:
+            # 查询索引库（首次打开时还可能导入全部日期文件），放到I/O线程池里，不阻塞其它客户端
+            last = await run_blocking(self.last_crawled)
+        except Exception as e:
+            log_debug(f"Could not read the last crawl time, keeping the normal schedule: {str(e)}")
+            return False
+        return last is None or last < previous_announcement(self.clock.now(), self.delay)
+
+    async def _loop(self):
+        if await self.is_stale():
+            log_debug("Local data predates the latest announcement, crawling now")
+            await self.run_once()
+        while True:
+            run_at = self.next_run()
+            self.state["next_run"] = run_at.isoformat()
+            log_debug(f"Next scheduled crawl of {self.categories} at {run_at.isoformat()}")
+            await self.clock.sleep((run_at - self.clock.now()).total_seconds())
+            await self.run_once()
+
+    def start(self):
+        """Start the background loop (no-op if it is already running)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+            self.state["enabled"] = True
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.state["enabled"] = False
+        self.state["next_run"] = None
+
+    def get_state(self) -> dict:
+        return dict(self.state, running=self._task is not None and not self._task.done())
@@ -0,0 +1,77 @@
+from typing import Dict, Any
+import re
+import logging
+from tools.dedup import collapse_hits
+from tools.executor import run_blocking
+from tools.paper_store import open_store
+from tools.storage import validate_category
+
+logger = logging.getLogger(__name__)
+
+def log_debug(message):
+    """Write debug message to log file"""
+    logger.debug(message)
+
+DATE_RANGE_RE = re.compile(r'^(\d{4}-\d{2}-\d{2})?\s*(?:\.\.|/)\s*(\d{4}-\d{2}-\d{2})?$')
+DAY_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+MAX_LIMIT = 100
+
+def parse_date_range(date_range: str):
+    """Parse "2025-04-01..2025-04-30" (either side optional) or a single day into (from, to)"""
+    if not date_range:
+        return None, None
+    date_range = date_range.strip()
+    if DAY_RE.match(date_range):
+        return date_range, date_range
+    match = DATE_RANGE_RE.match(date_range)
+    if not match:
+        raise ValueError(f"Invalid date range {date_range!r}, expected YYYY-MM-DD..YYYY-MM-DD")
+    return match.group(1), match.group(2)
+
+async def search_titles(base_dir: str, query: str, date_range: str = None,
+                        category: str = None, limit: int = 20, dedup: bool = False) -> dict:
+    """Search all crawled titles (and authors) with BM25 ranking.
+
+    Only the top ``limit`` hits are returned, each with a highlighted snippet.
+    ``date_range`` is "YYYY-MM-DD..YYYY-MM-DD" (either side optional) or a single day.
+    ``dedup=True`` keeps the best hit of every group of near-duplicate papers
+    and lists the others under its ``duplicates``.
+
+    Returns the ranked hits with arXiv id, title, authors, categories, date and links
+    """
+    try:
+        log_debug(f"Searching titles: {query!r}, range={date_range}, category={category}, limit={limit}")
+        if not query or not query.strip():
+            raise ValueError("Empty search query")
+        if category:
+            validate_category(category)
+        date_from, date_to = parse_date_range(date_range)
+        limit = max(1, min(int(limit), MAX_LIMIT))
+
+        store = await run_blocking(open_store, base_dir)
+        # 去重会合并掉一部分结果，多取一些再截断
+        hits = await run_blocking(store.search, query, category=category, date_from=date_from,
+                                  date_to=date_to, limit=limit * 3 if dedup else limit)
+        if dedup:
+            hits = (await run_blocking(collapse_hits, base_dir, hits))[:limit]
+        log_debug(f"Found {len(hits)} hits")
+        return {
+            "success": True,
+            "message": f"Found {len(hits)} matching papers",
+            "data": {
+                "query": query,
+                "date_from": date_from,
+                "date_to": date_to,
+                "category": category,
+                "hits": hits
+            }
+        }
+
+    except Exception as e:
+        log_debug(f"Error in search_titles: {str(e)}")
+        return {
+            "success": False,
+            "message": "Failed to search titles",
+            "error": str(e)
+        }
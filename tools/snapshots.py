@@ -0,0 +1,109 @@
+"""Raw HTML snapshots of the crawled listing pages.
+
+Every listing a crawl stores also keeps the pages it was parsed from,
+compressed, next to the parsed output::
+
+    snapshots/<tag>/<YYYY-MM>/<date>.jsonl.gz     one JSON line per page:
+                                                  category, url, fetched_at, html
+    snapshots/<tag>/unparsed/<time>.jsonl.gz      pages of a crawl that failed
+
+When the listing markup changes and the parser breaks, the pages of the
+failed crawls are still on disk.  ``tools/reparse.py`` rebuilds the stored
+days from the snapshots once the parser is fixed, without fetching again.
+This module only imports the parser, so re-parse workers start quickly.
+"""
+import os
+import re
+import glob
+import gzip
+import json
+import time
+import uuid
+import logging
+from urllib.parse import parse_qs, urlsplit
+from tools.listing_parser import merge_pages, parse_listing
+from tools.storage import atomic_write, category_tag
+
+logger = logging.getLogger(__name__)
+
+def log_debug(message):
+    """Write debug message to log file"""
+    logger.debug(message)
+
+SNAPSHOTS_DIRNAME = "snapshots"
+UNPARSED_DIRNAME = "unparsed"
+# ARXIV_SNAPSHOTS=0 关闭快照
+SNAPSHOTS = os.environ.get("ARXIV_SNAPSHOTS", "1") != "0"
+COMPRESS_LEVEL = 6
+
+SNAPSHOT_DATE_RE = re.compile(r'(\d{4}-\d{2}-\d{2})\.jsonl\.gz$')
+
+def snapshot_path(base_dir: str, category: str, day: str = None) -> str:
+    """Snapshot of one stored day, or a new name for the pages of a failed crawl (``day=None``)"""
+    directory = os.path.join(base_dir, SNAPSHOTS_DIRNAME, category_tag(category))
+    if day is None:
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}.jsonl.gz"
+        return os.path.join(directory, UNPARSED_DIRNAME, name)
+    return os.path.join(directory, day[:7], f"{day}.jsonl.gz")
+
+def page_skip(url: str) -> int:
+    """Position of a listing page in its day (the ``skip=`` of its URL)"""
+    return int(parse_qs(urlsplit(url).query).get("skip", ["0"])[0])
+
+def write_snapshot(base_dir: str, category: str, pages: dict, day: str = None) -> str:
+    """Write the raw ``{url: (fetched_at, html)}`` pages of one crawl, compressed and atomically.
+
+    Pages are kept in listing order.  Returns the path of the snapshot.
+    """
+    path = snapshot_path(base_dir, category, day)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    lines = [json.dumps({"category": category, "url": url, "fetched_at": fetched_at, "html": html},
+                        ensure_ascii=False)
+             for url, (fetched_at, html) in sorted(pages.items(), key=lambda item: page_skip(item[0]))]
+    # mtime=0：同样的页面得到同样的字节
+    data = gzip.compress("\n".join(lines).encode("utf-8"), COMPRESS_LEVEL, mtime=0)
+    with atomic_write(path) as writer:
+        writer.write(data)
+    log_debug(f"Saved snapshot of {len(pages)} page(s) to {path} ({len(data)} bytes)")
+    return path
+
+def read_snapshot(path: str) -> list:
+    """Pages of a snapshot, each a dict with ``category``, ``url``, ``fetched_at`` and ``html``"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def find_snapshots(base_dir: str, categories=None, date_from: str = None, date_to: str = None) -> list:
+    """Snapshot paths of the given categories (all by default), oldest day first.
+
+    The date range applies to the snapshots of stored days; the pages of
+    failed crawls are always included, their day is only known once parsed.
+    """
+    root = os.path.join(base_dir, SNAPSHOTS_DIRNAME)
+    tags = [glob.escape(category_tag(category)) for category in categories] if categories else ["*"]
+    paths = []
+    for tag in tags:
+        for path in sorted(glob.glob(os.path.join(root, tag, "*", "*.jsonl.gz"))):
+            match = SNAPSHOT_DATE_RE.search(os.path.basename(path))
+            if match and (date_from and match.group(1) < date_from or date_to and match.group(1) > date_to):
+                continue
+            paths.append(path)
+    return paths
+
+def parse_snapshot(path: str) -> dict:
+    """Parse the pages of a snapshot into one listing (runs in the re-parse worker processes).
+
+    Returns ``path``, ``category``, ``pages`` and ``fetched_at``, plus the
+    merged ``listing`` or the ``error`` that stopped the parser.
+    """
+    result = {"path": path, "category": None, "pages": 0, "fetched_at": None}
+    try:
+        pages = read_snapshot(path)
+        if not pages:
+            raise Exception("Empty snapshot")
+        result.update(category=pages[0]["category"], pages=len(pages),
+                      fetched_at=max(page["fetched_at"] for page in pages))
+        listing = merge_pages([parse_listing(page["html"]) for page in pages])
+        result["listing"] = dict(listing, category=result["category"], pages=len(pages), unchanged=False)
+    except Exception as e:
+        result["error"] = str(e)
+    return result
@@ -0,0 +1,211 @@
+import os
+import re
+import glob
+import json
+import time
+import uuid
+import hashlib
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+def log_debug(message):
+    """Write debug message to log file"""
+    logger.debug(message)
+
+DEFAULT_CATEGORY = "cs.AI"
+
+# 我们跟踪的分类
+CATEGORIES = ("cs.AI", "cs.LG", "cs.CL", "cs.CV", "stat.ML")
+
+CATEGORY_RE = re.compile(r'^[a-z\-]+(\.[A-Za-z\-]+)?$')
+
+def validate_category(category: str) -> str:
+    """Return the category if it looks like an arXiv category (e.g. cs.AI, stat.ML)"""
+    if not category or not CATEGORY_RE.match(category):
+        raise ValueError(f"Invalid arXiv category: {category!r}")
+    return category
+
+def category_tag(category: str) -> str:
+    """Short name used in file names: cs.AI -> AI, stat.ML -> stat.ML"""
+    validate_category(category)
+    if category.startswith("cs."):
+        return category[3:]
+    return category
+
+def day_filename(category: str, day: str, total_entries: int) -> str:
+    """File name of one crawled day, e.g. arxiv_AI_2025-04-02_(140entries).txt"""
+    return f"arxiv_{category_tag(category)}_{day}_({total_entries}entries).txt"
+
+def day_file_pattern(base_dir: str, category: str) -> str:
+    """Glob pattern matching every stored day of a category"""
+    return os.path.join(base_dir, f"arxiv_{glob.escape(category_tag(category))}_*.txt")
+
+def parse_day_filename(path: str, category: str):
+    """Extract (date, total_entries) from a day file name, or None if it doesn't match"""
+    tag = re.escape(category_tag(category))
+    match = re.search(rf'arxiv_{tag}_(\d{{4}}-\d{{2}}-\d{{2}})_\((\d+)entries\)\.txt$', path)
+    if not match:
+        return None
+    return match.group(1), int(match.group(2))
+
+def find_day_files(base_dir: str, category: str) -> list:
+    """All stored day files of a category (only in base_dir, not recursive)"""
+    pattern = day_file_pattern(base_dir, category)
+    log_debug(f"Search pattern: {pattern}")
+    return glob.glob(pattern)
+
+def records_filename(filename: str) -> str:
+    """Sidecar file holding the structured records of a day file (.txt -> .jsonl)"""
+    return os.path.splitext(filename)[0] + ".jsonl"
+
+def manifest_filename(filename: str) -> str:
+    """Manifest of a day file: checksum and entry count of it and its records"""
+    return os.path.splitext(filename)[0] + ".manifest.json"
+
+class TornRead(Exception):
+    """A day file does not match its manifest (being replaced, or damaged)"""
+
+class LineWriter:
+    """File written line by line (or as raw bytes), with a running checksum and line count"""
+
+    def __init__(self, f, path: str):
+        self._f = f
+        self.path = path
+        self._sha256 = hashlib.sha256()
+        self.lines = 0
+        self.bytes = 0
+
+    def write_line(self, line: str):
+        # 行之间用换行分隔，末尾没有换行（与原来的 "\n".join 格式一致）
+        data = (("\n" if self.lines else "") + line).encode("utf-8")
+        self._f.write(data)
+        self._sha256.update(data)
+        self.lines += 1
+        self.bytes += len(data)
+
+    def write(self, data: bytes):
+        """Append raw bytes (binary formats); not counted as lines"""
+        self._f.write(data)
+        self._sha256.update(data)
+        self.bytes += len(data)
+
+    def summary(self) -> dict:
+        return {"sha256": self._sha256.hexdigest(), "entries": self.lines, "bytes": self.bytes}
+
+@contextmanager
+def atomic_write(path: str):
+    """Stream a file into a temporary name next to ``path``, then fsync and rename it into place.
+
+    Readers see either the old file or the complete new one, never a prefix.
+    The temporary name starts with a dot so the day file globs never match it.
+    The caller may still change ``writer.path`` (in the same directory) before
+    the block ends.  On error the temporary file is removed and nothing is
+    replaced.
+    """
+    directory, name = os.path.split(path)
+    tmp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            writer = LineWriter(f, path)
+            yield writer
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, writer.path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_dir(directory)
+
+def _fsync_dir(directory: str):
+    # 让重命名本身也落盘；Windows 上无法打开目录，跳过
+    try:
+        fd = os.open(directory or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def write_records(path: str, entries) -> dict:
+    """Write one JSON record per line, atomically; returns checksum and count"""
+    with atomic_write(path) as writer:
+        for entry in entries:
+            writer.write_line(json.dumps(entry, ensure_ascii=False))
+    return writer.summary()
+
+def write_day_files(base_dir: str, category: str, day: str, titles, entries) -> dict:
+    """Write the titles, records and manifest of a crawled day, each file atomically.
+
+    ``titles`` and ``entries`` may be iterators; lines are written as they
+    arrive.  The manifest is replaced last, so it only ever describes files
+    that are completely in place.  Returns the file names and the manifest.
+    """
+    with atomic_write(os.path.join(base_dir, day_filename(category, day, 0))) as writer:
+        for title in titles:
+            writer.write_line(title)
+        # 条目数写在文件名里，写完之后才知道
+        filename = day_filename(category, day, writer.lines)
+        writer.path = os.path.join(base_dir, filename)
+    titles_summary = writer.summary()
+    records_file = records_filename(filename)
+    records_summary = write_records(os.path.join(base_dir, records_file), entries)
+    manifest = {
+        "category": category,
+        "date": day,
+        "written_at": time.time(),
+        "files": {filename: titles_summary, records_file: records_summary},
+    }
+    with atomic_write(os.path.join(base_dir, manifest_filename(filename))) as writer:
+        writer.write_line(json.dumps(manifest, ensure_ascii=False))
+    log_debug(f"Wrote {filename} ({titles_summary['entries']} titles, {records_summary['entries']} records)")
+    return {"filename": filename, "records_filename": records_file, "manifest": manifest}
+
+def read_records(path: str) -> list:
+    """Read the records written by ``write_records``"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _read_checked(path: str, expected: dict) -> list:
+    with open(path, "rb") as f:
+        data = f.read()
+    lines = data.decode("utf-8").split("\n") if data else []
+    if hashlib.sha256(data).hexdigest() != expected["sha256"] or len(lines) != expected["entries"]:
+        raise TornRead(f"{os.path.basename(path)} does not match its manifest "
+                       f"({len(lines)} lines, {expected['entries']} expected)")
+    return lines
+
+def read_day_files(path: str, retries: int = 3) -> dict:
+    """Titles and records of a day file, validated against its manifest.
+
+    A writer replacing the same day between our reads shows up as a checksum
+    mismatch; the read is retried and ``TornRead`` raised if it persists.
+    Day files without a manifest (written before manifests existed) are read
+    unchecked.
+    """
+    manifest_path = manifest_filename(path)
+    records_path = records_filename(path)
+    for attempt in range(retries + 1):
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            with open(path, "r", encoding="utf-8") as f:
+                titles = [line.strip() for line in f if line.strip()]
+            records = read_records(records_path) if os.path.exists(records_path) else None
+            return {"titles": titles, "records": records, "checked": False}
+        files = manifest["files"]
+        try:
+            titles = _read_checked(path, files[os.path.basename(path)])
+            records = [json.loads(line) for line in _read_checked(records_path, files[os.path.basename(records_path)])]
+            return {"titles": titles, "records": records, "checked": True}
+        except (TornRead, FileNotFoundError, KeyError) as e:
+            if attempt == retries:
+                raise TornRead(str(e)) from e
+            log_debug(f"Retrying read of {path}: {str(e)}")
+            time.sleep(0.01 * (attempt + 1))
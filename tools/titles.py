@@ -1,9 +1,12 @@
 from typing import Dict, Any
-import os
-import glob
-import re
-from datetime import date
+import json
+import base64
 import logging
+from tools.cache import read_cache
+from tools.dedup import day_duplicates
+from tools.executor import run_blocking
+from tools.paper_store import RECORD_FIELDS, legacy_id
+from tools.storage import DEFAULT_CATEGORY, validate_category
 
 logger = logging.getLogger(__name__)
 
@@ -11,71 +14,133 @@ def log_debug(message):
     """Write debug message to log file"""
     logger.debug(message)
 
-async def get_latest_titles(base_dir: str) -> dict:
-    """Get the latest arXiv CS.AI paper titles from the local file.
-    
-    This will read the most recent file containing paper titles.
-    Use this when:
-    - You want to get the titles from the most recent crawl
-    - You don't need to fetch new data
-    
-    Returns the list of paper titles from the most recent crawl
-    """
+FIELDS = ("titles", "records")
+
+def encode_cursor(category: str, day: str, offset: int) -> str:
+    """Opaque cursor pointing at a position of one stored day"""
+    raw = json.dumps({"c": category, "d": day, "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return data["c"], data["d"], int(data["o"])
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+def _read_latest_titles(base_dir: str, category: str, offset: int, limit: int, cursor: str,
+                        fields: str, compact: bool, dedup: bool = False) -> dict:
     try:
-        log_debug("Getting latest titles...")
-        log_debug(f"Base directory: {base_dir}")
-        
-        # 获取当前工作目录
-        current_dir = os.getcwd()
-        log_debug(f"Current working directory: {current_dir}")
-        
-        # 搜索最新的文件
-        pattern = os.path.join(base_dir, "arxiv_AI_*.txt")
-        all_files = glob.glob(pattern)
-        log_debug(f"Found files: {all_files}")
-        
-        if not all_files:
+        if fields not in FIELDS:
+            raise ValueError(f"Invalid fields {fields!r}, expected one of {', '.join(FIELDS)}")
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be a positive number")
+        if offset < 0:
+            raise ValueError("offset must not be negative")
+
+        store = read_cache(base_dir)
+        if cursor:
+            category, day, offset = decode_cursor(cursor)
+            validate_category(category)
+            latest = store.get_day(category, day)
+            log_debug(f"Continuing {category} {day} at {offset}")
+        else:
+            validate_category(category)
+            log_debug("Getting latest titles...")
+            log_debug(f"Base directory: {base_dir}")
+
+            # 从缓存（未命中时查索引库）获取最新的一天
+            latest = store.latest_day(category)
+            log_debug(f"Latest day: {latest}")
+
+        if latest is None:
             return {
                 "success": False,
                 "message": "No paper files found",
                 "error": "No paper files found"
             }
-        
-        # 按修改时间排序
-        latest_file = max(all_files, key=os.path.getmtime)
-        log_debug(f"Latest file: {latest_file}")
-        
-        # 读取文件内容
-        with open(latest_file, "r", encoding="utf-8") as f:
-            titles = [line.strip() for line in f if line.strip()]
-        
-        # 提取日期和条目数
-        match = re.search(r'arxiv_AI_(\d{4}-\d{2}-\d{2})_\((\d+)entries\)\.txt', latest_file)
-        if not match:
-            return {
-                "success": False,
-                "message": "Invalid filename format",
-                "error": "Invalid filename format"
-            }
-        
-        file_date = match.group(1)
-        total_entries = int(match.group(2))
-        
+
+        file_date = latest["date"]
+        total_entries = latest["total_entries"]
+        data = {
+            "category": category,
+            "date": file_date,
+            "total_entries": total_entries,
+            "filename": latest["filename"],
+        }
+
+        duplicates = {}
+        if dedup:
+            # 去重要看整天的顺序：本页之前出现过的同一篇也算重复
+            keys = [record["arxiv_id"] or legacy_id(record["title"])
+                    for record in store.get_records(category, file_date)]
+            duplicates = day_duplicates(base_dir, category, file_date, keys)
+            data["distinct_entries"] = total_entries - len(duplicates)
+
+        # 只读取请求的那一页
+        if fields == "records":
+            items = store.get_records(category, file_date, offset=offset, limit=limit)
+        else:
+            items = store.get_titles(category, file_date, offset=offset, limit=limit)
+        next_offset = offset + len(items)
+        if dedup:
+            page = len(items)
+            items = [item for position, item in enumerate(items, offset) if position not in duplicates]
+            data["duplicates_removed"] = page - len(items)
+
+        if fields == "records":
+            if compact:
+                data["columns"] = list(RECORD_FIELDS)
+                data["rows"] = [[record[field] for field in RECORD_FIELDS] for record in items]
+            else:
+                data["records"] = items
+        else:
+            if compact:
+                data["text"] = "\n".join(items)
+            else:
+                data["titles"] = items
+
+        if limit is not None or offset:
+            data["offset"] = offset
+            data["limit"] = limit
+            data["has_more"] = next_offset < total_entries
+            data["next_cursor"] = encode_cursor(category, file_date, next_offset) if data["has_more"] else None
+
         return {
             "success": True,
-            "message": f"Successfully retrieved {len(titles)} titles",
-            "data": {
-                "date": file_date,
-                "total_entries": total_entries,
-                "filename": os.path.basename(latest_file),
-                "titles": titles
-            }
+            "message": f"Successfully retrieved {len(items)} {fields}",
+            "data": data
         }
-        
+
     except Exception as e:
         log_debug(f"Error in get_latest_titles: {str(e)}")
         return {
             "success": False,
             "message": "Failed to get titles",
             "error": str(e)
-        } 
\ No newline at end of file
+        }
+
+async def get_latest_titles(base_dir: str, category: str = DEFAULT_CATEGORY, offset: int = 0,
+                            limit: int = None, cursor: str = None, fields: str = "titles",
+                            compact: bool = False, dedup: bool = False) -> dict:
+    """Get the latest arXiv paper titles of a category (CS.AI by default) from the local store.
+
+    This will read the most recently crawled day from the local paper store.
+    Use this when:
+    - You want to get the titles from the most recent crawl
+    - You don't need to fetch new data
+
+    Large days can be read page by page: ``offset``/``limit`` select a slice,
+    and ``next_cursor`` continues on the same day even if a newer crawl lands
+    meanwhile.  ``fields="records"`` returns full records instead of titles;
+    ``compact=True`` returns titles as one newline-separated ``text`` and
+    records as ``columns`` + ``rows``.  ``dedup=True`` leaves out papers
+    that repeat earlier work: replacements and cross-lists of papers listed
+    on an earlier day, and near-duplicate titles (see ``tools.dedup``).
+
+    Returns the list of paper titles from the most recent crawl
+    """
+    # 索引库查询在I/O线程池里执行，不阻塞事件循环
+    return await run_blocking(_read_latest_titles, base_dir, category, offset, limit, cursor, fields, compact,
+                              dedup)
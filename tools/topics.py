@@ -0,0 +1,445 @@
+#!/usr/bin/env python
+"""Per-day topics and term trends over the stored titles.
+
+For every stored day the index keeps, in ``arxiv_topics.db`` next to the
+paper store:
+
+- how many titles of the day contain each term (words and two-word phrases),
+- the day's topics: its titles clustered with spherical k-means over a
+  sparse TF-IDF matrix (NumPy/SciPy), with a label, size, top terms and the
+  papers closest to each topic's centre.
+
+A trend query then reads one row per day, so months of history cost
+O(days) instead of re-reading every title.  The index follows the store:
+days whose digest changed since they were indexed are re-indexed on the
+next query (or explicitly with ``python -m tools.topics build``).
+"""
+import os
+import re
+import json
+import math
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+from collections import Counter
+import numpy as np
+from scipy import sparse
+from tools.executor import run_blocking
+from tools.paper_store import open_store
+from tools.search import parse_date_range
+from tools.storage import CATEGORIES, DEFAULT_CATEGORY, validate_category
+
+logger = logging.getLogger(__name__)
+
+def log_debug(message):
+    """Write debug message to log file"""
+    logger.debug(message)
+
+TOPICS_DB_FILENAME = "arxiv_topics.db"
+
+# 每个主题大约包含的论文数；主题数在 [1, MAX_TOPICS] 之间
+PAPERS_PER_TOPIC = 25
+MAX_TOPICS = int(os.environ.get("ARXIV_MAX_TOPICS", "12"))
+KMEANS_ITERATIONS = 20
+TOP_TERMS = 8
+TOP_PAPERS = 5
+
+TOKEN_RE = re.compile(r"[a-z][a-z0-9]*(?:-[a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+a an the of for and or in on with to via from by at as into onto over under using use based
+towards toward through is are be been being its it this that these those we our you your not no
+can do does how what when where which who why new novel approach approaches method methods study
+studies paper analysis case between beyond within without than more less vs versus per
+""".split())
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS indexed_days (
+    category   TEXT NOT NULL,
+    date       TEXT NOT NULL,
+    digest     TEXT NOT NULL,
+    total      INTEGER NOT NULL,
+    indexed_at REAL NOT NULL,
+    PRIMARY KEY (category, date)
+);
+
+-- 每天包含某个词的标题数
+CREATE TABLE IF NOT EXISTS day_terms (
+    term     TEXT NOT NULL,
+    category TEXT NOT NULL,
+    date     TEXT NOT NULL,
+    count    INTEGER NOT NULL,
+    PRIMARY KEY (term, category, date)
+) WITHOUT ROWID;
+
+-- 所有已索引日期中包含某个词的标题数，用来计算IDF
+CREATE TABLE IF NOT EXISTS term_totals (
+    term  TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS day_topics (
+    category TEXT NOT NULL,
+    date     TEXT NOT NULL,
+    topic    INTEGER NOT NULL,
+    label    TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    terms    TEXT NOT NULL,
+    papers   TEXT NOT NULL,
+    PRIMARY KEY (category, date, topic)
+);
+"""
+
+def tokenize(title: str) -> list:
+    return [token for token in TOKEN_RE.findall(title.lower()) if len(token) > 1]
+
+def title_terms(title: str) -> list:
+    """Words and adjacent word pairs of a title, stopwords removed"""
+    tokens = tokenize(title)
+    words = [token for token in tokens if token not in STOPWORDS]
+    pairs = [f"{a} {b}" for a, b in zip(tokens, tokens[1:]) if a not in STOPWORDS and b not in STOPWORDS]
+    return words + pairs
+
+def normalize_term(term: str) -> str:
+    """The index key of a query term: one word or a two-word phrase"""
+    tokens = tokenize(term)
+    if not tokens or len(tokens) > 2:
+        raise ValueError(f"Trend terms are one word or a two-word phrase, got {term!r}")
+    if any(token in STOPWORDS for token in tokens):
+        raise ValueError(f"{term!r} contains a stopword, which is not indexed")
+    return " ".join(tokens)
+
+def tfidf_matrix(term_lists: list, idf) -> tuple:
+    """Row-normalized sparse TF-IDF matrix of the titles and its vocabulary"""
+    vocabulary = {}
+    indptr, indices, data = [0], [], []
+    for terms in term_lists:
+        for term, count in Counter(terms).items():
+            indices.append(vocabulary.setdefault(term, len(vocabulary)))
+            data.append(1.0 + math.log(count))
+        indptr.append(len(indices))
+    matrix = sparse.csr_matrix((np.array(data, dtype=np.float32), indices, indptr),
+                               shape=(len(term_lists), len(vocabulary)))
+    weights = np.array([idf(term) for term in vocabulary], dtype=np.float32)
+    matrix = matrix @ sparse.diags(weights)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    matrix = sparse.diags(1.0 / norms) @ matrix
+    return sparse.csr_matrix(matrix), list(vocabulary)
+
+def spherical_kmeans(matrix, k: int, seed: int, iterations: int = KMEANS_ITERATIONS) -> tuple:
+    """Cluster unit-length rows by cosine similarity; returns (labels, centroids, similarities)"""
+    n = matrix.shape[0]
+    rng = np.random.default_rng(seed)
+    # k-means++ 初始化：依次选离已选中心最远的点（按相似度加权）
+    centers = [int(rng.integers(n))]
+    best = matrix @ matrix[centers[0]].T.toarray().ravel()
+    for _ in range(1, k):
+        distance = np.clip(1.0 - best, 0.0, None)
+        total = distance.sum()
+        index = int(rng.choice(n, p=distance / total)) if total > 0 else int(rng.integers(n))
+        centers.append(index)
+        best = np.maximum(best, matrix @ matrix[index].T.toarray().ravel())
+    centroids = matrix[centers].toarray()
+
+    labels = None
+    for _ in range(iterations):
+        similarities = np.asarray(matrix @ centroids.T)
+        new_labels = similarities.argmax(axis=1)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        # 一次稀疏乘法求出所有簇的向量和
+        membership = sparse.csr_matrix((np.ones(n, dtype=np.float32), (labels, np.arange(n))), shape=(k, n))
+        centroids = np.asarray((membership @ matrix).todense())
+        norms = np.linalg.norm(centroids, axis=1)
+        empty = norms == 0
+        if empty.any():
+            # 空簇重新放到离自己中心最远的点上
+            worst = np.argsort(similarities[np.arange(n), labels])[:int(empty.sum())]
+            centroids[empty] = matrix[worst].toarray()
+            norms[empty] = 1.0
+        centroids /= norms[:, None]
+    similarities = np.asarray(matrix @ centroids.T)
+    return labels, centroids, similarities[np.arange(n), labels]
+
+def _label(terms: list) -> str:
+    """Up to three top terms, skipping words already part of a chosen phrase"""
+    chosen = []
+    for term in terms:
+        if any(term in other.split() or other in term.split() for other in chosen):
+            continue
+        chosen.append(term)
+        if len(chosen) == 3:
+            break
+    return " / ".join(chosen)
+
+def cluster_day(records: list, idf, seed: int = 0, term_lists: list = None) -> list:
+    """Topics of one day's records, largest first (``term_lists``: ``title_terms`` of each record)"""
+    if term_lists is None:
+        term_lists = [title_terms(record.get("title") or "") for record in records]
+    pairs = [(record, terms) for record, terms in zip(records, term_lists) if record.get("title")]
+    if not pairs:
+        return []
+    records = [record for record, _ in pairs]
+    matrix, vocabulary = tfidf_matrix([terms for _, terms in pairs], idf)
+    k = max(1, min(MAX_TOPICS, len(records) // PAPERS_PER_TOPIC, len(records)))
+    if matrix.nnz == 0:
+        k = 1
+    labels, centroids, similarity = spherical_kmeans(matrix, k, seed)
+    topics = []
+    for topic in range(k):
+        members = np.flatnonzero(labels == topic)
+        if not len(members):
+            continue
+        order = np.argsort(-centroids[topic])[:TOP_TERMS]
+        terms = [vocabulary[j] for j in order if centroids[topic, j] > 0]
+        closest = members[np.argsort(-similarity[members])[:TOP_PAPERS]]
+        topics.append({
+            "label": _label(terms) or "(untitled)",
+            "size": int(len(members)),
+            "terms": [{"term": vocabulary[j], "weight": round(float(centroids[topic, j]), 4)}
+                      for j in order if centroids[topic, j] > 0],
+            "papers": [{"arxiv_id": records[i].get("arxiv_id"), "title": records[i]["title"]}
+                       for i in closest],
+        })
+    topics.sort(key=lambda topic: -topic["size"])
+    return topics
+
+class TopicIndex:
+    """Per-day term counts and topics, kept in step with the paper store"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.stats = {"days_indexed": 0, "index_time": 0.0, "updates": 0}
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def _idf(self, terms: set):
+        """IDF of the given terms over every indexed title"""
+        total = self.conn.execute("SELECT COALESCE(SUM(total), 0) FROM indexed_days").fetchone()[0]
+        counts = {}
+        terms = list(terms)
+        for start in range(0, len(terms), 500):
+            chunk = terms[start:start + 500]
+            counts.update(self.conn.execute(
+                f"SELECT term, count FROM term_totals WHERE term IN ({', '.join('?' * len(chunk))})", chunk))
+        return lambda term: math.log((1 + total) / (1 + counts.get(term, 0))) + 1.0
+
+    def _add_terms(self, category: str, date: str, term_lists: list) -> int:
+        counts = Counter(term for terms in term_lists for term in set(terms))
+        self.conn.executemany("INSERT INTO day_terms (term, category, date, count) VALUES (?, ?, ?, ?)",
+                              [(term, category, date, count) for term, count in counts.items()])
+        self.conn.executemany("INSERT INTO term_totals (term, count) VALUES (?, ?) "
+                              "ON CONFLICT (term) DO UPDATE SET count = count + excluded.count",
+                              counts.items())
+        return len(counts)
+
+    def _remove_day(self, category: str, date: str):
+        # 先从总数里减掉这一天旧的词频
+        self.conn.execute(
+            "UPDATE term_totals SET count = count - (SELECT d.count FROM day_terms d "
+            "WHERE d.term = term_totals.term AND d.category = ? AND d.date = ?) "
+            "WHERE term IN (SELECT term FROM day_terms WHERE category = ? AND date = ?)",
+            (category, date, category, date))
+        self.conn.execute("DELETE FROM day_terms WHERE category = ? AND date = ?", (category, date))
+        self.conn.execute("DELETE FROM day_topics WHERE category = ? AND date = ?", (category, date))
+        self.conn.execute("DELETE FROM indexed_days WHERE category = ? AND date = ?", (category, date))
+
+    def update(self, store, category: str) -> int:
+        """Index the days of a category that are new or changed in the store; returns how many"""
+        with self._lock:
+            indexed = dict(self.conn.execute(
+                "SELECT date, digest FROM indexed_days WHERE category = ?", (category,)).fetchall())
+            stale = [day for day in store.list_days(category) if indexed.get(day["date"]) != day["digest"]]
+            if not stale:
+                return 0
+            start = time.perf_counter()
+            records = {day["date"]: store.get_records(category, day["date"]) for day in stale}
+            terms = {date: [title_terms(record.get("title") or "") for record in day_records]
+                     for date, day_records in records.items()}
+
+            # 先写入所有词频（IDF 用到全部日期），再逐日聚类
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for day in stale:
+                    self._remove_day(category, day["date"])
+                    self._add_terms(category, day["date"], terms[day["date"]])
+                    self.conn.execute(
+                        "INSERT INTO indexed_days (category, date, digest, total, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                        (category, day["date"], day["digest"], len(records[day["date"]]), time.time()))
+                self.conn.execute("DELETE FROM term_totals WHERE count <= 0")
+                for day in stale:
+                    day_terms = terms[day["date"]]
+                    idf = self._idf({term for title in day_terms for term in title})
+                    topics = cluster_day(records[day["date"]], idf, seed=int(day["date"].replace("-", "")),
+                                         term_lists=day_terms)
+                    self.conn.executemany(
+                        "INSERT INTO day_topics (category, date, topic, label, size, terms, papers) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [(category, day["date"], i, topic["label"], topic["size"],
+                          json.dumps(topic["terms"], ensure_ascii=False),
+                          json.dumps(topic["papers"], ensure_ascii=False)) for i, topic in enumerate(topics)])
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            elapsed = time.perf_counter() - start
+            self.stats["days_indexed"] += len(stale)
+            self.stats["index_time"] += elapsed
+            self.stats["updates"] += 1
+            log_debug(f"Indexed {len(stale)} days of {category} in {elapsed:.2f}s")
+            return len(stale)
+
+    def topics(self, category: str, date: str):
+        """Stored topics of a day, None if the day is not indexed"""
+        with self._lock:
+            row = self.conn.execute("SELECT total FROM indexed_days WHERE category = ? AND date = ?",
+                                    (category, date)).fetchone()
+            if row is None:
+                return None
+            rows = self.conn.execute(
+                "SELECT label, size, terms, papers FROM day_topics WHERE category = ? AND date = ? ORDER BY topic",
+                (category, date)).fetchall()
+        return {"total": row[0],
+                "topics": [{"label": label, "size": size, "terms": json.loads(terms), "papers": json.loads(papers)}
+                           for label, size, terms, papers in rows]}
+
+    def trend(self, term: str, category: str, date_from: str = None, date_to: str = None) -> list:
+        """(date, titles containing term, titles) of every indexed day in the range, oldest first"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT i.date, COALESCE(t.count, 0), i.total FROM indexed_days i "
+                "LEFT JOIN day_terms t ON t.term = ? AND t.category = i.category AND t.date = i.date "
+                "WHERE i.category = ? AND i.date >= ? AND i.date <= ? ORDER BY i.date",
+                (term, category, date_from or "", date_to or "9999-99-99")).fetchall()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            days, terms = self.conn.execute(
+                "SELECT COUNT(*), (SELECT COUNT(*) FROM term_totals) FROM indexed_days").fetchone()
+        return dict(self.stats, index_time=round(self.stats["index_time"], 3), days=days, terms=terms)
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def open_topic_index(base_dir: str) -> TopicIndex:
+    """Process-wide topic index of a base directory"""
+    path = os.path.join(base_dir, TOPICS_DB_FILENAME)
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = TopicIndex(path)
+        return index
+
+def close_topic_indexes():
+    with _indexes_lock:
+        for index in _indexes.values():
+            index.close()
+        _indexes.clear()
+
+def _updated_index(base_dir: str, category: str) -> TopicIndex:
+    index = open_topic_index(base_dir)
+    index.update(open_store(base_dir), category)
+    return index
+
+def _topics_for_day(base_dir: str, category: str, date: str) -> dict:
+    index = _updated_index(base_dir, category)
+    if date is None:
+        latest = open_store(base_dir).latest_day(category)
+        if latest is None:
+            raise LookupError(f"No papers stored for {category}")
+        date = latest["date"]
+    day = index.topics(category, date)
+    if day is None:
+        raise LookupError(f"No papers stored for {category} on {date}")
+    return {"category": category, "date": date, "total_entries": day["total"], "topics": day["topics"]}
+
+async def topics_for_day(base_dir: str, category: str = DEFAULT_CATEGORY, date: str = None) -> dict:
+    """Topics of one stored day (the latest by default), largest first.
+
+    Returns every topic's label, size, top terms and closest papers
+    """
+    try:
+        validate_category(category)
+        if date is not None:
+            parse_date_range(date)
+        data = await run_blocking(_topics_for_day, base_dir, category, date)
+        return {
+            "success": True,
+            "message": f"{len(data['topics'])} topics among {data['total_entries']} papers of {data['date']}",
+            "data": data
+        }
+    except Exception as e:
+        log_debug(f"Error in topics_for_day: {str(e)}")
+        return {
+            "success": False,
+            "message": "Failed to get topics",
+            "error": str(e)
+        }
+
+def _trend(base_dir: str, term: str, category: str, date_from: str, date_to: str) -> dict:
+    rows = _updated_index(base_dir, category).trend(term, category, date_from, date_to)
+    days = [{"date": date, "count": count, "total": total, "share": round(count / total, 4) if total else 0.0}
+            for date, count, total in rows]
+    matches = sum(day["count"] for day in days)
+    papers = sum(day["total"] for day in days)
+    # 前后两半的占比，粗略判断上升还是下降
+    half = len(days) // 2
+    first = days[:half] or days
+    second = days[half:] or days
+
+    def share(part):
+        total = sum(day["total"] for day in part)
+        return sum(day["count"] for day in part) / total if total else 0.0
+
+    return {"term": term, "category": category, "date_from": date_from, "date_to": date_to,
+            "count": matches, "papers": papers, "share": round(matches / papers, 4) if papers else 0.0,
+            "first_half_share": round(share(first), 4), "second_half_share": round(share(second), 4),
+            "days": days}
+
+async def trend(base_dir: str, term: str, date_range: str = None, category: str = DEFAULT_CATEGORY) -> dict:
+    """How many titles per day contain a word or two-word phrase.
+
+    Returns per-day counts and shares plus totals for the range
+    """
+    try:
+        validate_category(category)
+        key = normalize_term(term or "")
+        date_from, date_to = parse_date_range(date_range)
+        data = await run_blocking(_trend, base_dir, key, category, date_from, date_to)
+        return {
+            "success": True,
+            "message": f"{data['count']} of {data['papers']} titles over {len(data['days'])} days mention {key!r}",
+            "data": data
+        }
+    except Exception as e:
+        log_debug(f"Error in trend: {str(e)}")
+        return {
+            "success": False,
+            "message": "Failed to compute trend",
+            "error": str(e)
+        }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--base-dir", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument("--categories", nargs="+", default=list(CATEGORIES))
+    args = parser.parse_args()
+
+    store = open_store(args.base_dir)
+    index = open_topic_index(args.base_dir)
+    start = time.perf_counter()
+    days = sum(index.update(store, category) for category in args.categories)
+    print(f"Indexed {days} days into {index.path} in {time.perf_counter() - start:.2f}s")
+    close_topic_indexes()